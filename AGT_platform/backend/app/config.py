@@ -115,6 +115,21 @@ class Config:
     S3_UPLOAD_SPOOL_MAX_MEMORY_BYTES = _env_int(
         "S3_UPLOAD_SPOOL_MAX_MEMORY_BYTES", default=16 * 1024 * 1024
     )
+    # Grading workers fetch a submission's artifacts concurrently on one client.
+    S3_DOWNLOAD_CONCURRENCY = max(1, min(_env_int("S3_DOWNLOAD_CONCURRENCY", default=4), 32))
+    # Check downloaded bytes against the artifact row's recorded sha256 (when one is stored).
+    S3_DOWNLOAD_VERIFY_SHA256 = (
+        _env_str("S3_DOWNLOAD_VERIFY_SHA256").strip().lower() != "false"
+    )
+    # Process-wide boto3 clients (one per endpoint + credentials): connection pool size, retry
+    # policy ("standard", "adaptive" or "legacy") and socket timeouts.
+    S3_MAX_POOL_CONNECTIONS = max(1, min(_env_int("S3_MAX_POOL_CONNECTIONS", default=32), 1024))
+    S3_RETRY_MODE = _env_str("S3_RETRY_MODE").strip().lower() or "standard"
+    S3_MAX_ATTEMPTS = max(1, min(_env_int("S3_MAX_ATTEMPTS", default=3), 20))
+    S3_CONNECT_TIMEOUT_SEC = max(0.1, _env_float("S3_CONNECT_TIMEOUT_SEC", default=10.0))
+    S3_READ_TIMEOUT_SEC = max(0.1, _env_float("S3_READ_TIMEOUT_SEC", default=60.0))
+    # Concurrent HEAD requests when finalizing a multi-file upload.
+    S3_HEAD_CONCURRENCY = max(1, min(_env_int("S3_HEAD_CONCURRENCY", default=8), 64))
 
     # Presigned PUT lifetime (browser → S3 direct upload).
     S3_PRESIGN_PUT_EXPIRES = _env_int("S3_PRESIGN_PUT_EXPIRES", default=3600)
@@ -197,6 +212,43 @@ class Config:
         ),
     )
     OPENAI_MODEL = _env_str("OPENAI_MODEL").strip() or "gpt-4o-mini"
+    # Process-wide OpenAI / Anthropic SDK clients (see ``llm_router.shared_openai_sdk_client``):
+    # one keep-alive HTTP pool per provider + key, shared by all threads and tasks in a worker.
+    LLM_HTTP_MAX_CONNECTIONS = max(1, min(_env_int("LLM_HTTP_MAX_CONNECTIONS", default=64), 1024))
+    LLM_HTTP_MAX_KEEPALIVE = max(
+        0, min(_env_int("LLM_HTTP_MAX_KEEPALIVE", default=32), LLM_HTTP_MAX_CONNECTIONS)
+    )
+    LLM_HTTP_KEEPALIVE_EXPIRY_SEC = max(
+        0.0, _env_float("LLM_HTTP_KEEPALIVE_EXPIRY_SEC", default=60.0)
+    )
+    # Per-request timeout (seconds) for SDK calls; 0 keeps the SDK default.
+    LLM_HTTP_TIMEOUT_SEC = max(0.0, _env_float("LLM_HTTP_TIMEOUT_SEC", default=0.0))
+    LLM_HTTP_CONNECT_TIMEOUT_SEC = max(
+        0.0, _env_float("LLM_HTTP_CONNECT_TIMEOUT_SEC", default=10.0)
+    )
+    # Page-parallel PDF text extraction (``tools.extract_pdf_document``): PDFs with at least
+    # PDF_EXTRACT_MIN_PAGES pages are split across this many spawn worker processes. 0/1 = serial
+    # (also forced inside daemonic Celery prefork children, which cannot start processes).
+    PDF_EXTRACT_WORKERS = max(0, min(_env_int("PDF_EXTRACT_WORKERS", default=0), 32))
+    PDF_EXTRACT_MIN_PAGES = max(1, _env_int("PDF_EXTRACT_MIN_PAGES", default=8))
+    # Per-process cache of extracted pages keyed by PDF sha256; 0 disables.
+    PDF_EXTRACT_CACHE_MAX_ENTRIES = max(
+        0, _env_int("PDF_EXTRACT_CACHE_MAX_ENTRIES", default=64)
+    )
+    # Content-addressed cache of parsed LLM JSON replies (see ``app.grading.llm_response_cache``).
+    # off (default) | memory | disk (SQLite under LLM_RESPONSE_CACHE_DIR) | redis (REDIS_URL).
+    LLM_RESPONSE_CACHE = _env_str("LLM_RESPONSE_CACHE").strip().lower() or "off"
+    LLM_RESPONSE_CACHE_TTL_SEC = max(
+        60, _env_int("LLM_RESPONSE_CACHE_TTL_SEC", default=7 * 24 * 3600)
+    )
+    LLM_RESPONSE_CACHE_MAX_ENTRIES = max(
+        1, _env_int("LLM_RESPONSE_CACHE_MAX_ENTRIES", default=2048)
+    )
+    # Empty → ``<tmp>/agt_llm_response_cache``. Disk store is trimmed LRU-first to MAX_BYTES.
+    LLM_RESPONSE_CACHE_DIR = _env_str("LLM_RESPONSE_CACHE_DIR").strip()
+    LLM_RESPONSE_CACHE_MAX_BYTES = max(
+        0, _env_int("LLM_RESPONSE_CACHE_MAX_BYTES", default=512 * 1024 * 1024)
+    )
     # If true, re-run or arbitrate grading with OpenAI when local model confidence is low.
     ESCALATE_TO_OPENAI = _env_bool("ESCALATE_TO_OPENAI")
 
@@ -241,6 +293,108 @@ class Config:
         1,
         min(_env_int("MULTIMODAL_SAMPLES_PER_MODEL", default=5), 16),
     )
+    # Max in-flight ``chat_json`` samples **per grading model** inside one chunk
+    # (:class:`~app.grading.multimodal.model_runner.MultiModelChunkRunner`). 1 = serial (default);
+    # >1 runs the k samples on a bounded thread pool (``sample_index`` order is unchanged).
+    MULTIMODAL_SAMPLE_CONCURRENCY = max(
+        1,
+        min(_env_int("MULTIMODAL_SAMPLE_CONCURRENCY", default=1), 16),
+    )
+    # Chunks graded in parallel by :meth:`MultimodalGradingPipeline.run` (1 = serial, default).
+    # Results and audit rows are still emitted in original chunk order.
+    MULTIMODAL_CHUNK_GRADING_WORKERS = max(
+        1,
+        min(_env_int("MULTIMODAL_CHUNK_GRADING_WORKERS", default=1), 32),
+    )
+    # Process-wide cap on concurrent grading ``chat_json`` calls across all runners, chunk workers
+    # and sample threads (0 = unlimited). Keep below the provider's per-key rate limits.
+    MULTIMODAL_LLM_MAX_IN_FLIGHT = max(
+        0,
+        min(_env_int("MULTIMODAL_LLM_MAX_IN_FLIGHT", default=0), 256),
+    )
+    # OpenAI grading clients return a model's k samples (per adaptive wave) from one ``n``-choice
+    # request so the prompt is billed once. Set to "false" to always send k separate requests.
+    MULTIMODAL_OPENAI_MULTI_CHOICE = (
+        _env_str("MULTIMODAL_OPENAI_MULTI_CHOICE").strip().lower() != "false"
+    )
+    # Adaptive k-sampling: draw grading samples in waves and stop a chunk early once its outcome
+    # is settled (see semantic_confidence.adaptive_sampling_can_stop). Off = always k per model.
+    MULTIMODAL_ADAPTIVE_SAMPLING = _env_bool("MULTIMODAL_ADAPTIVE_SAMPLING")
+    # Reps per model drawn between stop checks.
+    MULTIMODAL_ADAPTIVE_WAVE_SIZE = max(
+        1,
+        min(_env_int("MULTIMODAL_ADAPTIVE_WAVE_SIZE", default=2), 16),
+    )
+    # Valid (parsed) samples required before any early stop.
+    MULTIMODAL_ADAPTIVE_MIN_SAMPLES = max(
+        1,
+        min(_env_int("MULTIMODAL_ADAPTIVE_MIN_SAMPLES", default=2), 16),
+    )
+    # ``unanimous`` (all valid samples agree) or ``band_stable`` (remaining samples cannot move
+    # the chunk across the auto-accept / caution / flagged confidence cut points).
+    MULTIMODAL_ADAPTIVE_STOP_RULE = (
+        _env_str("MULTIMODAL_ADAPTIVE_STOP_RULE").strip().lower() or "unanimous"
+    )
+    # Assignment-scoped reuse of answer key / blank template resolution, answer-key audit
+    # embedding, parsed blank notebook and custom rubric plan (see multimodal.assignment_context).
+    # off (default) | memory | disk (SQLite under ..._DIR) | redis (REDIS_URL).
+    MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE = (
+        _env_str("MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE").strip().lower() or "off"
+    )
+    MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE_MAX_ENTRIES = max(
+        1, _env_int("MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE_MAX_ENTRIES", default=256)
+    )
+    MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE_TTL_SEC = max(
+        60, _env_int("MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE_TTL_SEC", default=24 * 3600)
+    )
+    MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE_DIR = _env_str(
+        "MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE_DIR"
+    ).strip()
+    # Reuse a chunk's aggregated grade for later submissions with the same normalized response,
+    # rubric rows and answer-key segment (see multimodal.grade_reuse). Stored in the assignment
+    # context cache, so it needs MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE != off. Comma-separated
+    # assignment ids in ..._DISABLED_ASSIGNMENTS always grade every submission.
+    MULTIMODAL_GRADE_REUSE = _env_bool("MULTIMODAL_GRADE_REUSE")
+    MULTIMODAL_GRADE_REUSE_DISABLED_ASSIGNMENTS = _env_str(
+        "MULTIMODAL_GRADE_REUSE_DISABLED_ASSIGNMENTS"
+    ).strip()
+    # Rule-based fast path before the LLM (multimodal.rule_grader): scaffolded code identical to
+    # its aligned answer-key segment gets full credit, empty responses zero. "false" disables.
+    MULTIMODAL_RULE_GRADER = _env_str("MULTIMODAL_RULE_GRADER").strip().lower() != "false"
+    # Cohort batch mode (run_db_cohort_multimodal_pipeline): responses to one question whose
+    # student_response embeddings reach this cosine join a cluster graded once (multimodal.cohort).
+    MULTIMODAL_COHORT_SIMILARITY = max(
+        0.5, min(_env_float("MULTIMODAL_COHORT_SIMILARITY", default=0.97), 1.0)
+    )
+    # Submissions / cluster representatives graded concurrently in cohort mode.
+    MULTIMODAL_COHORT_WORKERS = max(1, min(_env_int("MULTIMODAL_COHORT_WORKERS", default=4), 32))
+    # Per-chunk answer-key trimming (answer_key_chunk_enrich.assemble_answer_key_context): when
+    # > 0, a chunk with a matched answer-key segment gets its matched section plus the N most
+    # similar sections within this many (estimated) tokens instead of the whole key. 0 = off.
+    MULTIMODAL_ANSWER_KEY_TOKEN_BUDGET = max(
+        0, min(_env_int("MULTIMODAL_ANSWER_KEY_TOKEN_BUDGET", default=0), 32_000)
+    )
+    MULTIMODAL_ANSWER_KEY_NEIGHBOR_SECTIONS = max(
+        0, min(_env_int("MULTIMODAL_ANSWER_KEY_NEIGHBOR_SECTIONS", default=2), 10)
+    )
+    # Chunk packing (multimodal.chunk_packing): grade up to ..._MAX_BATCH chunks that share a
+    # rubric and have at most ..._MAX_CHARS of text in one request. Skipped when grade reuse is on.
+    MULTIMODAL_CHUNK_PACKING = _env_bool("MULTIMODAL_CHUNK_PACKING")
+    MULTIMODAL_CHUNK_PACKING_MAX_CHARS = max(
+        1, _env_int("MULTIMODAL_CHUNK_PACKING_MAX_CHARS", default=600)
+    )
+    MULTIMODAL_CHUNK_PACKING_MAX_BATCH = max(
+        2, min(_env_int("MULTIMODAL_CHUNK_PACKING_MAX_BATCH", default=4), 16)
+    )
+    # Grading cascade (multimodal.cascade): sample the cheapest grading model first and call
+    # GRADING_MODEL_2 / GRADING_MODEL_3 only while the chunk's ai_confidence is below ..._MIN or
+    # its parse-failure rate is high. ..._MODEL_PRICES ("label=in/out,...", USD per 1M tokens)
+    # orders tiers cheapest first and prices the per-tier cost in the trace.
+    MULTIMODAL_GRADING_CASCADE = _env_bool("MULTIMODAL_GRADING_CASCADE")
+    MULTIMODAL_CASCADE_CONFIDENCE_MIN = max(
+        0.0, min(_env_float("MULTIMODAL_CASCADE_CONFIDENCE_MIN", default=0.85), 1.0)
+    )
+    MULTIMODAL_CASCADE_MODEL_PRICES = _env_str("MULTIMODAL_CASCADE_MODEL_PRICES").strip()
     # When true, each chunk is sent to the **structure** LLM once to fill ``evidence["trio"]``
     # (question / student_response / instructor_context) before answer-key alignment. Uses
     # Claude (Anthropic) when configured, else OpenAI — not Ollama.
@@ -307,6 +461,18 @@ class Config:
         _env_str("OLLAMA_EMBEDDINGS_MODEL").strip() or "nomic-embed-text"
     )
     RAG_EMBED_MAX_CHARS = _env_int("RAG_EMBED_MAX_CHARS", default=24000)
+    # Texts per embedding request / SentenceTransformer ``encode`` batch in
+    # :func:`app.grading.rag_embeddings.compute_submission_embeddings`.
+    RAG_EMBED_BATCH_SIZE = max(1, min(_env_int("RAG_EMBED_BATCH_SIZE", default=64), 2048))
+    # Embedding vector cache (:mod:`app.grading.embedding_cache`): off (default) | memory |
+    # disk (SQLite under RAG_EMBED_CACHE_DIR, shared by workers on one host).
+    RAG_EMBED_CACHE = _env_str("RAG_EMBED_CACHE").strip().lower() or "off"
+    RAG_EMBED_CACHE_MAX_ENTRIES = max(1, _env_int("RAG_EMBED_CACHE_MAX_ENTRIES", default=4096))
+    # Empty → ``<tmp>/agt_embedding_cache``. Disk store is trimmed LRU-first to MAX_BYTES.
+    RAG_EMBED_CACHE_DIR = _env_str("RAG_EMBED_CACHE_DIR").strip()
+    RAG_EMBED_CACHE_MAX_BYTES = max(
+        0, _env_int("RAG_EMBED_CACHE_MAX_BYTES", default=1024 * 1024 * 1024)
+    )
     # auto | openai_first | ollama_first | openai_only | ollama_only
     # auto: try OpenAI before Ollama when OPENAI_API_KEY is set (avoids Ollama /api/embed 404 noise).
     RAG_EMBED_ORDER = _env_str("RAG_EMBED_ORDER").strip().lower() or "auto"
@@ -11,7 +11,7 @@ from __future__ import annotations
 import csv
 import io
 import logging
-from typing import Final
+from typing import Callable, Final
 
 from app.grading.tools import extract_from_ipynb, extract_text_from_pdf, transcribe_video_stub
 
@@ -114,7 +114,9 @@ def _xlsx_bytes_to_plain(data: bytes) -> str:
         xl = pd.ExcelFile(io.BytesIO(data))
         for name in xl.sheet_names:
             df = pd.read_excel(io.BytesIO(data), sheet_name=name, header=None)
-            frames.append(f"=== SHEET {name} ===\n{df.to_csv(index=False, sep='\t')}")
+            # No backslashes inside f-string expressions before Python 3.12.
+            csv_text = df.to_csv(index=False, sep="\t")
+            frames.append(f"=== SHEET {name} ===\n{csv_text}")
         return "\n\n".join(frames).strip()
     except Exception:
         _log.debug("pandas xlsx read failed", exc_info=True)
@@ -137,6 +139,12 @@ def _csv_bytes_to_plain(data: bytes) -> str:
     return "\n".join(rows_out).strip()
 
 
+def pdf_text_block(text: str) -> str:
+    """``=== PDF TEXT ===`` block for extracted PDF text (``""`` when there is none)."""
+    txt = (text or "").strip()
+    return f"=== PDF TEXT ===\n{txt}" if txt else ""
+
+
 def single_artifact_key_to_plain(key: str, raw: bytes) -> str:
     """Map ingestion artifact key (e.g. ``pdf``) to extracted text."""
     if not raw:
@@ -154,8 +162,7 @@ def single_artifact_key_to_plain(key: str, raw: bytes) -> str:
                 parts.append(f"=== NOTEBOOK CODE ({k}) ===\n{code}")
             return "\n\n".join(parts).strip()
         if k == "pdf":
-            txt = extract_text_from_pdf(raw).strip()
-            return f"=== PDF TEXT ===\n{txt}" if txt else ""
+            return pdf_text_block(extract_text_from_pdf(raw))
         if k == "docx":
             body = _docx_bytes_to_plain(raw)
             return f"=== DOCX ===\n{body}" if body else ""
@@ -184,8 +191,18 @@ def single_artifact_key_to_plain(key: str, raw: bytes) -> str:
     return ""
 
 
-def artifacts_to_concatenated_plain(artifacts: dict[str, bytes]) -> str:
-    """Concatenate normalized text from artifact dict keys in :data:`ARTIFACT_KEY_ORDER`."""
+def artifacts_to_concatenated_plain(
+    artifacts: dict[str, bytes],
+    *,
+    block_for_key: Callable[[str, bytes], str] = single_artifact_key_to_plain,
+) -> str:
+    """
+    Concatenate normalized text from artifact dict keys in :data:`ARTIFACT_KEY_ORDER`.
+
+    ``block_for_key`` renders one artifact (default :func:`single_artifact_key_to_plain`);
+    :class:`~app.grading.multimodal.parsed_artifacts.ParsedArtifactBundle` passes its memoized
+    variant.
+    """
     if not isinstance(artifacts, dict) or not artifacts:
         return ""
     chunks: list[str] = []
@@ -193,7 +210,7 @@ def artifacts_to_concatenated_plain(artifacts: dict[str, bytes]) -> str:
         raw = artifacts.get(key)
         if not isinstance(raw, (bytes, bytearray)) or not raw:
             continue
-        block = single_artifact_key_to_plain(key, bytes(raw))
+        block = block_for_key(key, bytes(raw))
         if block.strip():
             chunks.append(block)
     if not chunks:
@@ -0,0 +1,318 @@
+"""
+Shared back ends for the grading caches (:mod:`app.grading.llm_response_cache`,
+:mod:`app.grading.embedding_cache`, :mod:`app.grading.multimodal.assignment_context`).
+
+- :class:`SqliteStore` — one table in a host-local SQLite file shared by the Celery workers of a
+  host; optional per-entry TTL and a byte budget trimmed least recently used first.
+- :class:`RedisStore` — ``REDIS_URL`` with per-key TTL (size bound is Redis ``maxmemory`` policy).
+- :class:`LruFront` — the in-process LRU (optional TTL) each cache keeps in front of its store,
+  with hit / miss / store-error counters.
+- :class:`CacheRegistry` — the process-wide ``settings → cache`` map behind each ``get_*_cache``;
+  forked children (Celery prefork) start with an empty registry.
+- :class:`RunCacheStats` — the counters of one grading run, while :meth:`LruFront.stats` covers
+  the whole process (every submission of a cohort).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Generic, Iterator, TypeVar
+
+_log = logging.getLogger(__name__)
+
+V = TypeVar("V")
+C = TypeVar("C")
+R = TypeVar("R")
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# Re-read the table size at least this often, so other processes' inserts count toward the
+# byte budget even when this process writes little.
+_SIZE_RESYNC_PUTS = 64
+
+
+class SqliteStore:
+    """
+    Host-local key/value table (one short-lived connection per call). ``value_type`` is ``TEXT``
+    (``str`` values) or ``BLOB`` (``bytes``). With ``max_bytes`` > 0 the table is trimmed to ~90%
+    of the budget once it is exceeded; the size is tracked from this process's inserts and
+    re-read with ``SUM`` only when that estimate passes the budget or every
+    ``_SIZE_RESYNC_PUTS`` inserts.
+    """
+
+    def __init__(self, path: Path, *, table: str, max_bytes: int, value_type: str = "TEXT"):
+        if not _IDENTIFIER.match(table):
+            raise ValueError(f"invalid table name: {table!r}")
+        if value_type not in ("TEXT", "BLOB"):
+            raise ValueError(f"value_type must be TEXT or BLOB, not {value_type!r}")
+        self._path = path
+        self._table = table
+        self._blob = value_type == "BLOB"
+        self._max_bytes = max(0, int(max_bytes))
+        self._size_lock = threading.Lock()
+        self._known_bytes: int | None = None
+        self._puts_since_sync = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                f"key TEXT PRIMARY KEY, value {value_type} NOT NULL, expires_at REAL NOT NULL, "
+                "accessed_at REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            con.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed_at)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        con = sqlite3.connect(str(self._path), timeout=10.0)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def get(self, key: str) -> str | bytes | None:
+        now = time.time()
+        with self._connect() as con:
+            row = con.execute(
+                f"SELECT value, expires_at FROM {self._table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if float(row[1]) <= now:
+                con.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+                return None
+            con.execute(f"UPDATE {self._table} SET accessed_at = ? WHERE key = ?", (now, key))
+            return bytes(row[0]) if self._blob else str(row[0])
+
+    def put(self, key: str, value: str | bytes, *, ttl_sec: float | None = None) -> None:
+        """Insert or replace ``key``; ``ttl_sec=None`` keeps it until trimmed."""
+        now = time.time()
+        expires_at = math.inf if ttl_sec is None else now + ttl_sec
+        stored: str | memoryview
+        if isinstance(value, bytes):
+            stored, size = sqlite3.Binary(value), len(value)
+        else:
+            stored, size = value, len(value.encode("utf-8"))
+        with self._connect() as con:
+            con.execute(
+                f"INSERT OR REPLACE INTO {self._table} "
+                "(key, value, expires_at, accessed_at, size) VALUES (?, ?, ?, ?, ?)",
+                (key, stored, expires_at, now, size),
+            )
+            if self._max_bytes > 0 and self._size_check_due(size):
+                self._trim(con, now)
+
+    def _size_check_due(self, added: int) -> bool:
+        with self._size_lock:
+            self._puts_since_sync += 1
+            if self._known_bytes is not None:
+                self._known_bytes += added
+            return (
+                self._known_bytes is None
+                or self._known_bytes > self._max_bytes
+                or self._puts_since_sync >= _SIZE_RESYNC_PUTS
+            )
+
+    def _trim(self, con: sqlite3.Connection, now: float) -> None:
+        con.execute(f"DELETE FROM {self._table} WHERE expires_at <= ?", (now,))
+        total = int(con.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self._table}").fetchone()[0])
+        if total > self._max_bytes:
+            # Trim to ~90% of the budget so eviction is not re-run on every insert.
+            target = int(self._max_bytes * 0.9)
+            for k, sz in con.execute(
+                f"SELECT key, size FROM {self._table} ORDER BY accessed_at ASC"
+            ).fetchall():
+                if total <= target:
+                    break
+                con.execute(f"DELETE FROM {self._table} WHERE key = ?", (k,))
+                total -= int(sz)
+        with self._size_lock:
+            self._known_bytes = total
+            self._puts_since_sync = 0
+
+
+class RedisStore:
+    """Store shared across hosts; keys live under ``prefix``."""
+
+    def __init__(self, url: str, *, prefix: str):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key: str) -> str | None:
+        raw = self._redis.get(self._prefix + key)
+        if raw is None:
+            return None
+        return raw.decode("utf-8") if isinstance(raw, bytes) else str(raw)
+
+    def put(self, key: str, value: str, *, ttl_sec: float | None = None) -> None:
+        ex = max(1, int(ttl_sec)) if ttl_sec is not None else None
+        self._redis.set(self._prefix + key, value, ex=ex)
+
+
+class RunCacheStats:
+    """
+    Cache counters of one grading run: every :class:`LruFront` count made while the run is
+    :meth:`active` is also added here, keyed by the cache ``name``. Pool threads only see the run
+    when their work is wrapped with :func:`in_run_context`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts: dict[str, Counter[str]] = {}
+
+    def add(self, cache: str, counter: str) -> None:
+        with self._lock:
+            self._counts.setdefault(cache, Counter())[counter] += 1
+
+    def counts(self, cache: str, counters: tuple[str, ...]) -> dict[str, int]:
+        with self._lock:
+            got = self._counts.get(cache, Counter())
+            return {k: got[k] for k in counters}
+
+    @contextmanager
+    def active(self) -> Iterator[RunCacheStats]:
+        token = _active_run.set(self)
+        try:
+            yield self
+        finally:
+            _active_run.reset(token)
+
+
+_active_run: contextvars.ContextVar[RunCacheStats | None] = contextvars.ContextVar(
+    "grading_run_cache_stats", default=None
+)
+
+
+def in_run_context(fn: Callable[..., R]) -> Callable[..., R]:
+    """``fn`` bound to the caller's context, so cache counts from pool threads reach its run."""
+    ctx = contextvars.copy_context()
+
+    def call(*args: Any, **kwargs: Any) -> R:
+        # One context cannot be entered by two threads at once; each call runs in its own copy.
+        return ctx.copy().run(fn, *args, **kwargs)
+
+    return call
+
+
+class LruFront(Generic[V]):
+    """
+    In-process LRU of up to ``max_entries`` values (expiring after ``ttl_sec`` when set) in front
+    of an optional shared ``store``. Store failures are logged under ``name``, counted as
+    ``store_errors`` and reported as misses, so a cache never fails its caller.
+    """
+
+    COUNTERS: tuple[str, ...] = ("hits", "misses", "store_errors")
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        max_entries: int,
+        ttl_sec: float | None = None,
+        store: Any | None = None,
+    ):
+        self._name = name
+        self._max_entries = max(1, int(max_entries))
+        self._ttl_sec = None if ttl_sec is None else max(1.0, float(ttl_sec))
+        self._store = store
+        self._lock = threading.Lock()
+        self._lru: OrderedDict[str, tuple[float, V]] = OrderedDict()
+        self._counts: Counter[str] = Counter()
+
+    def _lookup(self, key: str) -> V | None:
+        """Live in-memory value for ``key`` (counted as a hit), else ``None``."""
+        now = time.time()
+        with self._lock:
+            hit = self._lru.get(key)
+            if hit is None:
+                return None
+            if hit[0] <= now:
+                del self._lru[key]
+                return None
+            self._lru.move_to_end(key)
+        self._count("hits")
+        return hit[1]
+
+    def _remember(self, key: str, value: V) -> None:
+        expires_at = math.inf if self._ttl_sec is None else time.time() + self._ttl_sec
+        with self._lock:
+            self._lru[key] = (expires_at, value)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self._max_entries:
+                self._lru.popitem(last=False)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counts[counter] += 1
+        run = _active_run.get()
+        if run is not None:
+            run.add(self._name, counter)
+
+    def _store_get(self, key: str) -> Any | None:
+        if self._store is None:
+            return None
+        try:
+            return self._store.get(key)
+        except Exception as exc:
+            _log.warning("%s: store get failed (%s); treating as miss", self._name, exc)
+            self._count("store_errors")
+            return None
+
+    def _store_put(self, key: str, value: Any) -> None:
+        if self._store is None:
+            return
+        try:
+            self._store.put(key, value, ttl_sec=self._ttl_sec)
+        except Exception as exc:
+            _log.warning("%s: store put failed (%s)", self._name, exc)
+            self._count("store_errors")
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            out = {k: self._counts[k] for k in self.COUNTERS}
+            out["memory_entries"] = len(self._lru)
+            return out
+
+
+class CacheRegistry(Generic[C]):
+    """Process-wide caches keyed by the settings they were built from."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._caches: dict[tuple[Any, ...], C] = {}
+        if hasattr(os, "register_at_fork"):
+            # A lock held by another parent thread at fork time would never be released in the
+            # child, and the parent's connections must not be shared.
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def get(self, ident: tuple[Any, ...], build: Callable[[], C]) -> C:
+        """The cache for ``ident``, built (once per process) by ``build`` on first use."""
+        with self._lock:
+            cache = self._caches.get(ident)
+            if cache is None:
+                cache = self._caches[ident] = build()
+            return cache
+
+    def clear(self) -> None:
+        """Drop every cache (tests)."""
+        with self._lock:
+            self._caches.clear()
+
+    def _reset_after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._caches.clear()
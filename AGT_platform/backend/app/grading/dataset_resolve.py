@@ -1,19 +1,19 @@
 """
 Match a tabular / text dataset in ``assignments_to_grade/`` to a notebook submission.
 
-Uses the same embedding path as RAG (:func:`app.grading.rag_embeddings.compute_submission_embedding`)
+Uses the same embedding path as RAG (:func:`app.grading.rag_embeddings.compute_submission_embeddings`)
 and cosine similarity between the assignment plaintext vector and each candidate file’s
 ``filename + preview`` embedding.
 """
 
 from __future__ import annotations
 
-import math
 import os
 from pathlib import Path
 from typing import Any
 
-from app.grading.rag_embeddings import compute_submission_embedding
+from app.grading.rag_embeddings import compute_submission_embeddings
+from app.grading.similarity import best_match
 
 _DATA_SUFFIXES = frozenset({".csv", ".tsv", ".txt", ".json"})
 
@@ -40,17 +40,6 @@ def list_data_asset_files(directory: Path) -> list[Path]:
     return out
 
 
-def _cosine_similarity(a: list[float], b: list[float]) -> float:
-    if len(a) != len(b) or not a:
-        return 0.0
-    dot = sum(a[i] * b[i] for i in range(len(a)))
-    na = math.sqrt(sum(x * x for x in a))
-    nb = math.sqrt(sum(y * y for y in b))
-    if na <= 0.0 or nb <= 0.0:
-        return 0.0
-    return float(dot / (na * nb))
-
-
 def _preview_file(path: Path, max_chars: int = 12_000) -> str:
     try:
         return path.read_text(encoding="utf-8", errors="replace")[:max_chars]
@@ -77,16 +66,10 @@ def resolve_dataset_for_notebook(
     cands = list_data_asset_files(assignments_dir)
     if not cands:
         return None, None, 0.0
-    a_vec, _ = compute_submission_embedding(assignment_plaintext or "", cfg)
-    best_sim = -1.0
-    best: Path | None = None
-    for p in cands:
-        blob = f"{p.name}\n{_preview_file(p)}"
-        b_vec, _ = compute_submission_embedding(blob, cfg)
-        sim = _cosine_similarity(a_vec, b_vec)
-        if sim > best_sim:
-            best_sim = sim
-            best = p
+    blobs = [f"{p.name}\n{_preview_file(p)}" for p in cands]
+    vecs = compute_submission_embeddings([assignment_plaintext or ""] + blobs, cfg)
+    pos, best_sim = best_match(vecs[0][0], [v for v, _src in vecs[1:]])
+    best: Path | None = cands[pos] if pos >= 0 else None
     if best is None:
         return None, None, 0.0
     if best_sim < min_similarity:
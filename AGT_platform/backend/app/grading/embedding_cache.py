@@ -0,0 +1,148 @@
+"""
+Cache for RAG embedding vectors returned by :func:`app.grading.rag_embeddings.compute_submission_embedding`.
+
+Keys are SHA-256 digests of ``(backend, model id, max_chars, sha256(text))``
+(see :func:`embedding_cache_key`). The same question prompts, answer-key sections and dataset
+previews are embedded for every student, so a cohort run mostly hits:
+
+- ``RAG_EMBED_CACHE=memory`` — in-process LRU (``RAG_EMBED_CACHE_MAX_ENTRIES``).
+- ``RAG_EMBED_CACHE=disk`` — LRU + SQLite file under ``RAG_EMBED_CACHE_DIR`` shared by the
+  Celery workers of one host (:class:`~app.grading.cache_support.SqliteStore`); vectors are
+  stored as float64 blobs and the file is trimmed (least recently used first) to
+  ``RAG_EMBED_CACHE_MAX_BYTES``.
+
+Deterministic-hash fallbacks are never stored (they are cheap and would mask a backend that
+recovers). Store failures are logged and treated as misses.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.grading.cache_support import CacheRegistry, LruFront, SqliteStore
+
+_log = logging.getLogger(__name__)
+
+
+def embedding_model_id(cfg: Any) -> tuple[str, str]:
+    """``(backend, model id)`` that determines which vectors a text maps to."""
+    backend = (getattr(cfg, "RAG_EMBEDDING_BACKEND", "") or "sentence_transformers").strip().lower()
+    if backend == "openai":
+        model = (
+            getattr(cfg, "OPENAI_TRIO_RAG_EMBEDDING_MODEL", "") or "text-embedding-3-small"
+        ).strip()
+    elif backend == "ollama":
+        # Fallback order decides whether OpenAI or Ollama vectors come back first.
+        model = "{}|{}".format(
+            (getattr(cfg, "OLLAMA_EMBEDDINGS_MODEL", "") or "nomic-embed-text").strip(),
+            (getattr(cfg, "RAG_EMBED_ORDER", "auto") or "auto").strip().lower(),
+        )
+    else:
+        model = (getattr(cfg, "SENTENCE_TRANSFORMERS_MODEL", "") or "all-MiniLM-L6-v2").strip()
+    return backend, model
+
+
+def embedding_cache_key(*, backend: str, model: str, max_chars: int, text: str) -> str:
+    text_digest = hashlib.sha256(text.encode("utf-8", errors="replace")).hexdigest()
+    raw = f"{backend}\x00{model}\x00{int(max_chars)}\x00{text_digest}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache(LruFront[tuple[bytes, str]]):
+    """In-process LRU in front of an optional SQLite store; values are ``(vector, source)``."""
+
+    def __init__(self, *, max_entries: int = 4096, store: Any | None = None):
+        super().__init__(name="embedding_cache", max_entries=max_entries, store=store)
+
+    def get(self, key: str) -> tuple[list[float], str] | None:
+        row = self._lookup(key)
+        if row is None:
+            raw = self._store_get(key)
+            if raw is None:
+                self._count("misses")
+                return None
+            row = _unpack(raw)
+            self._count("hits")
+            self._remember(key, row)
+        return _decode(row)
+
+    def put(self, key: str, vector: list[float], source: str) -> None:
+        blob = np.asarray(vector, dtype=np.float64).tobytes()
+        self._remember(key, (blob, source))
+        self._store_put(key, _pack(blob, source))
+
+    def stats(self) -> dict[str, Any]:
+        out: dict[str, Any] = dict(super().stats())
+        total = out["hits"] + out["misses"]
+        out["hit_rate"] = round(out["hits"] / total, 4) if total else 0.0
+        return out
+
+
+def _decode(row: tuple[bytes, str]) -> tuple[list[float], str]:
+    return np.frombuffer(row[0], dtype=np.float64).tolist(), row[1]
+
+
+def _pack(blob: bytes, source: str) -> bytes:
+    """One store value: ``source``, NUL, float64 vector bytes."""
+    return source.encode("utf-8") + b"\x00" + blob
+
+
+def _unpack(raw: bytes) -> tuple[bytes, str]:
+    source, _sep, blob = raw.partition(b"\x00")
+    return blob, source.decode("utf-8")
+
+
+_registry: CacheRegistry[EmbeddingCache] = CacheRegistry()
+
+
+def embedding_cache_mode(cfg: Any) -> str:
+    mode = (getattr(cfg, "RAG_EMBED_CACHE", "") or "").strip().lower()
+    return mode if mode in ("memory", "disk") else "off"
+
+
+def default_embedding_cache_dir() -> Path:
+    return Path(tempfile.gettempdir()) / "agt_embedding_cache"
+
+
+def get_embedding_cache(cfg: Any) -> EmbeddingCache | None:
+    """Process-wide cache for the current settings, or ``None`` when ``RAG_EMBED_CACHE`` is off."""
+    mode = embedding_cache_mode(cfg)
+    if mode == "off":
+        return None
+    max_entries = int(getattr(cfg, "RAG_EMBED_CACHE_MAX_ENTRIES", 4096) or 4096)
+    raw_dir = str(getattr(cfg, "RAG_EMBED_CACHE_DIR", "") or "").strip()
+    cache_dir = Path(raw_dir).expanduser() if raw_dir else default_embedding_cache_dir()
+    max_bytes = int(getattr(cfg, "RAG_EMBED_CACHE_MAX_BYTES", 0) or 0)
+    ident = (mode, max_entries, str(cache_dir), max_bytes)
+
+    def build() -> EmbeddingCache:
+        store: Any | None = None
+        if mode == "disk":
+            try:
+                store = SqliteStore(
+                    cache_dir / "embeddings.sqlite3",
+                    table="embedding_vectors",
+                    max_bytes=max_bytes,
+                    value_type="BLOB",
+                )
+            except Exception as exc:
+                _log.warning("embedding_cache: disk store unavailable (%s); memory only", exc)
+        return EmbeddingCache(max_entries=max_entries, store=store)
+
+    return _registry.get(ident, build)
+
+
+def embedding_cache_stats(cfg: Any) -> dict[str, Any] | None:
+    cache = get_embedding_cache(cfg)
+    return cache.stats() if cache is not None else None
+
+
+def reset_embedding_caches() -> None:
+    """Drop process-wide caches (tests)."""
+    _registry.clear()
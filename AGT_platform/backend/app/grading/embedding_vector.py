@@ -0,0 +1,135 @@
+"""
+Compact float32 embedding vectors for chunk ``evidence``.
+
+RAG vectors used to live in evidence as ``list[float]`` (one boxed Python float per dimension,
+~32 bytes each). :class:`EmbeddingVector` keeps the same read-only sequence interface
+(``len``, iteration, indexing, ``==`` against lists) over a float32 ndarray (4 bytes per
+dimension), and NumPy code reads it without a copy via ``__array__``.
+
+JSON form (chunk cache): ``{"__f32_b64__": "<base64 little-endian float32>"}`` — see
+:func:`encode_vectors_for_json` / :func:`decode_vectors_from_json`. Plain float lists from older
+files are still accepted everywhere.
+"""
+
+from __future__ import annotations
+
+import base64
+from typing import Any, Iterator, Sequence
+
+import numpy as np
+
+JSON_TAG = "__f32_b64__"
+
+_DTYPE = np.dtype("<f4")
+
+
+class EmbeddingVector(Sequence[float]):
+    """Immutable float32 vector; behaves like a read-only ``list[float]``."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, values: Sequence[float] | np.ndarray):
+        arr = np.array(values, dtype=_DTYPE).reshape(-1)
+        arr.setflags(write=False)
+        self._data = arr
+
+    @classmethod
+    def from_bytes(cls, raw: bytes | memoryview) -> EmbeddingVector:
+        """Wrap little-endian float32 bytes (copied, so the source buffer can be released)."""
+        return cls(np.frombuffer(raw, dtype=_DTYPE))
+
+    @classmethod
+    def view(cls, arr: np.ndarray) -> EmbeddingVector:
+        """Wrap a 1-D little-endian float32 array without copying (e.g. a memory-mapped slice)."""
+        if arr.dtype != _DTYPE or arr.ndim != 1:
+            return cls(arr)
+        out = cls.__new__(cls)
+        data = np.asarray(arr)
+        if data.flags.writeable:
+            data = data.view()
+            data.setflags(write=False)
+        out._data = data
+        return out
+
+    def to_bytes(self) -> bytes:
+        return self._data.tobytes()
+
+    @property
+    def array(self) -> np.ndarray:
+        """Read-only float32 view."""
+        return self._data
+
+    def tolist(self) -> list[float]:
+        return self._data.tolist()
+
+    def __array__(self, dtype: Any = None, copy: bool | None = None) -> np.ndarray:
+        if dtype is None or np.dtype(dtype) == self._data.dtype:
+            return self._data.copy() if copy else self._data
+        return self._data.astype(dtype)
+
+    def __len__(self) -> int:
+        return int(self._data.shape[0])
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return self._data[index].tolist()
+        return float(self._data[index])
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self._data.tolist())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, EmbeddingVector):
+            return bool(np.array_equal(self._data, other._data))
+        if isinstance(other, (list, tuple, np.ndarray)):
+            if len(other) != len(self):
+                return False
+            return bool(np.array_equal(self._data, np.asarray(other, dtype=_DTYPE)))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (EmbeddingVector.from_bytes, (self.to_bytes(),))
+
+    def __repr__(self) -> str:
+        return f"EmbeddingVector(dim={len(self)})"
+
+    def to_json(self) -> dict[str, str]:
+        return {JSON_TAG: base64.b64encode(self.to_bytes()).decode("ascii")}
+
+
+def compact_embedding(values: Sequence[float] | np.ndarray | None) -> EmbeddingVector | list:
+    """Evidence value for an embedding: :class:`EmbeddingVector`, or ``[]`` when empty."""
+    if isinstance(values, EmbeddingVector):
+        return values
+    if values is None or not len(values):
+        return []
+    return EmbeddingVector(values)
+
+
+def is_embedding(value: Any, *, min_dim: int = 1) -> bool:
+    """True for an :class:`EmbeddingVector` or float list with at least ``min_dim`` entries."""
+    return isinstance(value, (EmbeddingVector, list)) and len(value) >= min_dim
+
+
+def encode_vectors_for_json(obj: Any) -> Any:
+    """Copy of ``obj`` with every :class:`EmbeddingVector` replaced by its tagged JSON form."""
+    if isinstance(obj, EmbeddingVector):
+        return obj.to_json()
+    if isinstance(obj, dict):
+        return {k: encode_vectors_for_json(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [encode_vectors_for_json(v) for v in obj]
+    return obj
+
+
+def decode_vectors_from_json(obj: Any) -> Any:
+    """Inverse of :func:`encode_vectors_for_json`; other values pass through unchanged."""
+    if isinstance(obj, dict):
+        if len(obj) == 1 and isinstance(obj.get(JSON_TAG), str):
+            return EmbeddingVector.from_bytes(base64.b64decode(obj[JSON_TAG]))
+        return {k: decode_vectors_from_json(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [decode_vectors_from_json(v) for v in obj]
+    return obj
@@ -0,0 +1,141 @@
+"""
+Content-addressed cache for parsed LLM JSON responses (grading and structure calls).
+
+Keys are SHA-256 digests of ``(model, messages, temperature, response_format, sample_slot)``
+(see :func:`response_cache_key`). Lookups go through an in-process LRU first, then an optional
+shared back end so Celery retries and instructor re-runs on the same host (``disk``) or across
+hosts (``redis``) reuse earlier answers:
+
+- ``LLM_RESPONSE_CACHE=memory`` — in-process LRU only.
+- ``LLM_RESPONSE_CACHE=disk`` — LRU + SQLite file under ``LLM_RESPONSE_CACHE_DIR``; entries past
+  ``LLM_RESPONSE_CACHE_TTL_SEC`` are ignored and the file is trimmed (least recently used first)
+  to ``LLM_RESPONSE_CACHE_MAX_BYTES``.
+- ``LLM_RESPONSE_CACHE=redis`` — LRU + ``REDIS_URL`` with per-key TTL (size bound is Redis
+  ``maxmemory`` policy).
+
+Back-end failures are logged and treated as misses; the cache never fails a grading call.
+Wrap clients with :func:`app.grading.llm_router.maybe_cache_chat_client`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from app.grading.cache_support import CacheRegistry, LruFront, RedisStore, SqliteStore
+
+_log = logging.getLogger(__name__)
+
+_REDIS_PREFIX = "agt:llm_response:"
+
+
+def response_cache_key(
+    *,
+    model: str,
+    messages: list[dict],
+    temperature: float | None,
+    response_format: dict[str, Any] | None,
+    sample_slot: int,
+) -> str:
+    """Stable hex digest for one logical LLM request (``sample_slot`` separates k samples)."""
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": str(m.get("role") or ""), "content": m.get("content")} for m in messages
+        ],
+        "temperature": temperature,
+        "response_format": response_format,
+        "sample_slot": int(sample_slot),
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache(LruFront[str]):
+    """In-process LRU in front of an optional shared store; values are parsed JSON objects."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 2048,
+        ttl_sec: float = 7 * 24 * 3600,
+        store: Any | None = None,
+    ):
+        super().__init__(
+            name="llm_response_cache", max_entries=max_entries, ttl_sec=ttl_sec, store=store
+        )
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        raw = self._lookup(key)
+        if raw is None:
+            raw = self._store_get(key)
+            if raw is None:
+                self._count("misses")
+                return None
+            self._count("hits")
+            self._remember(key, raw)
+        return json.loads(raw)
+
+    def put(self, key: str, value: dict[str, Any]) -> None:
+        raw = json.dumps(value, ensure_ascii=True, default=str)
+        self._remember(key, raw)
+        self._store_put(key, raw)
+
+
+_registry: CacheRegistry[LLMResponseCache] = CacheRegistry()
+
+
+def llm_response_cache_mode(cfg: Any) -> str:
+    mode = (getattr(cfg, "LLM_RESPONSE_CACHE", "") or "").strip().lower()
+    return mode if mode in ("memory", "disk", "redis") else "off"
+
+
+def default_llm_response_cache_dir() -> Path:
+    return Path(tempfile.gettempdir()) / "agt_llm_response_cache"
+
+
+def get_llm_response_cache(cfg: Any) -> LLMResponseCache | None:
+    """Process-wide cache for the current settings, or ``None`` when ``LLM_RESPONSE_CACHE`` is off."""
+    mode = llm_response_cache_mode(cfg)
+    if mode == "off":
+        return None
+    max_entries = int(getattr(cfg, "LLM_RESPONSE_CACHE_MAX_ENTRIES", 2048) or 2048)
+    ttl = float(getattr(cfg, "LLM_RESPONSE_CACHE_TTL_SEC", 7 * 24 * 3600) or 7 * 24 * 3600)
+    raw_dir = str(getattr(cfg, "LLM_RESPONSE_CACHE_DIR", "") or "").strip()
+    cache_dir = Path(raw_dir).expanduser() if raw_dir else default_llm_response_cache_dir()
+    max_bytes = int(getattr(cfg, "LLM_RESPONSE_CACHE_MAX_BYTES", 0) or 0)
+    redis_url = str(getattr(cfg, "REDIS_URL", "") or "").strip()
+    ident = (mode, max_entries, ttl, str(cache_dir), max_bytes, redis_url)
+
+    def build() -> LLMResponseCache:
+        store: Any | None = None
+        try:
+            if mode == "disk":
+                store = SqliteStore(
+                    cache_dir / "llm_responses.sqlite3", table="responses", max_bytes=max_bytes
+                )
+            elif mode == "redis":
+                if redis_url:
+                    store = RedisStore(redis_url, prefix=_REDIS_PREFIX)
+                else:
+                    _log.warning("LLM_RESPONSE_CACHE=redis but REDIS_URL is empty; memory only")
+        except Exception as exc:
+            _log.warning("llm_response_cache: %s store unavailable (%s); memory only", mode, exc)
+            store = None
+        return LLMResponseCache(max_entries=max_entries, ttl_sec=ttl, store=store)
+
+    return _registry.get(ident, build)
+
+
+def llm_response_cache_stats(cfg: Any) -> dict[str, int] | None:
+    cache = get_llm_response_cache(cfg)
+    return cache.stats() if cache is not None else None
+
+
+def reset_llm_response_caches() -> None:
+    """Drop process-wide caches (tests)."""
+    _registry.clear()
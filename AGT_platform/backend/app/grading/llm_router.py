@@ -2,16 +2,28 @@
 LLM routing for grading: **OpenAI** (server-side) plus optional **Anthropic** for structure.
 
 Course grading and multimodal per-chunk grading use OpenAI chat clients; Ollama is not supported.
+
+SDK clients (``openai.OpenAI`` / ``anthropic.Anthropic``) are process-wide singletons per provider
+and API key (:func:`shared_openai_sdk_client`, :func:`shared_anthropic_sdk_client`) so every call
+in a worker reuses one keep-alive HTTP connection pool. Pool size and timeouts come from the
+``LLM_HTTP_*`` settings in :class:`~app.config.Config`; the registry is cleared in forked children.
+
+:meth:`OpenAIJsonClient.chat_json_choices` returns several sampled JSON choices from one request
+(``n``); a model that rejects ``n > 1`` is remembered for the process and
+:func:`client_supports_multi_choice` then reports ``False`` so callers send single requests.
 """
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import os
 import re
-from typing import Any, Protocol
+import threading
+from typing import Any, Iterable, Protocol
 
 from ..config import Config
+from .llm_response_cache import LLMResponseCache, get_llm_response_cache, response_cache_key
 
 _log = logging.getLogger(__name__)
 
@@ -73,6 +85,87 @@ def parse_llm_json_content(content: str) -> dict[str, Any]:
             raise first_err
 
 
+_sdk_clients_lock = threading.Lock()
+_sdk_clients: dict[tuple[str, str, tuple[Any, ...]], Any] = {}
+
+
+def _sdk_http_settings() -> tuple[int, int, float, float, float]:
+    return (
+        int(Config.LLM_HTTP_MAX_CONNECTIONS),
+        int(Config.LLM_HTTP_MAX_KEEPALIVE),
+        float(Config.LLM_HTTP_KEEPALIVE_EXPIRY_SEC),
+        float(Config.LLM_HTTP_TIMEOUT_SEC),
+        float(Config.LLM_HTTP_CONNECT_TIMEOUT_SEC),
+    )
+
+
+def _sdk_client_kwargs(
+    default_httpx_client: Any, settings: tuple[int, int, float, float, float]
+) -> dict[str, Any]:
+    import httpx
+
+    max_conn, max_keepalive, keepalive_expiry, timeout, connect_timeout = settings
+    limits = httpx.Limits(
+        max_connections=max_conn,
+        max_keepalive_connections=max_keepalive,
+        keepalive_expiry=keepalive_expiry or None,
+    )
+    kwargs: dict[str, Any] = {"http_client": default_httpx_client(limits=limits)}
+    if timeout > 0:
+        kwargs["timeout"] = httpx.Timeout(
+            timeout, connect=min(connect_timeout, timeout) if connect_timeout > 0 else timeout
+        )
+    return kwargs
+
+
+def _shared_sdk_client(provider: str, api_key: str, factory: Any) -> Any:
+    settings = _sdk_http_settings()
+    key = (provider, hashlib.sha256(api_key.encode("utf-8")).hexdigest(), settings)
+    client = _sdk_clients.get(key)
+    if client is not None:
+        return client
+    with _sdk_clients_lock:
+        client = _sdk_clients.get(key)
+        if client is None:
+            client = factory(api_key, settings)
+            _sdk_clients[key] = client
+        return client
+
+
+def shared_openai_sdk_client(api_key: str) -> Any:
+    """Process-wide ``openai.OpenAI`` for ``api_key`` (thread-safe; reuses HTTP connections)."""
+
+    def _make(k: str, settings: tuple[int, int, float, float, float]) -> Any:
+        from openai import DefaultHttpxClient, OpenAI
+
+        return OpenAI(api_key=k, **_sdk_client_kwargs(DefaultHttpxClient, settings))
+
+    return _shared_sdk_client("openai", api_key, _make)
+
+
+def shared_anthropic_sdk_client(api_key: str) -> Any:
+    """Process-wide ``anthropic.Anthropic`` for ``api_key`` (thread-safe; reuses HTTP connections)."""
+
+    def _make(k: str, settings: tuple[int, int, float, float, float]) -> Any:
+        from anthropic import Anthropic, DefaultHttpxClient
+
+        return Anthropic(api_key=k, **_sdk_client_kwargs(DefaultHttpxClient, settings))
+
+    return _shared_sdk_client("anthropic", api_key, _make)
+
+
+def reset_shared_sdk_clients() -> None:
+    """Drop pooled SDK clients (tests, key rotation). Open sockets close when clients are GC'd."""
+    global _sdk_clients_lock
+    _sdk_clients.clear()
+    _sdk_clients_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    # Celery prefork children must not share the parent's sockets.
+    os.register_at_fork(after_in_child=reset_shared_sdk_clients)
+
+
 class ChatClient(Protocol):
     def chat_json(
         self, messages: list[dict], *, temperature: float | None = None
@@ -111,9 +204,72 @@ class OpenAIJsonClient:
         ``response_format`` is passed through when supported; on error it is dropped
         and the request is retried once for broader model compatibility.
         """
-        from openai import OpenAI
+        resp = self._create(messages, temperature=temperature, response_format=response_format)
+        content = resp.choices[0].message.content or ""
+        return parse_llm_json_content(content), _openai_usage(resp)
+
+    @property
+    def supports_multi_choice(self) -> bool:
+        """False once the API has rejected ``n > 1`` for this model in this process."""
+        return self.model not in _multi_choice_unsupported_models
+
+    def chat_json_choices(
+        self,
+        messages: list[dict],
+        *,
+        n: int,
+        temperature: float | None = None,
+        response_format: dict[str, Any] | None = None,
+    ) -> list[dict[str, Any] | None]:
+        choices, _usage = self.chat_json_choices_with_usage(
+            messages, n=n, temperature=temperature, response_format=response_format
+        )
+        return choices
+
+    def chat_json_choices_with_usage(
+        self,
+        messages: list[dict],
+        *,
+        n: int,
+        temperature: float | None = None,
+        response_format: dict[str, Any] | None = None,
+    ) -> tuple[list[dict[str, Any] | None], dict[str, int]]:
+        """
+        ``n`` sampled completions from **one** request (prompt tokens are billed once).
 
-        client = OpenAI(api_key=self._api_key)
+        Each entry is the parsed JSON of one choice, or ``None`` when that choice is not valid
+        JSON. The API may return fewer than ``n`` choices; callers top up with single calls.
+        Raises :class:`MultiChoiceUnsupportedError` when the model rejects ``n > 1``.
+        """
+        n = max(1, int(n))
+        try:
+            resp = self._create(
+                messages, temperature=temperature, response_format=response_format, n=n
+            )
+        except Exception as e:
+            if n > 1 and _rejects_multi_choice(e):
+                _multi_choice_unsupported_models.add(self.model)
+                raise MultiChoiceUnsupportedError(
+                    f"model {self.model!r} rejected n={n}: {e}"
+                ) from e
+            raise
+        out: list[dict[str, Any] | None] = []
+        for ch in list(resp.choices or [])[:n]:
+            try:
+                out.append(parse_llm_json_content(ch.message.content or ""))
+            except (json.JSONDecodeError, ValueError):
+                out.append(None)
+        return out, _openai_usage(resp)
+
+    def _create(
+        self,
+        messages: list[dict],
+        *,
+        temperature: float | None,
+        response_format: dict[str, Any] | None,
+        n: int = 1,
+    ) -> Any:
+        client = shared_openai_sdk_client(self._api_key)
         oa_messages = [{"role": m["role"], "content": m["content"]} for m in messages]
         temp = 0.3 if temperature is None else float(temperature)
         kwargs: dict[str, Any] = {
@@ -121,24 +277,89 @@ class OpenAIJsonClient:
             "messages": oa_messages,
             "temperature": temp,
         }
+        if n > 1:
+            kwargs["n"] = n
         if response_format is not None:
             kwargs["response_format"] = response_format
         try:
-            resp = client.chat.completions.create(**kwargs)
+            return client.chat.completions.create(**kwargs)
         except Exception:
             if response_format is not None:
                 kwargs.pop("response_format", None)
-                resp = client.chat.completions.create(**kwargs)
-            else:
-                raise
-        content = resp.choices[0].message.content or ""
-        usage: dict[str, int] = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
-        u = getattr(resp, "usage", None)
-        if u is not None:
-            usage["prompt_tokens"] = int(getattr(u, "prompt_tokens", 0) or 0)
-            usage["completion_tokens"] = int(getattr(u, "completion_tokens", 0) or 0)
-            usage["total_tokens"] = int(getattr(u, "total_tokens", 0) or 0)
-        return parse_llm_json_content(content), usage
+                return client.chat.completions.create(**kwargs)
+            raise
+
+
+class MultiChoiceUnsupportedError(RuntimeError):
+    """The provider rejected a multi-choice (``n > 1``) request for this model."""
+
+
+_multi_choice_unsupported_models: set[str] = set()
+
+
+# Provider wording for an ``n`` rejection when the error body does not name the parameter.
+_N_REJECTED = re.compile(
+    r"""['"`]n['"`]|\bn\b\W+(?:is\s+)?(?:not\s+supported|unsupported)|multiple\s+choices""",
+    re.IGNORECASE,
+)
+
+
+def _rejects_multi_choice(exc: BaseException) -> bool:
+    """
+    A 400 that is about ``n`` itself. Other 400s on an ``n > 1`` call (context length, schema,
+    content policy) say nothing about multi-choice support and must not disable it.
+    """
+    try:
+        import openai
+    except ImportError:  # pragma: no cover - openai is a hard dependency of this client
+        return False
+    if not isinstance(exc, openai.BadRequestError):
+        return False
+    if getattr(exc, "param", None) == "n":
+        return True
+    return bool(_N_REJECTED.search(str(getattr(exc, "message", "") or exc)))
+
+
+def empty_token_usage() -> dict[str, int]:
+    """Zero usage in the shape returned by the ``*_with_usage`` client methods."""
+    return {
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "total_tokens": 0,
+        "cached_prompt_tokens": 0,
+    }
+
+
+def sum_token_usage(usages: Iterable[dict[str, int] | None]) -> dict[str, int]:
+    """Key-wise sum of usage dicts (missing keys count as zero)."""
+    total = empty_token_usage()
+    for usage in usages:
+        for key, value in (usage or {}).items():
+            total[key] = total.get(key, 0) + int(value or 0)
+    return total
+
+
+def _openai_usage(resp: Any) -> dict[str, int]:
+    """
+    Token usage of a Chat Completions response. ``cached_prompt_tokens`` is the part of
+    ``prompt_tokens`` served from the provider's prompt cache (``prompt_tokens_details``).
+    """
+    usage = empty_token_usage()
+    u = getattr(resp, "usage", None)
+    if u is not None:
+        usage["prompt_tokens"] = int(getattr(u, "prompt_tokens", 0) or 0)
+        usage["completion_tokens"] = int(getattr(u, "completion_tokens", 0) or 0)
+        usage["total_tokens"] = int(getattr(u, "total_tokens", 0) or 0)
+        details = getattr(u, "prompt_tokens_details", None)
+        usage["cached_prompt_tokens"] = int(getattr(details, "cached_tokens", 0) or 0)
+    return usage
+
+
+def client_supports_multi_choice(client: Any) -> bool:
+    """True when ``client`` can return several sampled JSON choices from one request."""
+    return bool(getattr(client, "supports_multi_choice", False)) and callable(
+        getattr(client, "chat_json_choices", None)
+    )
 
 
 class AnthropicJsonClient:
@@ -168,9 +389,7 @@ class AnthropicJsonClient:
         response_format: dict[str, Any] | None = None,
     ) -> dict[str, Any]:
         del response_format  # Anthropic has no JSON schema mode here; prompt enforces JSON only.
-        from anthropic import Anthropic
-
-        client = Anthropic(api_key=self._api_key)
+        client = shared_anthropic_sdk_client(self._api_key)
         system_parts: list[str] = []
         anth_msgs: list[dict[str, Any]] = []
         for m in messages:
@@ -201,9 +420,153 @@ class AnthropicJsonClient:
         return parse_llm_json_content(text)
 
 
+class CachedChatClient:
+    """
+    :class:`ChatClient` wrapper that serves repeated requests from
+    :class:`~app.grading.llm_response_cache.LLMResponseCache`.
+
+    ``sample_slot`` keeps the k stochastic samples of one prompt distinct, so a re-run replays
+    the same k answers instead of collapsing them into one.
+    """
+
+    def __init__(self, inner: Any, cache: LLMResponseCache, model_label: str):
+        self._inner = inner
+        self._cache = cache
+        self.model_label = model_label
+        self.model = getattr(inner, "model", model_label)
+
+    def _key(
+        self,
+        messages: list[dict],
+        temperature: float | None,
+        response_format: dict[str, Any] | None,
+        sample_slot: int,
+    ) -> str:
+        return response_cache_key(
+            model=self.model_label,
+            messages=messages,
+            temperature=temperature,
+            response_format=response_format,
+            sample_slot=sample_slot,
+        )
+
+    def chat_json(
+        self,
+        messages: list[dict],
+        *,
+        temperature: float | None = None,
+        response_format: dict[str, Any] | None = None,
+        sample_slot: int = 0,
+    ) -> dict[str, Any]:
+        key = self._key(messages, temperature, response_format, sample_slot)
+        hit = self._cache.get(key)
+        if hit is not None:
+            return hit
+        kwargs: dict[str, Any] = {"temperature": temperature}
+        if response_format is not None:
+            kwargs["response_format"] = response_format
+        out = self._inner.chat_json(messages, **kwargs)
+        self._cache.put(key, out)
+        return out
+
+    def chat_json_with_usage(
+        self,
+        messages: list[dict],
+        *,
+        temperature: float | None = None,
+        response_format: dict[str, Any] | None = None,
+        sample_slot: int = 0,
+    ) -> tuple[dict[str, Any], dict[str, int]]:
+        """Cache hits report zero token usage (nothing was billed)."""
+        key = self._key(messages, temperature, response_format, sample_slot)
+        hit = self._cache.get(key)
+        if hit is not None:
+            return hit, empty_token_usage()
+        if hasattr(self._inner, "chat_json_with_usage"):
+            out, usage = self._inner.chat_json_with_usage(
+                messages, temperature=temperature, response_format=response_format
+            )
+        else:
+            out, usage = self._inner.chat_json(messages, temperature=temperature), {}
+        self._cache.put(key, out)
+        return out, usage
+
+    @property
+    def supports_multi_choice(self) -> bool:
+        return client_supports_multi_choice(self._inner)
+
+    def chat_json_choices(
+        self,
+        messages: list[dict],
+        *,
+        n: int,
+        temperature: float | None = None,
+        response_format: dict[str, Any] | None = None,
+        first_slot: int = 0,
+    ) -> list[dict[str, Any] | None]:
+        choices, _usage = self.chat_json_choices_with_usage(
+            messages,
+            n=n,
+            temperature=temperature,
+            response_format=response_format,
+            first_slot=first_slot,
+        )
+        return choices
+
+    def chat_json_choices_with_usage(
+        self,
+        messages: list[dict],
+        *,
+        n: int,
+        temperature: float | None = None,
+        response_format: dict[str, Any] | None = None,
+        first_slot: int = 0,
+    ) -> tuple[list[dict[str, Any] | None], dict[str, int]]:
+        """
+        Slots ``first_slot .. first_slot + n - 1`` share keys with single-sample
+        :meth:`chat_json` calls; only the missing slots are requested from the provider.
+        Usage covers that request only (zero when every slot was cached).
+        """
+        keys = [
+            self._key(messages, temperature, response_format, first_slot + i)
+            for i in range(max(1, int(n)))
+        ]
+        out: list[dict[str, Any] | None] = [self._cache.get(k) for k in keys]
+        missing = [i for i, v in enumerate(out) if v is None]
+        if not missing:
+            return out, empty_token_usage()
+        kwargs: dict[str, Any] = {"n": len(missing), "temperature": temperature}
+        if response_format is not None:
+            kwargs["response_format"] = response_format
+        usage: dict[str, int] = {}
+        if hasattr(self._inner, "chat_json_choices_with_usage"):
+            fresh, usage = self._inner.chat_json_choices_with_usage(messages, **kwargs)
+        else:
+            fresh = self._inner.chat_json_choices(messages, **kwargs)
+        fresh = list(fresh)[: len(missing)]
+        for i, obj in zip(missing, fresh):
+            out[i] = obj
+            if obj is not None:
+                self._cache.put(keys[i], obj)
+        if len(fresh) < len(missing):
+            # Keep the filled prefix so the caller tops up the rest with single calls.
+            return out[: missing[len(fresh)]], usage
+        return out, usage
+
+
+def maybe_cache_chat_client(client: Any, model_label: str, cfg: Any) -> Any:
+    """Wrap ``client`` in :class:`CachedChatClient` when ``LLM_RESPONSE_CACHE`` is enabled."""
+    if client is None or isinstance(client, CachedChatClient):
+        return client
+    cache = get_llm_response_cache(cfg)
+    if cache is None:
+        return client
+    return CachedChatClient(client, cache, model_label)
+
+
 def anthropic_multimodal_structure_client(
     cfg: Config,
-) -> tuple[AnthropicJsonClient, str] | None:
+) -> tuple[ChatClient, str] | None:
     """
     Claude client for multimodal **structure** only (assignment parsing, trio labeling,
     blank-question inventory, triplet-three-source when not using OpenAI there).
@@ -226,7 +589,11 @@ def anthropic_multimodal_structure_client(
         mt = int(getattr(cfg, "MULTIMODAL_ANTHROPIC_PARSING_MAX_TOKENS", 16384) or 16384)
     except (TypeError, ValueError):
         mt = 16384
-    return AnthropicJsonClient(key, model, max_tokens=mt), f"anthropic:{model}"
+    label = f"anthropic:{model}"
+    return (
+        maybe_cache_chat_client(AnthropicJsonClient(key, model, max_tokens=mt), label, cfg),
+        label,
+    )
 
 
 def openai_client_if_configured(cfg: Config) -> OpenAIJsonClient | None:
@@ -253,7 +620,8 @@ def _parse_model_spec(spec: str, cfg: Config) -> tuple[ChatClient, str] | None:
     key = (cfg.OPENAI_API_KEY or "").strip()
     if not key:
         return None
-    return OpenAIJsonClient(key, model_name), f"openai:{model_name}"
+    label = f"openai:{model_name}"
+    return maybe_cache_chat_client(OpenAIJsonClient(key, model_name), label, cfg), label
 
 
 def build_grading_clients(cfg: Config) -> list[tuple[ChatClient, str]]:
@@ -268,8 +636,9 @@ def build_grading_clients(cfg: Config) -> list[tuple[ChatClient, str]]:
         _log.warning("build_grading_clients: OPENAI_API_KEY missing; no clients")
         return []
     mid = (cfg.OPENAI_MODEL or "gpt-4o-mini").strip()
+    label = f"openai:{mid}"
     clients: list[tuple[ChatClient, str]] = [
-        (OpenAIJsonClient(key, mid), f"openai:{mid}"),
+        (maybe_cache_chat_client(OpenAIJsonClient(key, mid), label, cfg), label),
     ]
     for spec in (cfg.GRADING_MODEL_2, cfg.GRADING_MODEL_3):
         parsed = _parse_model_spec(spec, cfg)
@@ -342,7 +711,10 @@ def build_multimodal_grading_clients(cfg: Config) -> list[tuple[ChatClient, str]
         )
         return []
     omid = openai_multimodal_grading_model(cfg)
-    clients: list[tuple[ChatClient, str]] = [(OpenAIJsonClient(key, omid), f"openai:{omid}")]
+    label = f"openai:{omid}"
+    clients: list[tuple[ChatClient, str]] = [
+        (maybe_cache_chat_client(OpenAIJsonClient(key, omid), label, cfg), label)
+    ]
 
     for spec in (cfg.GRADING_MODEL_2, cfg.GRADING_MODEL_3):
         parsed = _parse_model_spec(spec, cfg)
@@ -10,7 +10,10 @@ artifacts). Shared helpers that are also used outside multimodal (e.g. ``submiss
 **Celery / DB grading:** :mod:`app.tasks` calls
 :func:`~app.grading.multimodal.course_multimodal_runner.run_db_submission_multimodal_pipeline`
 and :func:`~app.grading.multimodal.course_multimodal_runner.run_standalone_multimodal_pipeline`
-(both wrap :class:`MultimodalGradingPipeline`). Local multimodal runs use the same factory;
+(both wrap :class:`MultimodalGradingPipeline`);
+:func:`~app.grading.multimodal.course_multimodal_runner.run_db_cohort_multimodal_pipeline` grades
+a batch of submissions as one cohort (:mod:`.cohort`; Celery task ``grade_submission_cohort``
+takes the submission ids). Local multimodal runs use the same factory;
 tests live under ``tests/test_multimodal_pipeline.py``.
 
 See ``AGT_platform/backend/docs/multimodal_grading_pipeline.md`` for architecture.
@@ -31,6 +34,7 @@ from .semantic_confidence import (
 from .pipeline import (
     MultimodalGradingPipeline,
     PipelineArtifactStore,
+    PreparedSubmission,
     build_envelope_from_plaintext,
     create_multimodal_pipeline_from_app_config,
 )
@@ -65,6 +69,7 @@ __all__ = [
     "MultimodalGradingPipeline",
     "ParsedChunkGrade",
     "PipelineArtifactStore",
+    "PreparedSubmission",
     "ReviewStatus",
     "RubricType",
     "SampledChunkGrade",
@@ -8,7 +8,9 @@ After notebook (or heuristic) chunking, each unit has a ``question_id`` and opti
    numbered prompts).
 2. Picks the section that best matches the chunk (heading contains ``question_id`` when
    possible; otherwise **cosine similarity** of embeddings vs. a chunk query string —
-   same stack as :func:`app.grading.rag_embeddings.compute_submission_embedding`).
+   same stack as :func:`app.grading.rag_embeddings.compute_submission_embedding`). Sections are
+   embedded once into an :class:`AnswerKeySectionIndex` (normalized float32 matrix, reused
+   across submissions with the same key) and all chunk queries are scored in one matrix product.
 3. Writes ``chunk.evidence["answer_key_unit"]`` with parsed metadata, the matched
    **snippet**, and ``answer_key_rag`` (per-unit embedding) for downstream RAG / audit.
 
@@ -18,28 +20,30 @@ Raw vectors are stripped from grader prompts via
 
 from __future__ import annotations
 
+import hashlib
 import logging
 import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Any
 
-from app.grading.rag_embeddings import compute_submission_embedding
+import numpy as np
+
+from app.grading.embedding_cache import embedding_model_id
+from app.grading.embedding_vector import compact_embedding, is_embedding
+from app.grading.rag_embeddings import (
+    compute_submission_embedding,
+    compute_submission_embeddings,
+    is_primary_embedding_source,
+)
+from app.grading.similarity import top_k, unit_rows
 
 from .notebook_chunker import strip_assignment_placeholder_lines
 from .schemas import GradingChunk
 
 _log = logging.getLogger(__name__)
 
-def _cosine(a: list[float], b: list[float]) -> float:
-    if len(a) != len(b) or not a:
-        return 0.0
-    dot = sum(a[i] * b[i] for i in range(len(a)))
-    na = (sum(x * x for x in a)) ** 0.5
-    nb = (sum(y * y for y in b)) ** 0.5
-    if na <= 0.0 or nb <= 0.0:
-        return 0.0
-    return float(dot / (na * nb))
-
-
 def split_answer_key_sections(answer_plain: str) -> list[tuple[str, str]]:
     """
     Split answer key text on markdown headings (``## ...`` at line start).
@@ -105,6 +109,15 @@ def code_reference_matches_student(*, student: str, reference: str) -> bool:
     return False
 
 
+def code_reference_equivalent(*, student: str, reference: str) -> bool:
+    """
+    Stricter than :func:`code_reference_matches_student`: the same non-empty executable line
+    sequence (comments dropped, inner whitespace collapsed), with no containment fallbacks.
+    """
+    s_lines = _executable_code_lines(student)
+    return bool(s_lines) and s_lines == _executable_code_lines(reference)
+
+
 def grading_student_code_blob(chunk: GradingChunk) -> str:
     """Best-effort student code string for reference matching (trio → previews → chunk text)."""
     ev = chunk.evidence or {}
@@ -161,57 +174,131 @@ def _chunk_query_text(ch: GradingChunk) -> str:
     return "\n\n".join(p for p in parts if p).strip() or (ch.extracted_text or "").strip()
 
 
-def _pick_section_for_chunk(
+def _section_snippet(hdr: str, body: str) -> str:
+    snip = (hdr + "\n\n" + body).strip() if hdr else (body or "").strip()
+    return snip[:24_000]
+
+
+def _pick_section_without_embeddings(
     ch: GradingChunk,
     sections: list[tuple[str, str]],
-    cfg: Any,
-) -> tuple[str, str, str, float | None]:
+) -> tuple[str, str, str, float | None] | None:
     """
-    Return ``(snippet, match_method, matched_heading, cosine_or_none)``.
-
-    ``snippet`` is capped for storage / embedding; may be shortened further in prompts.
+    Heading / trivial picks as ``(snippet, match_method, matched_heading, cosine_or_none)``;
+    ``None`` when the chunk needs embedding similarity against the section index.
     """
     qid = str(ch.question_id or "").strip()
     for hdr, body in sections:
         if _heading_matches_question_id(hdr, qid):
-            snip = (hdr + "\n\n" + body).strip() if hdr else body.strip()
-            return snip[:24_000], "question_id_heading", hdr, None
+            return _section_snippet(hdr, body), "question_id_heading", hdr, None
 
     if not sections:
         return "", "none", "", None
 
-    query = _chunk_query_text(ch)
-    if not query.strip():
-        body0 = sections[0][1] if sections else ""
-        hdr0 = sections[0][0] if sections else ""
-        snip = (hdr0 + "\n\n" + body0).strip() if hdr0 else (body0 or "").strip()
-        return snip[:24_000], "full_key_fallback", hdr0, None
+    if not _chunk_query_text(ch).strip():
+        hdr0, body0 = sections[0]
+        return _section_snippet(hdr0, body0), "full_key_fallback", hdr0, None
+    return None
+
+
+@dataclass(frozen=True)
+class AnswerKeySectionIndex:
+    """
+    Answer-key sections embedded once: ``matrix`` rows are L2-normalized float32 vectors
+    aligned with ``sections`` (non-empty sections only). Rows whose dimension differs from the
+    majority (mixed embedding fallbacks) are zero, i.e. cosine 0 as in the list-based path.
+    """
+
+    sections: tuple[tuple[str, str], ...]
+    matrix: np.ndarray
+    cacheable: bool
 
+    def best_sections(self, query_vecs: list[list[float]]) -> list[tuple[int, float]]:
+        """``(row, cosine)`` of the best section for each query (first row wins ties)."""
+        if not self.sections:
+            return [(-1, -1.0) for _ in query_vecs]
+        q = unit_rows(query_vecs, dim=int(self.matrix.shape[1]))
+        idx, scores = top_k(q, self.matrix, 1)
+        return [(int(i), float(sc)) for i, sc in zip(idx[:, 0], scores[:, 0])]
+
+
+def build_answer_key_section_index(
+    sections: list[tuple[str, str]],
+    cfg: Any,
+) -> AnswerKeySectionIndex:
+    """Embed every non-empty section in one batched pass."""
+    kept = [(hdr, body) for hdr, body in sections if (hdr + "\n" + body).strip()]
+    vecs = compute_submission_embeddings(
+        [(hdr + "\n" + body).strip()[:20_000] for hdr, body in kept], cfg
+    )
+    mat = unit_rows([v for v, _src in vecs])
+    # Rows from a fallback backend (or the hash) live in another vector space: do not keep them.
+    cacheable = all(is_primary_embedding_source(src, cfg) for _v, src in vecs)
+    return AnswerKeySectionIndex(sections=tuple(kept), matrix=mat, cacheable=cacheable)
+
+
+_SECTION_INDEX_MAX = 16
+_section_index_lock = threading.Lock()
+_section_indexes: OrderedDict[tuple[Any, ...], AnswerKeySectionIndex] = OrderedDict()
+
+
+def get_answer_key_section_index(
+    answer_key_plain: str,
+    sections: list[tuple[str, str]],
+    cfg: Any,
+) -> AnswerKeySectionIndex:
+    """
+    Section index for one answer key, reused across submissions of the same assignment in this
+    process (keyed by answer-key text and embedding model). Indexes with any row from a fallback
+    backend or the hash are not kept, so a recovered embedding backend is picked up next call.
+    """
+    backend, model = embedding_model_id(cfg)
+    key = (
+        hashlib.sha256(answer_key_plain.encode("utf-8", errors="replace")).hexdigest(),
+        backend,
+        model,
+        int(getattr(cfg, "RAG_EMBED_MAX_CHARS", 24000) or 24000),
+    )
+    with _section_index_lock:
+        hit = _section_indexes.get(key)
+        if hit is not None:
+            _section_indexes.move_to_end(key)
+            return hit
+    index = build_answer_key_section_index(sections, cfg)
+    if index.cacheable:
+        with _section_index_lock:
+            _section_indexes[key] = index
+            while len(_section_indexes) > _SECTION_INDEX_MAX:
+                _section_indexes.popitem(last=False)
+    return index
+
+
+def reset_answer_key_section_indexes() -> None:
+    """Drop cached section indexes (tests)."""
+    with _section_index_lock:
+        _section_indexes.clear()
+
+
+def _pick_sections_by_similarity(
+    chunks: list[GradingChunk],
+    sections: list[tuple[str, str]],
+    answer_key_plain: str,
+    cfg: Any,
+) -> list[tuple[str, str, str, float | None]]:
+    """Score every chunk query against the section index with one matrix product."""
     try:
-        q_vec, _ = compute_submission_embedding(query, cfg)
+        index = get_answer_key_section_index(answer_key_plain, sections, cfg)
+        q_vecs = compute_submission_embeddings([_chunk_query_text(ch) for ch in chunks], cfg)
     except Exception:
         _log.debug("answer_key_chunk_enrich: embedding query failed", exc_info=True)
         hdr, body = sections[0]
-        snip = (hdr + "\n\n" + body).strip() if hdr else body.strip()
-        return snip[:24_000], "fallback_first_section", hdr, None
+        return [(_section_snippet(hdr, body), "fallback_first_section", hdr, None)] * len(chunks)
 
-    best_sim = -1.0
-    best: tuple[str, str] = ("", "")
-    for hdr, body in sections:
-        blob = (hdr + "\n" + body).strip()[:20_000]
-        if not blob.strip():
-            continue
-        try:
-            b_vec, _ = compute_submission_embedding(blob, cfg)
-            sim = _cosine(q_vec, b_vec)
-        except Exception:
-            continue
-        if sim > best_sim:
-            best_sim = sim
-            best = (hdr, body)
-    hdr, body = best
-    snip = (hdr + "\n\n" + body).strip() if hdr else body.strip()
-    return snip[:24_000], "embedding_cosine", hdr, float(best_sim)
+    out: list[tuple[str, str, str, float | None]] = []
+    for row, sim in index.best_sections([v for v, _src in q_vecs]):
+        hdr, body = index.sections[row] if row >= 0 else ("", "")
+        out.append((_section_snippet(hdr, body), "embedding_cosine", hdr, float(sim)))
+    return out
 
 
 def enrich_chunks_with_per_question_answer_key(
@@ -233,8 +320,22 @@ def enrich_chunks_with_per_question_answer_key(
     if not sections:
         return
 
-    for ch in chunks:
-        snippet, method, hdr, cos = _pick_section_for_chunk(ch, sections, cfg)
+    picks = [_pick_section_without_embeddings(ch, sections) for ch in chunks]
+    need = [i for i, p in enumerate(picks) if p is None]
+    if need:
+        for i, pick in zip(
+            need,
+            _pick_sections_by_similarity(
+                [chunks[i] for i in need], sections, answer_key_plain, cfg
+            ),
+        ):
+            picks[i] = pick
+
+    picked: list[tuple[GradingChunk, str, str, str, float | None]] = []
+    for ch, pick in zip(chunks, picks):
+        if pick is None:
+            continue
+        snippet, method, hdr, cos = pick
         if not snippet.strip():
             continue
         student_blob = grading_student_code_blob(ch)
@@ -255,16 +356,22 @@ def enrich_chunks_with_per_question_answer_key(
             if narrowed:
                 snippet = narrowed
                 method = f"{method};narrowed_to_student_matching_line"
-        try:
-            emb_vec, emb_src = compute_submission_embedding(snippet[:20_000], cfg)
-        except Exception:
-            _log.warning(
-                "answer_key_chunk_enrich: per-unit embedding failed for %s",
-                ch.chunk_id,
-                exc_info=True,
-            )
-            emb_vec, emb_src = [], "embedding_failed"
+        picked.append((ch, snippet, method, hdr, cos))
 
+    # Per-unit answer-key vectors for every chunk in one batched pass.
+    try:
+        unit_vecs: list[tuple[list[float], str]] = list(
+            compute_submission_embeddings([p[1][:20_000] for p in picked], cfg)
+        )
+    except Exception:
+        _log.warning(
+            "answer_key_chunk_enrich: per-unit embedding failed for %d chunk(s)",
+            len(picked),
+            exc_info=True,
+        )
+        unit_vecs = [([], "embedding_failed")] * len(picked)
+
+    for (ch, snippet, method, hdr, cos), (emb_vec, emb_src) in zip(picked, unit_vecs):
         ev = dict(ch.evidence or {})
         unit: dict[str, Any] = {
             "question_id": str(ch.question_id or ""),
@@ -280,7 +387,7 @@ def enrich_chunks_with_per_question_answer_key(
             unit["answer_key_rag"] = {
                 "embedding_dimension": len(emb_vec),
                 "embedding_source": emb_src,
-                "embedding": emb_vec,
+                "embedding": compact_embedding(emb_vec),
             }
         ev["answer_key_unit"] = unit
         trio = ev.get("trio")
@@ -299,6 +406,145 @@ def enrich_chunks_with_per_question_answer_key(
         ch.evidence = ev
 
 
+def estimate_prompt_tokens(text: str) -> int:
+    """Rough token count (≈4 characters per token) for prompt budgeting."""
+    return (len(text or "") + 3) // 4
+
+
+def _matched_answer_key_segment(chunk: GradingChunk) -> str:
+    ev = chunk.evidence or {}
+    unit = ev.get("answer_key_unit")
+    if isinstance(unit, dict) and str(unit.get("snippet") or "").strip():
+        return str(unit["snippet"]).strip()
+    trio = ev.get("trio")
+    if isinstance(trio, dict):
+        return str(trio.get("answer_key_segment") or "").strip()
+    return ""
+
+
+def _matched_section_row(chunk: GradingChunk, sections: list[tuple[str, str]]) -> int:
+    """
+    Row of the section the chunk was aligned to (heading, then a segment equal to one whole
+    section), or ``-1``.
+    """
+    unit = (chunk.evidence or {}).get("answer_key_unit")
+    parsed = unit.get("parsed") if isinstance(unit, dict) else None
+    heading = str((parsed or {}).get("matched_section_heading") or "").strip()
+    if heading:
+        for i, (hdr, _body) in enumerate(sections):
+            if hdr and hdr[:500] == heading:
+                return i
+    segment = " ".join(_matched_answer_key_segment(chunk).split())
+    if segment:
+        # A segment narrowed to one line can occur in several sections; anything short of a
+        # whole-section match is left to the chunk's answer-key vector.
+        rows = [
+            i
+            for i, (hdr, body) in enumerate(sections)
+            if " ".join(_section_snippet(hdr, body).split()) == segment
+        ]
+        if len(rows) == 1:
+            return rows[0]
+    return -1
+
+
+def _chunk_answer_key_vector(chunk: GradingChunk) -> np.ndarray | None:
+    unit = (chunk.evidence or {}).get("answer_key_unit")
+    rag = unit.get("answer_key_rag") if isinstance(unit, dict) else None
+    vec = rag.get("embedding") if isinstance(rag, dict) else None
+    return np.asarray(vec, dtype=np.float32) if is_embedding(vec) else None
+
+
+def assemble_answer_key_context(
+    chunk: GradingChunk,
+    answer_key_text: str,
+    cfg: Any,
+    *,
+    token_budget: int,
+    neighbors: int = 2,
+    prompt_text: str | None = None,
+) -> tuple[str, dict[str, Any]] | None:
+    """
+    Trimmed ``reference_answer_key`` for one chunk: the section it was aligned to plus the
+    ``neighbors`` sections most similar to that section (cosine over the cached
+    :class:`AnswerKeySectionIndex`), in answer-key order, within ``token_budget`` estimated
+    tokens. Returns ``(text, audit)``; the audit lists the included sections and the tokens
+    saved against ``prompt_text`` (the key the prompt carries untrimmed, e.g. the capped
+    ``answer_key_for_prompt``; defaults to ``answer_key_text``). Savings can be zero or negative
+    when that key is already shorter than the excerpt.
+
+    ``None`` means "send the whole key": trimming is off, the chunk has no matched segment,
+    the key has a single section or already fits the budget, or the matched section is unknown.
+    """
+    if token_budget <= 0 or cfg is None or not _matched_answer_key_segment(chunk):
+        return None
+    full = strip_assignment_placeholder_lines(str(answer_key_text or "")).strip()
+    tokens_full = estimate_prompt_tokens(full)
+    if not full or tokens_full <= token_budget:
+        return None
+    sections = [(h, b) for h, b in split_answer_key_sections(full) if (h + "\n" + b).strip()]
+    if len(sections) < 2:
+        return None
+
+    row = _matched_section_row(chunk, sections)
+    sims: np.ndarray | None = None
+    try:
+        index = get_answer_key_section_index(full, sections, cfg)
+        if row >= 0:
+            sims = index.matrix @ index.matrix[row]
+        else:
+            vec = _chunk_answer_key_vector(chunk)
+            if vec is not None:
+                q = unit_rows([vec], dim=int(index.matrix.shape[1]))
+                sims = index.matrix @ q[0]
+                row = int(np.argmax(sims))
+    except Exception:
+        _log.debug("answer_key_chunk_enrich: section similarity failed", exc_info=True)
+    if row < 0:
+        return None
+    if sims is not None:
+        selection = "embedding_cosine"
+        # Stable sort: ties keep answer-key order.
+        others = sorted(
+            (i for i in range(len(sections)) if i != row), key=lambda i: -float(sims[i])
+        )
+    else:
+        selection = "position"
+        others = sorted((i for i in range(len(sections)) if i != row), key=lambda i: abs(i - row))
+
+    picked: dict[int, str] = {}
+    used = 0
+    for i in [row, *others[: max(0, int(neighbors))]]:
+        text = _section_snippet(*sections[i])
+        tokens = estimate_prompt_tokens(text)
+        if i == row and tokens > token_budget:
+            text, tokens = text[: token_budget * 4], token_budget
+        elif used + tokens > token_budget:
+            continue
+        picked[i] = text
+        used += tokens
+    order = sorted(picked)
+    tokens_untrimmed = tokens_full if prompt_text is None else estimate_prompt_tokens(prompt_text)
+    return "\n\n".join(picked[i] for i in order), {
+        "selection": selection,
+        "matched_section": row,
+        "sections": [
+            {
+                "index": i,
+                "heading": sections[i][0][:200],
+                "cosine": round(float(sims[i]), 4) if sims is not None else None,
+            }
+            for i in order
+        ],
+        "n_sections_total": len(sections),
+        "token_budget": int(token_budget),
+        "tokens_full": tokens_full,
+        "tokens_untrimmed": tokens_untrimmed,
+        "tokens_included": used,
+        "tokens_saved": tokens_untrimmed - used,
+    }
+
+
 def embed_full_answer_key_for_audit(answer_plain: str, cfg: Any) -> dict[str, Any] | None:
     """Single vector over the capped answer key (metadata suitable for ``pipeline_audit``)."""
     if not str(answer_plain or "").strip() or cfg is None:
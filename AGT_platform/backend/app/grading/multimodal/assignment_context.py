@@ -0,0 +1,255 @@
+"""
+Assignment-scoped cache for inputs that are identical for every submission in a cohort.
+
+:meth:`MultimodalGradingPipeline.run` resolves the answer key and blank template by fuzzy file
+name, embeds the full key for the audit row, parses the blank notebook into question units and
+loads / validates the ``custom_rubric`` plan — once per student. With
+``MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE`` enabled those results are reused:
+
+- ``memory`` — in-process LRU (``MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE_MAX_ENTRIES``).
+- ``disk`` — LRU + SQLite under ``MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE_DIR`` shared by the Celery
+  workers of one host.
+- ``redis`` — LRU + ``REDIS_URL``.
+
+Only JSON-serializable entries (resolved answer key / template, answer-key audit, rubric plan)
+go to the shared store; parsed blank-template chunks stay in-process. Shared entries expire after
+``MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE_TTL_SEC``.
+
+Keys carry everything the value depends on, so invalidation is implicit: directory lookups include
+a fingerprint of the directory listing (name, size, mtime of each file), and text-derived entries
+include a SHA-256 of the text — a changed DB column (``answer_key_plaintext`` hint) or edited file
+is simply a different key. Cached values are shared between runs and must not be mutated.
+Answer-key section indexes have their own process cache in
+:func:`app.grading.multimodal.answer_key_chunk_enrich.get_answer_key_section_index`.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+from app.grading.answer_key_resolve import (
+    resolve_answer_key_plaintext,
+    resolve_blank_assignment_template,
+)
+from app.grading.cache_support import CacheRegistry, LruFront, RedisStore, SqliteStore
+from app.grading.embedding_cache import embedding_model_id
+
+_log = logging.getLogger(__name__)
+
+_REDIS_PREFIX = "agt:assignment_context:"
+
+T = TypeVar("T")
+
+
+def directory_fingerprint(path: Path) -> str:
+    """Digest of the regular files directly under ``path`` (name, size, mtime); ``""`` if absent."""
+    rows: list[tuple[str, int, int]] = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_file():
+                        st = entry.stat()
+                        rows.append((entry.name, st.st_size, st.st_mtime_ns))
+                except OSError:
+                    continue
+    except OSError:
+        return ""
+    rows.sort()
+    return hashlib.sha256(json.dumps(rows).encode("utf-8")).hexdigest()
+
+
+def file_fingerprint(path: Path) -> str:
+    """``size:mtime_ns`` of one file, or ``""`` when it does not exist."""
+    try:
+        st = path.stat()
+    except OSError:
+        return ""
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", errors="replace")).hexdigest()
+
+
+class AssignmentContextCache(LruFront[Any]):
+    """In-process LRU of assignment-level values in front of an optional shared JSON store."""
+
+    COUNTERS = ("hits", "shared_hits", "misses", "store_errors")
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 256,
+        ttl_sec: float = 24 * 3600,
+        store: Any | None = None,
+    ):
+        super().__init__(
+            name="assignment_context", max_entries=max_entries, ttl_sec=ttl_sec, store=store
+        )
+
+    @staticmethod
+    def key(kind: str, *parts: Any) -> str:
+        raw = json.dumps([kind, *parts], ensure_ascii=True, default=str)
+        return f"{kind}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+    def get_or_build(
+        self,
+        kind: str,
+        parts: tuple[Any, ...],
+        build: Callable[[], T],
+        *,
+        shared: bool = False,
+    ) -> T:
+        """
+        Cached value for ``(kind, *parts)``, calling ``build`` on a miss (``None`` results are not
+        kept, so failed builds retry). ``shared`` values must be JSON-serializable; they are also
+        read from / written to the shared store.
+        """
+        key = self.key(kind, *parts)
+        value = self._lookup(key)
+        if value is not None:
+            return value
+        if shared:
+            raw = self._store_get(key)
+            if raw is not None:
+                value = json.loads(raw)
+                self._count("shared_hits")
+                self._remember(key, value)
+                return value
+        value = build()
+        self._count("misses")
+        if value is None:
+            return value
+        self._remember(key, value)
+        if shared:
+            self._store_put(key, json.dumps(value, ensure_ascii=True))
+        return value
+
+
+_registry: CacheRegistry[AssignmentContextCache] = CacheRegistry()
+
+
+def assignment_context_cache_mode(cfg: Any) -> str:
+    mode = (getattr(cfg, "MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE", "") or "").strip().lower()
+    return mode if mode in ("memory", "disk", "redis") else "off"
+
+
+def default_assignment_context_cache_dir() -> Path:
+    return Path(tempfile.gettempdir()) / "agt_assignment_context_cache"
+
+
+def get_assignment_context_cache(cfg: Any) -> AssignmentContextCache | None:
+    """Process-wide cache for the current settings, or ``None`` when the cache is off."""
+    mode = assignment_context_cache_mode(cfg)
+    if mode == "off":
+        return None
+    max_entries = int(getattr(cfg, "MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE_MAX_ENTRIES", 256) or 256)
+    ttl = float(getattr(cfg, "MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE_TTL_SEC", 24 * 3600) or 24 * 3600)
+    raw_dir = str(getattr(cfg, "MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE_DIR", "") or "").strip()
+    cache_dir = Path(raw_dir).expanduser() if raw_dir else default_assignment_context_cache_dir()
+    redis_url = str(getattr(cfg, "REDIS_URL", "") or "").strip()
+    ident = (mode, max_entries, ttl, str(cache_dir), redis_url)
+
+    def build() -> AssignmentContextCache:
+        store: Any | None = None
+        try:
+            if mode == "disk":
+                # Values are small (texts, plans); age-out is by TTL rather than a byte budget.
+                store = SqliteStore(
+                    cache_dir / "assignment_context.sqlite3", table="responses", max_bytes=0
+                )
+            elif mode == "redis":
+                if redis_url:
+                    store = RedisStore(redis_url, prefix=_REDIS_PREFIX)
+                else:
+                    _log.warning(
+                        "MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE=redis but REDIS_URL is empty; "
+                        "memory only"
+                    )
+        except Exception as exc:
+            _log.warning("assignment_context: %s store unavailable (%s); memory only", mode, exc)
+            store = None
+        return AssignmentContextCache(max_entries=max_entries, ttl_sec=ttl, store=store)
+
+    return _registry.get(ident, build)
+
+
+def assignment_context_cache_stats(cfg: Any) -> dict[str, int] | None:
+    cache = get_assignment_context_cache(cfg)
+    return cache.stats() if cache is not None else None
+
+
+def reset_assignment_context_caches() -> None:
+    """Drop process-wide caches (tests)."""
+    _registry.clear()
+
+
+def cached_assignment_value(
+    cfg: Any,
+    kind: str,
+    parts: tuple[Any, ...],
+    build: Callable[[], T],
+    *,
+    shared: bool = False,
+) -> T:
+    """``build()`` through the assignment context cache, or directly when the cache is off."""
+    cache = get_assignment_context_cache(cfg)
+    if cache is None:
+        return build()
+    return cache.get_or_build(kind, parts, build, shared=shared)
+
+
+def resolve_answer_key_cached(cfg: Any, assignment_id: str, ak_dir: Path) -> tuple[str, str]:
+    """:func:`resolve_answer_key_plaintext` keyed by assignment id + directory fingerprint."""
+
+    def build() -> list[str]:
+        return list(resolve_answer_key_plaintext(assignment_id, ak_dir))
+
+    text, name = cached_assignment_value(
+        cfg,
+        "answer_key",
+        (assignment_id, str(ak_dir.resolve()), directory_fingerprint(ak_dir)),
+        build,
+        shared=True,
+    )
+    return text, name
+
+
+def resolve_blank_template_cached(
+    cfg: Any, assignment_id: str, blank_dir: Path
+) -> tuple[bytes, str, str]:
+    """:func:`resolve_blank_assignment_template` keyed by assignment id + directory fingerprint."""
+
+    def build() -> dict[str, str]:
+        data, name, suffix = resolve_blank_assignment_template(assignment_id, blank_dir)
+        return {"b64": base64.b64encode(data).decode("ascii"), "name": name, "suffix": suffix}
+
+    row = cached_assignment_value(
+        cfg,
+        "blank_template",
+        (assignment_id, str(blank_dir.resolve()), directory_fingerprint(blank_dir)),
+        build,
+        shared=True,
+    )
+    return base64.b64decode(row["b64"]), row["name"], row["suffix"]
+
+
+def answer_key_audit_cached(cfg: Any, answer_plain: str) -> dict[str, Any] | None:
+    """:func:`embed_full_answer_key_for_audit` keyed by key text digest + embedding model."""
+    from .answer_key_chunk_enrich import embed_full_answer_key_for_audit
+
+    return cached_assignment_value(
+        cfg,
+        "answer_key_audit",
+        (text_digest(answer_plain), *embedding_model_id(cfg)),
+        lambda: embed_full_answer_key_for_audit(answer_plain, cfg),
+        shared=True,
+    )
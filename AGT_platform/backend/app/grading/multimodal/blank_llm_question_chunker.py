@@ -19,6 +19,7 @@ import re
 from typing import Any
 
 from app.config import Config
+from app.grading.similarity import best_match
 
 from .ingestion import IngestionEnvelope
 from .notebook_chunker import (
@@ -27,7 +28,7 @@ from .notebook_chunker import (
 )
 from .schemas import GradingChunk, Modality, TaskType
 from .chunker import modality_from_hints, task_type_from_hints
-from .answer_key_chunk_enrich import _chunk_query_text, _cosine
+from .answer_key_chunk_enrich import _chunk_query_text
 
 _log = logging.getLogger(__name__)
 
@@ -113,32 +114,26 @@ def _best_student_chunk_for_prompt(
     student_chunks: list[GradingChunk],
     cfg: Config,
 ) -> GradingChunk | None:
-    from app.grading.rag_embeddings import compute_submission_embedding
+    from app.grading.rag_embeddings import compute_submission_embeddings
 
     if not student_chunks:
         return None
     pq = (prompt or "").strip()[:12_000]
     if not pq.strip():
         return student_chunks[0]
+    candidates: list[tuple[GradingChunk, str]] = []
+    for ch in student_chunks:
+        blob = _chunk_query_text(ch).strip()[:12_000] or (ch.extracted_text or "").strip()[:12_000]
+        if blob:
+            candidates.append((ch, blob))
     try:
-        q_vec, _ = compute_submission_embedding(pq, cfg)
+        vecs = compute_submission_embeddings([pq] + [b for _ch, b in candidates], cfg)
     except Exception:
         _log.debug("blank LLM match: question embed failed", exc_info=True)
         return student_chunks[0]
 
-    best: tuple[float, GradingChunk] = (-1.0, student_chunks[0])
-    for ch in student_chunks:
-        blob = _chunk_query_text(ch).strip()[:12_000] or (ch.extracted_text or "").strip()[:12_000]
-        if not blob:
-            continue
-        try:
-            b_vec, _ = compute_submission_embedding(blob, cfg)
-            sim = _cosine(q_vec, b_vec)
-        except Exception:
-            continue
-        if sim > best[0]:
-            best = (sim, ch)
-    return best[1]
+    pos, _sim = best_match(vecs[0][0], [v for v, _src in vecs[1:]])
+    return candidates[pos][0] if pos >= 0 else student_chunks[0]
 
 
 def try_build_llm_blank_aligned_notebook_chunks(
@@ -182,6 +177,7 @@ def try_build_llm_blank_aligned_notebook_chunks(
 
     student_chunks = build_notebook_qa_chunks(
         student_bytes,
+        notebook=envelope.parsed.notebook(),
         assignment_id=aid,
         student_id=sid,
         modality=nb_mod,
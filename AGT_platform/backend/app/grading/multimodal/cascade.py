@@ -0,0 +1,132 @@
+"""
+Grading cascade: sample the cheapest grading model first and escalate only uncertain chunks.
+
+With ``MULTIMODAL_GRADING_CASCADE`` on, :class:`MultimodalGradingPipeline` samples a chunk with
+one model (tier) at a time instead of every client from
+:func:`app.grading.llm_router.build_multimodal_grading_clients` at once. Tiers follow
+:func:`cascade_tier_order`: configured order (``OPENAI_MULTIMODAL_GRADING_MODEL``, then
+``GRADING_MODEL_2`` / ``GRADING_MODEL_3``) unless ``MULTIMODAL_CASCADE_MODEL_PRICES`` prices the
+models, in which case the cheapest goes first.
+
+After each tier, :func:`cascade_escalation_reason` looks at every sample drawn so far: the next
+tier runs when ``ai_confidence`` (:func:`summarize_chunk_confidence_from_counts`) is below
+``MULTIMODAL_CASCADE_CONFIDENCE_MIN`` or the parse-failure rate exceeds
+:attr:`MultimodalGradingConfig.parse_fail_rate_high`. The chunk is aggregated over all drawn
+samples as usual. Outcomes carry ``stage_artifacts["cascade"]`` with per-tier calls, latency,
+tokens and estimated cost; :func:`summarize_cascade` rolls those up for the ``cascade``
+workflow phase.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Iterable, Sequence
+
+from .schemas import MultimodalGradingConfig, SampledChunkGrade
+from .semantic_confidence import summarize_chunk_confidence_from_counts
+
+
+def grading_cascade_enabled(cfg: Any | None) -> bool:
+    return bool(getattr(cfg, "MULTIMODAL_GRADING_CASCADE", False)) if cfg is not None else False
+
+
+def cascade_confidence_min(cfg: Any | None) -> float:
+    try:
+        value = float(getattr(cfg, "MULTIMODAL_CASCADE_CONFIDENCE_MIN", 0.85))
+    except (TypeError, ValueError):
+        value = 0.85
+    return max(0.0, min(value, 1.0))
+
+
+def parse_model_prices(spec: str) -> dict[str, tuple[float, float]]:
+    """
+    ``"openai:gpt-5.4-nano=0.20/1.25,openai:gpt-5.4=2.50/15"`` → ``{label: (input, output)}``
+    in USD per million tokens. Malformed entries are skipped.
+    """
+    prices: dict[str, tuple[float, float]] = {}
+    for part in (spec or "").split(","):
+        label, sep, rates = part.strip().rpartition("=")
+        if not sep or not label.strip():
+            continue
+        pin, _slash, pout = rates.partition("/")
+        try:
+            prices[label.strip()] = (float(pin), float(pout or 0))
+        except ValueError:
+            continue
+    return prices
+
+
+def cascade_model_prices(cfg: Any | None) -> dict[str, tuple[float, float]]:
+    return parse_model_prices(str(getattr(cfg, "MULTIMODAL_CASCADE_MODEL_PRICES", "") or ""))
+
+
+def cascade_tier_order(
+    labels: Sequence[str],
+    prices: dict[str, tuple[float, float]],
+) -> list[int]:
+    """Client positions, cheapest priced model first; unpriced models keep configured order."""
+    def cost(pos: int) -> float:
+        price = prices.get(labels[pos])
+        return price[0] + price[1] if price is not None else math.inf
+
+    return sorted(range(len(labels)), key=cost)
+
+
+def estimate_cost_usd(usage: dict[str, int], price: tuple[float, float] | None) -> float:
+    if price is None:
+        return 0.0
+    return round(
+        (int(usage.get("prompt_tokens") or 0) * price[0]
+         + int(usage.get("completion_tokens") or 0) * price[1]) / 1_000_000.0,
+        8,
+    )
+
+
+def cascade_escalation_reason(
+    samples: Sequence[SampledChunkGrade],
+    cluster_counts: dict[str, int],
+    *,
+    confidence_min: float,
+    config: MultimodalGradingConfig,
+) -> tuple[str | None, float, float]:
+    """
+    ``(reason, ai_confidence, parse_fail_rate)`` over parsed ``samples``; ``reason`` is
+    ``"parse_failures"``, ``"low_confidence"`` or ``None`` when the chunk is settled.
+    """
+    n = len(samples)
+    parse_fail = (sum(1 for s in samples if not s.parse_ok) / n) if n else 1.0
+    confidence = float(summarize_chunk_confidence_from_counts(cluster_counts)["ai_confidence"])
+    if parse_fail > float(config.parse_fail_rate_high):
+        return "parse_failures", confidence, parse_fail
+    if confidence < confidence_min:
+        return "low_confidence", confidence, parse_fail
+    return None, confidence, parse_fail
+
+
+def summarize_cascade(traces: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    """Per-model totals (chunks, calls, latency, tokens, cost) and the escalated chunk count."""
+    tiers: dict[str, dict[str, Any]] = {}
+    chunks = escalated = 0
+    for trace in traces:
+        chunks += 1
+        escalated += 1 if len(trace.get("tiers") or []) > 1 else 0
+        for row in trace.get("tiers") or []:
+            agg = tiers.setdefault(
+                row["model_id"],
+                {
+                    "tier": row["tier"],
+                    "chunks": 0,
+                    "calls": 0,
+                    "latency_ms": 0.0,
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "cost_usd": 0.0,
+                },
+            )
+            agg["chunks"] += 1
+            agg["calls"] += int(row["calls"])
+            agg["latency_ms"] = round(agg["latency_ms"] + float(row["latency_ms"]), 1)
+            agg["prompt_tokens"] += int(row["prompt_tokens"])
+            agg["completion_tokens"] += int(row["completion_tokens"])
+            agg["cost_usd"] = round(agg["cost_usd"] + float(row["cost_usd"]), 8)
+    return {"chunks": chunks, "escalated": escalated, "tiers": tiers}
@@ -4,15 +4,41 @@ Serialize / deserialize :class:`GradingChunk` lists so chunking + unit embedding
 The multimodal pipeline can read ``modality_hints["multimodal_chunk_cache_path"]`` and skip
 ``build_multimodal_grading_chunks`` + ``enrich_chunks_with_rag_embeddings`` when vectors are
 present in the cached ``evidence["rag_embedding_bundle"]`` (and optional ``trio_segment_rag``).
+
+Two on-disk formats, chosen by :func:`save_grading_chunks_cache` from the path suffix and told
+apart on load by the leading magic bytes:
+
+- ``*.json`` — one JSON array; vectors as base64 float32
+  (:class:`app.grading.embedding_vector.EmbeddingVector`). Older files with plain float lists are
+  still read and their vectors compacted on load.
+- anything else (e.g. ``*.agtc``) — versioned binary: magic, a JSON header, compact JSON-lines
+  chunk records in which vectors are ``{"__f32_ref__": [offset, length]}`` references, then one
+  64-byte-aligned little-endian float32 arena holding every vector. The arena is memory-mapped
+  on load, so a vector's pages are read only when it is used. The header carries SHA-256 digests
+  of the records and the arena, plus ``unit_embeddings`` for
+  :func:`chunk_cache_has_unit_embeddings`.
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
+import os
+import struct
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
+from app.grading.embedding_vector import (
+    EmbeddingVector,
+    compact_embedding,
+    decode_vectors_from_json,
+    encode_vectors_for_json,
+    is_embedding,
+)
+
 from .schemas import GradingChunk, Modality, RubricType, TaskType
 
 _log = logging.getLogger(__name__)
@@ -41,6 +67,28 @@ def _rubric_from_value(raw: str | None) -> RubricType | None:
     return None
 
 
+def _compact_rag_slot(slot: Any) -> Any:
+    if isinstance(slot, dict) and isinstance(slot.get("embedding"), list):
+        slot = dict(slot)
+        slot["embedding"] = compact_embedding(slot["embedding"])
+    return slot
+
+
+def _compact_evidence_vectors(ev: dict[str, Any]) -> dict[str, Any]:
+    """Legacy caches store float lists; keep them as float32 vectors in memory."""
+    if "rag_embedding_bundle" in ev:
+        ev["rag_embedding_bundle"] = _compact_rag_slot(ev["rag_embedding_bundle"])
+    seg = ev.get("trio_segment_rag")
+    if isinstance(seg, dict):
+        ev["trio_segment_rag"] = {k: _compact_rag_slot(v) for k, v in seg.items()}
+    unit = ev.get("answer_key_unit")
+    if isinstance(unit, dict) and "answer_key_rag" in unit:
+        unit = dict(unit)
+        unit["answer_key_rag"] = _compact_rag_slot(unit["answer_key_rag"])
+        ev["answer_key_unit"] = unit
+    return ev
+
+
 def grading_chunk_to_record(ch: GradingChunk) -> dict[str, Any]:
     return {
         "chunk_id": ch.chunk_id,
@@ -63,6 +111,7 @@ def grading_chunk_to_record(ch: GradingChunk) -> dict[str, Any]:
 
 
 def grading_chunk_from_record(d: dict[str, Any]) -> GradingChunk:
+    evidence = decode_vectors_from_json(dict(d.get("evidence") or {}))
     return GradingChunk(
         chunk_id=str(d["chunk_id"]),
         assignment_id=str(d["assignment_id"]),
@@ -74,7 +123,7 @@ def grading_chunk_from_record(d: dict[str, Any]) -> GradingChunk:
         rubric_version=str(d.get("rubric_version") or ""),
         parent_chunk_id=d.get("parent_chunk_id"),
         raw_content_ref=d.get("raw_content_ref"),
-        evidence=dict(d.get("evidence") or {}),
+        evidence=_compact_evidence_vectors(evidence),
         source_refs=list(d.get("source_refs") or []),
         rubric_type=_rubric_from_value(d.get("rubric_type")),
         rubric_rows=list(d.get("rubric_rows") or []),
@@ -83,18 +132,167 @@ def grading_chunk_from_record(d: dict[str, Any]) -> GradingChunk:
     )
 
 
+_BINARY_MAGIC = b"AGTCHNK\x00"
+_BINARY_VERSION = 1
+_ARENA_ALIGN = 64
+_REF_TAG = "__f32_ref__"
+_F32 = np.dtype("<f4")
+
+
 def save_grading_chunks_cache(path: Path, chunks: list[GradingChunk]) -> None:
+    """Write ``chunks`` as JSON when ``path`` ends in ``.json``, else in the binary format."""
     path.parent.mkdir(parents=True, exist_ok=True)
-    payload = [grading_chunk_to_record(c) for c in chunks]
-    path.write_text(json.dumps(payload, ensure_ascii=True, indent=2), encoding="utf-8")
+    if path.suffix.lower() == ".json":
+        payload = [encode_vectors_for_json(grading_chunk_to_record(c)) for c in chunks]
+        data = json.dumps(payload, ensure_ascii=True, indent=2).encode("utf-8")
+    else:
+        data = _encode_binary_cache(chunks)
+    # Replace atomically: readers may still have the previous file memory-mapped.
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _encode_binary_cache(chunks: list[GradingChunk]) -> bytes:
+    arena: list[np.ndarray] = []
+    n_floats = 0
+
+    def pack(obj: Any) -> Any:
+        nonlocal n_floats
+        if isinstance(obj, EmbeddingVector):
+            ref = {_REF_TAG: [n_floats, len(obj)]}
+            arena.append(obj.array)
+            n_floats += len(obj)
+            return ref
+        if isinstance(obj, dict):
+            return {k: pack(v) for k, v in obj.items()}
+        if isinstance(obj, (list, tuple)):
+            return [pack(v) for v in obj]
+        return obj
+
+    lines = [
+        json.dumps(pack(grading_chunk_to_record(c)), ensure_ascii=True, separators=(",", ":"))
+        for c in chunks
+    ]
+    records = "".join(line + "\n" for line in lines).encode("utf-8")
+    vectors = (np.concatenate(arena) if arena else np.zeros(0)).astype(_F32).tobytes()
+    header = json.dumps(
+        {
+            "version": _BINARY_VERSION,
+            "n_chunks": len(chunks),
+            "n_floats": n_floats,
+            "records_bytes": len(records),
+            "records_sha256": hashlib.sha256(records).hexdigest(),
+            "vectors_sha256": hashlib.sha256(vectors).hexdigest(),
+            "unit_embeddings": chunks_have_unit_embeddings(chunks),
+        },
+        separators=(",", ":"),
+    ).encode("utf-8")
+    head = _BINARY_MAGIC + struct.pack("<I", len(header)) + header + records
+    return head + bytes(_arena_offset(len(head)) - len(head)) + vectors
+
+
+def _arena_offset(end_of_records: int) -> int:
+    return -(-end_of_records // _ARENA_ALIGN) * _ARENA_ALIGN
+
+
+def _read_binary_head(path: Path) -> tuple[dict[str, Any], bytes, int] | None:
+    """``(header, records, arena offset)`` or ``None`` when ``path`` is not a binary cache."""
+    with path.open("rb") as fh:
+        if fh.read(len(_BINARY_MAGIC)) != _BINARY_MAGIC:
+            return None
+        (header_len,) = struct.unpack("<I", fh.read(4))
+        header = json.loads(fh.read(header_len).decode("utf-8"))
+        if not isinstance(header, dict) or header.get("version") != _BINARY_VERSION:
+            raise ValueError(f"unsupported chunk cache version {header.get('version')!r}")
+        records = fh.read(int(header["records_bytes"]))
+    end = len(_BINARY_MAGIC) + 4 + header_len + len(records)
+    return header, records, _arena_offset(end)
+
+
+def read_chunk_cache_header(path: Path) -> dict[str, Any] | None:
+    """Header of a binary chunk cache (no records or vectors parsed); ``None`` for JSON files."""
+    try:
+        head = _read_binary_head(path)
+    except (OSError, ValueError, struct.error) as exc:
+        _log.warning("chunk_cache: could not read header of %s (%s)", path, exc)
+        return None
+    return head[0] if head else None
+
+
+def chunk_cache_has_unit_embeddings(path: Path) -> bool | None:
+    """Binary caches answer from the header; ``None`` means "load and use
+    :func:`chunks_have_unit_embeddings`" (JSON or unreadable file)."""
+    header = read_chunk_cache_header(path)
+    if header is None:
+        return None
+    return bool(header.get("unit_embeddings"))
+
+
+def _load_binary_cache(
+    path: Path,
+    header: dict[str, Any],
+    records: bytes,
+    arena_offset: int,
+    *,
+    verify_vectors: bool,
+) -> list[GradingChunk] | None:
+    if hashlib.sha256(records).hexdigest() != header.get("records_sha256"):
+        _log.warning("chunk_cache: record digest mismatch in %s", path)
+        return None
+    n_floats = int(header.get("n_floats") or 0)
+    if path.stat().st_size < arena_offset + n_floats * _F32.itemsize:
+        _log.warning("chunk_cache: truncated vector arena in %s", path)
+        return None
+    arena = (
+        np.memmap(path, dtype=_F32, mode="r", offset=arena_offset, shape=(n_floats,))
+        if n_floats
+        else np.zeros(0, dtype=_F32)
+    )
+    if verify_vectors and hashlib.sha256(arena).hexdigest() != header.get("vectors_sha256"):
+        _log.warning("chunk_cache: vector digest mismatch in %s", path)
+        return None
+
+    def unpack(obj: Any) -> Any:
+        if isinstance(obj, dict):
+            ref = obj.get(_REF_TAG)
+            if len(obj) == 1 and isinstance(ref, list) and len(ref) == 2:
+                start, length = int(ref[0]), int(ref[1])
+                if start < 0 or start + length > n_floats:
+                    raise ValueError(f"vector reference out of range: {ref!r}")
+                return EmbeddingVector.view(arena[start : start + length])
+            return {k: unpack(v) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [unpack(v) for v in obj]
+        return obj
+
+    out: list[GradingChunk] = []
+    for line in records.decode("utf-8").splitlines():
+        if line.strip():
+            out.append(grading_chunk_from_record(unpack(json.loads(line))))
+    return out
+
 
+def load_grading_chunks_cache(
+    path: Path, *, verify_vectors: bool = False
+) -> list[GradingChunk] | None:
+    """
+    Read a cache written by :func:`save_grading_chunks_cache` (either format).
 
-def load_grading_chunks_cache(path: Path) -> list[GradingChunk] | None:
+    Binary caches always check the record digest and the arena size; ``verify_vectors`` also
+    hashes the arena, which pages in every vector.
+    """
     if not path.is_file():
         return None
     try:
+        head = _read_binary_head(path)
+        if head is not None:
+            return _load_binary_cache(path, *head, verify_vectors=verify_vectors) or None
         data = json.loads(path.read_text(encoding="utf-8"))
-    except (OSError, json.JSONDecodeError, TypeError) as exc:
+    except (OSError, KeyError, TypeError, ValueError, struct.error) as exc:
         _log.warning("chunk_cache: could not read %s (%s)", path, exc)
         return None
     if not isinstance(data, list):
@@ -116,6 +314,6 @@ def chunks_have_unit_embeddings(chunks: list[GradingChunk]) -> bool:
         if not isinstance(bundle, dict):
             return False
         emb = bundle.get("embedding")
-        if not isinstance(emb, list) or len(emb) < 8:
+        if not is_embedding(emb, min_dim=8):
             return False
     return bool(chunks)
@@ -0,0 +1,106 @@
+"""
+Chunk packing: grade several small chunks that share a rubric in one LLM request.
+
+With ``MULTIMODAL_CHUNK_PACKING`` on, :meth:`MultimodalGradingPipeline.grade_prepared` routes
+every chunk first and passes the ones that would otherwise be sampled on their own, and whose
+``extracted_text`` is at most ``MULTIMODAL_CHUNK_PACKING_MAX_CHARS``, to
+:func:`plan_chunk_batches`. Chunks with the same rubric type and rows are packed, in submission
+order, into batches of up to ``MULTIMODAL_CHUNK_PACKING_MAX_BATCH``.
+
+Each batch is one :func:`~app.grading.multimodal.prompts_chunk.build_batch_grading_prompt`
+request sampled k times like a single chunk. :func:`split_batch_samples` turns every batch
+sample's ``{"results": [...]}`` array back into per-chunk samples (matched by ``chunk_id``) for
+the usual parse → semantic entropy → review path. A chunk keeps its packed samples only when
+every one of them has a result that parses; otherwise that chunk alone is re-graded with
+single-chunk calls. Outcomes record the batch in ``stage_artifacts["packing"]``; the batch's
+token usage is added to the first chunk of the batch.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Sequence
+
+from .schemas import GradingChunk, SampledChunkGrade
+
+
+def chunk_packing_enabled(cfg: Any | None) -> bool:
+    return bool(getattr(cfg, "MULTIMODAL_CHUNK_PACKING", False)) if cfg is not None else False
+
+
+def chunk_packing_limits(cfg: Any | None) -> tuple[int, int]:
+    """``(max chars per packed chunk, max chunks per batch)``."""
+    try:
+        max_chars = int(getattr(cfg, "MULTIMODAL_CHUNK_PACKING_MAX_CHARS", 600) or 600)
+        max_batch = int(getattr(cfg, "MULTIMODAL_CHUNK_PACKING_MAX_BATCH", 4) or 4)
+    except (TypeError, ValueError):
+        max_chars, max_batch = 600, 4
+    return max(1, max_chars), max(2, min(max_batch, 16))
+
+
+def _rubric_signature(chunk: GradingChunk) -> str:
+    return json.dumps(
+        [chunk.rubric_type.value if chunk.rubric_type else None, chunk.rubric_rows or []],
+        sort_keys=True,
+        default=str,
+    )
+
+
+def plan_chunk_batches(
+    chunks: Sequence[GradingChunk],
+    *,
+    max_chars: int,
+    max_batch: int,
+) -> list[list[GradingChunk]]:
+    """
+    Batches of two or more routed chunks that share a rubric, each chunk at most ``max_chars``
+    of ``extracted_text``. Chunks keep submission order within a batch; chunks that end up
+    alone are not returned.
+    """
+    groups: dict[str, list[list[GradingChunk]]] = {}
+    for chunk in chunks:
+        if not chunk.rubric_rows or len(chunk.extracted_text or "") > max_chars:
+            continue
+        batches = groups.setdefault(_rubric_signature(chunk), [[]])
+        if len(batches[-1]) >= max_batch:
+            batches.append([])
+        batches[-1].append(chunk)
+    return [batch for batches in groups.values() for batch in batches if len(batch) > 1]
+
+
+def split_batch_samples(
+    chunks: Sequence[GradingChunk],
+    raw_samples: Sequence[SampledChunkGrade],
+) -> dict[str, list[SampledChunkGrade]]:
+    """
+    Per-chunk samples (keyed by ``chunk_id``) from raw batch samples. A chunk without a result
+    in some sample gets an empty ``raw_text`` for that sample (parse failure downstream). Token
+    usage is left on the batch samples.
+    """
+    out: dict[str, list[SampledChunkGrade]] = {str(ch.chunk_id): [] for ch in chunks}
+    for sample in raw_samples:
+        by_id: dict[str, Any] = {}
+        try:
+            results = json.loads(sample.raw_text or "").get("results")
+        except (json.JSONDecodeError, AttributeError):
+            results = None
+        if isinstance(results, list):
+            for row in results:
+                if isinstance(row, dict) and str(row.get("chunk_id") or "") in out:
+                    by_id.setdefault(str(row["chunk_id"]), row)
+        for cid, samples in out.items():
+            row = by_id.get(cid)
+            samples.append(
+                SampledChunkGrade(
+                    model_id=sample.model_id,
+                    sample_index=sample.sample_index,
+                    raw_text=json.dumps(
+                        {k: v for k, v in row.items() if k != "chunk_id"}, ensure_ascii=True
+                    )
+                    if row is not None
+                    else "",
+                    parsed=None,
+                    parse_ok=False,
+                )
+            )
+    return out
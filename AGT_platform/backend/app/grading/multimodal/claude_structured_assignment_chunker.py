@@ -19,11 +19,8 @@ import re
 from typing import Any
 
 from app.config import Config
-from app.grading.artifact_plaintext import (
-    artifacts_to_concatenated_plain,
-    infer_modality_from_artifact_keys,
-)
-from app.grading.llm_router import AnthropicJsonClient
+from app.grading.artifact_plaintext import infer_modality_from_artifact_keys
+from app.grading.llm_router import AnthropicJsonClient, maybe_cache_chat_client
 
 from .chunker import modality_from_hints, task_type_from_hints
 from .ingestion import IngestionEnvelope
@@ -77,7 +74,7 @@ def claude_structured_chunking_forced_on(cfg: Any) -> bool:
     return mode in ("on", "true", "1", "yes")
 
 
-def _anthropic_chunking_client(cfg: Config) -> tuple[AnthropicJsonClient, str] | None:
+def _anthropic_chunking_client(cfg: Config) -> tuple[Any, str] | None:
     """Anthropic client for assignment chunking only (independent of MULTIMODAL_ANTHROPIC_ASSIGNMENT_PARSING)."""
     key = (getattr(cfg, "ANTHROPIC_API_KEY", "") or "").strip()
     if not key:
@@ -98,7 +95,11 @@ def _anthropic_chunking_client(cfg: Config) -> tuple[AnthropicJsonClient, str] |
             )
         except (TypeError, ValueError):
             mt = 16384
-    return AnthropicJsonClient(key, model, max_tokens=mt), f"anthropic:{model}"
+    label = f"anthropic:{model}"
+    return (
+        maybe_cache_chat_client(AnthropicJsonClient(key, model, max_tokens=mt), label, cfg),
+        label,
+    )
 
 
 def _max_student_chars(cfg: Any) -> int:
@@ -137,7 +138,7 @@ def _submission_payload_for_claude(
         if len(raw) > max_chars:
             raw = raw[:max_chars] + "\n…[truncated]"
         return raw, True
-    plain = artifacts_to_concatenated_plain(bmap).strip()
+    plain = envelope.parsed.concatenated_plaintext().strip()
     if not plain:
         plain = (envelope.extracted_plaintext or "").strip()
     if len(plain) > max_chars:
@@ -0,0 +1,227 @@
+"""
+Cohort (batch) grading: chunk every submission first, then grade near-duplicate responses once.
+
+:func:`grade_cohort` runs :meth:`MultimodalGradingPipeline.prepare` for every submission of an
+assignment, then :func:`build_cohort_plan` clusters each question's ``student_response`` across
+the cohort. Responses with the same normalized text
+(:func:`app.grading.multimodal.grade_reuse.normalize_response_text`) form one group; smaller groups
+whose RAG ``student_response`` embedding is within ``MULTIMODAL_COHORT_SIMILARITY`` cosine of a
+larger group's leader join its cluster. Per cluster of two or more responses:
+
+- the **representative** (first response of the largest group) is graded with full sampling;
+- **members** draw one confirmatory sample with the representative's consensus grade in the
+  prompt; when it lands in the representative's modal cluster they take a copy of the
+  representative's outcome, otherwise they are graded normally;
+- responses in singleton clusters (**outliers**) and empty responses take the normal path.
+
+Roles are recorded in ``stage_artifacts["cohort"]`` and counted in the ``cohort`` workflow phase.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Sequence
+
+from app.grading.embedding_vector import is_embedding
+from app.grading.similarity import cosine_matrix, unit_rows
+
+from .grade_reuse import normalize_response_text, student_response_text
+from .schemas import AssignmentGradeResult, ChunkGradeOutcome, GradingChunk
+
+if TYPE_CHECKING:
+    from .ingestion import IngestionEnvelope
+    from .pipeline import MultimodalGradingPipeline, PreparedSubmission
+
+_log = logging.getLogger(__name__)
+
+ChunkKey = tuple[str, str]
+GradedChunk = tuple[ChunkGradeOutcome, list[tuple[str, dict[str, Any]]]]
+
+
+def chunk_key(chunk: GradingChunk) -> ChunkKey:
+    """``(student_id, chunk_id)`` — chunk ids alone are not unique across every chunker."""
+    return str(chunk.student_id), str(chunk.chunk_id)
+
+
+@dataclass(frozen=True)
+class CohortRole:
+    role: str  # "representative" | "member"
+    cluster_id: str
+    representative: ChunkKey
+    similarity: float
+    cluster_size: int
+
+
+class CohortPlan:
+    """Cluster roles for one cohort plus the representatives' graded results (thread-safe)."""
+
+    def __init__(self, roles: dict[ChunkKey, CohortRole]):
+        self.roles = roles
+        self._graded: dict[ChunkKey, GradedChunk] = {}
+        self._lock = threading.Lock()
+
+    def role_for(self, chunk: GradingChunk) -> CohortRole | None:
+        return self.roles.get(chunk_key(chunk))
+
+    def is_representative(self, chunk: GradingChunk) -> bool:
+        role = self.role_for(chunk)
+        return role is not None and role.role == "representative"
+
+    def record_representative(self, role: CohortRole, graded: GradedChunk) -> None:
+        with self._lock:
+            self._graded[role.representative] = graded
+
+    def representative_result(self, role: CohortRole) -> GradedChunk | None:
+        with self._lock:
+            return self._graded.get(role.representative)
+
+    def stats(self) -> dict[str, int]:
+        reps = sum(1 for r in self.roles.values() if r.role == "representative")
+        return {"clusters": reps, "representatives": reps, "members": len(self.roles) - reps}
+
+
+def _response_embedding(chunk: GradingChunk) -> Any:
+    ev = chunk.evidence or {}
+    seg = (ev.get("trio_segment_rag") or {}).get("student_response")
+    if isinstance(seg, dict) and is_embedding(seg.get("embedding")):
+        return seg["embedding"]
+    bundle = ev.get("rag_embedding_bundle")
+    if isinstance(bundle, dict) and is_embedding(bundle.get("embedding")):
+        return bundle["embedding"]
+    return []
+
+
+def build_cohort_plan(
+    submissions: Sequence[Sequence[GradingChunk]],
+    *,
+    similarity: float = 0.97,
+) -> CohortPlan:
+    """Cluster every question's responses across ``submissions`` (see module docstring)."""
+    by_question: dict[str, dict[str, list[GradingChunk]]] = {}
+    for chunks in submissions:
+        for chunk in chunks:
+            if not chunk.question_id:
+                continue
+            text = normalize_response_text(student_response_text(chunk))
+            if not text:
+                continue
+            digest = hashlib.sha256(text.encode("utf-8", errors="replace")).hexdigest()
+            by_question.setdefault(str(chunk.question_id), {}).setdefault(digest, []).append(chunk)
+
+    roles: dict[ChunkKey, CohortRole] = {}
+    for qid, groups in by_question.items():
+        # Stable sort: equal-sized groups keep first-submission order.
+        ordered = sorted(groups.values(), key=len, reverse=True)
+        vectors = [_response_embedding(group[0]) for group in ordered]
+        sims = None
+        if any(len(v) for v in vectors):
+            unit = unit_rows(vectors)
+            sims = cosine_matrix(unit, unit)
+        assigned = [False] * len(ordered)
+        for i, group in enumerate(ordered):
+            if assigned[i]:
+                continue
+            assigned[i] = True
+            cluster = [(chunk, 1.0) for chunk in group]
+            if sims is not None and len(vectors[i]):
+                for j in range(i + 1, len(ordered)):
+                    if not assigned[j] and len(vectors[j]) and sims[i, j] >= similarity:
+                        assigned[j] = True
+                        cluster.extend((chunk, float(sims[i, j])) for chunk in ordered[j])
+            if len(cluster) < 2:
+                continue
+            rep_key = chunk_key(cluster[0][0])
+            cluster_id = f"{qid}#{i}"
+            for pos, (chunk, sim) in enumerate(cluster):
+                roles[chunk_key(chunk)] = CohortRole(
+                    role="representative" if pos == 0 else "member",
+                    cluster_id=cluster_id,
+                    representative=rep_key,
+                    similarity=round(min(sim, 1.0), 6),
+                    cluster_size=len(cluster),
+                )
+    return CohortPlan(roles)
+
+
+def _cohort_workers(app_cfg: Any | None, n_items: int) -> int:
+    try:
+        n = int(getattr(app_cfg, "MULTIMODAL_COHORT_WORKERS", 4) or 4)
+    except (TypeError, ValueError):
+        n = 4
+    return max(1, min(n, 32, max(1, n_items)))
+
+
+def grade_cohort(
+    items: Sequence[tuple[MultimodalGradingPipeline, IngestionEnvelope]],
+    *,
+    app_cfg: Any | None = None,
+) -> list[AssignmentGradeResult | Exception]:
+    """
+    Grade ``(pipeline, envelope)`` pairs of one assignment as a cohort. Results are in input
+    order; a submission whose preparation or grading raised gets the exception instead (logged),
+    and its chunks take no part in clustering.
+    """
+    prepared: list[PreparedSubmission | Exception] = []
+    for pipeline, envelope in items:
+        try:
+            prepared.append(pipeline.prepare(envelope))
+        except Exception as exc:
+            _log.warning(
+                "cohort: preparing student %s failed: %s", envelope.student_id, exc, exc_info=True
+            )
+            prepared.append(exc)
+
+    threshold = float(getattr(app_cfg, "MULTIMODAL_COHORT_SIMILARITY", 0.97) or 0.97)
+    plan = build_cohort_plan(
+        [p.chunks for p in prepared if not isinstance(p, Exception)], similarity=threshold
+    )
+    _log.info("cohort: %d submission(s), %s", len(items), plan.stats())
+
+    representatives = [
+        (pipeline, prep, chunk)
+        for (pipeline, _env), prep in zip(items, prepared)
+        if not isinstance(prep, Exception)
+        for chunk in prep.chunks
+        if plan.is_representative(chunk)
+    ]
+
+    def grade_representative(item: tuple[Any, Any, GradingChunk]) -> None:
+        pipeline, prep, chunk = item
+        try:
+            pipeline.grade_cohort_representative(prep, chunk, plan)
+        except Exception as exc:
+            # Members of this cluster fall back to normal grading.
+            _log.warning("cohort: representative %s failed: %s", chunk.chunk_id, exc)
+
+    workers = _cohort_workers(app_cfg, len(representatives))
+    if workers <= 1:
+        for item in representatives:
+            grade_representative(item)
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mm-cohort") as pool:
+            list(pool.map(grade_representative, representatives))
+
+    def grade_submission(
+        item: tuple[tuple[Any, Any], PreparedSubmission | Exception],
+    ) -> AssignmentGradeResult | Exception:
+        (pipeline, envelope), prep = item
+        if isinstance(prep, Exception):
+            return prep
+        try:
+            return pipeline.grade_prepared(prep, cohort=plan)
+        except Exception as exc:
+            _log.warning(
+                "cohort: grading student %s failed: %s", envelope.student_id, exc, exc_info=True
+            )
+            return exc
+
+    pairs = list(zip(items, prepared))
+    workers = _cohort_workers(app_cfg, len(pairs))
+    if workers <= 1:
+        return [grade_submission(pair) for pair in pairs]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mm-cohort") as pool:
+        return list(pool.map(grade_submission, pairs))
@@ -1,5 +1,6 @@
 """
-DB / Celery entry: map assignment + raw artifact bytes → multimodal pipeline → grading dict.
+DB / Celery entry: map assignment + raw artifact bytes → multimodal pipeline → grading dict
+(one submission, or a cohort batch via :func:`run_db_cohort_multimodal_pipeline`).
 
 Produces the same top-level shape as the removed legacy ``run_grading_pipeline`` after
 :func:`~app.grading.output_schema.coerce_grading_output_shape`.
@@ -9,7 +10,8 @@ from __future__ import annotations
 
 import json
 import logging
-from typing import Any
+from dataclasses import dataclass
+from typing import Any, Sequence
 
 from app.grading.modality_resolution import (
     augment_prompt_for_modality_profile,
@@ -17,17 +19,18 @@ from app.grading.modality_resolution import (
     resolve_modality_profile,
 )
 from app.grading.output_schema import coerce_grading_output_shape
-from app.grading.submission_text import submission_text_from_artifacts
 
+from .cohort import grade_cohort
 from .generic_rubric_loader import (
     _row_from_criterion,
     flat_rubric_rows_from_by_type,
 )
 from .grading_output import multimodal_assignment_to_grading_dict
-from .ingestion import ingest_raw_submission
-from .pipeline import create_multimodal_pipeline_from_app_config
+from .ingestion import IngestionEnvelope, ingest_raw_submission
+from .parsed_artifacts import ParsedArtifactBundle
+from .pipeline import MultimodalGradingPipeline, create_multimodal_pipeline_from_app_config
 from .rubric_fallback import DEFAULT_STANDALONE_RUBRIC
-from .schemas import MultimodalGradingConfig, RubricType
+from .schemas import AssignmentGradeResult, MultimodalGradingConfig, RubricType
 
 _log = logging.getLogger(__name__)
 
@@ -196,7 +199,7 @@ def _compose_assignment_task_description(
     return "\n\n".join(parts) if parts else "Grade this submission."
 
 
-def _run_multimodal_once(
+def _build_multimodal_run(
     cfg: Any,
     assignment: Any,
     artifacts_bytes: dict[str, bytes],
@@ -206,11 +209,11 @@ def _run_multimodal_once(
     rubric_text: str | None,
     answer_key_text: str | None,
     rubric_column: Any,
-) -> dict[str, Any]:
-    plaintext = submission_text_from_artifacts(artifacts_bytes).strip()
-    modality = getattr(assignment, "modality", None) or infer_modality_from_artifacts(
-        artifacts_bytes
-    )
+) -> tuple[MultimodalGradingPipeline, IngestionEnvelope, list[dict[str, Any]], dict[str, Any]]:
+    """Pipeline + envelope for one submission → ``(pipeline, envelope, flat_rubric, profile)``."""
+    # One bundle parses the PDF / notebook once for the plaintext here and every later stage.
+    parsed = ParsedArtifactBundle(artifacts_bytes)
+    plaintext = parsed.concatenated_plaintext().strip()
     profile = resolve_modality_profile(assignment, artifacts_bytes, plaintext)
     if profile.get("signals", {}).get("text_too_short_for_grading"):
         _log.warning(
@@ -234,6 +237,7 @@ def _run_multimodal_once(
         artifacts=dict(artifacts_bytes),
         extracted_plaintext=plaintext,
         modality_hints=hints,
+        parsed=parsed,
     )
 
     mm_cfg = MultimodalGradingConfig(require_answer_key=False)
@@ -244,7 +248,14 @@ def _run_multimodal_once(
         classifier=None,
         task_description=augmented,
     )
-    mm_result = pipeline.run(envelope)
+    return pipeline, envelope, flat_rubric, profile
+
+
+def _grading_dict(
+    mm_result: AssignmentGradeResult,
+    flat_rubric: list[dict[str, Any]],
+    profile: dict[str, Any],
+) -> dict[str, Any]:
     out = multimodal_assignment_to_grading_dict(
         mm_result,
         rubric=flat_rubric,
@@ -261,6 +272,30 @@ def _run_multimodal_once(
     return coerce_grading_output_shape(out)
 
 
+def _run_multimodal_once(
+    cfg: Any,
+    assignment: Any,
+    artifacts_bytes: dict[str, bytes],
+    *,
+    assignment_id: int,
+    envelope_student_id: str,
+    rubric_text: str | None,
+    answer_key_text: str | None,
+    rubric_column: Any,
+) -> dict[str, Any]:
+    pipeline, envelope, flat_rubric, profile = _build_multimodal_run(
+        cfg,
+        assignment,
+        artifacts_bytes,
+        assignment_id=assignment_id,
+        envelope_student_id=envelope_student_id,
+        rubric_text=rubric_text,
+        answer_key_text=answer_key_text,
+        rubric_column=rubric_column,
+    )
+    return _grading_dict(pipeline.run(envelope), flat_rubric, profile)
+
+
 def run_db_submission_multimodal_pipeline(
     cfg: Any,
     assignment: Any,
@@ -288,6 +323,71 @@ def run_db_submission_multimodal_pipeline(
     )
 
 
+@dataclass(frozen=True)
+class CohortSubmission:
+    """One row of a :func:`run_db_cohort_multimodal_pipeline` batch."""
+
+    submission_id: int
+    student_id: int | None
+    artifacts_bytes: dict[str, bytes]
+
+
+def run_db_cohort_multimodal_pipeline(
+    cfg: Any,
+    assignment: Any,
+    submissions: Sequence[CohortSubmission],
+    *,
+    assignment_id: int,
+    rubric_text: str | None,
+    answer_key_text: str | None,
+) -> dict[int, dict[str, Any] | Exception]:
+    """
+    Grade many submissions of one course assignment as a cohort (deadline surges): every
+    submission is chunked first, then near-duplicate responses per question are clustered and
+    graded once (see :mod:`app.grading.multimodal.cohort`).
+
+    Returns ``submission_id → grading dict`` in the :func:`run_db_submission_multimodal_pipeline`
+    shape; a submission that failed maps to its exception so the caller can mark or retry it.
+    """
+    out: dict[int, dict[str, Any] | Exception] = {}
+    runs: list[tuple[int, MultimodalGradingPipeline, IngestionEnvelope, Any, Any]] = []
+    for sub in submissions:
+        envelope_sid = (
+            str(sub.student_id)
+            if sub.student_id is not None
+            else f"anon_sub_{sub.submission_id}"
+        )
+        try:
+            pipeline, envelope, flat_rubric, profile = _build_multimodal_run(
+                cfg,
+                assignment,
+                sub.artifacts_bytes,
+                assignment_id=assignment_id,
+                envelope_student_id=envelope_sid,
+                rubric_text=rubric_text,
+                answer_key_text=answer_key_text,
+                rubric_column=getattr(assignment, "rubric", None),
+            )
+        except Exception as exc:
+            # Unreadable artifacts fail this submission only; the rest of the cohort still grades.
+            _log.warning(
+                "cohort: ingesting submission %s failed: %s",
+                sub.submission_id,
+                exc,
+                exc_info=True,
+            )
+            out[sub.submission_id] = exc
+            continue
+        runs.append((sub.submission_id, pipeline, envelope, flat_rubric, profile))
+
+    results = grade_cohort([(pipeline, env) for _sid, pipeline, env, _r, _p in runs], app_cfg=cfg)
+    for (sid, _pipeline, _env, flat_rubric, profile), result in zip(runs, results):
+        out[sid] = (
+            result if isinstance(result, Exception) else _grading_dict(result, flat_rubric, profile)
+        )
+    return out
+
+
 def run_standalone_multimodal_pipeline(
     cfg: Any,
     artifacts_bytes: dict[str, bytes],
@@ -19,9 +19,12 @@ from typing import Any
 import numpy as np
 
 from app.config import Config
-from app.grading.rag_embeddings import compute_submission_embedding
+from app.grading.embedding_vector import is_embedding
+from app.grading.rag_embeddings import compute_submission_embeddings
+from app.grading.similarity import cosine_matrix, unit_rows
 
 from . import rubric_llm_chain as _rubric_llm_chain
+from .assignment_context import cached_assignment_value, file_fingerprint
 from .ingestion import IngestionEnvelope
 from .rubric_router import _MEDIUM_EDA_SIGNAL, _STRONG_EDA_SIGNAL
 from .schemas import GradingChunk, Modality, RubricType, TaskType
@@ -130,7 +133,7 @@ def _mean_unit_embedding(chunks: list[GradingChunk]) -> np.ndarray | None:
         if not isinstance(bundle, dict):
             continue
         emb = bundle.get("embedding")
-        if not isinstance(emb, list) or len(emb) < 8:
+        if not is_embedding(emb, min_dim=8):
             continue
         vecs.append(np.asarray(emb, dtype=np.float64))
     if not vecs:
@@ -138,20 +141,6 @@ def _mean_unit_embedding(chunks: list[GradingChunk]) -> np.ndarray | None:
     return np.mean(np.stack(vecs, axis=0), axis=0)
 
 
-def _l2_normalize(v: np.ndarray) -> np.ndarray:
-    n = float(np.linalg.norm(v))
-    if n < 1e-12:
-        return v
-    return v / n
-
-
-def _cosine(a: np.ndarray, b: np.ndarray) -> float:
-    na = float(np.linalg.norm(a)) * float(np.linalg.norm(b))
-    if na < 1e-12:
-        return 0.0
-    return float(np.dot(a, b) / na)
-
-
 def _infer_chunk_tags(chunk: GradingChunk) -> set[str]:
     """Mechanical tags for applicability (no LLM)."""
     blob = (chunk.extracted_text or "") + "\n" + json.dumps(
@@ -349,17 +338,26 @@ def resolve_assignment_rubric_type(
     )
 
     if mean is not None and not skip:
-        mean_n = _l2_normalize(mean)
-        for rt, anchor in _RUBRIC_TYPE_ANCHORS.items():
-            try:
-                vec, _src = compute_submission_embedding(anchor, cfg)
-            except Exception:
-                _log.debug("anchor embed failed for %s", rt.value, exc_info=True)
-                continue
-            if not isinstance(vec, list) or len(vec) != len(mean):
-                continue
-            a = np.asarray(vec, dtype=np.float64)
-            scores[rt.value] = _cosine(mean_n, _l2_normalize(a))
+        anchors = list(_RUBRIC_TYPE_ANCHORS.items())
+        try:
+            anchor_vecs = compute_submission_embeddings([a for _rt, a in anchors], cfg)
+        except Exception:
+            _log.debug("anchor embed failed", exc_info=True)
+            anchor_vecs = []
+        if anchor_vecs:
+            # Anchors of another dimension (embedding fallback) are left out, as before.
+            kept = [
+                (rt, vec)
+                for (rt, _anchor), (vec, _src) in zip(anchors, anchor_vecs)
+                if isinstance(vec, list) and len(vec) == len(mean)
+            ]
+            if kept:
+                sims = cosine_matrix(
+                    unit_rows([mean], dim=len(mean)),
+                    unit_rows([vec for _rt, vec in kept], dim=len(mean)),
+                )[0]
+                for (rt, _vec), sim in zip(kept, sims):
+                    scores[rt.value] = float(sim)
 
     if scores:
         best_rt = max(_RUBRIC_TYPE_ANCHORS, key=lambda r: scores.get(r.value, -1.0))
@@ -460,14 +458,6 @@ def apply_custom_rubric_plan_to_chunks(
     stem = _safe_filename_stem(envelope.assignment_id)
     path = out_dir / f"{stem}_multimodal_custom_rubric.json"
 
-    plan: dict[str, Any] | None = None
-    if path.is_file():
-        try:
-            plan = json.loads(path.read_text(encoding="utf-8"))
-        except (OSError, json.JSONDecodeError, TypeError) as exc:
-            _log.warning("custom_rubric: corrupt %s (%s); rebuilding", path, exc)
-            plan = None
-
     def _plan_stale(p: dict[str, Any] | None) -> bool:
         if not p:
             return True
@@ -478,11 +468,29 @@ def apply_custom_rubric_plan_to_chunks(
             return ["missing plan"]
         return validate_multimodal_custom_rubric(p)
 
-    errs_load = _plan_errors(plan)
-    if plan is not None and (_plan_stale(plan) or errs_load):
-        for e in errs_load:
-            _log.warning("custom_rubric: invalid or stale plan (%s)", e)
-        plan = None
+    def _load_valid_plan() -> dict[str, Any] | None:
+        if not path.is_file():
+            return None
+        try:
+            loaded = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError, TypeError) as exc:
+            _log.warning("custom_rubric: corrupt %s (%s); rebuilding", path, exc)
+            return None
+        errs_load = _plan_errors(loaded)
+        if _plan_stale(loaded) or errs_load:
+            for e in errs_load:
+                _log.warning("custom_rubric: invalid or stale plan (%s)", e)
+            return None
+        return loaded
+
+    # Same file for the whole cohort: parse + validate once per (path, size, mtime).
+    plan = cached_assignment_value(
+        cfg,
+        "custom_rubric_plan",
+        (str(path.resolve()), file_fingerprint(path), _SCHEMA_VERSION),
+        _load_valid_plan,
+        shared=True,
+    )
 
     if plan is None:
         built: dict[str, Any] | None = None
@@ -497,20 +505,20 @@ def apply_custom_rubric_plan_to_chunks(
         if built is not None and not _plan_errors(built):
             plan = built
         if plan is None:
-            rt, reason, scores = resolve_assignment_rubric_type(chunks, envelope, cfg)
-            template = list(rubric_rows_by_type.get(rt) or [])
+            resolved, reason, scores = resolve_assignment_rubric_type(chunks, envelope, cfg)
+            template = list(rubric_rows_by_type.get(resolved) or [])
             if not template:
                 _log.warning(
                     "custom_rubric: no template rows for resolved type %s; using FREE_RESPONSE",
-                    rt.value,
+                    resolved.value,
                 )
-                rt = RubricType.FREE_RESPONSE
-                template = list(rubric_rows_by_type.get(rt) or [])
+                resolved = RubricType.FREE_RESPONSE
+                template = list(rubric_rows_by_type.get(resolved) or [])
             if not template:
                 return None
             plan = _build_plan_payload(
                 envelope.assignment_id,
-                rt,
+                resolved,
                 reason,
                 scores,
                 chunks,
@@ -0,0 +1,197 @@
+"""
+Cross-student reuse of aggregated chunk grades for identical normalized responses.
+
+Scaffolded notebooks produce many identical answers per question across a cohort (``import csv``,
+the same ``df.head()``). With ``MULTIMODAL_GRADE_REUSE`` on, the first submission to reach a given
+
+    (assignment, question_id, rubric rows, answer-key segment, normalized student response)
+
+is graded with the usual k samples; later ones get a copy of its :class:`ChunkGradeOutcome` with
+``stage_artifacts["grade_reuse"]`` naming the source chunk. The key also carries a *grader
+signature* (models, samples per model, system prompt, review thresholds, task description, full
+answer key and dataset context) so a configuration change never serves stale grades.
+
+Entries live in the assignment context cache
+(:mod:`app.grading.multimodal.assignment_context`): ``MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE=memory``
+reuses within one worker, ``disk`` / ``redis`` across workers; with the cache off, reuse stays
+disabled (and a warning is logged) because nothing could be stored. Opt out per assignment with
+``modality_hints["grade_reuse"] = False`` or by listing its id in
+``MULTIMODAL_GRADE_REUSE_DISABLED_ASSIGNMENTS``. Outcomes without a valid sample are never stored.
+"""
+
+from __future__ import annotations
+
+import copy
+import dataclasses
+import hashlib
+import json
+import logging
+import re
+from typing import Any
+
+from app.grading.llm_router import empty_token_usage
+
+from .assignment_context import assignment_context_cache_mode
+from .schemas import (
+    ChunkGradeOutcome,
+    CriterionScore,
+    GradingChunk,
+    ParsedChunkGrade,
+    ReviewStatus,
+    RubricType,
+    SampledChunkGrade,
+)
+
+_log = logging.getLogger(__name__)
+
+_INNER_WS = re.compile(r"[ \t]+")
+
+_warned_cache_off = False
+
+
+def grade_reuse_enabled(cfg: Any, hints: dict[str, Any], assignment_id: str) -> bool:
+    """
+    ``MULTIMODAL_GRADE_REUSE`` on, the assignment context cache on (reused grades live there) and
+    not opted out for this assignment.
+    """
+    global _warned_cache_off
+    if not bool(getattr(cfg, "MULTIMODAL_GRADE_REUSE", False)):
+        return False
+    if assignment_context_cache_mode(cfg) == "off":
+        if not _warned_cache_off:
+            _warned_cache_off = True
+            _log.warning(
+                "MULTIMODAL_GRADE_REUSE is on but MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE is off; "
+                "grade reuse disabled"
+            )
+        return False
+    if hints.get("grade_reuse") is False:
+        return False
+    raw = str(getattr(cfg, "MULTIMODAL_GRADE_REUSE_DISABLED_ASSIGNMENTS", "") or "")
+    disabled = {p.strip() for p in raw.split(",") if p.strip()}
+    return str(assignment_id) not in disabled
+
+
+def normalize_response_text(text: str) -> str:
+    """
+    Whitespace-insensitive form of a response: unified newlines, no trailing or blank lines, runs
+    of spaces / tabs after the indentation collapsed. Leading indentation is kept (it is syntax
+    in Python answers).
+    """
+    lines: list[str] = []
+    for line in str(text or "").replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        line = line.expandtabs(4).rstrip()
+        if not line:
+            continue
+        body = line.lstrip(" ")
+        lines.append(" " * (len(line) - len(body)) + _INNER_WS.sub(" ", body))
+    return "\n".join(lines)
+
+
+def _digest(value: Any) -> str:
+    raw = value if isinstance(value, str) else json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8", errors="replace")).hexdigest()
+
+
+def student_response_text(chunk: GradingChunk) -> str:
+    """Trio ``student_response`` when present, else the chunk text."""
+    trio = (chunk.evidence or {}).get("trio")
+    if isinstance(trio, dict) and str(trio.get("student_response") or "").strip():
+        return str(trio.get("student_response"))
+    return chunk.extracted_text or ""
+
+
+def _answer_key_segment(chunk: GradingChunk) -> str:
+    ev = chunk.evidence or {}
+    unit = ev.get("answer_key_unit")
+    if isinstance(unit, dict) and str(unit.get("snippet") or "").strip():
+        return str(unit.get("snippet"))
+    trio = ev.get("trio")
+    if isinstance(trio, dict):
+        return str(trio.get("answer_key_segment") or "")
+    return ""
+
+
+def grade_reuse_key_parts(chunk: GradingChunk, *, grader_signature: str) -> tuple[str, ...]:
+    """Cache key parts for ``chunk`` after rubric routing."""
+    return (
+        str(chunk.assignment_id),
+        str(chunk.question_id or ""),
+        chunk.rubric_type.value if chunk.rubric_type else "",
+        _digest(chunk.rubric_rows or []),
+        _digest(normalize_response_text(_answer_key_segment(chunk))),
+        _digest(normalize_response_text(student_response_text(chunk))),
+        grader_signature,
+    )
+
+
+def grader_signature(**parts: Any) -> str:
+    """Digest of everything outside the chunk that shapes its grade."""
+    return _digest(parts)
+
+
+def outcome_to_record(outcome: ChunkGradeOutcome) -> dict[str, Any]:
+    """JSON-serializable form of ``outcome`` (enums as values)."""
+    return json.loads(json.dumps(dataclasses.asdict(outcome), default=str))
+
+
+def _rubric_type(raw: Any) -> RubricType | str:
+    for r in RubricType:
+        if r.value == raw:
+            return r
+    return str(raw or "")
+
+
+def _parsed_from_record(d: dict[str, Any] | None) -> ParsedChunkGrade | None:
+    if not isinstance(d, dict):
+        return None
+    d = dict(d)
+    d["rubric_type"] = _rubric_type(d.get("rubric_type"))
+    d["criterion_scores"] = [CriterionScore(**c) for c in d.get("criterion_scores") or []]
+    return ParsedChunkGrade(**d)
+
+
+def outcome_from_record(record: dict[str, Any]) -> ChunkGradeOutcome:
+    """Inverse of :func:`outcome_to_record` (fresh objects; the record is not aliased)."""
+    d = copy.deepcopy(record)
+    d["samples"] = [
+        SampledChunkGrade(**{**s, "parsed": _parsed_from_record(s.get("parsed"))})
+        for s in d.get("samples") or []
+    ]
+    d["review_status"] = ReviewStatus(d.get("review_status") or ReviewStatus.AUTO_ACCEPTED.value)
+    return ChunkGradeOutcome(**d)
+
+
+def reused_outcome(
+    record: dict[str, Any],
+    chunk: GradingChunk,
+    *,
+    user_prompt: str,
+) -> ChunkGradeOutcome:
+    """Copy of a stored outcome re-labelled for ``chunk``, with provenance."""
+    outcome = outcome_from_record(record["outcome"])
+    source = dict(record.get("source") or {})
+    outcome.chunk_id = chunk.chunk_id
+    outcome.stage_artifacts["user_prompt"] = user_prompt
+    outcome.stage_artifacts["raw_sample_count"] = 0
+    outcome.stage_artifacts["token_usage"] = empty_token_usage()
+    outcome.stage_artifacts["grade_reuse"] = {"reused": True, **source}
+    return outcome
+
+
+def reuse_record(outcome: ChunkGradeOutcome, chunk: GradingChunk) -> dict[str, Any] | None:
+    """Stored form of a fresh outcome, or ``None`` when it should not be reused."""
+    trace = outcome.stage_artifacts.get("confidence_trace")
+    if not isinstance(trace, dict) or int(trace.get("n_valid_samples") or 0) <= 0:
+        return None
+    stored = outcome_to_record(outcome)
+    # The prompt quotes the source student's chunk; reused copies get their own.
+    stored["stage_artifacts"].pop("user_prompt", None)
+    stored["stage_artifacts"].pop("grade_reuse", None)
+    return {
+        "outcome": stored,
+        "source": {
+            "source_chunk_id": chunk.chunk_id,
+            "source_student_id": str(chunk.student_id),
+        },
+    }
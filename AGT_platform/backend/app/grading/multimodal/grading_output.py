@@ -440,4 +440,7 @@ def multimodal_assignment_to_grading_dict(
     aw = (result.stage_artifacts or {}).get("agentic_workflow")
     if isinstance(aw, list) and aw:
         out["_agentic_workflow"] = aw
+    usage = (result.stage_artifacts or {}).get("token_usage")
+    if isinstance(usage, dict):
+        out["_token_usage"] = dict(usage)
     return out
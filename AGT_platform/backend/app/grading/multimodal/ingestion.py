@@ -10,6 +10,8 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Any
 
+from .parsed_artifacts import ParsedArtifactBundle
+
 
 @dataclass
 class IngestionEnvelope:
@@ -22,6 +24,16 @@ class IngestionEnvelope:
     extracted_plaintext: str = ""
     modality_hints: dict[str, Any] = field(default_factory=dict)
     """May include ``answer_key_plaintext`` (str): sample solution text passed to chunk graders."""
+    _parsed: ParsedArtifactBundle | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @property
+    def parsed(self) -> ParsedArtifactBundle:
+        """Parse-once views of :attr:`artifacts` (PDF pages, notebook JSON, plaintext)."""
+        if self._parsed is None:
+            self._parsed = ParsedArtifactBundle(self.artifacts)
+        return self._parsed
 
 
 def ingest_raw_submission(
@@ -31,12 +43,19 @@ def ingest_raw_submission(
     artifacts: dict[str, Any],
     extracted_plaintext: str = "",
     modality_hints: dict[str, Any] | None = None,
+    parsed: ParsedArtifactBundle | None = None,
 ) -> IngestionEnvelope:
-    """Build an envelope; callers run PDF/notebook extractors before this if needed."""
-    return IngestionEnvelope(
+    """
+    Build an envelope; callers run PDF/notebook extractors before this if needed. Pass the
+    ``parsed`` bundle those extractors used so the envelope reuses its views.
+    """
+    envelope = IngestionEnvelope(
         assignment_id=assignment_id,
         student_id=student_id,
         artifacts=dict(artifacts),
         extracted_plaintext=extracted_plaintext,
         modality_hints=dict(modality_hints or {}),
     )
+    if parsed is not None:
+        envelope._parsed = parsed.for_artifacts(envelope.artifacts)
+    return envelope
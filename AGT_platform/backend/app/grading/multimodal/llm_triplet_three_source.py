@@ -35,11 +35,14 @@ from typing import Any
 
 from app.config import Config
 from app.grading.artifact_plaintext import (
-    artifacts_to_concatenated_plain,
     bytes_with_suffix_to_plain,
     infer_modality_from_artifact_keys,
 )
-from app.grading.llm_router import OpenAIJsonClient, anthropic_multimodal_structure_client
+from app.grading.llm_router import (
+    OpenAIJsonClient,
+    anthropic_multimodal_structure_client,
+    maybe_cache_chat_client,
+)
 
 from .chunker import modality_from_hints, task_type_from_hints
 from .ingestion import IngestionEnvelope
@@ -165,14 +168,8 @@ def _blank_template_plaintext(hints: dict[str, Any]) -> tuple[str, str]:
 
 
 def _student_submission_plaintext(envelope: IngestionEnvelope) -> str:
-    arts = envelope.artifacts or {}
-    if isinstance(arts, dict):
-        blob = artifacts_to_concatenated_plain(
-            {k: v for k, v in arts.items() if isinstance(v, (bytes, bytearray))}
-        )
-        if blob.strip():
-            return blob.strip()
-    return (envelope.extracted_plaintext or "").strip()
+    blob = envelope.parsed.concatenated_plaintext().strip()
+    return blob or (envelope.extracted_plaintext or "").strip()
 
 
 def _modality_for_triplet_chunks(
@@ -259,8 +256,8 @@ def try_build_llm_triplet_three_source_chunks(
         chat_model = (
             getattr(cfg, "OPENAI_TRIO_RAG_CHAT_MODEL", None) or ""
         ).strip() or "gpt-5.4-nano"
-        client = OpenAIJsonClient(oa_key, chat_model)
         model_label = f"openai:{chat_model}"
+        client = maybe_cache_chat_client(OpenAIJsonClient(oa_key, chat_model), model_label, cfg)
         use_openai_usage = True
     elif anth is not None:
         client, model_label = anth
@@ -5,26 +5,78 @@ Protocol for k samples per chunk.
 (OpenAI-only for per-chunk grading) and draws
 ``MULTIMODAL_SAMPLES_PER_MODEL`` stochastic samples **per client** at
 ``GRADING_SAMPLE_TEMPERATURE``.
+
+When ``MULTIMODAL_SAMPLE_CONCURRENCY`` is greater than 1, samples run on a bounded thread
+pool (at most that many in-flight calls per model). ``sample_index`` is assigned before
+dispatch, so the returned list is ordered exactly as in serial mode.
+
+``MULTIMODAL_LLM_MAX_IN_FLIGHT`` (when > 0) caps concurrent calls across **every** runner in the
+process with that setting — sample pools, parallel chunk workers in
+:class:`MultimodalGradingPipeline` and the submissions of a cohort share one semaphore.
+
+``run_chunk_samples(..., should_stop=...)`` draws samples in waves and lets the caller end a
+chunk once the outcome is settled (adaptive sampling; see
+:func:`app.grading.multimodal.semantic_confidence.adaptive_sampling_can_stop`).
+
+With ``MULTIMODAL_OPENAI_MULTI_CHOICE`` on (default), OpenAI clients draw a model's samples for a
+wave with **one** ``n``-choice request, so the long grading prompt is billed once instead of k
+times. Models that reject ``n > 1`` (and failed or short responses) fall back to single calls.
+
+``run_chunk_samples(..., model_index=...)`` samples a single client, one tier of the grading
+cascade (:mod:`app.grading.multimodal.cascade`).
+
+Clients exposing ``chat_json_with_usage`` / ``chat_json_choices_with_usage`` are called through
+those, and the reported token usage (including ``cached_prompt_tokens``) is kept on
+:attr:`SampledChunkGrade.usage` for per-submission accounting.
 """
 
 from __future__ import annotations
 
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Callable, Protocol
 
 from app.config import Config
-from app.grading.llm_router import ChatClient, build_multimodal_grading_clients
+from app.grading.cache_support import CacheRegistry, in_run_context
+from app.grading.llm_router import (
+    CachedChatClient,
+    ChatClient,
+    MultiChoiceUnsupportedError,
+    build_multimodal_grading_clients,
+    client_supports_multi_choice,
+)
 
 from .schemas import GradingChunk, SampledChunkGrade
 
 _log = logging.getLogger(__name__)
 
 ClientBuilder = Callable[[Config], list[tuple[ChatClient, str]]]
+StopCheck = Callable[[list[SampledChunkGrade]], bool]
+
+
+def _chat_json_with_usage(
+    client: ChatClient, messages: list[dict], kwargs: dict[str, Any]
+) -> tuple[Any, dict[str, int]]:
+    fn = getattr(client, "chat_json_with_usage", None)
+    if callable(fn):
+        return fn(messages, **kwargs)
+    return client.chat_json(messages, **kwargs), {}
+
+
+def _chat_json_choices_with_usage(
+    client: ChatClient, messages: list[dict], kwargs: dict[str, Any]
+) -> tuple[list[dict[str, Any] | None], dict[str, int]]:
+    fn = getattr(client, "chat_json_choices_with_usage", None)
+    if callable(fn):
+        objs, usage = fn(messages, **kwargs)
+        return list(objs), usage
+    return list(client.chat_json_choices(messages, **kwargs)), {}  # type: ignore[attr-defined]
 
 
 class ChunkModelRunner(Protocol):
-    """k samples per chunk; returns raw model outputs for parsing + entropy."""
+    """k samples per chunk (or a single one); returns raw model outputs for parsing + entropy."""
 
     def run_chunk_samples(
         self,
@@ -32,8 +84,30 @@ class ChunkModelRunner(Protocol):
         *,
         system_prompt: str,
         user_prompt: str,
+        should_stop: StopCheck | None = None,
     ) -> list[SampledChunkGrade]: ...
 
+    def run_single_sample(
+        self,
+        chunk: GradingChunk,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> list[SampledChunkGrade]:
+        """One sample (cohort confirmation); ``[]`` when no model is available."""
+        ...
+
+
+# ``MULTIMODAL_LLM_MAX_IN_FLIGHT`` → process-wide semaphore; forked children start without any.
+_call_budgets: CacheRegistry[threading.BoundedSemaphore] = CacheRegistry()
+
+
+def _shared_call_budget(limit: int) -> threading.BoundedSemaphore | None:
+    """The semaphore shared by every runner configured with ``limit`` (``None`` when off)."""
+    if limit <= 0:
+        return None
+    return _call_budgets.get((limit,), lambda: threading.BoundedSemaphore(limit))
+
 
 class MultiModelChunkRunner:
     """
@@ -54,27 +128,188 @@ class MultiModelChunkRunner:
         self._build_clients: ClientBuilder = (
             build_clients or build_multimodal_grading_clients
         )
+        try:
+            budget = int(getattr(cfg, "MULTIMODAL_LLM_MAX_IN_FLIGHT", 0) or 0)
+        except (TypeError, ValueError):
+            budget = 0
+        self._call_budget = _shared_call_budget(budget)
+        self._clients: list[tuple[ChatClient, str]] | None = None
+        self._clients_lock = threading.Lock()
 
     @property
     def app_config(self) -> Config:
         return self._cfg
 
+    def grading_clients(self) -> list[tuple[ChatClient, str]]:
+        """Clients built once per runner (SDK HTTP pools are shared process-wide underneath)."""
+        if self._clients is None:
+            with self._clients_lock:
+                if self._clients is None:
+                    self._clients = list(self._build_clients(self._cfg))
+        return self._clients
+
+    def _sample_concurrency(self) -> int:
+        try:
+            n = int(getattr(self._cfg, "MULTIMODAL_SAMPLE_CONCURRENCY", 1) or 1)
+        except (TypeError, ValueError):
+            n = 1
+        return max(1, min(n, 16))
+
+    def _draw_sample(
+        self,
+        client: ChatClient,
+        model_label: str,
+        chunk: GradingChunk,
+        messages: list[dict],
+        *,
+        temperature: float,
+        rep: int,
+        k: int,
+    ) -> tuple[str, dict[str, int]]:
+        """
+        One ``chat_json`` call → ``(raw JSON text, token usage)``; ``("", {})`` on failure
+        (logged).
+        """
+        kwargs: dict[str, Any] = {"temperature": temperature}
+        if isinstance(client, CachedChatClient):
+            kwargs["sample_slot"] = rep
+        try:
+            if self._call_budget is None:
+                obj, usage = _chat_json_with_usage(client, messages, kwargs)
+            else:
+                with self._call_budget:
+                    obj, usage = _chat_json_with_usage(client, messages, kwargs)
+            return json.dumps(obj, ensure_ascii=True, default=str), usage
+        except Exception as e:
+            _log.warning(
+                "grading_llm_sample_failed (not chunking): chunk_id=%s model=%s "
+                "rep=%s/%s: %s: %s",
+                chunk.chunk_id,
+                model_label,
+                rep + 1,
+                k,
+                type(e).__name__,
+                e,
+                exc_info=_log.isEnabledFor(logging.DEBUG),
+            )
+            return "", {}
+
+    def _multi_choice_enabled(self) -> bool:
+        return bool(getattr(self._cfg, "MULTIMODAL_OPENAI_MULTI_CHOICE", True))
+
+    def _draw_choices(
+        self,
+        client: ChatClient,
+        model_label: str,
+        chunk: GradingChunk,
+        messages: list[dict],
+        *,
+        temperature: float,
+        reps: list[int],
+        k: int,
+    ) -> list[tuple[str, dict[str, int]]]:
+        """
+        One multi-choice request for ``reps`` → ``(raw JSON text, usage)`` in rep order; the
+        request's usage goes to the first returned choice.
+
+        Choices the provider did not return (or a rejected/failed request) are drawn with
+        single :meth:`_draw_sample` calls, so the slot count always matches ``reps``.
+        """
+        kwargs: dict[str, Any] = {"n": len(reps), "temperature": temperature}
+        if isinstance(client, CachedChatClient):
+            kwargs["first_slot"] = reps[0]
+        objs: list[dict[str, Any] | None] = []
+        usage: dict[str, int] = {}
+        try:
+            if self._call_budget is None:
+                objs, usage = _chat_json_choices_with_usage(client, messages, kwargs)
+            else:
+                with self._call_budget:
+                    objs, usage = _chat_json_choices_with_usage(client, messages, kwargs)
+        except MultiChoiceUnsupportedError as e:
+            _log.info(
+                "grading_llm_multi_choice_unsupported: model=%s; using single calls (%s)",
+                model_label,
+                e,
+            )
+        except Exception as e:
+            _log.warning(
+                "grading_llm_multi_choice_failed: chunk_id=%s model=%s n=%s: %s: %s; "
+                "retrying as single calls",
+                chunk.chunk_id,
+                model_label,
+                len(reps),
+                type(e).__name__,
+                e,
+                exc_info=_log.isEnabledFor(logging.DEBUG),
+            )
+        texts: list[tuple[str, dict[str, int]]] = []
+        for rep, obj in zip(reps, objs):
+            obj_usage, usage = usage, {}
+            if obj is None:
+                _log.warning(
+                    "grading_llm_sample_failed (not chunking): chunk_id=%s model=%s "
+                    "rep=%s/%s: choice was not valid JSON",
+                    chunk.chunk_id,
+                    model_label,
+                    rep + 1,
+                    k,
+                )
+                texts.append(("", obj_usage))
+            else:
+                texts.append((json.dumps(obj, ensure_ascii=True, default=str), obj_usage))
+        for rep in reps[len(texts) :]:
+            texts.append(
+                self._draw_sample(
+                    client, model_label, chunk, messages, temperature=temperature, rep=rep, k=k
+                )
+            )
+        return texts
+
+    def _adaptive_wave_size(self) -> int:
+        try:
+            n = int(getattr(self._cfg, "MULTIMODAL_ADAPTIVE_WAVE_SIZE", 2) or 2)
+        except (TypeError, ValueError):
+            n = 2
+        return max(1, n)
+
     def run_chunk_samples(
         self,
         chunk: GradingChunk,
         *,
         system_prompt: str,
         user_prompt: str,
+        should_stop: StopCheck | None = None,
+        model_index: int | None = None,
     ) -> list[SampledChunkGrade]:
-        clients = self._build_clients(self._cfg)
+        """
+        Draw up to ``k`` samples per client.
+
+        With ``should_stop``, reps are drawn in waves of ``MULTIMODAL_ADAPTIVE_WAVE_SIZE`` per
+        client; after each wave the callback sees every sample so far (``sample_index`` order)
+        and may end the chunk early. Without it, all ``k`` reps form a single wave.
+
+        ``model_index`` samples only that client (one cascade tier); ``sample_index`` values stay
+        those of a full run, so tiers drawn separately never collide.
+        """
+        all_clients = self.grading_clients()
+        positions = list(range(len(all_clients)))
+        if model_index is not None:
+            positions = [model_index] if model_index in positions else []
+        clients = [all_clients[pos] for pos in positions]
         k = max(1, int(getattr(self._cfg, "MULTIMODAL_SAMPLES_PER_MODEL", 5)))
         temp = float(getattr(self._cfg, "GRADING_SAMPLE_TEMPERATURE", 0.3))
+        conc = min(self._sample_concurrency(), k)
+        wave = self._adaptive_wave_size() if should_stop is not None else k
 
         _log.debug(
-            "Multimodal grading: %d model(s), %d sample(s) each → %d total calls/chunk",
+            "Multimodal grading: %d model(s), %d sample(s) each → %d total calls/chunk "
+            "(concurrency %d/model, wave %d)",
             len(clients),
             k,
             len(clients) * k,
+            conc,
+            wave,
         )
 
         messages = [
@@ -83,34 +318,119 @@ class MultiModelChunkRunner:
         ]
 
         out: list[SampledChunkGrade] = []
-        idx = 0
-        for client, model_label in clients:
-            for _rep in range(k):
-                raw_text = ""
-                try:
-                    obj = client.chat_json(messages, temperature=temp)
-                    raw_text = json.dumps(obj, ensure_ascii=True, default=str)
-                except Exception as e:
-                    _log.warning(
-                        "grading_llm_sample_failed (not chunking): chunk_id=%s model=%s "
-                        "rep=%s/%s: %s: %s",
+        multi = self._multi_choice_enabled()
+        # One pool per model bounds in-flight calls per model; all models run side by side.
+        pools = (
+            [
+                ThreadPoolExecutor(max_workers=conc, thread_name_prefix="mm-sample")
+                for _ in clients
+            ]
+            if conc > 1
+            else []
+        )
+        try:
+            for lo in range(0, k, wave):
+                reps = list(range(lo, min(lo + wave, k)))
+                # Each unit is one model's reps that share a request: all of them when the
+                # client can return several choices at once, otherwise one rep per unit.
+                units: list[tuple[int, list[int]]] = []
+                for pos, (client, _label) in enumerate(clients):
+                    if multi and len(reps) > 1 and client_supports_multi_choice(client):
+                        units.append((pos, reps))
+                    else:
+                        units.extend((pos, [rep]) for rep in reps)
+
+                def draw(unit: tuple[int, list[int]]) -> list[tuple[str, dict[str, int]]]:
+                    pos, unit_reps = unit
+                    client, model_label = clients[pos]
+                    if len(unit_reps) > 1:
+                        return self._draw_choices(
+                            client,
+                            model_label,
+                            chunk,
+                            messages,
+                            temperature=temp,
+                            reps=unit_reps,
+                            k=k,
+                        )
+                    return [
+                        self._draw_sample(
+                            client,
+                            model_label,
+                            chunk,
+                            messages,
+                            temperature=temp,
+                            rep=unit_reps[0],
+                            k=k,
+                        )
+                    ]
+
+                if not pools:
+                    unit_texts = [draw(u) for u in units]
+                else:
+                    futures = [pools[u[0]].submit(in_run_context(draw), u) for u in units]
+                    unit_texts = [f.result() for f in futures]
+                for (pos, unit_reps), texts in zip(units, unit_texts):
+                    model_label = clients[pos][1]
+                    for rep, (raw_text, usage) in zip(unit_reps, texts):
+                        out.append(
+                            SampledChunkGrade(
+                                model_id=model_label,
+                                sample_index=positions[pos] * k + rep,
+                                raw_text=raw_text,
+                                parsed=None,
+                                parse_ok=False,
+                                parse_warnings=[],
+                                usage=usage,
+                            )
+                        )
+                out.sort(key=lambda s: s.sample_index)
+                if should_stop is not None and lo + wave < k and should_stop(out):
+                    _log.debug(
+                        "adaptive_sampling_stop: chunk_id=%s after %d/%d sample(s)",
                         chunk.chunk_id,
-                        model_label,
-                        _rep + 1,
-                        k,
-                        type(e).__name__,
-                        e,
-                        exc_info=_log.isEnabledFor(logging.DEBUG),
-                    )
-                out.append(
-                    SampledChunkGrade(
-                        model_id=model_label,
-                        sample_index=idx,
-                        raw_text=raw_text,
-                        parsed=None,
-                        parse_ok=False,
-                        parse_warnings=[],
+                        len(out),
+                        len(clients) * k,
                     )
-                )
-                idx += 1
+                    break
+        finally:
+            for pool in pools:
+                pool.shutdown(wait=True)
         return out
+
+    def run_single_sample(
+        self,
+        chunk: GradingChunk,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> list[SampledChunkGrade]:
+        """One sample from the primary client (cohort confirmation); ``[]`` without clients."""
+        clients = self.grading_clients()
+        if not clients:
+            return []
+        client, model_label = clients[0]
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+        raw_text, usage = self._draw_sample(
+            client,
+            model_label,
+            chunk,
+            messages,
+            temperature=float(getattr(self._cfg, "GRADING_SAMPLE_TEMPERATURE", 0.3)),
+            rep=0,
+            k=1,
+        )
+        return [
+            SampledChunkGrade(
+                model_id=model_label,
+                sample_index=0,
+                raw_text=raw_text,
+                parsed=None,
+                parse_ok=False,
+                parse_warnings=[],
+                usage=usage,
+            )
+        ]
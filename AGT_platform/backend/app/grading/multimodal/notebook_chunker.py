@@ -17,11 +17,11 @@ module parses the raw notebook JSON to produce accurate ``GradingChunk`` objects
 
 from __future__ import annotations
 
-import json
 import logging
 import re
 from typing import Any
 
+from .parsed_artifacts import load_notebook_json
 from .schemas import GradingChunk, Modality, TaskType
 
 _log = logging.getLogger(__name__)
@@ -143,9 +143,8 @@ def ipynb_to_plaintext_for_structure_llm(ipynb_bytes: bytes) -> str:
 
     Preserves cell order and cell type so the model can infer distinct questions.
     """
-    try:
-        nb = json.loads(ipynb_bytes.decode("utf-8", errors="replace"))
-    except (json.JSONDecodeError, UnicodeDecodeError):
+    nb = load_notebook_json(ipynb_bytes)
+    if nb is None:
         return ""
     parts: list[str] = []
     for i, cell in enumerate(nb.get("cells") or []):
@@ -521,10 +520,11 @@ def split_code_cell_at_scaffold_for_student_tail(src: str) -> tuple[str, str]:
     return pref, rest
 
 
-def _notebook_cells_list(ipynb_bytes: bytes) -> list[dict[str, Any]]:
-    try:
-        nb = json.loads(ipynb_bytes.decode("utf-8", errors="replace"))
-    except (json.JSONDecodeError, UnicodeDecodeError):
+def _notebook_cells_list(
+    ipynb_bytes: bytes, notebook: dict[str, Any] | None = None
+) -> list[dict[str, Any]]:
+    nb = notebook if notebook is not None else load_notebook_json(ipynb_bytes)
+    if nb is None:
         return []
     cells = nb.get("cells")
     return cells if isinstance(cells, list) else []
@@ -597,6 +597,7 @@ def try_build_notebook_scaffold_aligned_chunks(
     modality: Modality = Modality.NOTEBOOK,
     task_type: TaskType = TaskType.UNKNOWN,
     max_grading_units: int | None = None,
+    student_notebook: dict[str, Any] | None = None,
 ) -> list[GradingChunk] | None:
     """
     One chunk per **scaffold code cell** shared ordinal between blank and student notebooks.
@@ -604,9 +605,10 @@ def try_build_notebook_scaffold_aligned_chunks(
     Question / instructions come from the blank segment up to and including the scaffold
     prefix; ``student_response`` is the scaffold tail plus following cells until the next
     scaffold anchor. Returns ``None`` when anchors are missing or counts disagree.
+    ``student_notebook`` is the already-parsed student JSON (``envelope.parsed.notebook()``).
     """
     blank_cells = _notebook_cells_list(blank_ipynb_bytes)
-    student_cells = _notebook_cells_list(student_ipynb_bytes)
+    student_cells = _notebook_cells_list(student_ipynb_bytes, student_notebook)
     if not blank_cells or not student_cells:
         return None
     b_idx = scaffold_anchor_code_cell_indices(blank_cells)
@@ -771,17 +773,18 @@ def build_notebook_qa_chunks(
     modality: Modality = Modality.NOTEBOOK,
     task_type: TaskType = TaskType.UNKNOWN,
     max_grading_units: int | None = None,
+    notebook: dict[str, Any] | None = None,
 ) -> list[GradingChunk]:
     """
     Parse an ipynb file and return one :class:`GradingChunk` per detected
     question/answer pair, preserving cell order.
 
     Falls back to a single whole-notebook chunk when no question structure is
-    detected (project-style notebooks with only code).
+    detected (project-style notebooks with only code). Pass ``notebook`` (the
+    already-parsed JSON, e.g. ``envelope.parsed.notebook()``) to skip parsing.
     """
-    try:
-        nb = json.loads(ipynb_bytes.decode("utf-8", errors="replace"))
-    except (json.JSONDecodeError, UnicodeDecodeError):
+    nb = notebook if notebook is not None else load_notebook_json(ipynb_bytes)
+    if nb is None:
         _log.warning("notebook_chunker: could not parse ipynb JSON")
         return []
 
@@ -941,9 +944,8 @@ def build_notebook_question_boundary_chunks(
     Used to chunk a **blank** instructor template: boundaries follow headings so
     :mod:`template_aligned_notebook_chunks` can align student work by ``question_id``.
     """
-    try:
-        nb = json.loads(ipynb_bytes.decode("utf-8", errors="replace"))
-    except (json.JSONDecodeError, UnicodeDecodeError):
+    nb = load_notebook_json(ipynb_bytes)
+    if nb is None:
         _log.warning("notebook_chunker: could not parse ipynb JSON (boundary mode)")
         return []
 
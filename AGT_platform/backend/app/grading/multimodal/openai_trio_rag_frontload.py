@@ -23,7 +23,12 @@ import re
 from typing import Any
 
 from app.config import Config
-from app.grading.llm_router import OpenAIJsonClient
+from app.grading.embedding_vector import compact_embedding
+from app.grading.llm_router import (
+    OpenAIJsonClient,
+    maybe_cache_chat_client,
+    shared_openai_sdk_client,
+)
 from app.grading.submission_chunks import reflow_pdf_sections_in_plaintext
 
 from .chunker import modality_from_hints, task_type_from_hints
@@ -191,13 +196,9 @@ def estimate_openai_trio_rag_cost_usd(
     }
 
 
-def _ipynb_bytes_to_plain(nb: bytes) -> str:
-    try:
-        obj = json.loads(nb.decode("utf-8", errors="replace"))
-    except Exception:
-        return ""
+def _notebook_cells_to_plain(cells: list[dict[str, Any]]) -> str:
     parts: list[str] = []
-    for cell in obj.get("cells") or []:
+    for cell in cells:
         src = cell.get("source")
         if isinstance(src, list):
             src = "".join(str(x) for x in src)
@@ -210,9 +211,7 @@ def _ipynb_bytes_to_plain(nb: bytes) -> str:
 def _submission_plain_for_frontload(envelope: IngestionEnvelope, max_chars: int) -> str:
     plain = (envelope.extracted_plaintext or "").strip()
     if not plain:
-        raw = (envelope.artifacts or {}).get("ipynb")
-        if isinstance(raw, (bytes, bytearray)):
-            plain = _ipynb_bytes_to_plain(bytes(raw))
+        plain = _notebook_cells_to_plain(envelope.parsed.notebook_cells())
     if not plain:
         return ""
     flowed = reflow_pdf_sections_in_plaintext(plain)
@@ -234,8 +233,6 @@ def _openai_embed_batch(
     max_chars_per_input: int = 8000,
 ) -> tuple[list[list[float]], int]:
     """Return one vector per input slot (empty list for empty strings) + total_tokens."""
-    from openai import OpenAI
-
     n = len(texts)
     cleaned: list[str] = []
     for t in texts:
@@ -246,7 +243,7 @@ def _openai_embed_batch(
     if not need_idx:
         return [[] for _ in range(n)], 0
 
-    client = OpenAI(api_key=api_key)
+    client = shared_openai_sdk_client(api_key)
     out: list[list[float]] = [[] for _ in range(n)]
     total_tok = 0
     batch_size = 256
@@ -312,7 +309,9 @@ def run_openai_trio_rag_frontload(
     audit["trio_window_count"] = len(slices)
     audit["trio_answer_key_chars_in_prompt"] = len(ak_use)
 
-    client = OpenAIJsonClient(key, chat_model)
+    client = maybe_cache_chat_client(
+        OpenAIJsonClient(key, chat_model), f"openai:{chat_model}", cfg
+    )
     all_raw: list[dict[str, Any]] = []
     usage_chat: dict[str, int] = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
     pre_chat_in = 0
@@ -459,14 +458,14 @@ def run_openai_trio_rag_frontload(
                     "embedding": [],
                 }
                 continue
-            vec = list(vecs[idx]) if idx < len(vecs) else []
+            vec = compact_embedding(vecs[idx]) if idx < len(vecs) else []
             seg_rag[key] = {
                 "embedding_dimension": len(vec),
                 "embedding_source": f"openai:{embed_model}",
                 "embedding": vec,
             }
         c_idx = base + 3
-        vec2 = list(vecs[c_idx]) if c_idx < len(vecs) else []
+        vec2 = compact_embedding(vecs[c_idx]) if c_idx < len(vecs) else []
         ev = dict(ch.evidence or {})
         ev["trio_segment_rag"] = seg_rag
         ev["rag_embedding_bundle"] = {
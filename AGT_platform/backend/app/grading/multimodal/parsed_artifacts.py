@@ -0,0 +1,155 @@
+"""
+Parse-once views of one submission's artifact bytes.
+
+Chunkers, extractors and frontloads all need the same derived text: per-artifact plaintext,
+the concatenated submission view, PDF pages (pypdf is the slowest CPU step of a grading task),
+the reflowed text and the parsed notebook JSON. :class:`ParsedArtifactBundle` computes each view
+on first use and memoizes it; every :class:`~app.grading.multimodal.ingestion.IngestionEnvelope`
+exposes one as ``envelope.parsed``.
+
+A memoized view is tied to the exact bytes object it was computed from, so replacing an entry in
+``envelope.artifacts`` recomputes that artifact's views on next use.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from typing import Any, Callable, Mapping
+
+from app.grading.artifact_plaintext import (
+    artifacts_to_concatenated_plain,
+    pdf_text_block,
+    single_artifact_key_to_plain,
+)
+from app.grading.submission_chunks import reflow_pdf_sections_in_plaintext
+from app.grading.tools import (
+    PdfExtraction,
+    extract_pdf_document,
+    extract_pdf_pages,
+    pdf_pages_to_text,
+)
+
+
+def load_notebook_json(ipynb_bytes: bytes) -> dict[str, Any] | None:
+    """Raw ``.ipynb`` JSON object; ``None`` when the bytes are not a JSON object."""
+    try:
+        nb = json.loads(ipynb_bytes.decode("utf-8", errors="replace"))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return nb if isinstance(nb, dict) else None
+
+
+class ParsedArtifactBundle:
+    """
+    Lazily computed, memoized views of an artifact mapping (``{"pdf": b"...", ...}``).
+
+    Safe to share across chunk workers: each view is computed at most once per bytes object,
+    under a lock of its own, so a slow view (PDF pages) does not hold up the others.
+    Returned lists and dicts are shared; callers must not mutate them.
+    """
+
+    def __init__(self, artifacts: Mapping[str, Any] | None = None) -> None:
+        self._artifacts: Mapping[str, Any] = artifacts if artifacts is not None else {}
+        self._memo: dict[tuple[str, str], tuple[Any, Any]] = {}
+        self._view_locks: dict[tuple[str, str], threading.Lock] = {}
+        # Guards ``_memo`` and ``_view_locks`` only; never held while a view is computed.
+        self._lock = threading.Lock()
+
+    def for_artifacts(self, artifacts: Mapping[str, Any]) -> ParsedArtifactBundle:
+        """A bundle over ``artifacts`` that keeps views already computed for the same bytes."""
+        other = ParsedArtifactBundle(artifacts)
+        with self._lock:
+            other._memo = dict(self._memo)
+        return other
+
+    def byte_artifacts(self) -> dict[str, bytes]:
+        """Non-empty bytes artifacts (other values such as refs are dropped)."""
+        return {
+            str(k): bytes(v)
+            for k, v in self._artifacts.items()
+            if isinstance(v, (bytes, bytearray)) and v
+        }
+
+    def _view_lock(self, memo_key: tuple[str, str]) -> threading.Lock:
+        # Views only ever wait on views they are built from (concatenated → plaintext → PDF
+        # pages), so per-view locks cannot deadlock.
+        with self._lock:
+            return self._view_locks.setdefault(memo_key, threading.Lock())
+
+    def _cached(self, view: str, key: str, compute: Callable[[bytes], Any]) -> Any:
+        source = self._artifacts.get(key)
+        if not isinstance(source, (bytes, bytearray)) or not source:
+            return None
+        with self._view_lock((view, key)):
+            with self._lock:
+                hit = self._memo.get((view, key))
+            if hit is not None and hit[0] is source:
+                return hit[1]
+            value = compute(bytes(source))
+            with self._lock:
+                self._memo[(view, key)] = (source, value)
+            return value
+
+    def _cached_all(self, view: str, compute: Callable[[], Any]) -> Any:
+        # Tied to every artifact object, so replacing or adding any artifact recomputes.
+        sources = dict(self._artifacts)
+        with self._view_lock((view, "")):
+            with self._lock:
+                hit = self._memo.get((view, ""))
+            if (
+                hit is not None
+                and hit[0].keys() == sources.keys()
+                and all(hit[0][k] is v for k, v in sources.items())
+            ):
+                return hit[1]
+            value = compute()
+            with self._lock:
+                self._memo[(view, "")] = (sources, value)
+            return value
+
+    def pdf_pages(self, key: str = "pdf") -> list[str]:
+        """Per-page PDF text (:func:`app.grading.tools.extract_pdf_pages`); ``[]`` if absent."""
+        return self._cached("pdf_pages", key, extract_pdf_pages) or []
+
+    def pdf_document(self, key: str = "pdf") -> PdfExtraction | None:
+        """Pages with their offsets in the joined text, for citing pages; ``None`` if absent."""
+        return self._cached("pdf_document", key, extract_pdf_document)
+
+    def pdf_text(self, key: str = "pdf") -> str:
+        return pdf_pages_to_text(self.pdf_pages(key))
+
+    def artifact_plaintext(self, key: str) -> str:
+        """One artifact's text block, as :func:`single_artifact_key_to_plain` renders it."""
+        if key == "pdf":
+            block = self._cached("plaintext", key, lambda _raw: pdf_text_block(self.pdf_text()))
+        else:
+            block = self._cached(
+                "plaintext", key, lambda raw: single_artifact_key_to_plain(key, raw)
+            )
+        return block or ""
+
+    def concatenated_plaintext(self) -> str:
+        """Every artifact in stable key order (:func:`artifacts_to_concatenated_plain`)."""
+        return self._cached_all(
+            "concatenated",
+            lambda: artifacts_to_concatenated_plain(
+                self.byte_artifacts(),
+                block_for_key=lambda key, _raw: self.artifact_plaintext(key),
+            ),
+        )
+
+    def reflowed_plaintext(self) -> str:
+        """:meth:`concatenated_plaintext` with PDF sections reflowed for line-based chunkers."""
+        return self._cached_all(
+            "reflowed", lambda: reflow_pdf_sections_in_plaintext(self.concatenated_plaintext())
+        )
+
+    def notebook(self, key: str = "ipynb") -> dict[str, Any] | None:
+        """Parsed ``.ipynb`` JSON (:func:`load_notebook_json`)."""
+        return self._cached("notebook", key, load_notebook_json)
+
+    def notebook_cells(self, key: str = "ipynb") -> list[dict[str, Any]]:
+        nb = self.notebook(key) or {}
+        cells = nb.get("cells")
+        return cells if isinstance(cells, list) else []
@@ -42,9 +42,10 @@ OpenAI trio+RAG frontload is skipped when blank-template chunking is active **or
 ``MULTIMODAL_LLM_TRIPLET_THREE_SOURCE`` is on with resolved blank + answer key so
 :mod:`llm_triplet_three_source` can own trios (single structured LLM call over blank + student + key).
 
-**Chunk cache:** set ``modality_hints["multimodal_chunk_cache_path"]`` to a JSON file produced
-by :func:`app.grading.multimodal.chunk_cache.save_grading_chunks_cache` to skip rebuilding
-chunks and (when embeddings are present in the file) skip per-unit embedding calls.
+**Chunk cache:** set ``modality_hints["multimodal_chunk_cache_path"]`` to a file produced
+by :func:`app.grading.multimodal.chunk_cache.save_grading_chunks_cache` (``.json``, or the
+memory-mapped binary format for any other suffix) to skip rebuilding chunks and (when
+embeddings are present in the file) skip per-unit embedding calls.
 
 **Trio export:** after chunking, the pipeline writes ``{assignment_id}_trio_chunks.json`` under
 ``modality_hints["rag_embedding_output_dir"]`` or the repository ``RAG_embedding/`` folder
@@ -65,6 +66,66 @@ before answer-key alignment and grading.
 **Agentic trace:** ordered phases are stored on the result as
 ``stage_artifacts["agentic_workflow"]`` and copied into grading JSON as ``_agentic_workflow``.
 
+**Parallel chunk grading:** ``MULTIMODAL_CHUNK_GRADING_WORKERS`` > 1 grades chunks on a
+thread pool (routing → prompt → samples → parse → per-chunk aggregate). Outcomes and
+``PipelineArtifactStore`` rows are collected and appended in original chunk order, so the result
+matches serial mode. Bound total provider load with ``MULTIMODAL_LLM_MAX_IN_FLIGHT``.
+
+**LLM response cache:** with ``LLM_RESPONSE_CACHE`` enabled, grading and structure clients are
+wrapped by :class:`~app.grading.llm_router.CachedChatClient`; hit/miss counts for the run are
+recorded in the ``llm_response_cache`` workflow phase. ``RAG_EMBED_CACHE`` hit counts are recorded
+the same way in the ``embedding_cache`` phase.
+
+**Assignment context cache:** with ``MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE`` enabled, the resolved
+answer key / blank template, the answer-key audit embedding, the parsed blank notebook and the
+validated ``custom_rubric`` plan are reused across the cohort
+(:mod:`app.grading.multimodal.assignment_context`); counts land in the
+``assignment_context_cache`` phase.
+
+**Grade reuse:** with ``MULTIMODAL_GRADE_REUSE`` on (and the assignment context cache enabled),
+a chunk whose normalized student response, rubric rows and answer-key segment match an earlier
+submission's reuses that aggregated outcome instead of sampling
+(:mod:`app.grading.multimodal.grade_reuse`); ``stage_artifacts["grade_reuse"]`` records the source.
+
+**Cohort mode:** :meth:`MultimodalGradingPipeline.run` is :meth:`~MultimodalGradingPipeline.prepare`
+(everything up to grading) followed by :meth:`~MultimodalGradingPipeline.grade_prepared`.
+:func:`app.grading.multimodal.cohort.grade_cohort` prepares a whole batch first, clusters
+near-duplicate responses per question and passes the plan to ``grade_prepared``; representatives
+are fully sampled, close members confirmed with one sample (``stage_artifacts["cohort"]``).
+
+**Rule-based fast path:** with ``MULTIMODAL_RULE_GRADER`` on (default), scaffolded code that is
+the same executable line sequence as its aligned answer-key segment gets full credit, and an empty
+response (after placeholder stripping) gets zero, without any LLM call
+(:mod:`app.grading.multimodal.rule_grader`); see the ``rule_grading`` workflow phase.
+
+**Chunk packing:** with ``MULTIMODAL_CHUNK_PACKING`` on, small chunks that share a rubric are
+graded several per request and split back into per-chunk samples; chunks whose batch result does
+not parse are re-graded singly (:mod:`app.grading.multimodal.chunk_packing`, ``chunk_packing``
+workflow phase).
+
+**Answer-key trimming:** with ``MULTIMODAL_ANSWER_KEY_TOKEN_BUDGET`` > 0, a chunk aligned to an
+answer-key section is prompted with that section plus its most similar neighbours instead of the
+whole key (:func:`~app.grading.multimodal.answer_key_chunk_enrich.assemble_answer_key_context`);
+``stage_artifacts["answer_key_context"]`` lists the sections and the tokens saved. Sections come
+from the full answer key, not the ``MULTIMODAL_ANSWER_KEY_PROMPT_MAX_CHARS`` prefix.
+
+**Prompt caching:** chunk prompts put assignment-constant content first (see
+:func:`~app.grading.multimodal.prompts_chunk.build_chunk_grading_prompt`) so provider prompt
+caches can reuse the prefix across chunks and submissions. Per-sample token usage, including
+``cached_prompt_tokens``, is summed into ``stage_artifacts["token_usage"]`` per chunk and per
+submission (``token_usage`` workflow phase; ``token_usage`` in grading reports).
+
+**Adaptive sampling:** with ``MULTIMODAL_ADAPTIVE_SAMPLING`` on, samples are drawn in waves and a
+chunk stops once ``MULTIMODAL_ADAPTIVE_STOP_RULE`` says the remaining budget cannot change its
+outcome; each outcome then carries ``stage_artifacts["adaptive_sampling"]``.
+
+**Grading cascade:** with ``MULTIMODAL_GRADING_CASCADE`` on, a chunk is sampled by the
+cheapest grading model first and ``GRADING_MODEL_2`` / ``GRADING_MODEL_3`` run only while its
+``ai_confidence`` is below ``MULTIMODAL_CASCADE_CONFIDENCE_MIN`` or too many samples fail to
+parse (:mod:`app.grading.multimodal.cascade`). ``stage_artifacts["cascade"]`` and the
+``cascade`` workflow phase report per-tier calls, latency, tokens and estimated cost. Adaptive
+sampling does not apply to cascaded chunks.
+
 **Answer key size:** the string passed into chunk prompts is capped at
 ``MULTIMODAL_ANSWER_KEY_PROMPT_MAX_CHARS`` (default 18000) to avoid huge prompts that
 often cause provider timeouts.
@@ -76,31 +137,75 @@ import json
 import logging
 import os
 import re
+import time
 from collections import Counter
-from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 from typing import Any, Callable
 
 from app.config import Config
-from app.grading.answer_key_resolve import resolve_answer_key_plaintext
-from app.grading.answer_key_resolve import resolve_blank_assignment_template
-from app.grading.llm_router import multimodal_structure_llm_trace_label
+from app.grading.cache_support import RunCacheStats, in_run_context
+from app.grading.embedding_cache import embedding_cache_stats
+from app.grading.llm_response_cache import llm_response_cache_stats
+from app.grading.llm_router import multimodal_structure_llm_trace_label, sum_token_usage
 from app.grading.dataset_resolve import attach_dataset_context_for_notebook
 
 from .aggregator import aggregate_assignment, aggregate_chunk_samples
+from .answer_key_chunk_enrich import assemble_answer_key_context
+from .assignment_context import (
+    answer_key_audit_cached,
+    assignment_context_cache_stats,
+    cached_assignment_value,
+    resolve_answer_key_cached,
+    resolve_blank_template_cached,
+)
+from .cascade import (
+    cascade_confidence_min,
+    cascade_escalation_reason,
+    cascade_model_prices,
+    cascade_tier_order,
+    estimate_cost_usd,
+    grading_cascade_enabled,
+    summarize_cascade,
+)
 from .chunk_cache import (
+    chunk_cache_has_unit_embeddings,
     chunks_have_unit_embeddings,
     load_grading_chunks_cache,
     save_grading_chunks_cache,
 )
+from .chunk_packing import (
+    chunk_packing_enabled,
+    chunk_packing_limits,
+    plan_chunk_batches,
+    split_batch_samples,
+)
+from .cohort import ChunkKey, CohortPlan, CohortRole, chunk_key
 from .custom_rubric_export import apply_custom_rubric_plan_to_chunks
+from .grade_reuse import (
+    grade_reuse_enabled,
+    grade_reuse_key_parts,
+    grader_signature,
+    outcome_from_record,
+    outcome_to_record,
+    reuse_record,
+    reused_outcome,
+)
 from .ingestion import IngestionEnvelope, ingest_raw_submission
 from .model_runner import ChunkModelRunner, MultiModelChunkRunner
 from .parser import parse_chunk_grade_json
-from .prompts_chunk import SYSTEM_CHUNK_GRADER, build_chunk_grading_prompt
+from .prompts_chunk import (
+    SYSTEM_BATCH_CHUNK_GRADER,
+    SYSTEM_CHUNK_GRADER,
+    build_batch_grading_prompt,
+    build_chunk_grading_prompt,
+)
 from .review_router import evaluate_chunk_review
 from .rubric_router import route_rubric
+from .rule_grader import rule_grade_chunk, rule_grader_enabled, rule_sample
 from .semantic_confidence import (
+    adaptive_sampling_can_stop,
     cluster_assignment,
     summarize_chunk_confidence_from_counts,
 )
@@ -284,6 +389,15 @@ def _try_persist_assignment_chunking_json(
         _log.warning("Could not write assignment chunking export %s: %s", path, exc)
 
 
+def _chunk_grading_workers(app_cfg: Any | None, n_chunks: int) -> int:
+    """``MULTIMODAL_CHUNK_GRADING_WORKERS`` clamped to ``[1, n_chunks]`` (1 = serial)."""
+    try:
+        n = int(getattr(app_cfg, "MULTIMODAL_CHUNK_GRADING_WORKERS", 1) or 1)
+    except (TypeError, ValueError):
+        n = 1
+    return max(1, min(n, 32, max(1, n_chunks)))
+
+
 @dataclass
 class PipelineArtifactStore:
     """Per-stage audit log (in-memory; persist to DB/S3 in production)."""
@@ -294,6 +408,27 @@ class PipelineArtifactStore:
         self.stages.setdefault(stage, []).append(payload)
 
 
+@dataclass
+class PreparedSubmission:
+    """
+    One submission after :meth:`MultimodalGradingPipeline.prepare`: routed-for-grading chunks plus
+    the run's prompt context and audit state, consumed by
+    :meth:`MultimodalGradingPipeline.grade_prepared`.
+    """
+
+    envelope: IngestionEnvelope
+    chunks: list[GradingChunk]
+    answer_key_for_prompt: str
+    dataset_plain: str
+    artifacts: PipelineArtifactStore
+    workflow: list[dict[str, Any]]
+    #: Cache hits / misses of this submission only (prepare and grade phases).
+    cache_stats: RunCacheStats = field(default_factory=RunCacheStats)
+    #: Uncapped answer key; per-chunk trimming selects sections from it (falls back to
+    #: ``answer_key_for_prompt`` when empty).
+    answer_key_plain: str = ""
+
+
 class MultimodalGradingPipeline:
     def __init__(
         self,
@@ -319,13 +454,673 @@ class MultimodalGradingPipeline:
             return self.runner.app_config
         return None
 
+    def _parse_samples(
+        self,
+        chunk: GradingChunk,
+        raw_samples: list[SampledChunkGrade],
+    ) -> tuple[list[SampledChunkGrade], Counter[str]]:
+        """Parse raw sample JSON and assign semantic clusters (invalid samples get no cluster)."""
+        parsed_samples: list[SampledChunkGrade] = []
+        cluster_counts: Counter[str] = Counter()
+
+        rubric_mx: dict[str, float] = {}
+        for rr in chunk.rubric_rows or []:
+            rn = str(rr.get("name") or "").strip()
+            if rn:
+                try:
+                    rubric_mx[rn] = float(rr.get("max_points") or rr.get("max_score") or 0)
+                except (TypeError, ValueError):
+                    pass
+
+        strong = bool(self.config.confidence_clustering_strong_pattern)
+        for s in raw_samples:
+            parsed, warns = parse_chunk_grade_json(
+                s.raw_text,
+                rubric_max_points=rubric_mx,
+                rubric_rows=list(chunk.rubric_rows or []),
+                invalid_raw_score_policy=str(
+                    getattr(self.config, "raw_score_invalid_policy", "regenerate")
+                    or "regenerate"
+                ),
+            )
+            parse_ok = parsed is not None
+            pw = list(warns)
+            ck: str | None = cluster_assignment(
+                parsed, strong_pattern=strong
+            )
+            if ck is not None:
+                cluster_counts[ck] += 1
+            parsed_samples.append(
+                SampledChunkGrade(
+                    model_id=s.model_id,
+                    sample_index=s.sample_index,
+                    raw_text=s.raw_text,
+                    parsed=parsed,
+                    parse_ok=parse_ok,
+                    parse_warnings=pw,
+                    cluster_key=ck,
+                    usage=dict(s.usage),
+                )
+            )
+        return parsed_samples, cluster_counts
+
+    def _adaptive_sampling(self, chunk: GradingChunk) -> dict[str, Any] | None:
+        """
+        Early-stopping state for one chunk when ``MULTIMODAL_ADAPTIVE_SAMPLING`` is on.
+
+        Returns ``None`` when disabled or when the runner cannot sample in waves; otherwise a
+        dict whose ``should_stop`` callback records ``samples_drawn`` / ``stopped_early``.
+        """
+        if not isinstance(self.runner, MultiModelChunkRunner):
+            return None
+        app_cfg = self.runner.app_config
+        if not bool(getattr(app_cfg, "MULTIMODAL_ADAPTIVE_SAMPLING", False)):
+            return None
+        n_models = max(1, len(self.runner.grading_clients()))
+        k = max(1, int(getattr(app_cfg, "MULTIMODAL_SAMPLES_PER_MODEL", 5)))
+        rule = str(getattr(app_cfg, "MULTIMODAL_ADAPTIVE_STOP_RULE", "unanimous") or "unanimous")
+        min_valid = int(getattr(app_cfg, "MULTIMODAL_ADAPTIVE_MIN_SAMPLES", 2) or 2)
+        state: dict[str, Any] = {
+            "rule": rule.strip().lower(),
+            "budget": n_models * k,
+            "samples_drawn": 0,
+            "stopped_early": False,
+        }
+
+        def should_stop(samples: list[SampledChunkGrade]) -> bool:
+            _parsed, counts = self._parse_samples(chunk, samples)
+            state["samples_drawn"] = len(samples)
+            stop = adaptive_sampling_can_stop(
+                dict(counts),
+                remaining=state["budget"] - len(samples),
+                auto_accept_min=float(self.config.confidence_ai_auto_accept_min),
+                caution_min=float(self.config.confidence_ai_caution_min),
+                rule=state["rule"],
+                min_valid=min_valid,
+            )
+            state["stopped_early"] = bool(stop)
+            return stop
+
+        state["should_stop"] = should_stop
+        return state
+
+    def _grade_chunk(
+        self,
+        chunk: GradingChunk,
+        *,
+        answer_key_for_prompt: str,
+        dataset_plain: str,
+        answer_key_plain: str = "",
+        grade_reuse: bool = False,
+        cohort: CohortPlan | None = None,
+        packed: dict[ChunkKey, dict[str, Any]] | None = None,
+    ) -> tuple[ChunkGradeOutcome, list[tuple[str, dict[str, Any]]]]:
+        """
+        Route, prompt, sample, parse and aggregate one chunk (or reuse an identical response's
+        grade when ``grade_reuse``, confirm a cohort representative's grade, or aggregate the
+        chunk's share of a packed batch from ``packed``).
+
+        Audit rows are returned instead of written to :class:`PipelineArtifactStore` so the
+        caller can append them in chunk order regardless of which worker finished first.
+        """
+        role = cohort.role_for(chunk) if cohort is not None else None
+        if cohort is not None and role is not None and role.role == "representative":
+            graded = cohort.representative_result(role)
+            if graded is not None:
+                return graded
+
+        entries: list[tuple[str, dict[str, Any]]] = []
+
+        def emit(stage: str, payload: dict[str, Any]) -> None:
+            entries.append((stage, payload))
+
+        route_rubric(
+            chunk,
+            classifier=self.classifier,
+            rubric_rows_by_type=self.rubric_rows_by_type,
+        )
+        emit(
+            "rubric_routing",
+            {
+                "chunk_id": chunk.chunk_id,
+                "rubric_type": chunk.rubric_type.value
+                if chunk.rubric_type
+                else None,
+                "reason": chunk.routing_reason,
+            },
+        )
+
+        decision = (
+            rule_grade_chunk(chunk)
+            if rule_grader_enabled(self._resolve_app_config())
+            else None
+        )
+        if decision is not None:
+            outcome, grading_row = self._aggregate_samples(
+                chunk, "", [rule_sample(chunk, decision)]
+            )
+            outcome.stage_artifacts["rule_grading"] = {"rule": decision.rule, **decision.detail}
+            grading_row["rule"] = decision.rule
+            emit("grading", grading_row)
+            return outcome, entries
+
+        cohort_note: dict[str, Any] | None = None
+        if cohort is not None and role is not None and role.role == "member":
+            representative = cohort.representative_result(role)
+            if representative is not None:
+                confirmed, cohort_note = self._confirm_cohort_member(
+                    chunk,
+                    role,
+                    representative[0],
+                    answer_key_for_prompt=answer_key_for_prompt,
+                    answer_key_plain=answer_key_plain,
+                    dataset_plain=dataset_plain,
+                )
+                if confirmed is not None:
+                    emit("grading", confirmed[1])
+                    return confirmed[0], entries
+
+        pack = packed.get(chunk_key(chunk)) if packed else None
+        ak_context: dict[str, Any] | None = None
+        if pack is not None and pack["samples"]:
+            outcome, grading_row = self._aggregate_samples(
+                chunk, pack["user_prompt"], pack["samples"]
+            )
+            grading_row["packed_batch"] = pack["meta"]["batch"]
+        else:
+            user_prompt, ak_context = self._chunk_prompt(
+                chunk,
+                answer_key_for_prompt=answer_key_for_prompt,
+                answer_key_plain=answer_key_plain,
+                dataset_plain=dataset_plain,
+            )
+            if grade_reuse:
+                outcome, grading_row = self._sample_or_reuse(
+                    chunk,
+                    user_prompt,
+                    answer_key_for_prompt=answer_key_for_prompt,
+                    dataset_plain=dataset_plain,
+                )
+            else:
+                outcome, grading_row = self._sample_and_aggregate(chunk, user_prompt)
+        if pack is not None:
+            outcome.stage_artifacts["packing"] = dict(pack["meta"])
+            if pack.get("usage"):
+                outcome.stage_artifacts["token_usage"] = sum_token_usage(
+                    [outcome.stage_artifacts.get("token_usage"), pack["usage"]]
+                )
+        if cohort_note is not None:
+            outcome.stage_artifacts["cohort"] = cohort_note
+            if cohort_note.get("confirm_token_usage"):
+                outcome.stage_artifacts["token_usage"] = sum_token_usage(
+                    [outcome.stage_artifacts.get("token_usage"), cohort_note["confirm_token_usage"]]
+                )
+        if ak_context is not None:
+            outcome.stage_artifacts["answer_key_context"] = ak_context
+        emit("grading", grading_row)
+        return outcome, entries
+
+    def _grade_packed_batches(
+        self,
+        chunks: list[GradingChunk],
+        *,
+        answer_key_for_prompt: str,
+        dataset_plain: str,
+        cohort: CohortPlan | None,
+        workers: int,
+    ) -> dict[ChunkKey, dict[str, Any]]:
+        """
+        Route every chunk, then grade the small ones that would be sampled on their own in packed
+        batches (:mod:`.chunk_packing`). Returns per-chunk ``{"meta", "user_prompt", "samples"}``;
+        ``samples`` is empty when the chunk must fall back to single-chunk calls.
+        """
+        app_cfg = self._resolve_app_config()
+        rules_on = rule_grader_enabled(app_cfg)
+        candidates: list[GradingChunk] = []
+        for chunk in chunks:
+            route_rubric(
+                chunk,
+                classifier=self.classifier,
+                rubric_rows_by_type=self.rubric_rows_by_type,
+            )
+            if cohort is not None and cohort.role_for(chunk) is not None:
+                continue
+            if rules_on and rule_grade_chunk(chunk) is not None:
+                continue
+            candidates.append(chunk)
+        max_chars, max_batch = chunk_packing_limits(app_cfg)
+        batches = plan_chunk_batches(candidates, max_chars=max_chars, max_batch=max_batch)
+
+        def grade_batch(item: tuple[int, list[GradingChunk]]) -> dict[ChunkKey, dict[str, Any]]:
+            n, batch = item
+            user_prompt = build_batch_grading_prompt(
+                batch,
+                task_description=self.task_description,
+                answer_key_text=answer_key_for_prompt,
+                dataset_context_text=dataset_plain,
+            )
+            try:
+                raw = list(
+                    self.runner.run_chunk_samples(
+                        batch[0], system_prompt=SYSTEM_BATCH_CHUNK_GRADER, user_prompt=user_prompt
+                    )
+                )
+            except Exception as exc:
+                _log.warning("chunk packing: batch %d failed, grading singly: %s", n, exc)
+                raw = []
+            split = split_batch_samples(batch, raw)
+            out: dict[ChunkKey, dict[str, Any]] = {}
+            for pos, chunk in enumerate(batch):
+                samples = split[str(chunk.chunk_id)]
+                parsed, _counts = self._parse_samples(chunk, samples)
+                ok = bool(parsed) and all(s.parse_ok for s in parsed)
+                out[chunk_key(chunk)] = {
+                    "meta": {
+                        "batch": n,
+                        "batch_size": len(batch),
+                        "chunk_ids": [c.chunk_id for c in batch],
+                        "fallback": not ok,
+                    },
+                    "user_prompt": user_prompt,
+                    "samples": samples if ok else [],
+                    # The request is billed once; count it on the batch's first chunk.
+                    "usage": sum_token_usage(s.usage for s in raw) if pos == 0 else None,
+                }
+            return out
+
+        items = list(enumerate(batches))
+        packed: dict[ChunkKey, dict[str, Any]] = {}
+        if workers <= 1 or len(items) <= 1:
+            results = [grade_batch(item) for item in items]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(workers, len(items)), thread_name_prefix="mm-pack"
+            ) as pool:
+                results = list(pool.map(in_run_context(grade_batch), items))
+        for result in results:
+            packed.update(result)
+        return packed
+
+    def _chunk_prompt(
+        self,
+        chunk: GradingChunk,
+        *,
+        answer_key_for_prompt: str,
+        dataset_plain: str,
+        answer_key_plain: str = "",
+        reference_grade: dict[str, Any] | None = None,
+    ) -> tuple[str, dict[str, Any] | None]:
+        """
+        User prompt for a routed chunk, with the answer key trimmed to the chunk's sections when
+        ``MULTIMODAL_ANSWER_KEY_TOKEN_BUDGET`` > 0 → ``(prompt, trimming audit or None)``.
+        Sections are picked from the uncapped ``answer_key_plain``; an untrimmed prompt gets the
+        capped ``answer_key_for_prompt``.
+        """
+        app_cfg = self._resolve_app_config()
+        trimmed = assemble_answer_key_context(
+            chunk,
+            answer_key_plain or answer_key_for_prompt,
+            app_cfg,
+            token_budget=int(getattr(app_cfg, "MULTIMODAL_ANSWER_KEY_TOKEN_BUDGET", 0) or 0),
+            neighbors=int(getattr(app_cfg, "MULTIMODAL_ANSWER_KEY_NEIGHBOR_SECTIONS", 2) or 0),
+            prompt_text=answer_key_for_prompt,
+        )
+        prompt = build_chunk_grading_prompt(
+            chunk,
+            task_description=self.task_description,
+            answer_key_text=trimmed[0] if trimmed else answer_key_for_prompt,
+            dataset_context_text=dataset_plain,
+            reference_grade=reference_grade,
+            answer_key_excerpt=trimmed is not None,
+        )
+        return prompt, trimmed[1] if trimmed else None
+
+    @staticmethod
+    def _grading_row(
+        chunk: GradingChunk, outcome: ChunkGradeOutcome, *, total_samples: int, **extra: Any
+    ) -> dict[str, Any]:
+        """``grading`` audit row for an outcome that was not sampled from scratch."""
+        return {
+            "chunk_id": chunk.chunk_id,
+            "semantic_entropy": outcome.semantic_entropy_nats,
+            "ai_confidence": outcome.ai_confidence,
+            "entropy_max_reference_nats": outcome.entropy_max_reference_nats,
+            "cluster_counts": dict(outcome.cluster_counts),
+            "review": outcome.review_status.value,
+            "model_ids": list(outcome.stage_artifacts.get("model_ids") or []),
+            "total_samples": total_samples,
+            **extra,
+        }
+
+    def _sample_or_reuse(
+        self,
+        chunk: GradingChunk,
+        user_prompt: str,
+        *,
+        answer_key_for_prompt: str,
+        dataset_plain: str,
+    ) -> tuple[ChunkGradeOutcome, dict[str, Any]]:
+        """
+        :meth:`_sample_and_aggregate` behind the cross-student grade reuse cache. Chunks without a
+        ``question_id`` are always graded: the key could not tell two such questions apart.
+        """
+        fresh: list[tuple[ChunkGradeOutcome, dict[str, Any]]] = []
+
+        def build() -> dict[str, Any] | None:
+            fresh.append(self._sample_and_aggregate(chunk, user_prompt))
+            return reuse_record(fresh[0][0], chunk)
+
+        record: dict[str, Any] | None = None
+        if chunk.question_id:
+            parts = grade_reuse_key_parts(
+                chunk,
+                grader_signature=self._grader_signature(
+                    answer_key_for_prompt=answer_key_for_prompt, dataset_plain=dataset_plain
+                ),
+            )
+            record = cached_assignment_value(
+                self._resolve_app_config(), "chunk_grade", parts, build, shared=True
+            )
+        if record is not None and not fresh:
+            outcome = reused_outcome(record, chunk, user_prompt=user_prompt)
+            return outcome, self._grading_row(
+                chunk,
+                outcome,
+                total_samples=0,
+                reused_from_chunk_id=outcome.stage_artifacts["grade_reuse"].get("source_chunk_id"),
+            )
+        if not fresh:
+            # No question id, or a stored entry without a usable record: grade normally.
+            fresh.append(self._sample_and_aggregate(chunk, user_prompt))
+        outcome, grading_row = fresh[0]
+        outcome.stage_artifacts["grade_reuse"] = {"reused": False}
+        return outcome, grading_row
+
+    def _confirm_cohort_member(
+        self,
+        chunk: GradingChunk,
+        role: CohortRole,
+        representative: ChunkGradeOutcome,
+        *,
+        answer_key_for_prompt: str,
+        dataset_plain: str,
+        answer_key_plain: str = "",
+    ) -> tuple[tuple[ChunkGradeOutcome, dict[str, Any]] | None, dict[str, Any]]:
+        """
+        One sample seeded with the representative's consensus grade. When it falls in the
+        representative's modal cluster, return ``((outcome, grading row), note)`` with a copy of
+        the representative's outcome; otherwise ``(None, note)`` and the chunk is graded normally
+        (``note["confirm_token_usage"]`` is added to that outcome's usage).
+        """
+        note: dict[str, Any] = {
+            "role": "member",
+            "cluster_id": role.cluster_id,
+            "cluster_size": role.cluster_size,
+            "similarity": role.similarity,
+            "representative_student_id": role.representative[0],
+            "representative_chunk_id": role.representative[1],
+            "confirmed": False,
+        }
+        counts = representative.cluster_counts
+        if not counts:
+            return None, note
+        modal = max(sorted(counts), key=lambda key: counts[key])
+        user_prompt, ak_context = self._chunk_prompt(
+            chunk,
+            answer_key_for_prompt=answer_key_for_prompt,
+            answer_key_plain=answer_key_plain,
+            dataset_plain=dataset_plain,
+            reference_grade={
+                "normalized_score": representative.normalized_score_estimate,
+                "criterion_scores": dict(representative.criterion_consensus),
+            },
+        )
+        raw = self.runner.run_single_sample(
+            chunk, system_prompt=SYSTEM_CHUNK_GRADER, user_prompt=user_prompt
+        )
+        _parsed, confirm_counts = self._parse_samples(chunk, raw)
+        note["confirm_cluster"] = next(iter(confirm_counts), None)
+        if note["confirm_cluster"] != modal:
+            # The chunk is re-graded; its spend must still include this confirmation call.
+            note["confirm_token_usage"] = sum_token_usage(s.usage for s in raw)
+            return None, note
+        note["confirmed"] = True
+        outcome = outcome_from_record(outcome_to_record(representative))
+        outcome.chunk_id = chunk.chunk_id
+        outcome.stage_artifacts.pop("grade_reuse", None)
+        outcome.stage_artifacts["user_prompt"] = user_prompt
+        outcome.stage_artifacts["raw_sample_count"] = len(raw)
+        outcome.stage_artifacts["token_usage"] = sum_token_usage(s.usage for s in raw)
+        outcome.stage_artifacts["cohort"] = note
+        outcome.stage_artifacts.pop("answer_key_context", None)
+        if ak_context is not None:
+            outcome.stage_artifacts["answer_key_context"] = ak_context
+        return (
+            outcome,
+            self._grading_row(
+                chunk,
+                outcome,
+                total_samples=len(raw),
+                cohort_representative_chunk_id=role.representative[1],
+            ),
+        ), note
+
+    def _grader_signature(self, *, answer_key_for_prompt: str, dataset_plain: str) -> str:
+        """Everything outside the chunk that shapes a grade (see :mod:`.grade_reuse`)."""
+        models: list[str] = [type(self.runner).__name__]
+        spm: int | None = None
+        if isinstance(self.runner, MultiModelChunkRunner):
+            models = [model_id for _client, model_id in self.runner.grading_clients()]
+            spm = int(getattr(self.runner.app_config, "MULTIMODAL_SAMPLES_PER_MODEL", 5))
+        return grader_signature(
+            models=models,
+            samples_per_model=spm,
+            system_prompt=SYSTEM_CHUNK_GRADER,
+            review_config=asdict(self.config),
+            task_description=self.task_description,
+            answer_key=answer_key_for_prompt,
+            dataset=dataset_plain,
+        )
+
+    def _sample_and_aggregate(
+        self,
+        chunk: GradingChunk,
+        user_prompt: str,
+    ) -> tuple[ChunkGradeOutcome, dict[str, Any]]:
+        """Sample, parse and aggregate one routed chunk → ``(outcome, "grading" audit row)``."""
+        if isinstance(self.runner, MultiModelChunkRunner) and grading_cascade_enabled(
+            self.runner.app_config
+        ):
+            raw_samples, cascade = self._sample_cascade(self.runner, chunk, user_prompt)
+            outcome, grading_row = self._aggregate_samples(chunk, user_prompt, raw_samples)
+            outcome.stage_artifacts["cascade"] = cascade
+            grading_row["cascade_tiers"] = len(cascade["tiers"])
+            return outcome, grading_row
+        adaptive = self._adaptive_sampling(chunk)
+        if adaptive is None:
+            raw_samples = self.runner.run_chunk_samples(
+                chunk,
+                system_prompt=SYSTEM_CHUNK_GRADER,
+                user_prompt=user_prompt,
+            )
+        else:
+            raw_samples = self.runner.run_chunk_samples(
+                chunk,
+                system_prompt=SYSTEM_CHUNK_GRADER,
+                user_prompt=user_prompt,
+                should_stop=adaptive["should_stop"],
+            )
+        return self._aggregate_samples(chunk, user_prompt, raw_samples, adaptive=adaptive)
+
+    def _sample_cascade(
+        self,
+        runner: MultiModelChunkRunner,
+        chunk: GradingChunk,
+        user_prompt: str,
+    ) -> tuple[list[SampledChunkGrade], dict[str, Any]]:
+        """
+        Sample one model at a time, cheapest first, until the samples drawn so far are
+        confident and parse (:mod:`.cascade`) → ``(raw samples, stage_artifacts["cascade"])``.
+        """
+        app_cfg = runner.app_config
+        labels = [label for _client, label in runner.grading_clients()]
+        prices = cascade_model_prices(app_cfg)
+        confidence_min = cascade_confidence_min(app_cfg)
+        raw_samples: list[SampledChunkGrade] = []
+        tiers: list[dict[str, Any]] = []
+        for tier, pos in enumerate(cascade_tier_order(labels, prices)):
+            started = time.perf_counter()
+            drawn = runner.run_chunk_samples(
+                chunk,
+                system_prompt=SYSTEM_CHUNK_GRADER,
+                user_prompt=user_prompt,
+                model_index=pos,
+            )
+            latency_ms = round((time.perf_counter() - started) * 1000.0, 1)
+            raw_samples.extend(drawn)
+            parsed, counts = self._parse_samples(chunk, raw_samples)
+            reason, confidence, parse_fail = cascade_escalation_reason(
+                parsed, dict(counts), confidence_min=confidence_min, config=self.config
+            )
+            usage = sum_token_usage(s.usage for s in drawn)
+            tiers.append(
+                {
+                    "tier": tier,
+                    "model_id": labels[pos],
+                    "calls": len(drawn),
+                    "latency_ms": latency_ms,
+                    "prompt_tokens": usage["prompt_tokens"],
+                    "completion_tokens": usage["completion_tokens"],
+                    "cost_usd": estimate_cost_usd(usage, prices.get(labels[pos])),
+                    "ai_confidence": round(confidence, 4),
+                    "parse_fail_rate": round(parse_fail, 4),
+                    "escalation_reason": reason,
+                }
+            )
+            if reason is None:
+                break
+        raw_samples.sort(key=lambda s: s.sample_index)
+        return raw_samples, {
+            "confidence_min": confidence_min,
+            "parse_fail_rate_high": float(self.config.parse_fail_rate_high),
+            "tiers": tiers,
+            "final_model_id": tiers[-1]["model_id"] if tiers else None,
+        }
+
+    def _aggregate_samples(
+        self,
+        chunk: GradingChunk,
+        user_prompt: str,
+        raw_samples: list[SampledChunkGrade],
+        *,
+        adaptive: dict[str, Any] | None = None,
+    ) -> tuple[ChunkGradeOutcome, dict[str, Any]]:
+        """Parse, cluster, aggregate and review drawn samples."""
+        parsed_samples, cluster_counts = self._parse_samples(chunk, raw_samples)
+        strong = bool(self.config.confidence_clustering_strong_pattern)
+
+        co = summarize_chunk_confidence_from_counts(dict(cluster_counts))
+        rubric_fb = [
+            str(rr.get("name") or "").strip()
+            for rr in (chunk.rubric_rows or [])
+            if str(rr.get("name") or "").strip()
+        ]
+        outcome = aggregate_chunk_samples(
+            chunk.chunk_id,
+            parsed_samples,
+            cluster_counts=dict(cluster_counts),
+            cfg=self.config,
+            rubric_fallback_names=rubric_fb or None,
+        )
+        sample_details = [
+            {
+                "model_id": s.model_id,
+                "sample_index": s.sample_index,
+                "parse_ok": s.parse_ok,
+                "normalized_score": s.parsed.normalized_score
+                if s.parsed
+                else None,
+                "cluster_key": s.cluster_key,
+            }
+            for s in parsed_samples
+        ]
+        outcome.stage_artifacts = {
+            "system_prompt": SYSTEM_CHUNK_GRADER,
+            "user_prompt": user_prompt,
+            "raw_sample_count": len(raw_samples),
+            "confidence_trace": {
+                "clustering_strong_pattern": strong,
+                "cluster_counts": dict(cluster_counts),
+                "p_hat": co["p_hat"],
+                "semantic_entropy_nats": co["semantic_entropy_nats"],
+                "entropy_max_reference_nats": co["entropy_max_reference_nats"],
+                "ai_confidence": co["ai_confidence"],
+                "n_observed_clusters": co["n_observed_clusters"],
+                "n_valid_samples": co["n_valid_samples"],
+                "samples": sample_details,
+            },
+        }
+        outcome = evaluate_chunk_review(outcome, parsed_samples, self.config)
+        trace = outcome.stage_artifacts.get("confidence_trace")
+        if isinstance(trace, dict):
+            trace["review_status"] = outcome.review_status.value
+            trace["review_reasons"] = list(outcome.review_reasons)
+        model_ids = sorted({s.model_id for s in raw_samples})
+        meta_spm: int | None = None
+        if isinstance(self.runner, MultiModelChunkRunner):
+            meta_spm = int(
+                getattr(
+                    self.runner.app_config,
+                    "MULTIMODAL_SAMPLES_PER_MODEL",
+                    5,
+                )
+            )
+        outcome.stage_artifacts["model_ids"] = model_ids
+        outcome.stage_artifacts["samples_per_model"] = meta_spm
+        outcome.stage_artifacts["token_usage"] = sum_token_usage(s.usage for s in raw_samples)
+        if adaptive is not None:
+            outcome.stage_artifacts["adaptive_sampling"] = {
+                "rule": adaptive["rule"],
+                "samples_drawn": len(raw_samples),
+                "budget": adaptive["budget"],
+                "stopped_early": adaptive["stopped_early"],
+            }
+        return outcome, {
+            "chunk_id": chunk.chunk_id,
+            "semantic_entropy": co["semantic_entropy_nats"],
+            "ai_confidence": co["ai_confidence"],
+            "entropy_max_reference_nats": co["entropy_max_reference_nats"],
+            "cluster_counts": dict(cluster_counts),
+            "review": outcome.review_status.value,
+            "model_ids": model_ids,
+            "total_samples": len(raw_samples),
+        }
+
     def run(
         self,
         envelope: IngestionEnvelope,
         *,
         artifacts: PipelineArtifactStore | None = None,
     ) -> AssignmentGradeResult:
-        art = artifacts or PipelineArtifactStore()
+        return self.grade_prepared(self.prepare(envelope, artifacts=artifacts))
+
+    def prepare(
+        self,
+        envelope: IngestionEnvelope,
+        *,
+        artifacts: PipelineArtifactStore | None = None,
+    ) -> PreparedSubmission:
+        """Ingestion → chunking → answer-key alignment → RAG vectors → custom rubric plan."""
+        cache_stats = RunCacheStats()
+        with cache_stats.active():
+            return self._prepare(envelope, artifacts or PipelineArtifactStore(), cache_stats)
+
+    def _prepare(
+        self,
+        envelope: IngestionEnvelope,
+        art: PipelineArtifactStore,
+        cache_stats: RunCacheStats,
+    ) -> PreparedSubmission:
         hints = envelope.modality_hints
         workflow: list[dict[str, Any]] = []
 
@@ -345,7 +1140,9 @@ class MultimodalGradingPipeline:
         raw_akd = str(hints.get("answer_key_dir") or "").strip()
         ak_dir = Path(raw_akd).expanduser() if raw_akd else default_answer_key_dir()
         if not answer_key_plain:
-            ak_text, ak_name = resolve_answer_key_plaintext(envelope.assignment_id, ak_dir)
+            ak_text, ak_name = resolve_answer_key_cached(
+                self._resolve_app_config(), envelope.assignment_id, ak_dir
+            )
             if ak_text.strip():
                 answer_key_plain = ak_text.strip()
                 hints["answer_key_plaintext"] = ak_text
@@ -361,8 +1158,8 @@ class MultimodalGradingPipeline:
         raw_blank_dir = str(hints.get("blank_assignments_dir") or "").strip()
         blank_dir = Path(raw_blank_dir).expanduser() if raw_blank_dir else default_blank_assignments_dir()
         if not hints.get("blank_assignment_template_bytes"):
-            tpl_b, tpl_name, tpl_suf = resolve_blank_assignment_template(
-                envelope.assignment_id, blank_dir
+            tpl_b, tpl_name, tpl_suf = resolve_blank_template_cached(
+                self._resolve_app_config(), envelope.assignment_id, blank_dir
             )
             if tpl_b.strip():
                 hints["blank_assignment_template_bytes"] = tpl_b
@@ -425,7 +1222,10 @@ class MultimodalGradingPipeline:
         if loaded:
             chunks = loaded
             chunker_mode = "cached_units"
-            reused_embeddings = app_cfg is not None and chunks_have_unit_embeddings(chunks)
+            cached_vectors = chunk_cache_has_unit_embeddings(cache_p) if cache_p else None
+            if cached_vectors is None:
+                cached_vectors = chunks_have_unit_embeddings(chunks)
+            reused_embeddings = app_cfg is not None and cached_vectors
             wf(
                 "chunk_and_embed",
                 chunker_mode=chunker_mode,
@@ -538,15 +1338,12 @@ class MultimodalGradingPipeline:
             )
 
         if app_cfg is not None and answer_key_plain:
-            from .answer_key_chunk_enrich import (
-                embed_full_answer_key_for_audit,
-                enrich_chunks_with_per_question_answer_key,
-            )
+            from .answer_key_chunk_enrich import enrich_chunks_with_per_question_answer_key
 
             enrich_chunks_with_per_question_answer_key(
                 chunks, answer_key_plain, app_cfg
             )
-            ak_audit = embed_full_answer_key_for_audit(answer_key_plain, app_cfg)
+            ak_audit = answer_key_audit_cached(app_cfg, answer_key_plain)
             if ak_audit:
                 hints["answer_key_embedding_audit"] = ak_audit
                 art.append("answer_key", dict(ak_audit))
@@ -602,6 +1399,80 @@ class MultimodalGradingPipeline:
                 "reused_cached_embeddings": reused_embeddings and not rag_embed_ran,
             },
         )
+        return PreparedSubmission(
+            envelope=envelope,
+            chunks=chunks,
+            answer_key_for_prompt=answer_key_for_prompt,
+            dataset_plain=dataset_plain,
+            artifacts=art,
+            workflow=workflow,
+            cache_stats=cache_stats,
+            answer_key_plain=answer_key_plain,
+        )
+
+    def _grade_kwargs(self, prepared: PreparedSubmission) -> dict[str, Any]:
+        app_cfg = self._resolve_app_config()
+        envelope = prepared.envelope
+        return {
+            "answer_key_for_prompt": prepared.answer_key_for_prompt,
+            "answer_key_plain": prepared.answer_key_plain,
+            "dataset_plain": prepared.dataset_plain,
+            "grade_reuse": app_cfg is not None
+            and grade_reuse_enabled(app_cfg, envelope.modality_hints, envelope.assignment_id),
+        }
+
+    def grade_cohort_representative(
+        self,
+        prepared: PreparedSubmission,
+        chunk: GradingChunk,
+        cohort: CohortPlan,
+    ) -> None:
+        """
+        Grade one cluster representative of ``prepared`` with full sampling and record it on
+        ``cohort``; :meth:`grade_prepared` later picks the result up instead of re-grading.
+        """
+        role = cohort.role_for(chunk)
+        if role is None or role.role != "representative":
+            return
+        with prepared.cache_stats.active():
+            outcome, entries = self._grade_chunk(chunk, **self._grade_kwargs(prepared))
+        outcome.stage_artifacts["cohort"] = {
+            "role": "representative",
+            "cluster_id": role.cluster_id,
+            "cluster_size": role.cluster_size,
+        }
+        cohort.record_representative(role, (outcome, entries))
+
+    def grade_prepared(
+        self,
+        prepared: PreparedSubmission,
+        *,
+        cohort: CohortPlan | None = None,
+    ) -> AssignmentGradeResult:
+        """
+        Rubric routing → LLM grading → entropy → aggregation for a prepared submission. With a
+        ``cohort`` plan (:mod:`.cohort`), representatives and confirmed members reuse the
+        representative's grade.
+        """
+        with prepared.cache_stats.active():
+            return self._grade_prepared(prepared, cohort)
+
+    def _grade_prepared(
+        self,
+        prepared: PreparedSubmission,
+        cohort: CohortPlan | None,
+    ) -> AssignmentGradeResult:
+        envelope = prepared.envelope
+        chunks = prepared.chunks
+        art = prepared.artifacts
+        workflow = prepared.workflow
+        app_cfg = self._resolve_app_config()
+        run_stats = prepared.cache_stats
+
+        def wf(phase: str, **extra: Any) -> None:
+            row: dict[str, Any] = {"phase": phase}
+            row.update(extra)
+            workflow.append(row)
 
         wf(
             "route_rubric_and_grade",
@@ -612,150 +1483,123 @@ class MultimodalGradingPipeline:
             n_chunks=len(chunks),
         )
 
+        workers = _chunk_grading_workers(app_cfg, len(chunks))
+        grade_kwargs = self._grade_kwargs(prepared)
+        grade_kwargs["cohort"] = cohort
+        if chunk_packing_enabled(app_cfg) and not grade_kwargs["grade_reuse"]:
+            grade_kwargs["packed"] = self._grade_packed_batches(
+                chunks,
+                answer_key_for_prompt=prepared.answer_key_for_prompt,
+                dataset_plain=prepared.dataset_plain,
+                cohort=cohort,
+                workers=workers,
+            )
+        graded: list[tuple[ChunkGradeOutcome, list[tuple[str, dict[str, Any]]]]]
+        if workers <= 1:
+            graded = [self._grade_chunk(chunk, **grade_kwargs) for chunk in chunks]
+        else:
+            # Chunks are independent until ``aggregate_assignment``; ``map`` yields in input order.
+            with ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="mm-chunk"
+            ) as pool:
+                graded = list(
+                    pool.map(
+                        in_run_context(lambda ch: self._grade_chunk(ch, **grade_kwargs)), chunks
+                    )
+                )
+
         chunk_outcomes: list[ChunkGradeOutcome] = []
-        for chunk in chunks:
-            route_rubric(
-                chunk,
-                classifier=self.classifier,
-                rubric_rows_by_type=self.rubric_rows_by_type,
+        for outcome, entries in graded:
+            for stage, payload in entries:
+                art.append(stage, payload)
+            chunk_outcomes.append(outcome)
+
+        # Counted for this run only (prepare + grade), not the process-wide cache totals.
+        if llm_response_cache_stats(app_cfg) is not None:
+            wf(
+                "llm_response_cache",
+                **run_stats.counts("llm_response_cache", ("hits", "misses", "store_errors")),
             )
-            art.append(
-                "rubric_routing",
-                {
-                    "chunk_id": chunk.chunk_id,
-                    "rubric_type": chunk.rubric_type.value
-                    if chunk.rubric_type
-                    else None,
-                    "reason": chunk.routing_reason,
-                },
+        if embedding_cache_stats(app_cfg) is not None:
+            e = run_stats.counts("embedding_cache", ("hits", "misses", "store_errors"))
+            lookups = e["hits"] + e["misses"]
+            wf(
+                "embedding_cache",
+                hits=e["hits"],
+                misses=e["misses"],
+                hit_rate=round(e["hits"] / lookups, 4) if lookups else 0.0,
+                store_errors=e["store_errors"],
             )
-
-            user_prompt = build_chunk_grading_prompt(
-                chunk,
-                task_description=self.task_description,
-                answer_key_text=answer_key_for_prompt,
-                dataset_context_text=dataset_plain,
+        if assignment_context_cache_stats(app_cfg) is not None:
+            wf(
+                "assignment_context_cache",
+                **run_stats.counts(
+                    "assignment_context", ("hits", "shared_hits", "misses", "store_errors")
+                ),
             )
-            raw_samples = self.runner.run_chunk_samples(
-                chunk,
-                system_prompt=SYSTEM_CHUNK_GRADER,
-                user_prompt=user_prompt,
+        if grade_kwargs["grade_reuse"]:
+            reused = sum(
+                1
+                for o in chunk_outcomes
+                if (o.stage_artifacts.get("grade_reuse") or {}).get("reused")
             )
-
-            parsed_samples: list[SampledChunkGrade] = []
-            cluster_counts: Counter[str] = Counter()
-
-            rubric_mx: dict[str, float] = {}
-            for rr in chunk.rubric_rows or []:
-                rn = str(rr.get("name") or "").strip()
-                if rn:
-                    try:
-                        rubric_mx[rn] = float(rr.get("max_points") or rr.get("max_score") or 0)
-                    except (TypeError, ValueError):
-                        pass
-
-            strong = bool(self.config.confidence_clustering_strong_pattern)
-            for s in raw_samples:
-                parsed, warns = parse_chunk_grade_json(
-                    s.raw_text,
-                    rubric_max_points=rubric_mx,
-                    rubric_rows=list(chunk.rubric_rows or []),
-                    invalid_raw_score_policy=str(
-                        getattr(self.config, "raw_score_invalid_policy", "regenerate")
-                        or "regenerate"
-                    ),
-                )
-                parse_ok = parsed is not None
-                pw = list(warns)
-                ck: str | None = cluster_assignment(
-                    parsed, strong_pattern=strong
-                )
-                if ck is not None:
-                    cluster_counts[ck] += 1
-                parsed_samples.append(
-                    SampledChunkGrade(
-                        model_id=s.model_id,
-                        sample_index=s.sample_index,
-                        raw_text=s.raw_text,
-                        parsed=parsed,
-                        parse_ok=parse_ok,
-                        parse_warnings=pw,
-                        cluster_key=ck,
-                    )
-                )
-
-            co = summarize_chunk_confidence_from_counts(dict(cluster_counts))
-            rubric_fb = [
-                str(rr.get("name") or "").strip()
-                for rr in (chunk.rubric_rows or [])
-                if str(rr.get("name") or "").strip()
-            ]
-            outcome = aggregate_chunk_samples(
-                chunk.chunk_id,
-                parsed_samples,
-                cluster_counts=dict(cluster_counts),
-                cfg=self.config,
-                rubric_fallback_names=rubric_fb or None,
-            )
-            sample_details = [
-                {
-                    "model_id": s.model_id,
-                    "sample_index": s.sample_index,
-                    "parse_ok": s.parse_ok,
-                    "normalized_score": s.parsed.normalized_score
-                    if s.parsed
-                    else None,
-                    "cluster_key": s.cluster_key,
-                }
-                for s in parsed_samples
-            ]
-            outcome.stage_artifacts = {
-                "system_prompt": SYSTEM_CHUNK_GRADER,
-                "user_prompt": user_prompt,
-                "raw_sample_count": len(raw_samples),
-                "confidence_trace": {
-                    "clustering_strong_pattern": strong,
-                    "cluster_counts": dict(cluster_counts),
-                    "p_hat": co["p_hat"],
-                    "semantic_entropy_nats": co["semantic_entropy_nats"],
-                    "entropy_max_reference_nats": co["entropy_max_reference_nats"],
-                    "ai_confidence": co["ai_confidence"],
-                    "n_observed_clusters": co["n_observed_clusters"],
-                    "n_valid_samples": co["n_valid_samples"],
-                    "samples": sample_details,
-                },
-            }
-            outcome = evaluate_chunk_review(outcome, parsed_samples, self.config)
-            trace = outcome.stage_artifacts.get("confidence_trace")
-            if isinstance(trace, dict):
-                trace["review_status"] = outcome.review_status.value
-                trace["review_reasons"] = list(outcome.review_reasons)
-            model_ids = sorted({s.model_id for s in raw_samples})
-            meta_spm: int | None = None
-            if isinstance(self.runner, MultiModelChunkRunner):
-                meta_spm = int(
-                    getattr(
-                        self.runner.app_config,
-                        "MULTIMODAL_SAMPLES_PER_MODEL",
-                        5,
-                    )
-                )
-            outcome.stage_artifacts["model_ids"] = model_ids
-            outcome.stage_artifacts["samples_per_model"] = meta_spm
-            art.append(
-                "grading",
-                {
-                    "chunk_id": chunk.chunk_id,
-                    "semantic_entropy": co["semantic_entropy_nats"],
-                    "ai_confidence": co["ai_confidence"],
-                    "entropy_max_reference_nats": co["entropy_max_reference_nats"],
-                    "cluster_counts": dict(cluster_counts),
-                    "review": outcome.review_status.value,
-                    "model_ids": model_ids,
-                    "total_samples": len(raw_samples),
-                },
+            wf("grade_reuse", reused=reused, graded=len(chunk_outcomes) - reused)
+        rule_names = [
+            (o.stage_artifacts.get("rule_grading") or {}).get("rule") for o in chunk_outcomes
+        ]
+        rules: dict[str, int] = dict(
+            sorted(Counter(r for r in rule_names if isinstance(r, str) and r).items())
+        )
+        if rules:
+            wf(
+                "rule_grading",
+                **rules,
+                chunk_ids=[
+                    o.chunk_id for o in chunk_outcomes if o.stage_artifacts.get("rule_grading")
+                ],
+            )
+        trimmed = [
+            o.stage_artifacts["answer_key_context"]
+            for o in chunk_outcomes
+            if o.stage_artifacts.get("answer_key_context")
+        ]
+        if trimmed:
+            wf(
+                "answer_key_context",
+                chunks_trimmed=len(trimmed),
+                tokens_saved=sum(int(t.get("tokens_saved") or 0) for t in trimmed),
+            )
+        packing = [
+            o.stage_artifacts["packing"] for o in chunk_outcomes if o.stage_artifacts.get("packing")
+        ]
+        if packing:
+            wf(
+                "chunk_packing",
+                batches=len({p["batch"] for p in packing}),
+                packed=sum(1 for p in packing if not p["fallback"]),
+                fallback=sum(1 for p in packing if p["fallback"]),
+            )
+        cascades = [
+            o.stage_artifacts["cascade"] for o in chunk_outcomes if o.stage_artifacts.get("cascade")
+        ]
+        if cascades:
+            wf("cascade", **summarize_cascade(cascades))
+        if cohort is not None:
+            roles = Counter(
+                (o.stage_artifacts.get("cohort") or {}).get("role") or "outlier"
+                for o in chunk_outcomes
+            )
+            wf(
+                "cohort",
+                representatives=roles["representative"],
+                members=roles["member"],
+                confirmed=sum(
+                    1
+                    for o in chunk_outcomes
+                    if (o.stage_artifacts.get("cohort") or {}).get("confirmed")
+                ),
+                outliers=roles["outlier"],
             )
-            chunk_outcomes.append(outcome)
 
         assign = aggregate_assignment(
             envelope.assignment_id,
@@ -767,6 +1611,18 @@ class MultimodalGradingPipeline:
             assignment_normalized_score=assign.assignment_normalized_score,
             review_status=assign.review_status.value,
         )
+        token_usage = sum_token_usage(
+            o.stage_artifacts.get("token_usage") for o in chunk_outcomes
+        )
+        prompt_tokens = token_usage["prompt_tokens"]
+        wf(
+            "token_usage",
+            **token_usage,
+            cached_prompt_ratio=round(token_usage["cached_prompt_tokens"] / prompt_tokens, 4)
+            if prompt_tokens
+            else 0.0,
+        )
+        assign.stage_artifacts["token_usage"] = token_usage
         assign.stage_artifacts["pipeline_audit"] = art.stages
         assign.stage_artifacts["agentic_workflow"] = workflow
         art.append("output", {"score": assign.assignment_normalized_score})
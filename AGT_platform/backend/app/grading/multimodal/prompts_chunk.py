@@ -130,8 +130,23 @@ def build_chunk_grading_prompt(
     task_description: str = "",
     answer_key_text: str = "",
     dataset_context_text: str = "",
+    reference_grade: dict[str, Any] | None = None,
+    answer_key_excerpt: bool = False,
 ) -> str:
-    """Construct user message: task + optional answer key + rubric + chunk + strict instructions."""
+    """
+    Construct user message: task + optional answer key + rubric + chunk + strict instructions.
+
+    Keys are ordered so that everything constant for the assignment (``instructions``,
+    ``output_schema_hint``, ``task_description``, ``reference_answer_key``,
+    ``matched_dataset_preview``) comes first: every chunk of a submission — and every submission
+    of an assignment — then shares a byte-identical prompt prefix that provider-side prompt
+    caching can reuse. Per-chunk notes go to ``chunk_instructions`` after that prefix.
+
+    ``reference_grade`` (cohort mode) is the consensus grade of a near-identical response from
+    the same cohort, offered for confirmation. ``answer_key_excerpt`` marks ``answer_key_text`` as
+    a per-chunk excerpt of the key
+    (:func:`~app.grading.multimodal.answer_key_chunk_enrich.assemble_answer_key_context`).
+    """
     rubric = {
         "rubric_type": chunk.rubric_type.value if chunk.rubric_type else None,
         "rows": chunk.rubric_rows,
@@ -162,6 +177,7 @@ def build_chunk_grading_prompt(
         "Evidence: use a verbatim substring from the student's answer in this chunk (quote), ",
         "not a grader paraphrase.",
     ]
+    chunk_instr_parts: list[str] = []
     matched_ak = ""
     ev0 = chunk.evidence or {}
     trio = ev0.get("trio") if isinstance(ev0.get("trio"), dict) else {}
@@ -186,59 +202,86 @@ def build_chunk_grading_prompt(
             if code_reference_matches_student(student=student_code, reference=ak[:cap_cmp]):
                 exact_scaffolded = True
 
-    if ak:
+    if ak and answer_key_excerpt:
+        instr_parts.append(
+            "\nAn excerpt of the reference answer key (the section aligned to this question and "
+            "the most related sections) is provided under reference_answer_key. "
+            "Use it to judge correctness and depth as described in the system prompt; "
+            "the student need not match it exactly."
+        )
+    elif ak:
         instr_parts.append(
             "\nA reference answer key is provided under reference_answer_key. "
             "Use it to judge correctness and depth as described in the system prompt; "
             "the student need not match it exactly."
         )
-    if matched_ak:
+    if ds:
         instr_parts.append(
-            "\n**matched_answer_key_for_question** is the instructor / reference material "
+            "\nA matched dataset preview is provided under matched_dataset_preview. "
+            "Use it only as factual context for interpreting the student’s outputs; "
+            "it is not part of the student’s submission."
+        )
+    if matched_ak:
+        chunk_instr_parts.append(
+            "**matched_answer_key_for_question** is the instructor / reference material "
             "segment aligned to **this** question (same numbering as chunk.question_id when possible). "
             "Prefer it over the global key when both appear; it may omit unrelated parts of the key."
         )
     if trio_ak:
-        instr_parts.append(
-            "\n**trio_reference_answer_for_this_chunk** (when present) is the answer-key line(s) "
+        chunk_instr_parts.append(
+            "**trio_reference_answer_for_this_chunk** (when present) is the answer-key line(s) "
             "paired with this chunk’s trio extraction. If the student response satisfies it "
             "(including one-line / minimal keys), award full applicable credit for correctness "
             "and do not treat brevity as missing depth or evidence when the task only required that output."
         )
-    if ds:
-        instr_parts.append(
-            "\nA matched dataset preview is provided under matched_dataset_preview. "
-            "Use it only as factual context for interpreting the student’s outputs; "
-            "it is not part of the student’s submission."
-        )
     if ak or matched_ak or trio_ak:
-        instr_parts.append(
-            "\nAnswer-key grounding: for **each** criterion, both **reasoning** and "
+        grounding = (
+            "Answer-key grounding: for **each** criterion, both **reasoning** and "
             "**justification** must explicitly relate the student’s evidence to the "
             "reference material in this payload (``reference_answer_key``, "
             "``matched_answer_key_for_question``, and/or ``trio_reference_answer_for_this_chunk``), "
             "e.g. where the submission agrees or diverges. Do not leave the reference unused "
             "when it applies to that criterion."
         )
+        # With a global key the note is assignment-constant; otherwise it depends on the chunk.
+        if ak:
+            instr_parts.append("\n" + grounding)
+        else:
+            chunk_instr_parts.append(grounding)
+    if reference_grade:
+        chunk_instr_parts.append(
+            "**reference_grade_for_similar_response** is the consensus grade of a near-identical "
+            "response to this question from another student. If this response merits the same "
+            "scores, return them; where it differs in substance, grade those rows independently."
+        )
     if exact_scaffolded:
-        instr_parts.append(
-            "\n``exact_scaffolded_code_matches_reference`` is **true**: the student’s code "
+        chunk_instr_parts.append(
+            "``exact_scaffolded_code_matches_reference`` is **true**: the student’s code "
             "matches the instructor reference for this chunk. Follow the system prompt: "
             "output **raw_score = max_points** for **every** row in ``rubric.rows`` (all four "
             "scaffolded criteria including Edge Case Awareness)."
         )
+    # Assignment-constant prefix first (see docstring); per-chunk fields after.
     payload: dict[str, Any] = {
         "instructions": "".join(instr_parts),
-        "task_description": task_description or "(see assignment brief in LMS)",
-        "chunk": chunk_dict,
-        "rubric": rubric,
         "output_schema_hint": OUTPUT_SCHEMA_HINT,
+        "task_description": task_description or "(see assignment brief in LMS)",
     }
     max_chars = 24_000
     if ak:
         payload["reference_answer_key"] = ak[:max_chars] if len(ak) > max_chars else ak
         if len(ak) > max_chars:
             payload["reference_answer_key_truncated"] = True
+        if answer_key_excerpt:
+            payload["reference_answer_key_excerpt"] = True
+    if ds:
+        payload["matched_dataset_preview"] = ds[:max_chars] if len(ds) > max_chars else ds
+        if len(ds) > max_chars:
+            payload["matched_dataset_preview_truncated"] = True
+    payload["rubric"] = rubric
+    if chunk_instr_parts:
+        payload["chunk_instructions"] = "\n".join(chunk_instr_parts)
+    payload["chunk"] = chunk_dict
     if matched_ak:
         cap_q = min(max_chars, 16_000)
         payload["matched_answer_key_for_question"] = (
@@ -253,10 +296,84 @@ def build_chunk_grading_prompt(
         )
         if len(trio_ak) > cap_t:
             payload["trio_reference_answer_for_this_chunk_truncated"] = True
-    if ds:
-        payload["matched_dataset_preview"] = ds[:max_chars] if len(ds) > max_chars else ds
-        if len(ds) > max_chars:
-            payload["matched_dataset_preview_truncated"] = True
     if exact_scaffolded:
         payload["exact_scaffolded_code_matches_reference"] = True
+    if reference_grade:
+        payload["reference_grade_for_similar_response"] = reference_grade
+    return json.dumps(payload, ensure_ascii=True, indent=2)
+
+
+SYSTEM_BATCH_CHUNK_GRADER = (
+    SYSTEM_CHUNK_GRADER
+    + """
+
+BATCH MODE — when the user payload has a ``chunks`` array:
+- Each entry is one independent question chunk with its own ``chunk``, references and notes.
+  Apply every rule above to each entry separately; never let one chunk's evidence, references
+  or score affect another's.
+- Return one JSON object ``{"results": [...]}`` with **exactly one** result per entry, in the
+  same order. Each result has ``chunk_id`` (copied verbatim from the entry) plus the per-chunk
+  keys described above (``rubric_type``, ``criterion_scores``, ``criterion_justifications``,
+  ``confidence_note``, ``review_flag``)."""
+)
+
+# Per-chunk prompt keys that stay assignment-wide (shared once) in a batched request.
+_BATCH_SHARED_KEYS = frozenset(
+    {
+        "instructions",
+        "output_schema_hint",
+        "task_description",
+        "reference_answer_key",
+        "reference_answer_key_truncated",
+        "matched_dataset_preview",
+        "matched_dataset_preview_truncated",
+        "rubric",
+    }
+)
+_SINGLE_CHUNK_LEAD = "Grade this single chunk. Output one JSON object.\n"
+
+
+def build_batch_grading_prompt(
+    chunks: list[GradingChunk],
+    *,
+    task_description: str = "",
+    answer_key_text: str = "",
+    dataset_context_text: str = "",
+) -> str:
+    """
+    One user message grading several chunks that share a rubric (chunk packing).
+
+    Each chunk's payload is built by :func:`build_chunk_grading_prompt`; the assignment-wide
+    keys (instructions, schema hint, task, answer key, dataset preview, rubric) are emitted once
+    and the remaining per-chunk keys go to one ``chunks`` entry each, keyed by ``chunk_id``.
+    """
+    shared: dict[str, Any] = {}
+    entries: list[dict[str, Any]] = []
+    for chunk in chunks:
+        single = json.loads(
+            build_chunk_grading_prompt(
+                chunk,
+                task_description=task_description,
+                answer_key_text=answer_key_text,
+                dataset_context_text=dataset_context_text,
+            )
+        )
+        entry: dict[str, Any] = {"chunk_id": chunk.chunk_id}
+        for key, value in single.items():
+            if key in _BATCH_SHARED_KEYS:
+                shared.setdefault(key, value)
+            else:
+                entry[key] = value
+        entries.append(entry)
+    instructions = str(shared.get("instructions") or "")
+    if instructions.startswith(_SINGLE_CHUNK_LEAD):
+        instructions = instructions[len(_SINGLE_CHUNK_LEAD) :]
+    shared["instructions"] = (
+        f"Grade each of the {len(entries)} entries in chunks independently. Output one JSON "
+        'object {"results": [...]}: exactly one result per entry, in the same order, each with '
+        "the entry's chunk_id and the per-chunk keys below.\n" + instructions
+    )
+    payload = {k: shared[k] for k in shared if k != "rubric"}
+    payload["rubric"] = shared.get("rubric")
+    payload["chunks"] = entries
     return json.dumps(payload, ensure_ascii=True, indent=2)
@@ -53,13 +53,17 @@ import os
 from typing import Any
 
 from app.config import Config
-from app.grading.artifact_plaintext import artifacts_to_concatenated_plain
+from app.grading.embedding_vector import EmbeddingVector, compact_embedding
 from app.grading.llm_router import (
     OpenAIJsonClient,
     anthropic_multimodal_structure_client,
+    maybe_cache_chat_client,
     openai_multimodal_grading_model,
 )
-from app.grading.rag_embeddings import compute_submission_embedding
+from app.grading.rag_embeddings import (
+    compute_submission_embedding,
+    compute_submission_embeddings,
+)
 
 from app.grading.submission_chunks import reflow_pdf_sections_in_plaintext
 
@@ -139,24 +143,15 @@ def _multimodal_structure_chat_client(
         )
         return None, ""
     mid = openai_multimodal_grading_model(cfg)
-    return OpenAIJsonClient(key, mid), f"openai:{mid}"
+    label = f"openai:{mid}"
+    return maybe_cache_chat_client(OpenAIJsonClient(key, mid), label, cfg), label
 
 
 def _qa_segment_plaintext(envelope: IngestionEnvelope) -> str:
     """Prefer decoded artifact text, then ``extracted_plaintext``; reflow PDF-style blocks."""
-    art_plain = ""
-    arts = envelope.artifacts or {}
-    if isinstance(arts, dict):
-        blob = artifacts_to_concatenated_plain(
-            {
-                k: bytes(v)
-                for k, v in arts.items()
-                if isinstance(v, (bytes, bytearray)) and v
-            }
-        )
-        if blob.strip():
-            art_plain = blob.strip()
-    base = art_plain or (envelope.extracted_plaintext or "").strip()
+    if envelope.parsed.concatenated_plaintext().strip():
+        return envelope.parsed.reflowed_plaintext().strip()
+    base = (envelope.extracted_plaintext or "").strip()
     if not base:
         return ""
     return reflow_pdf_sections_in_plaintext(base)
@@ -297,7 +292,7 @@ def _chunks_use_openai_trio_rag_frontload(chunks: list[GradingChunk]) -> bool:
 
 def enrich_chunks_with_rag_embeddings(chunks: list[GradingChunk], cfg: Config) -> None:
     """
-    Attach per-unit vectors via :func:`compute_submission_embedding`.
+    Attach per-unit vectors via :func:`compute_submission_embeddings` (one batched pass).
 
     When ``evidence["trio"]`` is present (question / student_response / answer_key_segment),
     embed each non-empty segment into ``trio_segment_rag`` and set ``rag_embedding_bundle``
@@ -315,6 +310,9 @@ def enrich_chunks_with_rag_embeddings(chunks: list[GradingChunk], cfg: Config) -
         ak_cap = _env_int("MULTIMODAL_TRIO_EMBED_ANSWER_KEY_MAX_CHARS", 16_000)
         canon_cap = _env_int("MULTIMODAL_TRIO_CANONICAL_EMBED_MAX_CHARS", 24_000)
 
+    # Collect every text first so the whole submission is embedded in one batched pass.
+    texts: list[str] = []
+    plans: list[tuple[GradingChunk, dict[str, Any], dict[str, int] | None, int]] = []
     for ch in chunks:
         ev = dict(ch.evidence or {})
         trio = ev.get("trio")
@@ -322,36 +320,18 @@ def enrich_chunks_with_rag_embeddings(chunks: list[GradingChunk], cfg: Config) -
             tq = str(trio.get("question") or "").strip()[:q_cap]
             tsr = str(trio.get("student_response") or "").strip()[:r_cap]
             tak = str(trio.get("answer_key_segment") or "").strip()[:ak_cap]
-            seg_rag: dict[str, Any] = {}
+            seg_idx: dict[str, int] = {}
             for key, blob in (
                 ("question", tq),
                 ("student_response", tsr),
                 ("answer_key_segment", tak),
             ):
                 b = (blob or "").strip()
-                if not b:
-                    seg_rag[key] = {
-                        "embedding_dimension": 0,
-                        "embedding_source": "empty_segment_skipped",
-                        "embedding": [],
-                    }
-                    continue
-                try:
-                    vec, src = compute_submission_embedding(b, cfg)
-                except Exception:
-                    _log.warning(
-                        "trio_segment_rag embed failed (%s / %s)",
-                        ch.chunk_id,
-                        key,
-                        exc_info=True,
-                    )
-                    vec, src = [], "embedding_failed"
-                seg_rag[key] = {
-                    "embedding_dimension": len(vec),
-                    "embedding_source": src,
-                    "embedding": vec,
-                }
-            ev["trio_segment_rag"] = seg_rag
+                if b:
+                    seg_idx[key] = len(texts)
+                    texts.append(b)
+                else:
+                    seg_idx[key] = -1
             canon_parts: list[str] = []
             if tq:
                 canon_parts.append(f"[QUESTION]\n{tq}")
@@ -362,34 +342,82 @@ def enrich_chunks_with_rag_embeddings(chunks: list[GradingChunk], cfg: Config) -
             canon = "\n\n".join(canon_parts).strip()
             if not canon:
                 canon = (ch.extracted_text or "").strip() or " "
-            canon = canon[:canon_cap]
-            try:
-                vec2, src2 = compute_submission_embedding(canon, cfg)
-            except Exception:
-                _log.warning(
-                    "trio canonical rag_embedding_bundle failed (%s)",
-                    ch.chunk_id,
-                    exc_info=True,
-                )
-                vec2, src2 = [], "embedding_failed"
+            plans.append((ch, ev, seg_idx, len(texts)))
+            texts.append(canon[:canon_cap])
+            continue
+        plans.append((ch, ev, None, len(texts)))
+        texts.append((ch.extracted_text or "").strip() or " ")
+
+    vectors = _embed_texts(texts, cfg)
+
+    for ch, ev, seg_idx, bundle_idx in plans:
+        bundle = vectors[bundle_idx]
+        if seg_idx is None:
+            if bundle is None:
+                _log.warning("rag_embedding_bundle failed (%s)", ch.chunk_id)
+            vec, src = bundle or ([], "embedding_failed")
             ev["rag_embedding_bundle"] = {
-                "embedding_dimension": len(vec2),
-                "embedding_source": f"trio_canonical:{src2}",
-                "embedding": vec2,
+                "embedding_dimension": len(vec),
+                "embedding_source": src,
+                "embedding": compact_embedding(vec),
             }
             ch.evidence = ev
             continue
-
-        txt = (ch.extracted_text or "").strip() or " "
-        vec, src = compute_submission_embedding(txt, cfg)
+        seg_rag: dict[str, Any] = {}
+        for key, i in seg_idx.items():
+            if i < 0:
+                seg_rag[key] = {
+                    "embedding_dimension": 0,
+                    "embedding_source": "empty_segment_skipped",
+                    "embedding": [],
+                }
+                continue
+            hit = vectors[i]
+            if hit is None:
+                _log.warning("trio_segment_rag embed failed (%s / %s)", ch.chunk_id, key)
+            vec, src = hit or ([], "embedding_failed")
+            seg_rag[key] = {
+                "embedding_dimension": len(vec),
+                "embedding_source": src,
+                "embedding": compact_embedding(vec),
+            }
+        ev["trio_segment_rag"] = seg_rag
+        if bundle is None:
+            _log.warning("trio canonical rag_embedding_bundle failed (%s)", ch.chunk_id)
+        vec2, src2 = bundle or ([], "embedding_failed")
         ev["rag_embedding_bundle"] = {
-            "embedding_dimension": len(vec),
-            "embedding_source": src,
-            "embedding": vec,
+            "embedding_dimension": len(vec2),
+            "embedding_source": f"trio_canonical:{src2}",
+            "embedding": compact_embedding(vec2),
         }
         ch.evidence = ev
 
 
+def _embed_texts(texts: list[str], cfg: Config) -> list[tuple[list[float], str] | None]:
+    """
+    One :func:`compute_submission_embeddings` pass; if the batch raises, embed text by text
+    (``None`` where a single text still fails).
+    """
+    if not texts:
+        return []
+    try:
+        return list(compute_submission_embeddings(texts, cfg))
+    except Exception:
+        _log.warning(
+            "batched RAG embedding failed for %d text(s); embedding one by one",
+            len(texts),
+            exc_info=True,
+        )
+    out: list[tuple[list[float], str] | None] = []
+    for t in texts:
+        try:
+            out.append(compute_submission_embedding(t, cfg))
+        except Exception:
+            _log.debug("single-text RAG embedding failed", exc_info=True)
+            out.append(None)
+    return out
+
+
 def _get_ipynb_bytes(envelope: IngestionEnvelope) -> bytes | None:
     """Return raw ipynb bytes from the envelope's artifacts, if present."""
     raw = (envelope.artifacts or {}).get("ipynb")
@@ -609,6 +637,7 @@ def build_multimodal_grading_chunks(
             nb_mod = Modality.NOTEBOOK
         nb_chunks = build_notebook_qa_chunks(
             ipynb_bytes,
+            notebook=envelope.parsed.notebook(),
             assignment_id=envelope.assignment_id,
             student_id=envelope.student_id,
             modality=nb_mod,
@@ -660,6 +689,8 @@ def sanitize_evidence_for_grading_prompt(evidence: dict[str, Any]) -> dict[str,
                     out[k][sk] = sv
         elif k in ("_openai_trio_rag_frontload", "_claude_structured_units"):
             continue
+        elif isinstance(v, EmbeddingVector):
+            out[k] = {"embedding_dimension": len(v), "embedding_omitted_from_prompt": True}
         elif k == "trio" and isinstance(v, dict):
             tq = _optional_positive_int_env("MULTIMODAL_TRIO_PROMPT_QUESTION_MAX_CHARS")
             tr = _optional_positive_int_env("MULTIMODAL_TRIO_PROMPT_RESPONSE_MAX_CHARS")
@@ -0,0 +1,129 @@
+"""
+Rule-based grading that runs before the LLM for chunks whose grade is not in doubt.
+
+With ``MULTIMODAL_RULE_GRADER`` on (default), :meth:`MultimodalGradingPipeline._grade_chunk` asks
+:func:`rule_grade_chunk` after rubric routing:
+
+- ``exact_reference`` — a scaffolded-programming chunk whose code is the same executable line
+  sequence as the answer-key segment aligned to it (``trio.answer_key_segment`` or
+  ``answer_key_unit.snippet``; see
+  :func:`app.grading.multimodal.answer_key_chunk_enrich.code_reference_equivalent`) gets full
+  credit on every rubric row.
+- ``empty_response`` — a chunk with no student text left after
+  :func:`app.grading.multimodal.notebook_chunker.strip_assignment_placeholder_lines` gets zero.
+
+The decision is a single synthetic sample (``model_id`` ``rule:<name>``) with templated
+justifications that goes through the normal parse → aggregate → review path, so downstream
+consumers see an ordinary outcome. Each short-circuit is recorded in
+``stage_artifacts["rule_grading"]`` and counted in the ``rule_grading`` workflow phase.
+
+The global answer key is deliberately not used for ``exact_reference``: a one-line answer that
+merely appears somewhere in the key is left to the LLM (the prompt still flags it).
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any
+
+from .answer_key_chunk_enrich import code_reference_equivalent, grading_student_code_blob
+from .notebook_chunker import strip_assignment_placeholder_lines
+from .prompts_chunk import _is_programming_scaffolded_rubric
+from .schemas import GradingChunk, SampledChunkGrade
+
+
+def rule_grader_enabled(cfg: Any | None) -> bool:
+    return bool(getattr(cfg, "MULTIMODAL_RULE_GRADER", True)) if cfg is not None else True
+
+
+@dataclass(frozen=True)
+class RuleDecision:
+    rule: str  # "exact_reference" | "empty_response"
+    full_credit: bool
+    detail: dict[str, Any]
+
+    @property
+    def model_id(self) -> str:
+        return f"rule:{self.rule}"
+
+
+def _aligned_reference(chunk: GradingChunk) -> tuple[str, str]:
+    ev = chunk.evidence or {}
+    trio = ev.get("trio")
+    if isinstance(trio, dict) and str(trio.get("answer_key_segment") or "").strip():
+        return "trio.answer_key_segment", str(trio["answer_key_segment"])
+    unit = ev.get("answer_key_unit")
+    if isinstance(unit, dict) and str(unit.get("snippet") or "").strip():
+        return "answer_key_unit.snippet", str(unit["snippet"])
+    return "", ""
+
+
+def rule_grade_chunk(chunk: GradingChunk) -> RuleDecision | None:
+    """Deterministic decision for a routed chunk, or ``None`` when the LLM must grade it."""
+    if not chunk.rubric_rows:
+        return None
+    student = strip_assignment_placeholder_lines(grading_student_code_blob(chunk))
+    if not student.strip():
+        return RuleDecision("empty_response", False, {})
+    if _is_programming_scaffolded_rubric(chunk):
+        source, reference = _aligned_reference(chunk)
+        if reference and code_reference_equivalent(student=student, reference=reference):
+            return RuleDecision("exact_reference", True, {"reference": source})
+    return None
+
+
+def _max_points(row: dict[str, Any]) -> float:
+    try:
+        return float(row.get("max_points") or row.get("max_score") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def rule_sample(chunk: GradingChunk, decision: RuleDecision) -> SampledChunkGrade:
+    """The decision as one unparsed sample in the grader's JSON output schema."""
+    student = strip_assignment_placeholder_lines(grading_student_code_blob(chunk))
+    quote = student.strip().splitlines()[0] if student.strip() else ""
+    rows: list[dict[str, Any]] = []
+    for row in chunk.rubric_rows or []:
+        name = str(row.get("name") or "").strip()
+        if not name:
+            continue
+        mx = _max_points(row)
+        if decision.full_credit:
+            reasoning = (
+                "The student's code is the same executable line sequence as the reference "
+                f"answer aligned to this question ({decision.detail.get('reference')}); "
+                "full credit."
+            )
+        else:
+            reasoning = "No student response remains for this question after removing "
+            reasoning += "template placeholder lines; no credit."
+        rows.append(
+            {
+                "name": name,
+                "raw_score": mx if decision.full_credit else 0.0,
+                "max_points": mx,
+                "evidence": quote,
+                "reasoning": reasoning,
+                "justification": reasoning,
+            }
+        )
+    total = sum(r["raw_score"] for r in rows)
+    out_of = sum(r["max_points"] for r in rows)
+    payload = {
+        "rubric_type": chunk.rubric_type.value if chunk.rubric_type else None,
+        "criterion_scores": rows,
+        "criterion_justifications": [r["justification"] for r in rows],
+        "total_score": total,
+        "normalized_score": (total / out_of) if out_of > 0 else 0.0,
+        "confidence_note": f"rule-based ({decision.rule})",
+        "review_flag": False,
+    }
+    return SampledChunkGrade(
+        model_id=decision.model_id,
+        sample_index=0,
+        raw_text=json.dumps(payload, ensure_ascii=True),
+        parsed=None,
+        parse_ok=False,
+    )
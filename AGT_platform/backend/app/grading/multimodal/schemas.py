@@ -150,6 +150,9 @@ class SampledChunkGrade:
     parse_ok: bool
     parse_warnings: list[str] = field(default_factory=list)
     cluster_key: str | None = None
+    # Provider token usage of the request that produced this sample (see ``_openai_usage``);
+    # a multi-choice request is attributed to its first choice. Empty when not reported.
+    usage: dict[str, int] = field(default_factory=dict)
 
 
 @dataclass
@@ -136,3 +136,66 @@ def aggregate_assignment_confidence(
         "per_chunk": per_chunk,
     }
     return float(agg), trace
+
+
+def confidence_band(
+    ai_confidence: float,
+    *,
+    auto_accept_min: float,
+    caution_min: float,
+) -> str:
+    """``auto_accept`` / ``caution`` / ``flagged`` using the same cut points as review routing."""
+    c = float(ai_confidence)
+    if c >= float(auto_accept_min):
+        return "auto_accept"
+    if c >= float(caution_min):
+        return "caution"
+    return "flagged"
+
+
+def _band_for_counts(counts: list[int], auto_accept_min: float, caution_min: float) -> str:
+    summary = summarize_chunk_confidence_from_counts(
+        {str(i): n for i, n in enumerate(counts) if n > 0}
+    )
+    return confidence_band(
+        summary["ai_confidence"], auto_accept_min=auto_accept_min, caution_min=caution_min
+    )
+
+
+def adaptive_sampling_can_stop(
+    cluster_counts: dict[str, int],
+    *,
+    remaining: int,
+    auto_accept_min: float,
+    caution_min: float,
+    rule: str = "unanimous",
+    min_valid: int = 2,
+) -> bool:
+    """
+    Early-stopping rule for adaptive k-sampling (``remaining`` = samples still in the budget).
+
+    * ``unanimous``: at least ``min_valid`` valid samples, all in one cluster (confidence 1.0).
+    * ``band_stable``: at least ``min_valid`` valid samples **and** the confidence band is the
+      same under every extreme completion of the remaining budget — all into the leading
+      cluster, all into the runner-up or a new cluster, or each into its own new cluster.
+    """
+    counts = sorted((int(v) for v in cluster_counts.values() if int(v) > 0), reverse=True)
+    valid = sum(counts)
+    if valid < max(1, int(min_valid)):
+        return False
+    r = max(0, int(remaining))
+    if r == 0:
+        return True
+    if (rule or "").strip().lower() != "band_stable":
+        return len(counts) == 1
+    current = _band_for_counts(counts, auto_accept_min, caution_min)
+    scenarios: list[list[int]] = [
+        [counts[0] + r] + counts[1:],
+        counts + [r],
+        counts + [1] * r,
+    ]
+    if len(counts) > 1:
+        scenarios.append([counts[0], counts[1] + r] + counts[2:])
+    return all(
+        _band_for_counts(sc, auto_accept_min, caution_min) == current for sc in scenarios
+    )
@@ -12,12 +12,14 @@ so the pipeline skips relabeling that would overwrite the alignment.
 
 from __future__ import annotations
 
+import hashlib
 import logging
 import os
 import re
 
 from app.config import Config
 
+from .assignment_context import cached_assignment_value
 from .ingestion import IngestionEnvelope
 from .notebook_chunker import (
     build_notebook_qa_chunks,
@@ -164,6 +166,7 @@ def _try_scaffold_blank_student_alignment(
         modality=nb_mod,
         task_type=task,
         max_grading_units=max_grading_units,
+        student_notebook=envelope.parsed.notebook(),
     )
     if not scaffold_try:
         return None
@@ -248,13 +251,25 @@ def build_blank_template_aligned_notebook_chunks(
     if hit:
         return hit
 
-    template_chunks = build_notebook_question_boundary_chunks(
-        blank_ipynb_bytes,
-        assignment_id=aid,
-        student_id="__blank_template__",
-        modality=nb_mod,
-        task_type=task,
-        max_grading_units=max_units,
+    # The blank parse is the same for every student (shared, read-only list when cached).
+    template_chunks = cached_assignment_value(
+        cfg,
+        "blank_template_units",
+        (
+            aid,
+            hashlib.sha256(blank_ipynb_bytes).hexdigest(),
+            nb_mod.value,
+            task.value,
+            max_units,
+        ),
+        lambda: build_notebook_question_boundary_chunks(
+            blank_ipynb_bytes,
+            assignment_id=aid,
+            student_id="__blank_template__",
+            modality=nb_mod,
+            task_type=task,
+            max_grading_units=max_units,
+        ),
     )
     if not template_chunks:
         _log.info("blank template: no question-boundary units from blank ipynb")
@@ -262,6 +277,7 @@ def build_blank_template_aligned_notebook_chunks(
 
     student_chunks = build_notebook_qa_chunks(
         student_bytes,
+        notebook=envelope.parsed.notebook(),
         assignment_id=aid,
         student_id=sid,
         modality=nb_mod,
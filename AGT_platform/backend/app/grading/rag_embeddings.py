@@ -1,5 +1,9 @@
 """
 Build embedding vectors for submission text (SentenceTransformers, OpenAI, Ollama, or hash fallback).
+
+:func:`compute_submission_embeddings` embeds many texts per backend call (``RAG_EMBED_BATCH_SIZE``
+inputs per request / ``encode`` batch) and applies the same per-text fallback order as
+:func:`compute_submission_embedding`: texts a backend could not embed move on to the next one.
 """
 
 from __future__ import annotations
@@ -15,6 +19,7 @@ import numpy as np
 import requests
 
 from ..config import Config
+from .embedding_cache import embedding_cache_key, embedding_model_id, get_embedding_cache
 
 _log = logging.getLogger(__name__)
 
@@ -51,9 +56,9 @@ def _openai_embed_snippet(snippet: str, cfg: Config) -> tuple[list[float], str]
         or "text-embedding-3-small"
     )
     try:
-        from openai import OpenAI
+        from .llm_router import shared_openai_sdk_client
 
-        client = OpenAI(api_key=key)
+        client = shared_openai_sdk_client(key)
         resp = client.embeddings.create(
             model=model,
             input=snippet[:8000],
@@ -116,62 +121,336 @@ def sentence_transformers_embed_text(text: str, cfg: Config) -> tuple[list[float
 
 
 def _ollama_embed_snippet(snippet: str, cfg: Config) -> tuple[list[float], str] | None:
+    """
+    ``POST /api/embed`` (current Ollama) first, then legacy ``/api/embeddings``: the same order
+    as the batched :func:`_ollama_embed_snippets`, so one text gets the same vector either way.
+    """
     base = (cfg.INTERNAL_OLLAMA_URL or cfg.OLLAMA_BASE_URL or "").strip().rstrip("/")
     embed_model = (getattr(cfg, "OLLAMA_EMBEDDINGS_MODEL", "") or "nomic-embed-text").strip()
     if not base or not snippet:
         return None
     try:
         r = requests.post(
-            f"{base}/api/embeddings",
-            json={"model": embed_model, "prompt": snippet},
+            f"{base}/api/embed",
+            json={"model": embed_model, "input": snippet},
             timeout=120,
         )
-        if r.status_code == 404:
-            _log.debug(
-                "Ollama /api/embeddings 404; trying /api/embed or fallbacks (install embedding model or use RAG_EMBED_ORDER=openai_first)"
-            )
-            raise RuntimeError("legacy /api/embeddings not available")
         r.raise_for_status()
-        emb = r.json().get("embedding")
-        if isinstance(emb, list) and emb:
-            return [float(x) for x in emb], f"ollama:{embed_model}"
+        data = r.json()
+        vecs = data.get("embeddings")
+        if isinstance(vecs, list) and vecs and isinstance(vecs[0], list):
+            return [float(x) for x in vecs[0]], f"ollama_embed:{embed_model}"
+        emb_one = data.get("embedding")
+        if isinstance(emb_one, list) and emb_one:
+            return [float(x) for x in emb_one], f"ollama_embed:{embed_model}"
     except requests.HTTPError as exc:
         if exc.response is not None and exc.response.status_code == 404:
-            _log.debug("Ollama /api/embeddings HTTP 404; trying /api/embed")
+            _log.debug("Ollama /api/embed HTTP 404; trying legacy /api/embeddings")
         else:
-            _log.warning("Ollama embedding failed (%s); trying /api/embed or fallbacks", exc)
+            _log.warning("Ollama /api/embed failed (%s); trying legacy /api/embeddings", exc)
     except Exception as exc:
-        if "404" in str(exc).lower() or "not available" in str(exc).lower():
-            _log.debug("Ollama embedding path unavailable (%s); trying /api/embed or fallbacks", exc)
-        else:
-            _log.warning("Ollama embedding failed (%s); trying /api/embed or fallbacks", exc)
+        _log.debug("Ollama /api/embed failed (%s); trying legacy /api/embeddings", exc)
     try:
         r2 = requests.post(
-            f"{base}/api/embed",
-            json={"model": embed_model, "input": snippet},
+            f"{base}/api/embeddings",
+            json={"model": embed_model, "prompt": snippet},
             timeout=120,
         )
         r2.raise_for_status()
-        data = r2.json()
-        vecs = data.get("embeddings")
-        if isinstance(vecs, list) and vecs and isinstance(vecs[0], list):
-            return [float(x) for x in vecs[0]], f"ollama_embed:{embed_model}"
-        emb_one = data.get("embedding")
-        if isinstance(emb_one, list) and emb_one:
-            return [float(x) for x in emb_one], f"ollama_embed:{embed_model}"
+        emb = r2.json().get("embedding")
+        if isinstance(emb, list) and emb:
+            return [float(x) for x in emb], f"ollama:{embed_model}"
     except requests.HTTPError as exc:
         if exc.response is not None and exc.response.status_code == 404:
             _log.debug(
-                "Ollama /api/embed HTTP 404 — use a current Ollama build with embed API, "
+                "Ollama /api/embeddings HTTP 404 — install the embedding model, "
                 "or set OPENAI_API_KEY and RAG_EMBED_ORDER=openai_first (default when key is set)"
             )
         else:
-            _log.warning("Ollama /api/embed failed (%s); trying other fallbacks", exc)
+            _log.warning("Ollama embedding failed (%s); trying other fallbacks", exc)
     except Exception as exc:
-        _log.debug("Ollama /api/embed failed (%s); trying other fallbacks", exc)
+        _log.debug("Ollama /api/embeddings failed (%s); trying other fallbacks", exc)
     return None
 
 
+_HASH_DIMENSIONS = 256
+_HASH_SOURCE = "deterministic_hash:sha256×256"
+
+EmbeddingHit = tuple[list[float], str]
+
+
+def _embed_batch_size(cfg: Config) -> int:
+    try:
+        n = int(getattr(cfg, "RAG_EMBED_BATCH_SIZE", 64) or 64)
+    except (TypeError, ValueError):
+        n = 64
+    return max(1, min(n, 2048))
+
+
+def sentence_transformers_embed_texts(
+    texts: list[str], cfg: Config
+) -> list[EmbeddingHit | None]:
+    """
+    Batched :func:`sentence_transformers_embed_text`: one ``encode`` over all non-empty texts.
+
+    Entries are ``None`` for empty texts or when the model cannot be loaded / encode fails.
+    """
+    out: list[EmbeddingHit | None] = [None] * len(texts)
+    idx = [i for i, t in enumerate(texts) if (t or "").strip()]
+    if not idx:
+        return out
+    model_name = (getattr(cfg, "SENTENCE_TRANSFORMERS_MODEL", "") or "").strip()
+    if not model_name:
+        model_name = "all-MiniLM-L6-v2"
+    try:
+        model = _get_sentence_transformer(model_name)
+    except Exception as exc:
+        _log.warning("SentenceTransformer load failed for %r: %s", model_name, exc)
+        return out
+    try:
+        mat = model.encode(
+            [texts[i].strip() for i in idx],
+            batch_size=_embed_batch_size(cfg),
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+    except Exception as exc:
+        _log.warning("SentenceTransformer batch encode failed: %s", exc)
+        return out
+    arr = np.asarray(mat, dtype=np.float64)
+    if arr.ndim == 1:
+        arr = arr.reshape(1, -1)
+    if arr.shape[0] != len(idx) or arr.shape[1] < 8:
+        return out
+    src = f"sentence_transformers:{model_name}"
+    for i, row in zip(idx, arr):
+        out[i] = (row.tolist(), src)
+    return out
+
+
+def _openai_embed_snippets(snippets: list[str], cfg: Config) -> list[EmbeddingHit | None]:
+    """OpenAI Embeddings API with up to ``RAG_EMBED_BATCH_SIZE`` inputs per request."""
+    out: list[EmbeddingHit | None] = [None] * len(snippets)
+    key = (getattr(cfg, "OPENAI_API_KEY", "") or "").strip()
+    idx = [i for i, s in enumerate(snippets) if s]
+    if not key or not idx:
+        return out
+    model = (
+        (getattr(cfg, "OPENAI_TRIO_RAG_EMBEDDING_MODEL", "") or "").strip()
+        or "text-embedding-3-small"
+    )
+    from .llm_router import shared_openai_sdk_client
+
+    client = shared_openai_sdk_client(key)
+    bs = _embed_batch_size(cfg)
+    for start in range(0, len(idx), bs):
+        part = idx[start : start + bs]
+        try:
+            resp = client.embeddings.create(
+                model=model,
+                input=[snippets[i][:8000] for i in part],
+            )
+            for pos, d in enumerate(resp.data):
+                j = int(getattr(d, "index", pos))
+                if 0 <= j < len(part):
+                    out[part[j]] = (list(d.embedding), f"openai:{model}")
+        except Exception as exc:
+            _log.warning(
+                "OpenAI batch embedding failed for %d input(s) (%s); trying other fallbacks",
+                len(part),
+                exc,
+            )
+    return out
+
+
+def _ollama_embed_snippets(snippets: list[str], cfg: Config) -> list[EmbeddingHit | None]:
+    """
+    Ollama ``/api/embed`` with a list ``input`` per batch; inputs it does not return
+    go through :func:`_ollama_embed_snippet` one by one (``/api/embed``, then legacy
+    ``/api/embeddings``).
+    """
+    out: list[EmbeddingHit | None] = [None] * len(snippets)
+    base = (
+        (getattr(cfg, "INTERNAL_OLLAMA_URL", "") or getattr(cfg, "OLLAMA_BASE_URL", "") or "")
+        .strip()
+        .rstrip("/")
+    )
+    embed_model = (getattr(cfg, "OLLAMA_EMBEDDINGS_MODEL", "") or "nomic-embed-text").strip()
+    idx = [i for i, s in enumerate(snippets) if s]
+    if not base or not idx:
+        return out
+    bs = _embed_batch_size(cfg)
+    for start in range(0, len(idx), bs):
+        part = idx[start : start + bs]
+        try:
+            r = requests.post(
+                f"{base}/api/embed",
+                json={"model": embed_model, "input": [snippets[i] for i in part]},
+                timeout=120,
+            )
+            r.raise_for_status()
+            vecs = r.json().get("embeddings")
+            if isinstance(vecs, list) and len(vecs) == len(part):
+                for i, v in zip(part, vecs):
+                    if isinstance(v, list) and v:
+                        out[i] = ([float(x) for x in v], f"ollama_embed:{embed_model}")
+        except Exception as exc:
+            _log.debug("Ollama batch /api/embed failed (%s); embedding one by one", exc)
+    for i in idx:
+        if out[i] is None:
+            out[i] = _ollama_embed_snippet(snippets[i], cfg)
+    return out
+
+
+def _embedding_backend(cfg: Config) -> str:
+    backend = (getattr(cfg, "RAG_EMBEDDING_BACKEND", "") or "sentence_transformers").strip().lower()
+    if backend not in ("ollama", "sentence_transformers", "openai"):
+        _log.warning("Unknown RAG_EMBEDDING_BACKEND=%r; using sentence_transformers", backend)
+        backend = "sentence_transformers"
+    return backend
+
+
+def _api_fallback_methods(cfg: Config) -> list[str]:
+    """OpenAI / Ollama order from ``RAG_EMBED_ORDER``, limited to configured services."""
+    order = (getattr(cfg, "RAG_EMBED_ORDER", "auto") or "auto").strip().lower()
+    key_ok = bool((getattr(cfg, "OPENAI_API_KEY", "") or "").strip())
+    base = (
+        (getattr(cfg, "INTERNAL_OLLAMA_URL", "") or getattr(cfg, "OLLAMA_BASE_URL", "") or "")
+        .strip()
+        .rstrip("/")
+    )
+    has_ollama = bool(base)
+
+    methods: list[str]
+    if order == "openai_only":
+        methods = ["openai"]
+    elif order == "ollama_only":
+        methods = ["ollama"]
+    elif order == "openai_first":
+        methods = ["openai", "ollama"]
+    elif order == "ollama_first":
+        methods = ["ollama", "openai"]
+    elif key_ok:
+        methods = ["openai", "ollama"]
+    else:
+        methods = ["ollama", "openai"]
+    return [
+        m for m in methods if (m == "openai" and key_ok) or (m == "ollama" and has_ollama)
+    ]
+
+
+def _batch_embedder(stage: str) -> Any:
+    if stage == "sentence_transformers":
+        return sentence_transformers_embed_texts
+    if stage == "openai":
+        return _openai_embed_snippets
+    return _ollama_embed_snippets
+
+
+def _cache_keys(snippets: list[str], cfg: Config) -> list[str]:
+    backend, model = embedding_model_id(cfg)
+    max_c = int(getattr(cfg, "RAG_EMBED_MAX_CHARS", 24000))
+    return [
+        embedding_cache_key(backend=backend, model=model, max_chars=max_c, text=s)
+        for s in snippets
+    ]
+
+
+def _primary_sources(cfg: Config) -> set[str]:
+    """Sources the configured backend produces (fallback backends give other vector spaces)."""
+    backend, model = embedding_model_id(cfg)
+    if backend != "ollama":
+        return {f"{backend}:{model}"}
+    methods = _api_fallback_methods(cfg)
+    if not methods:
+        return set()
+    if methods[0] == "openai":
+        openai_model = (
+            (getattr(cfg, "OPENAI_TRIO_RAG_EMBEDDING_MODEL", "") or "").strip()
+            or "text-embedding-3-small"
+        )
+        return {f"openai:{openai_model}"}
+    embed_model = (getattr(cfg, "OLLAMA_EMBEDDINGS_MODEL", "") or "nomic-embed-text").strip()
+    return {f"ollama:{embed_model}", f"ollama_embed:{embed_model}"}
+
+
+def is_primary_embedding_source(source: str, cfg: Config) -> bool:
+    """
+    True when ``source`` came from the configured backend. Vectors from a fallback backend (or the
+    deterministic hash) live in another space and must not be cached under the primary key.
+    """
+    return source in _primary_sources(cfg)
+
+
+def _cacheable(hit: EmbeddingHit, cfg: Config) -> bool:
+    return bool(hit[0]) and is_primary_embedding_source(hit[1], cfg)
+
+
+def compute_submission_embeddings(texts: list[str], cfg: Config) -> list[EmbeddingHit]:
+    """
+    Batched :func:`compute_submission_embedding`: one ``(vector, source)`` per input, in order.
+
+    Each backend stage embeds every still-missing text in batches of ``RAG_EMBED_BATCH_SIZE``;
+    texts it cannot embed fall through to the next stage exactly as in the single-text path,
+    ending with the deterministic hash. With ``RAG_EMBED_CACHE`` on, only cache misses reach
+    a backend (see :mod:`app.grading.embedding_cache`); only vectors from the configured backend
+    are cached, so a transient failure does not pin a fallback model's vector to the key.
+    """
+    max_c = int(getattr(cfg, "RAG_EMBED_MAX_CHARS", 24000))
+    snippets = [(t or "")[:max_c] for t in texts]
+    cache = get_embedding_cache(cfg)
+    if cache is None or not snippets:
+        return _embed_snippets_uncached(snippets, cfg)
+    keys = _cache_keys(snippets, cfg)
+    out: list[EmbeddingHit | None] = []
+    for k in keys:
+        hit = cache.get(k)
+        out.append(hit if hit is not None and _cacheable(hit, cfg) else None)
+    missing = [i for i, h in enumerate(out) if h is None]
+    if missing:
+        fresh = _embed_snippets_uncached([snippets[i] for i in missing], cfg)
+        for i, hit in zip(missing, fresh):
+            out[i] = hit
+            if _cacheable(hit, cfg):
+                cache.put(keys[i], hit[0], hit[1])
+    return [h for h in out if h is not None]
+
+
+def _embed_snippets_uncached(snippets: list[str], cfg: Config) -> list[EmbeddingHit]:
+    hits: list[EmbeddingHit | None] = [None] * len(snippets)
+    if not snippets:
+        return []
+
+    backend = _embedding_backend(cfg)
+    if backend == "openai":
+        stages = ["openai", "sentence_transformers"]
+    elif backend == "sentence_transformers":
+        stages = ["sentence_transformers", *_api_fallback_methods(cfg)]
+    else:
+        stages = _api_fallback_methods(cfg)
+
+    for n, stage in enumerate(stages):
+        pending = [i for i, h in enumerate(hits) if h is None]
+        if not pending:
+            break
+        for i, hit in zip(pending, _batch_embedder(stage)([snippets[i] for i in pending], cfg)):
+            if hit:
+                hits[i] = hit
+        if n == 0 and backend != "ollama" and any(hits[i] is None for i in pending):
+            _log.warning(
+                "RAG_EMBEDDING_BACKEND=%s failed for %d of %d text(s); falling back to %s",
+                backend,
+                sum(1 for i in pending if hits[i] is None),
+                len(pending),
+                "sentence_transformers" if backend == "openai" else "OpenAI/Ollama per RAG_EMBED_ORDER",
+            )
+
+    return [
+        h if h is not None else (deterministic_hash_embedding(snippets[i], _HASH_DIMENSIONS), _HASH_SOURCE)
+        for i, h in enumerate(hits)
+    ]
+
+
 def compute_submission_embedding(text: str, cfg: Config) -> tuple[list[float], str]:
     """
     Return (vector, source_description).
@@ -184,14 +463,26 @@ def compute_submission_embedding(text: str, cfg: Config) -> tuple[list[float], s
     - ``openai``: OpenAI Embeddings API (``OPENAI_TRIO_RAG_EMBEDDING_MODEL``, requires
       ``OPENAI_API_KEY``); on failure falls back to sentence_transformers then hash.
     - ``ollama``: legacy behavior — order from ``RAG_EMBED_ORDER`` (OpenAI + Ollama), then hash.
+
+    With ``RAG_EMBED_CACHE`` on, vectors are served from :mod:`app.grading.embedding_cache`.
     """
     max_c = int(getattr(cfg, "RAG_EMBED_MAX_CHARS", 24000))
     snippet = (text or "")[:max_c]
+    cache = get_embedding_cache(cfg)
+    if cache is None:
+        return _embed_snippet_uncached(snippet, cfg)
+    key = _cache_keys([snippet], cfg)[0]
+    cached = cache.get(key)
+    if cached is not None and _cacheable(cached, cfg):
+        return cached
+    hit = _embed_snippet_uncached(snippet, cfg)
+    if _cacheable(hit, cfg):
+        cache.put(key, hit[0], hit[1])
+    return hit
 
-    backend = (getattr(cfg, "RAG_EMBEDDING_BACKEND", "") or "sentence_transformers").strip().lower()
-    if backend not in ("ollama", "sentence_transformers", "openai"):
-        _log.warning("Unknown RAG_EMBEDDING_BACKEND=%r; using sentence_transformers", backend)
-        backend = "sentence_transformers"
+
+def _embed_snippet_uncached(snippet: str, cfg: Config) -> EmbeddingHit:
+    backend = _embedding_backend(cfg)
 
     if backend == "openai":
         hit = _openai_embed_snippet(snippet, cfg)
@@ -203,8 +494,7 @@ def compute_submission_embedding(text: str, cfg: Config) -> tuple[list[float], s
         hit = sentence_transformers_embed_text(snippet, cfg)
         if hit:
             return hit
-        dim = 256
-        return deterministic_hash_embedding(snippet, dim), "deterministic_hash:sha256×256"
+        return deterministic_hash_embedding(snippet, _HASH_DIMENSIONS), _HASH_SOURCE
 
     if backend == "sentence_transformers":
         hit = sentence_transformers_embed_text(snippet, cfg)
@@ -215,37 +505,15 @@ def compute_submission_embedding(text: str, cfg: Config) -> tuple[list[float], s
             "OpenAI/Ollama per RAG_EMBED_ORDER"
         )
 
-    order = (getattr(cfg, "RAG_EMBED_ORDER", "auto") or "auto").strip().lower()
-    key_ok = bool((cfg.OPENAI_API_KEY or "").strip())
-    base = (cfg.INTERNAL_OLLAMA_URL or cfg.OLLAMA_BASE_URL or "").strip().rstrip("/")
-    has_ollama = bool(base)
-
-    methods: list[str]
-    if order == "openai_only":
-        methods = ["openai"]
-    elif order == "ollama_only":
-        methods = ["ollama"]
-    elif order == "openai_first":
-        methods = ["openai", "ollama"]
-    elif order == "ollama_first":
-        methods = ["ollama", "openai"]
-    elif key_ok:
-        methods = ["openai", "ollama"]
-    else:
-        methods = ["ollama", "openai"]
-
-    for m in methods:
-        if m == "openai" and key_ok:
+    for m in _api_fallback_methods(cfg):
+        if m == "openai":
             hit = _openai_embed_snippet(snippet, cfg)
-            if hit:
-                return hit
-        elif m == "ollama" and has_ollama:
+        else:
             hit = _ollama_embed_snippet(snippet, cfg)
-            if hit:
-                return hit
+        if hit:
+            return hit
 
-    dim = 256
-    return deterministic_hash_embedding(snippet, dim), "deterministic_hash:sha256×256"
+    return deterministic_hash_embedding(snippet, _HASH_DIMENSIONS), _HASH_SOURCE
 
 
 def save_rag_embedding_bundle(
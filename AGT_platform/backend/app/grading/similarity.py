@@ -0,0 +1,95 @@
+"""
+Vectorized cosine similarity for RAG embeddings (NumPy float32).
+
+Vectors are L2-normalized once into row matrices (:func:`unit_rows`), so cosine similarity is a
+plain dot product and query-vs-candidate scoring is one matrix product (:func:`cosine_matrix`,
+:func:`top_k`). Semantics match the list-based helpers these replace: empty vectors, zero
+vectors and dimension mismatches score ``0.0``.
+
+See ``scripts/bench_similarity.py`` for a micro-benchmark against the pure-Python loop.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Sequence
+
+import numpy as np
+
+VectorLike = Sequence[float] | np.ndarray
+
+
+def unit_rows(vectors: Sequence[VectorLike], *, dim: int | None = None) -> np.ndarray:
+    """
+    ``(n, dim)`` float32 matrix of L2-normalized rows.
+
+    ``dim`` defaults to the most common vector length; rows of another length (mixed embedding
+    fallbacks) and zero vectors become zero rows, i.e. cosine ``0.0`` against everything.
+    """
+    if dim is None:
+        lengths = Counter(len(v) for v in vectors if len(v))
+        dim = lengths.most_common(1)[0][0] if lengths else 1
+    mat = np.zeros((len(vectors), max(1, int(dim))), dtype=np.float32)
+    for i, v in enumerate(vectors):
+        if len(v) == mat.shape[1]:
+            mat[i] = np.asarray(v, dtype=np.float32)
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    return np.divide(mat, norms, out=np.zeros_like(mat), where=norms > 1e-12)
+
+
+def unit_vector(vector: VectorLike) -> np.ndarray:
+    """1-D float32 unit vector (zeros when the input norm is ~0)."""
+    return unit_rows([vector], dim=max(1, len(vector)))[0]
+
+
+def cosine(a: VectorLike, b: VectorLike) -> float:
+    """Cosine similarity of two vectors; ``0.0`` for empty, zero or mismatched vectors."""
+    if len(a) != len(b) or not len(a):
+        return 0.0
+    return float(np.dot(unit_vector(a), unit_vector(b)))
+
+
+def cosine_matrix(queries: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """
+    ``(n_queries, n_keys)`` cosine scores for **pre-normalized** row matrices
+    (see :func:`unit_rows`). Mismatched widths score ``0.0`` everywhere.
+    """
+    q = np.asarray(queries, dtype=np.float32)
+    k = np.asarray(keys, dtype=np.float32)
+    if q.ndim == 1:
+        q = q.reshape(1, -1)
+    if k.ndim == 1:
+        k = k.reshape(1, -1)
+    if q.shape[1] != k.shape[1]:
+        return np.zeros((q.shape[0], k.shape[0]), dtype=np.float32)
+    return q @ k.T
+
+
+def top_k(
+    queries: np.ndarray,
+    keys: np.ndarray,
+    k: int = 1,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Best ``k`` keys per query for pre-normalized matrices → ``(indices, scores)``, both shaped
+    ``(n_queries, min(k, n_keys))`` and sorted by descending score (ties keep the lower index).
+    """
+    scores = cosine_matrix(queries, keys)
+    kk = max(0, min(int(k), scores.shape[1]))
+    if kk == 0:
+        empty = np.zeros((scores.shape[0], 0))
+        return empty.astype(np.int64), empty.astype(np.float32)
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :kk]
+    return order, np.take_along_axis(scores, order, axis=1)
+
+
+def best_match(query: VectorLike, candidates: Sequence[VectorLike]) -> tuple[int, float]:
+    """``(index, cosine)`` of the best candidate for one query; ``(-1, -1.0)`` when empty."""
+    if not len(candidates):
+        return -1, -1.0
+    # Candidates are sized to the query, so a mismatched candidate scores 0.0.
+    dim = max(1, len(query))
+    mat = unit_rows(candidates, dim=dim)
+    q = unit_rows([query], dim=dim)
+    idx, sc = top_k(q, mat, 1)
+    return int(idx[0, 0]), float(sc[0, 0])
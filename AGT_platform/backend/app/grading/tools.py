@@ -1,7 +1,20 @@
 import io, json, subprocess, tempfile, os
+import hashlib
+import logging
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+
 import nbformat
 from pypdf import PdfReader
 
+from app.config import Config
+
+_log = logging.getLogger(__name__)
+
 
 def normalize_verticalized_pdf_text(text: str) -> str:
     """
@@ -59,26 +72,214 @@ def normalize_verticalized_pdf_text(text: str) -> str:
     return "\n\n".join(out_paras)
 
 
-def extract_text_from_pdf(pdf_bytes: bytes) -> str:
+def _pdf_page_text(page) -> str:
     """
-    Extract text from PDF bytes. Tries default extraction, then layout mode when output is tiny
-    (common with some LaTeX / scan-like PDFs in pypdf).
+    One page's text. Tries default extraction, then layout mode when output is tiny (common with
+    some LaTeX / scan-like PDFs in pypdf).
     """
+    text = (page.extract_text() or "").strip()
+    if len(text) < 30:
+        try:
+            alt = page.extract_text(extraction_mode="layout")  # type: ignore[call-arg]
+        except TypeError:
+            alt = ""
+        if isinstance(alt, str) and len(alt.strip()) > len(text):
+            text = alt.strip()
+    return text
+
+
+def _extract_pdf_page_range(pdf_bytes: bytes, start: int, stop: int) -> list[str]:
+    """Text of pages ``[start, stop)``; runs in :func:`_pdf_process_pool` workers."""
     reader = PdfReader(io.BytesIO(pdf_bytes))
-    parts: list[str] = []
-    for page in reader.pages:
-        text = (page.extract_text() or "").strip()
-        if len(text) < 30:
-            try:
-                alt = page.extract_text(extraction_mode="layout")  # type: ignore[call-arg]
-            except TypeError:
-                alt = ""
-            if isinstance(alt, str) and len(alt.strip()) > len(text):
-                text = alt.strip()
-        parts.append(text)
-    joined = "\n\n".join(p for p in parts if p).strip()
+    return [_pdf_page_text(reader.pages[i]) for i in range(start, stop)]
+
+
+def pdf_pages_to_text(pages: list[str]) -> str:
+    """Join :func:`extract_pdf_pages` output and reflow one-token-per-line extractions."""
+    joined = "\n\n".join(p for p in pages if p).strip()
     return normalize_verticalized_pdf_text(joined)
 
+
+@dataclass(frozen=True)
+class PdfExtraction:
+    """
+    Per-page text of one PDF. ``text`` is exactly what :func:`extract_text_from_pdf` returns;
+    ``page_spans[i]`` is page ``i + 1``'s ``(start, end)`` in ``joined`` (the pages joined
+    before :func:`normalize_verticalized_pdf_text`; equal to ``text`` unless it reflowed).
+    """
+
+    sha256: str
+    pages: tuple[str, ...]
+    page_spans: tuple[tuple[int, int], ...]
+    joined: str
+    text: str
+
+    def page_for_offset(self, offset: int) -> int | None:
+        """1-based page containing ``offset`` of ``joined``; ``None`` outside any page."""
+        for number, (start, end) in enumerate(self.page_spans, start=1):
+            if start <= offset < end:
+                return number
+        return None
+
+
+def _pdf_extraction(sha256: str, pages: list[str]) -> PdfExtraction:
+    spans: list[tuple[int, int]] = []
+    pos = 0
+    for text in pages:
+        if not text:
+            spans.append((pos, pos))
+            continue
+        if pos:
+            pos += 2  # "\n\n" separator, as in pdf_pages_to_text
+        spans.append((pos, pos + len(text)))
+        pos += len(text)
+    joined = "\n\n".join(p for p in pages if p)
+    return PdfExtraction(
+        sha256=sha256,
+        pages=tuple(pages),
+        page_spans=tuple(spans),
+        joined=joined,
+        text=pdf_pages_to_text(pages),
+    )
+
+
+_pdf_cache_lock = threading.Lock()
+_pdf_cache: OrderedDict[str, PdfExtraction] = OrderedDict()
+_pdf_pool_lock = threading.Lock()
+_pdf_pool: ProcessPoolExecutor | None = None
+_pdf_pool_workers = 0
+_pdf_pool_disabled = False
+
+
+def _pdf_process_pool(workers: int) -> ProcessPoolExecutor | None:
+    """
+    Process-wide extraction pool (``spawn`` workers, created on first use and rebuilt when
+    ``workers`` changes). ``None`` when pools are unavailable here, e.g. inside daemonic Celery
+    prefork children.
+    """
+    global _pdf_pool, _pdf_pool_workers
+    if _pdf_pool_disabled or multiprocessing.current_process().daemon:
+        return None
+    with _pdf_pool_lock:
+        if _pdf_pool is not None and _pdf_pool_workers != workers:
+            _pdf_pool.shutdown(wait=False)
+            _pdf_pool = None
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            _pdf_pool_workers = workers
+        return _pdf_pool
+
+
+def _reset_pdf_pool_after_fork() -> None:
+    """Forget the parent's pool in a forked child; its workers and queues belong to the parent."""
+    global _pdf_pool, _pdf_pool_workers, _pdf_pool_lock
+    _pdf_pool = None
+    _pdf_pool_workers = 0
+    _pdf_pool_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    # Shutting the inherited executor down from the child would signal the parent's workers.
+    os.register_at_fork(after_in_child=_reset_pdf_pool_after_fork)
+
+
+def _extract_pages_parallel(pdf_bytes: bytes, n_pages: int, workers: int) -> list[str] | None:
+    """
+    Contiguous page ranges across the pool, reassembled in page order; ``None`` on failure.
+    The pool is sized by ``workers``; short documents use fewer ranges, not a smaller pool.
+    """
+    step = -(-n_pages // min(workers, n_pages))
+    ranges = [(lo, min(lo + step, n_pages)) for lo in range(0, n_pages, step)]
+    try:
+        pool = _pdf_process_pool(workers)
+        if pool is None:
+            return None
+        futures = [pool.submit(_extract_pdf_page_range, pdf_bytes, lo, hi) for lo, hi in ranges]
+    except (OSError, RuntimeError, NotImplementedError) as e:
+        # Spawn failures, or a pool that is broken or shut down.
+        _disable_pdf_pool(e)
+        return None
+    try:
+        return [text for f in futures for text in f.result()]
+    except BrokenProcessPool as e:
+        _disable_pdf_pool(e)
+        return None
+    except Exception as e:
+        # This document failed in a worker (e.g. a pypdf error); the pool stays usable.
+        _log.warning(
+            "pdf_extract_parallel_failed; using serial extraction: %s: %s",
+            type(e).__name__,
+            e,
+        )
+        return None
+
+
+def _disable_pdf_pool(exc: BaseException) -> None:
+    """Stop using the process pool in this process; extraction continues on the serial path."""
+    global _pdf_pool, _pdf_pool_disabled
+    _log.warning(
+        "pdf_extract_pool_disabled; using serial extraction: %s: %s", type(exc).__name__, exc
+    )
+    with _pdf_pool_lock:
+        if _pdf_pool is not None:
+            _pdf_pool.shutdown(wait=False, cancel_futures=True)
+        _pdf_pool = None
+        _pdf_pool_disabled = True
+
+
+def extract_pdf_document(pdf_bytes: bytes, *, workers: int | None = None) -> PdfExtraction:
+    """
+    Per-page PDF text, cached by sha256 (``PDF_EXTRACT_CACHE_MAX_ENTRIES``).
+
+    With ``workers`` (default ``PDF_EXTRACT_WORKERS``) above 1 and at least
+    ``PDF_EXTRACT_MIN_PAGES`` pages, page ranges are extracted on a process pool; each page runs
+    the same :func:`_pdf_page_text` as the serial path, so the result is identical.
+    """
+    digest = hashlib.sha256(pdf_bytes).hexdigest()
+    cache_max = int(getattr(Config, "PDF_EXTRACT_CACHE_MAX_ENTRIES", 64) or 0)
+    if cache_max > 0:
+        with _pdf_cache_lock:
+            hit = _pdf_cache.get(digest)
+            if hit is not None:
+                _pdf_cache.move_to_end(digest)
+                return hit
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    n_pages = len(reader.pages)
+    if workers is None:
+        workers = int(getattr(Config, "PDF_EXTRACT_WORKERS", 0) or 0)
+    pages: list[str] | None = None
+    if min(workers, n_pages) > 1 and n_pages >= int(
+        getattr(Config, "PDF_EXTRACT_MIN_PAGES", 8) or 0
+    ):
+        pages = _extract_pages_parallel(pdf_bytes, n_pages, workers)
+    if pages is None:
+        pages = [_pdf_page_text(page) for page in reader.pages]
+    doc = _pdf_extraction(digest, pages)
+    if cache_max > 0:
+        with _pdf_cache_lock:
+            _pdf_cache[digest] = doc
+            while len(_pdf_cache) > cache_max:
+                _pdf_cache.popitem(last=False)
+    return doc
+
+
+def reset_pdf_extraction_cache() -> None:
+    """Drop cached extractions (tests)."""
+    with _pdf_cache_lock:
+        _pdf_cache.clear()
+
+
+def extract_pdf_pages(pdf_bytes: bytes) -> list[str]:
+    """Per-page text from PDF bytes (see :func:`extract_pdf_document`)."""
+    return list(extract_pdf_document(pdf_bytes).pages)
+
+
+def extract_text_from_pdf(pdf_bytes: bytes) -> str:
+    """Extract text from PDF bytes (see :func:`extract_pdf_document`)."""
+    return extract_pdf_document(pdf_bytes).text
+
 def extract_from_ipynb(ipynb_bytes: bytes) -> dict:
     nb = nbformat.reads(ipynb_bytes.decode("utf-8"), as_version=4)
     code, md = [], []
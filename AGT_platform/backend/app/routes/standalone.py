@@ -17,7 +17,8 @@ from app.config import Config
 from app.extensions import SessionLocal
 from app.models import StandaloneAIScore, StandaloneArtifact, StandaloneSubmission
 from app.rbac import get_user_from_token
-from app.storage import get_presigned_url, object_exists, presigned_put_url
+from app.routes.upload_checks import verify_objects_before_lock
+from app.storage import get_presigned_url, missing_object_keys, presigned_put_urls
 from app.tasks import grade_standalone_submission
 
 bp = Blueprint("standalone", __name__)
@@ -135,7 +136,7 @@ def standalone_start():
         db.add(sub)
         db.flush()
 
-        uploads_out = []
+        pending = []
         for spec in files:
             raw_name = (spec.get("filename") or "").strip()
             filename = secure_filename(raw_name)
@@ -151,21 +152,24 @@ def standalone_start():
                 filename=filename,
             )
             db.add(art)
-            db.flush()
-            url = presigned_put_url(cfg, key, content_type)
-            uploads_out.append(
-                {
-                    "artifact_id": art.id,
-                    "s3_key": key,
-                    "upload_url": url,
-                    "content_type": content_type,
-                }
-            )
+            pending.append((art, content_type))
 
-        if not uploads_out:
+        if not pending:
             db.rollback()
             return jsonify({"error": "no valid files"}), 400
 
+        db.flush()
+        urls = presigned_put_urls(cfg, [(art.s3_key, ct) for art, ct in pending])
+        uploads_out = [
+            {
+                "artifact_id": art.id,
+                "s3_key": art.s3_key,
+                "upload_url": url,
+                "content_type": content_type,
+            }
+            for (art, content_type), url in zip(pending, urls)
+        ]
+
         db.commit()
         db.refresh(sub)
         log_event(
@@ -197,6 +201,17 @@ def standalone_finalize(submission_id: int):
     cfg = Config()
     db = SessionLocal()
     try:
+        verified, missing_key = verify_objects_before_lock(
+            db,
+            cfg,
+            StandaloneSubmission,
+            submission_id,
+            lambda pre: _can_mutate_standalone(pre, user),
+            ("uploading", "uploaded"),
+        )
+        if missing_key:
+            return jsonify({"error": f"missing object: {missing_key}"}), 400
+
         sub = (
             db.query(StandaloneSubmission)
             .options(selectinload(StandaloneSubmission.artifacts))
@@ -231,9 +246,11 @@ def standalone_finalize(submission_id: int):
         if sub.status not in ("uploading", "uploaded"):
             return jsonify({"error": f"invalid state: {sub.status}"}), 409
 
-        for art in sub.artifacts:
-            if not object_exists(cfg, art.s3_key):
-                return jsonify({"error": f"missing object: {art.s3_key}"}), 400
+        missing = missing_object_keys(
+            cfg, [art.s3_key for art in sub.artifacts if art.s3_key not in verified]
+        )
+        if missing:
+            return jsonify({"error": f"missing object: {missing[0]}"}), 400
 
         sub.status = "uploaded"
         sub.updated_at = datetime.utcnow()
@@ -373,7 +390,7 @@ def standalone_presign_context_files(submission_id: int):
         if len(sub.artifacts) + len(files) > _MAX_FILES:
             return jsonify({"error": f"at most {_MAX_FILES} files per submission"}), 400
 
-        uploads_out = []
+        pending = []
         for spec in files:
             raw_name = (spec.get("filename") or "").strip()
             filename = secure_filename(raw_name)
@@ -392,21 +409,24 @@ def standalone_presign_context_files(submission_id: int):
                 filename=filename,
             )
             db.add(art)
-            db.flush()
-            url = presigned_put_url(cfg, key, content_type)
-            uploads_out.append(
-                {
-                    "artifact_id": art.id,
-                    "s3_key": key,
-                    "upload_url": url,
-                    "content_type": content_type,
-                }
-            )
+            pending.append((art, content_type))
 
-        if not uploads_out:
+        if not pending:
             db.rollback()
             return jsonify({"error": "no valid files"}), 400
 
+        db.flush()
+        urls = presigned_put_urls(cfg, [(art.s3_key, ct) for art, ct in pending])
+        uploads_out = [
+            {
+                "artifact_id": art.id,
+                "s3_key": art.s3_key,
+                "upload_url": url,
+                "content_type": content_type,
+            }
+            for (art, content_type), url in zip(pending, urls)
+        ]
+
         db.commit()
         log_event(
             user["id"],
@@ -434,6 +454,17 @@ def standalone_enqueue_grading(submission_id: int):
     cfg = Config()
     db = SessionLocal()
     try:
+        verified, missing_key = verify_objects_before_lock(
+            db,
+            cfg,
+            StandaloneSubmission,
+            submission_id,
+            lambda pre: _can_mutate_standalone(pre, user),
+            ("uploaded",),
+        )
+        if missing_key:
+            return jsonify({"error": f"missing object: {missing_key}"}), 400
+
         sub = (
             db.query(StandaloneSubmission)
             .options(selectinload(StandaloneSubmission.artifacts))
@@ -459,9 +490,11 @@ def standalone_enqueue_grading(submission_id: int):
         if sub.status != "uploaded":
             return jsonify({"error": f"expected status uploaded, got {sub.status}"}), 409
 
-        for art in sub.artifacts:
-            if not object_exists(cfg, art.s3_key):
-                return jsonify({"error": f"missing object: {art.s3_key}"}), 400
+        missing = missing_object_keys(
+            cfg, [art.s3_key for art in sub.artifacts if art.s3_key not in verified]
+        )
+        if missing:
+            return jsonify({"error": f"missing object: {missing[0]}"}), 400
 
         sub.status = "queued"
         sub.grading_dispatch_at = datetime.utcnow()
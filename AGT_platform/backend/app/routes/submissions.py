@@ -17,7 +17,8 @@ from app.config import Config
 from app.extensions import SessionLocal
 from app.models import AIScore, Assignment, Enrollment, Submission, SubmissionArtifact
 from app.rbac import require_auth
-from app.storage import object_exists, presigned_put_url, upload_from_werkzeug_file
+from app.routes.upload_checks import verify_objects_before_lock
+from app.storage import missing_object_keys, presigned_put_urls, upload_from_werkzeug_file
 from app.tasks import grade_submission
 
 bp = Blueprint("submissions", __name__)
@@ -76,7 +77,7 @@ def direct_upload_start():
         db.flush()
 
         prefix = cfg.UPLOADS_S3_PREFIX.rstrip("/")
-        uploads_out = []
+        pending = []
         for spec in files:
             raw_name = (spec.get("filename") or "").strip()
             filename = secure_filename(raw_name)
@@ -89,21 +90,24 @@ def direct_upload_start():
                 submission_id=sub.id, kind=kind, s3_key=key
             )
             db.add(art)
-            db.flush()
-            url = presigned_put_url(cfg, key, content_type)
-            uploads_out.append(
-                {
-                    "artifact_id": art.id,
-                    "s3_key": key,
-                    "upload_url": url,
-                    "content_type": content_type,
-                }
-            )
+            pending.append((art, content_type))
 
-        if not uploads_out:
+        if not pending:
             db.rollback()
             return jsonify({"error": "no valid files"}), 400
 
+        db.flush()
+        urls = presigned_put_urls(cfg, [(art.s3_key, ct) for art, ct in pending])
+        uploads_out = [
+            {
+                "artifact_id": art.id,
+                "s3_key": art.s3_key,
+                "upload_url": url,
+                "content_type": content_type,
+            }
+            for (art, content_type), url in zip(pending, urls)
+        ]
+
         db.commit()
         db.refresh(sub)
         log_event(
@@ -135,6 +139,17 @@ def direct_upload_finalize(submission_id: int):
         if user["role"] not in _SUBMITTER_ROLES:
             return jsonify({"error": "submission not permitted for this role"}), 403
 
+        verified, missing_key = verify_objects_before_lock(
+            db,
+            cfg,
+            Submission,
+            submission_id,
+            lambda pre: pre.student_id == user["id"],
+            ("uploading", "uploaded"),
+        )
+        if missing_key:
+            return jsonify({"error": f"missing object: {missing_key}"}), 400
+
         sub = (
             db.query(Submission)
             .options(selectinload(Submission.artifacts))
@@ -171,9 +186,11 @@ def direct_upload_finalize(submission_id: int):
         if sub.status not in ("uploading", "uploaded"):
             return jsonify({"error": f"invalid state: {sub.status}"}), 409
 
-        for art in sub.artifacts:
-            if not object_exists(cfg, art.s3_key):
-                return jsonify({"error": f"missing object: {art.s3_key}"}), 400
+        missing = missing_object_keys(
+            cfg, [art.s3_key for art in sub.artifacts if art.s3_key not in verified]
+        )
+        if missing:
+            return jsonify({"error": f"missing object: {missing[0]}"}), 400
 
         sub.status = "uploaded"
         sub.updated_at = datetime.utcnow()
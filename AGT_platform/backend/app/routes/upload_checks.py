@@ -0,0 +1,46 @@
+"""
+Upload checks shared by the finalize / enqueue endpoints (course and standalone submissions).
+"""
+from __future__ import annotations
+
+from typing import Callable
+
+from sqlalchemy.orm import selectinload
+
+from app.config import Config
+from app.storage import missing_object_keys
+
+
+def verify_objects_before_lock(
+    db,
+    cfg: Config,
+    model,
+    submission_id: int,
+    may_mutate: Callable[[object], bool],
+    statuses: tuple[str, ...],
+) -> tuple[set[str], str | None]:
+    """
+    HEAD the submission's uploads before the caller takes its row lock: with many attachments the
+    checks take seconds, and the lock only has to cover the state transition. Only runs when
+    ``may_mutate(row)`` holds for a not-yet-dispatched ``model`` row in ``statuses``. Returns the
+    verified keys and the first missing key (if any); ends the read transaction.
+    """
+    pre = (
+        db.query(model)
+        .options(selectinload(model.artifacts))
+        .filter_by(id=submission_id)
+        .first()
+    )
+    verified: set[str] = set()
+    missing: list[str] = []
+    if (
+        pre is not None
+        and may_mutate(pre)
+        and pre.grading_dispatch_at is None
+        and pre.status in statuses
+    ):
+        keys = [art.s3_key for art in pre.artifacts]
+        missing = missing_object_keys(cfg, keys)
+        verified = set(keys)
+    db.rollback()
+    return verified, (missing[0] if missing else None)
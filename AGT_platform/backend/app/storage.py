@@ -2,15 +2,22 @@
 S3-compatible object storage via boto3.
 
 Works with AWS S3 (leave S3_ENDPOINT unset) or MinIO / other S3 APIs (set S3_ENDPOINT).
+Clients are built once per process and endpoint (see :func:`s3_client`) and reset after fork.
 
 Large uploads use multipart transfers (see TransferConfig). Uploads stream through a spooled
-temp file so memory stays bounded for big student/teacher files.
+temp file so memory stays bounded for big student/teacher files. Grading downloads go through
+:func:`fetch_objects`: concurrent on one client, sha256-checked while streaming.
 """
 from __future__ import annotations
 
+import hashlib
+import os
 import tempfile
+import threading
 import uuid
-from typing import BinaryIO, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Optional, Sequence
 
 import boto3
 from botocore.client import Config as BotoClientConfig
@@ -35,24 +42,76 @@ def _addressing_style(cfg: Config) -> str:
     return "path" if cfg.S3_ENDPOINT else "virtual"
 
 
+_RETRY_MODES = ("standard", "adaptive", "legacy")
+
+_s3_clients: dict[tuple, Any] = {}
+_s3_clients_lock = threading.Lock()
+
+
+def _client_settings(cfg: Config) -> tuple[int, str, int, float, float]:
+    mode = (getattr(cfg, "S3_RETRY_MODE", "") or "standard").strip().lower()
+    return (
+        int(getattr(cfg, "S3_MAX_POOL_CONNECTIONS", 32)),
+        mode if mode in _RETRY_MODES else "standard",
+        int(getattr(cfg, "S3_MAX_ATTEMPTS", 3)),
+        float(getattr(cfg, "S3_CONNECT_TIMEOUT_SEC", 10.0)),
+        float(getattr(cfg, "S3_READ_TIMEOUT_SEC", 60.0)),
+    )
+
+
+def _shared_client(cfg: Config, endpoint: str, addressing_style: str, use_ssl: bool):
+    """
+    Process-wide client per endpoint + credentials + tuning. boto3 clients are thread-safe once
+    built; building one (endpoint/model loading) is the expensive part, so it happens once.
+    """
+    settings = _client_settings(cfg)
+    region = cfg.AWS_REGION or cfg.S3_REGION or "us-east-1"
+    secret = cfg.S3_SECRET_KEY or ""
+    key = (
+        region,
+        endpoint,
+        addressing_style,
+        bool(use_ssl),
+        cfg.S3_ACCESS_KEY or "",
+        hashlib.sha256(secret.encode("utf-8")).hexdigest() if secret else "",
+        settings,
+    )
+    client = _s3_clients.get(key)
+    if client is not None:
+        return client
+    with _s3_clients_lock:
+        client = _s3_clients.get(key)
+        if client is not None:
+            return client
+        pool, retry_mode, attempts, connect_timeout, read_timeout = settings
+        kwargs: dict = {
+            "region_name": region,
+            "config": BotoClientConfig(
+                signature_version="s3v4",
+                s3={"addressing_style": addressing_style},
+                max_pool_connections=pool,
+                retries={"mode": retry_mode, "total_max_attempts": attempts},
+                connect_timeout=connect_timeout,
+                read_timeout=read_timeout,
+            ),
+            "use_ssl": use_ssl,
+        }
+        if cfg.S3_ACCESS_KEY:
+            kwargs["aws_access_key_id"] = cfg.S3_ACCESS_KEY
+        if secret:
+            kwargs["aws_secret_access_key"] = secret
+        if endpoint:
+            kwargs["endpoint_url"] = endpoint
+        # A private Session: the boto3 default session is not safe to build clients on from
+        # several threads at once.
+        client = boto3.session.Session().client("s3", **kwargs)
+        _s3_clients[key] = client
+        return client
+
+
 def s3_client(cfg: Config):
-    """Low-level boto3 S3 client (AWS or MinIO)."""
-    kwargs: dict = {
-        "region_name": cfg.AWS_REGION or cfg.S3_REGION or "us-east-1",
-        "config": BotoClientConfig(
-            signature_version="s3v4",
-            s3={"addressing_style": _addressing_style(cfg)},
-        ),
-    }
-    if cfg.S3_ACCESS_KEY:
-        kwargs["aws_access_key_id"] = cfg.S3_ACCESS_KEY
-    if cfg.S3_SECRET_KEY:
-        kwargs["aws_secret_access_key"] = cfg.S3_SECRET_KEY
-    if cfg.S3_ENDPOINT:
-        kwargs["endpoint_url"] = cfg.S3_ENDPOINT
-    use_ssl = cfg.S3_SECURE
-    kwargs["use_ssl"] = use_ssl
-    return boto3.client("s3", **kwargs)
+    """Low-level boto3 S3 client (AWS or MinIO); shared process-wide, safe across threads."""
+    return _shared_client(cfg, cfg.S3_ENDPOINT or "", _addressing_style(cfg), cfg.S3_SECURE)
 
 
 def s3_client_for_presign(cfg: Config):
@@ -63,24 +122,21 @@ def s3_client_for_presign(cfg: Config):
     ``minio``). Server-side S3 calls continue to use :func:`s3_client`.
     """
     ep = (cfg.S3_PRESIGN_ENDPOINT or cfg.S3_ENDPOINT or "").strip()
-    kwargs: dict = {
-        "region_name": cfg.AWS_REGION or cfg.S3_REGION or "us-east-1",
-        "config": BotoClientConfig(
-            signature_version="s3v4",
-            s3={"addressing_style": "path" if ep else _addressing_style(cfg)},
-        ),
-    }
-    if cfg.S3_ACCESS_KEY:
-        kwargs["aws_access_key_id"] = cfg.S3_ACCESS_KEY
-    if cfg.S3_SECRET_KEY:
-        kwargs["aws_secret_access_key"] = cfg.S3_SECRET_KEY
     if ep:
-        kwargs["endpoint_url"] = ep
-    if ep:
-        kwargs["use_ssl"] = ep.lower().startswith("https://")
-    else:
-        kwargs["use_ssl"] = cfg.S3_SECURE
-    return boto3.client("s3", **kwargs)
+        return _shared_client(cfg, ep, "path", ep.lower().startswith("https://"))
+    return _shared_client(cfg, "", _addressing_style(cfg), cfg.S3_SECURE)
+
+
+def reset_s3_clients() -> None:
+    """Drop shared clients (tests, credential rotation). Pooled sockets close when GC'd."""
+    global _s3_clients_lock
+    _s3_clients.clear()
+    _s3_clients_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    # Celery prefork children must not share the parent's connection pools.
+    os.register_at_fork(after_in_child=reset_s3_clients)
 
 
 def _upload_fileobj(
@@ -151,6 +207,74 @@ def get_object_bytes(cfg: Config, key: str) -> bytes:
     return r["Body"].read()
 
 
+_DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class ObjectDigestMismatch(ValueError):
+    """Downloaded bytes do not match the sha256 recorded for the object."""
+
+
+@dataclass(frozen=True)
+class FetchedObject:
+    """One downloaded object with the sha256 computed while it streamed in."""
+
+    key: str
+    sha256: str
+    data: bytes
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+
+def _fetch_object(client, bucket: str, key: str, expected_sha256: str | None) -> FetchedObject:
+    body = client.get_object(Bucket=bucket, Key=key)["Body"]
+    digest = hashlib.sha256()
+    parts: list[bytes] = []
+    try:
+        while True:
+            chunk = body.read(_DOWNLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            digest.update(chunk)
+            parts.append(chunk)
+    finally:
+        body.close()
+    sha = digest.hexdigest()
+    want = (expected_sha256 or "").strip().lower()
+    if want and want != sha:
+        raise ObjectDigestMismatch(f"sha256 mismatch for {key}: expected {want}, got {sha}")
+    return FetchedObject(key, sha, b"".join(parts))
+
+
+def fetch_objects(
+    cfg: Config,
+    items: Sequence[tuple[str, str | None]],
+    *,
+    client=None,
+    max_workers: int | None = None,
+) -> list[FetchedObject]:
+    """
+    Download ``(key, expected_sha256)`` pairs concurrently on one shared client (used by Celery
+    grading). Results keep input order. Bodies stream in 1 MiB chunks and are hashed on the way;
+    a non-empty expected digest that differs raises :class:`ObjectDigestMismatch` (unless
+    ``S3_DOWNLOAD_VERIFY_SHA256`` is off).
+    """
+    if not items:
+        return []
+    c = client if client is not None else s3_client(cfg)
+    verify = bool(getattr(cfg, "S3_DOWNLOAD_VERIFY_SHA256", True))
+    workers = max_workers or int(getattr(cfg, "S3_DOWNLOAD_CONCURRENCY", 4))
+    workers = max(1, min(workers, len(items)))
+
+    def one(item: tuple[str, str | None]) -> FetchedObject:
+        key, expected = item
+        return _fetch_object(c, cfg.S3_BUCKET, key, expected if verify else None)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s3-fetch") as pool:
+        return list(pool.map(one, items))
+
+
 def get_presigned_url(
     cfg: Config,
     key: str,
@@ -188,28 +312,85 @@ def presigned_put_url(
     Browser → S3 direct upload. Client must send the same Content-Type header on PUT.
     Keeps large files off the Flask host (production ingress is metadata + presign only).
     """
+    return presigned_put_urls(cfg, [(key, content_type)], expires)[0]
+
+
+def presigned_put_urls(
+    cfg: Config,
+    items: Sequence[tuple[str, str]],
+    expires: Optional[int] = None,
+) -> list[str]:
+    """
+    :func:`presigned_put_url` for many ``(key, content_type)`` pairs in one pass on one client.
+    Presigning is local signing (no network), so a batch costs one client lookup.
+    """
     exp = expires if expires is not None else cfg.S3_PRESIGN_PUT_EXPIRES
     client = s3_client_for_presign(cfg)
-    ct = content_type or "application/octet-stream"
-    return client.generate_presigned_url(
-        "put_object",
-        Params={
-            "Bucket": cfg.S3_BUCKET,
-            "Key": key,
-            "ContentType": ct,
-        },
-        ExpiresIn=exp,
-        HttpMethod="PUT",
-    )
+    return [
+        client.generate_presigned_url(
+            "put_object",
+            Params={
+                "Bucket": cfg.S3_BUCKET,
+                "Key": key,
+                "ContentType": content_type or "application/octet-stream",
+            },
+            ExpiresIn=exp,
+            HttpMethod="PUT",
+        )
+        for key, content_type in items
+    ]
 
 
-def object_exists(cfg: Config, key: str) -> bool:
-    """Return True if object is present (used to finalize direct uploads)."""
+@dataclass(frozen=True)
+class ObjectStat:
+    """HEAD result for one key; ``size``/``etag`` are ``None`` when the object is missing."""
+
+    key: str
+    exists: bool
+    size: int | None = None
+    etag: str | None = None
+
+
+def _head_object(client, bucket: str, key: str) -> ObjectStat:
     try:
-        s3_client(cfg).head_object(Bucket=cfg.S3_BUCKET, Key=key)
-        return True
+        r = client.head_object(Bucket=bucket, Key=key)
     except ClientError as e:
         code = e.response.get("Error", {}).get("Code", "")
         if code in ("404", "NoSuchKey", "NotFound", "404 Not Found"):
-            return False
+            return ObjectStat(key, False)
         raise
+    etag = r.get("ETag")
+    return ObjectStat(
+        key,
+        True,
+        size=r.get("ContentLength"),
+        etag=etag.strip('"') if isinstance(etag, str) else None,
+    )
+
+
+def object_exists(cfg: Config, key: str) -> bool:
+    """Return True if object is present (used to finalize direct uploads)."""
+    return _head_object(s3_client(cfg), cfg.S3_BUCKET, key).exists
+
+
+def head_objects(
+    cfg: Config,
+    keys: Sequence[str],
+    *,
+    max_workers: int | None = None,
+) -> list[ObjectStat]:
+    """HEAD ``keys`` concurrently (``S3_HEAD_CONCURRENCY`` at a time); results keep input order."""
+    if not keys:
+        return []
+    client = s3_client(cfg)
+    workers = max_workers or int(getattr(cfg, "S3_HEAD_CONCURRENCY", 8))
+    workers = max(1, min(workers, len(keys)))
+    if workers == 1:
+        return [_head_object(client, cfg.S3_BUCKET, key) for key in keys]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s3-head") as pool:
+        return list(pool.map(lambda key: _head_object(client, cfg.S3_BUCKET, key), keys))
+
+
+def missing_object_keys(cfg: Config, keys: Sequence[str]) -> list[str]:
+    """Keys from ``keys`` (in order) that are not in the bucket; checked concurrently."""
+    return [stat.key for stat in head_objects(cfg, keys) if not stat.exists]
@@ -2,6 +2,7 @@ import json
 import logging
 from datetime import datetime
 from types import SimpleNamespace
+from typing import Any
 
 from celery import Celery
 from sqlalchemy.orm import selectinload
@@ -9,6 +10,8 @@ from sqlalchemy.orm import selectinload
 from .config import Config
 from .extensions import SessionLocal, engine, init_db
 from .grading.multimodal.course_multimodal_runner import (
+    CohortSubmission,
+    run_db_cohort_multimodal_pipeline,
     run_db_submission_multimodal_pipeline,
     run_standalone_multimodal_pipeline,
 )
@@ -21,7 +24,7 @@ from .models import (
     StandaloneSubmission,
     Submission,
 )
-from .storage import get_object_bytes, s3_client
+from .storage import fetch_objects, s3_client
 
 celery_app = Celery(__name__)
 
@@ -32,6 +35,7 @@ celery_app.conf.broker_url = _cfg.REDIS_URL
 celery_app.conf.result_backend = _cfg.REDIS_URL
 celery_app.conf.task_routes = {
     "grade_submission": {"queue": "gpu"},
+    "grade_submission_cohort": {"queue": "gpu"},
     "grade_standalone_submission": {"queue": "gpu"},
 }
 # Bound prefetch so one worker does not hoard many large grading tasks in memory.
@@ -57,11 +61,242 @@ def _rationale_for_db(c: dict) -> str:
     return (c.get("rationale") or c.get("justification") or "").strip() or ""
 
 
+def _download_artifacts(cfg: Config, arts) -> list[bytes]:
+    """Artifact bodies in ``arts`` order, fetched concurrently and checked against ``sha256``."""
+    fetched = fetch_objects(cfg, [(art.s3_key, getattr(art, "sha256", None)) for art in arts])
+    return [obj.data for obj in fetched]
+
+
 def _ensure_db():
     if engine is None:
         init_db(Config().DATABASE_URL)
 
 
+def _filename_hint_from_s3_key(key: str) -> str:
+    part = (key or "").rsplit("/", 1)[-1]
+    if "_" in part:
+        return part.split("_", 1)[-1]
+    return part
+
+
+def _course_grading_inputs(
+    cfg: Config, sub: Submission, assignment: Assignment
+) -> tuple[Any, dict[str, bytes], str | None, str | None]:
+    """
+    Download ``sub``'s artifacts → ``(assignment_for_prompt, artifacts, rubric_text,
+    answer_key_text)`` for :func:`run_db_submission_multimodal_pipeline`.
+    """
+    artifacts: dict[str, bytes] = {}
+    rubric_ex = ""
+    answer_ex = ""
+    sub_arts = list(sub.artifacts)
+    for art, data in zip(sub_arts, _download_artifacts(cfg, sub_arts)):
+        fn_hint = _filename_hint_from_s3_key(art.s3_key)
+        if art.kind in ("rubric", "answer_key"):
+            ex = _excerpt_file_bytes(fn_hint, data)
+            if art.kind == "rubric":
+                rubric_ex = (rubric_ex + "\n\n" + ex).strip() if rubric_ex else ex
+            else:
+                answer_ex = (answer_ex + "\n\n" + ex).strip() if answer_ex else ex
+            continue
+        if art.kind.endswith("pdf"):
+            artifacts["pdf"] = data
+        if art.kind.endswith("txt"):
+            artifacts["txt"] = data
+        if art.kind.endswith("ipynb"):
+            artifacts["ipynb"] = data
+        if art.kind.endswith("py"):
+            artifacts["py"] = data
+        if art.kind.endswith("mp4"):
+            artifacts["mp4"] = data
+        if art.kind.endswith("zip"):
+            artifacts["zip"] = data
+        if art.kind.endswith("png"):
+            artifacts["png"] = data
+        if art.kind.endswith("jpg") or art.kind.endswith("jpeg"):
+            artifacts["jpg"] = data
+        if art.kind.endswith("docx"):
+            artifacts["docx"] = data
+
+    is_public_autograder = assignment.course_id is None
+    if is_public_autograder:
+        merged_rubric_parts = []
+        grt = getattr(assignment, "grader_rubric_text", None)
+        if grt and str(grt).strip():
+            merged_rubric_parts.append(str(grt).strip())
+        if rubric_ex:
+            merged_rubric_parts.append("Rubric (from uploaded file):\n" + rubric_ex.strip())
+        merged_rubric = "\n\n".join(merged_rubric_parts) if merged_rubric_parts else None
+
+        merged_ak_parts = []
+        gak = getattr(assignment, "grader_answer_key_text", None)
+        if gak and str(gak).strip():
+            merged_ak_parts.append(str(gak).strip())
+        if answer_ex:
+            merged_ak_parts.append("Answer key (from uploaded file):\n" + answer_ex.strip())
+        merged_ak = "\n\n".join(merged_ak_parts) if merged_ak_parts else None
+
+        instr = getattr(assignment, "grader_instructions", None)
+        desc_parts = []
+        base = (assignment.description or assignment.title or "").strip()
+        if base:
+            desc_parts.append(base)
+        if instr and str(instr).strip():
+            desc_parts.append("Instructor grading instructions:\n" + str(instr).strip())
+        merged_desc = "\n\n".join(desc_parts) if desc_parts else (assignment.title or "Submission")
+
+        assign_for_prompt = SimpleNamespace(
+            modality=assignment.modality,
+            rubric=assignment.rubric,
+            title=assignment.title,
+            description=merged_desc,
+        )
+    else:
+        merged_rubric_parts = []
+        if rubric_ex:
+            merged_rubric_parts.append(
+                "Rubric (from uploaded file):\n" + rubric_ex.strip()
+            )
+        merged_rubric = "\n\n".join(merged_rubric_parts) if merged_rubric_parts else None
+        merged_ak_parts = []
+        if answer_ex:
+            merged_ak_parts.append(
+                "Answer key (from uploaded file):\n" + answer_ex.strip()
+            )
+        merged_ak = "\n\n".join(merged_ak_parts) if merged_ak_parts else None
+        assign_for_prompt = assignment
+
+    return assign_for_prompt, artifacts, merged_rubric, merged_ak
+
+
+def _store_course_result(
+    cfg: Config, db, submission_id: int, assignment: Assignment, result: dict[str, Any]
+) -> None:
+    """Persist a grading dict: AI scores, final score / status, then the S3 grading report."""
+    _default_ml = f"openai:{(cfg.OPENAI_MODEL or 'gpt-4o-mini').strip()}"
+    model_used = (result.pop("_model_used", None) or _default_ml)[:200]
+    models_used = result.pop("_models_used", [model_used])
+    result.pop("_used_openai_arbitration", None)
+    result.pop("_pipeline_meta", None)
+    entropy_meta = result.pop("_entropy_meta", None)
+    token_usage = result.pop("_token_usage", None)
+
+    criteria = result.get("criteria", [])
+    overall = result.get("overall", {})
+    flags = set(result.get("flags", []))
+    mm_review = str(result.get("_assignment_review_status", "") or "").lower()
+    multimodal_needs_review = mm_review in ("caution", "flagged", "escalation")
+
+    # Idempotent persistence: delete prior AI scores for this submission then insert
+    db.query(AIScore).filter_by(submission_id=submission_id).delete()
+    for c in criteria:
+        db.add(
+            AIScore(
+                submission_id=submission_id,
+                criterion=c["name"],
+                score=c["score"],
+                confidence=c.get("confidence", 0.5),
+                rationale=_rationale_for_db(c),
+                evidence=_evidence_for_db(c.get("evidence")),
+                model=model_used,
+            )
+        )
+
+    sub = db.query(Submission).get(submission_id)
+    sub.final_score = overall.get("score", 0)
+    sub.final_feedback = overall.get("summary", "")
+    low_conf = any(float(c.get("confidence", 0)) < 0.70 for c in criteria)
+    ent_conf = overall.get("confidence_from_entropy")
+    try:
+        if ent_conf is not None and float(ent_conf) < 0.5:
+            low_conf = True
+    except (TypeError, ValueError):
+        pass
+    if low_conf or "needs_review" in flags or multimodal_needs_review:
+        sub.status = "needs_review"
+    else:
+        sub.status = "graded"
+    sub.updated_at = datetime.utcnow()
+    db.commit()
+
+    try:
+        sub_ref = db.query(Submission).get(submission_id)
+        if sub_ref and sub_ref.status in ("graded", "needs_review"):
+            report_key = f"grading-reports/course/{submission_id}/{submission_id}_report.json"
+            grading_report = {
+                "submission_id": submission_id,
+                "title": getattr(assignment, "title", None),
+                "status": sub_ref.status,
+                "final_score": float(sub_ref.final_score)
+                if sub_ref.final_score is not None
+                else None,
+                "final_feedback": sub_ref.final_feedback,
+                "model_used": model_used,
+                "models_used": models_used,
+                "graded_at": sub_ref.updated_at.isoformat()
+                if sub_ref.updated_at
+                else None,
+                "criteria": [
+                    {
+                        "criterion": c.get("name", ""),
+                        "score": c.get("score", 0),
+                        "confidence": c.get("confidence", 0.5),
+                        "rationale": _rationale_for_db(c),
+                    }
+                    for c in criteria
+                ],
+            }
+            if entropy_meta is not None:
+                grading_report["entropy_meta"] = entropy_meta
+            if token_usage is not None:
+                grading_report["token_usage"] = token_usage
+            s3_client(cfg).put_object(
+                Bucket=cfg.S3_GRADING_REPORTS_BUCKET,
+                Key=report_key,
+                Body=json.dumps(grading_report, indent=2).encode("utf-8"),
+                ContentType="application/json",
+            )
+            sub_ref.grading_report_s3_key = report_key
+            db.commit()
+    except Exception as e:
+        _log.error(
+            "Failed to upload grading report for submission %s: %s",
+            submission_id,
+            e,
+            exc_info=True,
+        )
+
+
+def _claim_course_submission(db, submission_id: int) -> Submission | None:
+    """
+    Move a queued submission to ``grading`` (row lock) and return it; ``None`` when another
+    worker already owns or finished it, or it is not ready (e.g. still uploading).
+    """
+    sub = (
+        db.query(Submission)
+        .options(selectinload(Submission.artifacts))
+        .filter_by(id=submission_id)
+        .with_for_update()
+        .first()
+    )
+    if not sub or sub.status != "queued":
+        db.rollback()
+        return None
+    sub.status = "grading"
+    sub.updated_at = datetime.utcnow()
+    db.commit()
+    return sub
+
+
+def _mark_course_error(db, submission_id: int) -> None:
+    db.rollback()
+    s2 = db.query(Submission).get(submission_id)
+    if s2 and s2.status == "grading":
+        s2.status = "error"
+        s2.updated_at = datetime.utcnow()
+        db.commit()
+
+
 @celery_app.task(name="grade_submission", bind=True, max_retries=2)
 def grade_submission(self, submission_id: int):
     """
@@ -73,122 +308,19 @@ def grade_submission(self, submission_id: int):
     db = SessionLocal()
     sub = None
     try:
-        sub = (
-            db.query(Submission)
-            .options(selectinload(Submission.artifacts))
-            .filter_by(id=submission_id)
-            .with_for_update()
-            .first()
-        )
-        if not sub:
-            return
-        # Another worker already owns or finished
-        if sub.status in ("grading", "graded", "needs_review"):
-            return
-        if sub.status == "error":
-            return
-        if sub.status == "deleted":
-            return
-        if sub.status != "queued":
-            # e.g. still uploading — do not grade
+        sub = _claim_course_submission(db, submission_id)
+        if sub is None:
             return
 
-        sub.status = "grading"
-        sub.updated_at = datetime.utcnow()
-        db.commit()
-
         assignment = db.query(Assignment).get(sub.assignment_id)
         if not assignment:
             sub.status = "error"
             db.commit()
             return
 
-        def _filename_hint_from_s3_key(key: str) -> str:
-            part = (key or "").rsplit("/", 1)[-1]
-            if "_" in part:
-                return part.split("_", 1)[-1]
-            return part
-
-        artifacts: dict = {}
-        rubric_ex = ""
-        answer_ex = ""
-        for art in sub.artifacts:
-            data = get_object_bytes(cfg, art.s3_key)
-            fn_hint = _filename_hint_from_s3_key(art.s3_key)
-            if art.kind in ("rubric", "answer_key"):
-                ex = _excerpt_file_bytes(fn_hint, data)
-                if art.kind == "rubric":
-                    rubric_ex = (rubric_ex + "\n\n" + ex).strip() if rubric_ex else ex
-                else:
-                    answer_ex = (answer_ex + "\n\n" + ex).strip() if answer_ex else ex
-                continue
-            if art.kind.endswith("pdf"):
-                artifacts["pdf"] = data
-            if art.kind.endswith("txt"):
-                artifacts["txt"] = data
-            if art.kind.endswith("ipynb"):
-                artifacts["ipynb"] = data
-            if art.kind.endswith("py"):
-                artifacts["py"] = data
-            if art.kind.endswith("mp4"):
-                artifacts["mp4"] = data
-            if art.kind.endswith("zip"):
-                artifacts["zip"] = data
-            if art.kind.endswith("png"):
-                artifacts["png"] = data
-            if art.kind.endswith("jpg") or art.kind.endswith("jpeg"):
-                artifacts["jpg"] = data
-            if art.kind.endswith("docx"):
-                artifacts["docx"] = data
-
-        is_public_autograder = assignment.course_id is None
-        if is_public_autograder:
-            merged_rubric_parts = []
-            grt = getattr(assignment, "grader_rubric_text", None)
-            if grt and str(grt).strip():
-                merged_rubric_parts.append(str(grt).strip())
-            if rubric_ex:
-                merged_rubric_parts.append("Rubric (from uploaded file):\n" + rubric_ex.strip())
-            merged_rubric = "\n\n".join(merged_rubric_parts) if merged_rubric_parts else None
-
-            merged_ak_parts = []
-            gak = getattr(assignment, "grader_answer_key_text", None)
-            if gak and str(gak).strip():
-                merged_ak_parts.append(str(gak).strip())
-            if answer_ex:
-                merged_ak_parts.append("Answer key (from uploaded file):\n" + answer_ex.strip())
-            merged_ak = "\n\n".join(merged_ak_parts) if merged_ak_parts else None
-
-            instr = getattr(assignment, "grader_instructions", None)
-            desc_parts = []
-            base = (assignment.description or assignment.title or "").strip()
-            if base:
-                desc_parts.append(base)
-            if instr and str(instr).strip():
-                desc_parts.append("Instructor grading instructions:\n" + str(instr).strip())
-            merged_desc = "\n\n".join(desc_parts) if desc_parts else (assignment.title or "Submission")
-
-            assign_for_prompt = SimpleNamespace(
-                modality=assignment.modality,
-                rubric=assignment.rubric,
-                title=assignment.title,
-                description=merged_desc,
-            )
-        else:
-            merged_rubric_parts = []
-            if rubric_ex:
-                merged_rubric_parts.append(
-                    "Rubric (from uploaded file):\n" + rubric_ex.strip()
-                )
-            merged_rubric = "\n\n".join(merged_rubric_parts) if merged_rubric_parts else None
-            merged_ak_parts = []
-            if answer_ex:
-                merged_ak_parts.append(
-                    "Answer key (from uploaded file):\n" + answer_ex.strip()
-                )
-            merged_ak = "\n\n".join(merged_ak_parts) if merged_ak_parts else None
-            assign_for_prompt = assignment
-
+        assign_for_prompt, artifacts, merged_rubric, merged_ak = _course_grading_inputs(
+            cfg, sub, assignment
+        )
         result = run_db_submission_multimodal_pipeline(
             cfg,
             assign_for_prompt,
@@ -199,103 +331,78 @@ def grade_submission(self, submission_id: int):
             rubric_text=merged_rubric,
             answer_key_text=merged_ak,
         )
-        _default_ml = f"openai:{(cfg.OPENAI_MODEL or 'gpt-4o-mini').strip()}"
-        model_used = (result.pop("_model_used", None) or _default_ml)[:200]
-        models_used = result.pop("_models_used", [model_used])
-        result.pop("_used_openai_arbitration", None)
-        result.pop("_pipeline_meta", None)
-        entropy_meta = result.pop("_entropy_meta", None)
+        _store_course_result(cfg, db, submission_id, assignment, result)
+    except Exception:
+        if sub:
+            _mark_course_error(db, submission_id)
+        else:
+            db.rollback()
+        raise
+    finally:
+        db.close()
 
-        criteria = result.get("criteria", [])
-        overall = result.get("overall", {})
-        flags = set(result.get("flags", []))
-        mm_review = str(result.get("_assignment_review_status", "") or "").lower()
-        multimodal_needs_review = mm_review in ("caution", "flagged", "escalation")
 
-        # Idempotent persistence: delete prior AI scores for this submission then insert
-        db.query(AIScore).filter_by(submission_id=sub.id).delete()
-        for c in criteria:
-            db.add(
-                AIScore(
-                    submission_id=sub.id,
-                    criterion=c["name"],
-                    score=c["score"],
-                    confidence=c.get("confidence", 0.5),
-                    rationale=_rationale_for_db(c),
-                    evidence=_evidence_for_db(c.get("evidence")),
-                    model=model_used,
+@celery_app.task(name="grade_submission_cohort", bind=True, max_retries=2)
+def grade_submission_cohort(self, submission_ids: list[int]):
+    """
+    Deadline-surge grading for many queued course submissions at once. Each is claimed like
+    :func:`grade_submission`; those of one assignment with the same uploaded rubric / answer-key
+    text are graded as one cohort (:func:`run_db_cohort_multimodal_pipeline`). A submission that
+    fails is marked ``error`` without affecting the rest.
+    """
+    _ensure_db()
+    cfg = Config()
+    db = SessionLocal()
+    groups: dict[tuple[int, str | None, str | None], list[tuple[CohortSubmission, Any]]] = {}
+    assignments: dict[int, Assignment] = {}
+    claimed: list[int] = []
+    try:
+        for submission_id in dict.fromkeys(int(i) for i in submission_ids):
+            sub = _claim_course_submission(db, submission_id)
+            if sub is None:
+                continue
+            claimed.append(submission_id)
+            try:
+                assignment = db.query(Assignment).get(sub.assignment_id)
+                if not assignment:
+                    raise LookupError(f"assignment {sub.assignment_id} not found")
+                assign_for_prompt, artifacts, rubric, answer_key = _course_grading_inputs(
+                    cfg, sub, assignment
                 )
+            except Exception as e:
+                _log.error("Cohort: loading submission %s failed: %s", submission_id, e)
+                _mark_course_error(db, submission_id)
+                continue
+            assignments[assignment.id] = assignment
+            groups.setdefault((assignment.id, rubric, answer_key), []).append(
+                (CohortSubmission(sub.id, sub.student_id, artifacts), assign_for_prompt)
             )
-
-        sub = db.query(Submission).get(submission_id)
-        sub.final_score = overall.get("score", 0)
-        sub.final_feedback = overall.get("summary", "")
-        low_conf = any(float(c.get("confidence", 0)) < 0.70 for c in criteria)
-        ent_conf = overall.get("confidence_from_entropy")
-        try:
-            if ent_conf is not None and float(ent_conf) < 0.5:
-                low_conf = True
-        except (TypeError, ValueError):
-            pass
-        if low_conf or "needs_review" in flags or multimodal_needs_review:
-            sub.status = "needs_review"
-        else:
-            sub.status = "graded"
-        sub.updated_at = datetime.utcnow()
         db.commit()
 
-        try:
-            sub_ref = db.query(Submission).get(submission_id)
-            if sub_ref and sub_ref.status in ("graded", "needs_review"):
-                report_key = f"grading-reports/course/{submission_id}/{submission_id}_report.json"
-                grading_report = {
-                    "submission_id": submission_id,
-                    "title": getattr(assignment, "title", None),
-                    "status": sub_ref.status,
-                    "final_score": float(sub_ref.final_score)
-                    if sub_ref.final_score is not None
-                    else None,
-                    "final_feedback": sub_ref.final_feedback,
-                    "model_used": model_used,
-                    "models_used": models_used,
-                    "graded_at": sub_ref.updated_at.isoformat()
-                    if sub_ref.updated_at
-                    else None,
-                    "criteria": [
-                        {
-                            "criterion": c.get("name", ""),
-                            "score": c.get("score", 0),
-                            "confidence": c.get("confidence", 0.5),
-                            "rationale": _rationale_for_db(c),
-                        }
-                        for c in criteria
-                    ],
-                }
-                if entropy_meta is not None:
-                    grading_report["entropy_meta"] = entropy_meta
-                s3_client(cfg).put_object(
-                    Bucket=cfg.S3_GRADING_REPORTS_BUCKET,
-                    Key=report_key,
-                    Body=json.dumps(grading_report, indent=2).encode("utf-8"),
-                    ContentType="application/json",
-                )
-                sub_ref.grading_report_s3_key = report_key
-                db.commit()
-        except Exception as e:
-            _log.error(
-                "Failed to upload grading report for submission %s: %s",
-                submission_id,
-                e,
-                exc_info=True,
+        for (assignment_id, rubric, answer_key), rows in groups.items():
+            results = run_db_cohort_multimodal_pipeline(
+                cfg,
+                rows[0][1],
+                [row for row, _assign in rows],
+                assignment_id=assignment_id,
+                rubric_text=rubric,
+                answer_key_text=answer_key,
             )
+            for row, _assign in rows:
+                result = results.get(row.submission_id)
+                if isinstance(result, dict):
+                    try:
+                        _store_course_result(
+                            cfg, db, row.submission_id, assignments[assignment_id], result
+                        )
+                        continue
+                    except Exception as e:
+                        result = e
+                _log.error("Cohort: grading submission %s failed: %s", row.submission_id, result)
+                _mark_course_error(db, row.submission_id)
     except Exception:
-        db.rollback()
-        if sub:
-            s2 = db.query(Submission).get(submission_id)
-            if s2 and s2.status == "grading":
-                s2.status = "error"
-                s2.updated_at = datetime.utcnow()
-                db.commit()
+        for submission_id in claimed:
+            _mark_course_error(db, submission_id)
         raise
     finally:
         db.close()
@@ -372,8 +479,7 @@ def grade_standalone_submission(self, submission_id: int):
         main: dict[str, bytes] = {}
         rubric_ex = ""
         answer_ex = ""
-        for art in arts:
-            data = get_object_bytes(cfg, art.s3_key)
+        for art, data in zip(arts, _download_artifacts(cfg, arts)):
             if art.kind in ("rubric", "answer_key"):
                 ex = _excerpt_file_bytes(art.filename, data)
                 if art.kind == "rubric":
@@ -402,6 +508,7 @@ def grade_standalone_submission(self, submission_id: int):
         result.pop("_used_openai_arbitration", None)
         result.pop("_pipeline_meta", None)
         entropy_meta = result.pop("_entropy_meta", None)
+        token_usage = result.pop("_token_usage", None)
 
         criteria = result.get("criteria", [])
         overall = result.get("overall", {})
@@ -471,6 +578,8 @@ def grade_standalone_submission(self, submission_id: int):
                 }
                 if entropy_meta is not None:
                     grading_report["entropy_meta"] = entropy_meta
+                if token_usage is not None:
+                    grading_report["token_usage"] = token_usage
                 s3_client(cfg).put_object(
                     Bucket=cfg.S3_GRADING_REPORTS_BUCKET,
                     Key=report_key,
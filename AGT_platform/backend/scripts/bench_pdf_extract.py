@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Benchmark: serial vs page-parallel PDF text extraction (``app.grading.tools``).
+
+Extracts each PDF once serially and once on a ``--workers`` process pool (after a warm-up so
+worker start-up is not counted), checks that both produce identical text, and prints timings.
+The sha256 result cache is disabled for the run.
+
+Usage (from AGT_platform/backend):
+
+  python scripts/bench_pdf_extract.py uploads/*/*.pdf
+  python scripts/bench_pdf_extract.py --workers 8 path/to/problem_set.pdf
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.grading import tools  # noqa: E402
+
+
+def _timed(data: bytes, workers: int) -> tuple[float, tools.PdfExtraction]:
+    started = time.perf_counter()
+    doc = tools.extract_pdf_document(data, workers=workers)
+    return time.perf_counter() - started, doc
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    p.add_argument("pdfs", nargs="+", type=Path)
+    p.add_argument("--workers", type=int, default=4)
+    args = p.parse_args()
+
+    tools.Config.PDF_EXTRACT_CACHE_MAX_ENTRIES = 0
+    tools.Config.PDF_EXTRACT_MIN_PAGES = 1
+    files = [(path, path.read_bytes()) for path in args.pdfs]
+    _timed(files[0][1], args.workers)  # start the pool
+
+    print(f"{'pages':>6} {'serial s':>9} {'parallel s':>11} {'speedup':>8} {'same':>5}  file")
+    for path, data in files:
+        serial_s, serial = _timed(data, 1)
+        parallel_s, parallel = _timed(data, args.workers)
+        print(
+            f"{len(serial.pages):>6} {serial_s:>9.3f} {parallel_s:>11.3f} "
+            f"{serial_s / parallel_s:>7.2f}x {str(serial == parallel):>5}  {path.name}"
+        )
+
+
+if __name__ == "__main__":
+    main()
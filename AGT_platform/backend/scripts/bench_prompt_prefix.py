@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark: shared prompt prefix across the chunk grading prompts of one submission.
+
+Builds ``--chunks`` scaffolded-code chunk prompts that share an answer key and dataset preview,
+then measures the longest byte-identical prefix of the full request (system prompt + user
+message) for the current key order and for the previous order (chunk before the answer key).
+Provider prompt caches (OpenAI: prompts of 1024+ tokens, in 128-token steps) only reuse such a
+prefix, so the estimated cacheable tokens per request follow from it.
+
+Usage (from AGT_platform/backend):
+
+  python scripts/bench_prompt_prefix.py
+  python scripts/bench_prompt_prefix.py --chunks 40 --key-lines 200
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.grading.multimodal.prompts_chunk import (  # noqa: E402
+    SYSTEM_CHUNK_GRADER,
+    build_chunk_grading_prompt,
+)
+from app.grading.multimodal.schemas import (  # noqa: E402
+    GradingChunk,
+    Modality,
+    RubricType,
+    TaskType,
+)
+
+_RUBRIC = [
+    {"name": "Functional Correctness", "max_points": 4},
+    {"name": "Logical Implementation", "max_points": 3},
+    {"name": "Code Quality", "max_points": 2},
+    {"name": "Edge Case Awareness", "max_points": 1},
+]
+
+# Key order before the prompt was split into an assignment-constant prefix and per-chunk tail.
+_LEGACY_ORDER = (
+    "instructions",
+    "task_description",
+    "chunk",
+    "rubric",
+    "output_schema_hint",
+    "reference_answer_key",
+    "reference_answer_key_truncated",
+    "matched_answer_key_for_question",
+    "matched_answer_key_for_question_truncated",
+    "trio_reference_answer_for_this_chunk",
+    "trio_reference_answer_for_this_chunk_truncated",
+    "matched_dataset_preview",
+    "matched_dataset_preview_truncated",
+    "exact_scaffolded_code_matches_reference",
+    "reference_grade_for_similar_response",
+)
+
+# Rough chars-per-token for English + code (good enough to compare layouts).
+_CHARS_PER_TOKEN = 4
+_CACHE_MIN_TOKENS = 1024
+_CACHE_STEP_TOKENS = 128
+
+
+def _chunks(n: int) -> list[GradingChunk]:
+    out: list[GradingChunk] = []
+    for i in range(1, n + 1):
+        student = f"result_{i} = df['col_{i % 7}'].rolling({i}).mean()\nprint(result_{i}.tail())"
+        out.append(
+            GradingChunk(
+                chunk_id=f"s1:a1:{i}",
+                assignment_id="a1",
+                student_id="s1",
+                question_id=str(i),
+                modality=Modality.NOTEBOOK,
+                task_type=TaskType.SCAFFOLDED_CODING,
+                extracted_text=f"# Problem {i}\n{student}",
+                evidence={
+                    "trio": {
+                        "question": f"Problem {i}: compute a rolling mean of column {i % 7}.",
+                        "student_response": student,
+                        "answer_key_segment": f"result_{i} = df['col_{i % 7}'].rolling(3).mean()",
+                    }
+                },
+                rubric_type=RubricType.PROGRAMMING_SCAFFOLDED,
+                rubric_rows=list(_RUBRIC),
+            )
+        )
+    return out
+
+
+def _legacy(prompt: str) -> str:
+    data = json.loads(prompt)
+    notes = data.pop("chunk_instructions", "")
+    if notes:
+        data["instructions"] += "\n" + notes
+    ordered = {k: data[k] for k in _LEGACY_ORDER if k in data}
+    return json.dumps(ordered, ensure_ascii=True, indent=2)
+
+
+def _common_prefix(texts: list[str]) -> int:
+    return len(os.path.commonprefix(texts)) if texts else 0
+
+
+def _cacheable_tokens(prefix_chars: int) -> int:
+    tokens = prefix_chars // _CHARS_PER_TOKEN
+    if tokens < _CACHE_MIN_TOKENS:
+        return 0
+    return tokens - tokens % _CACHE_STEP_TOKENS
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    p.add_argument("--chunks", type=int, default=20)
+    p.add_argument("--key-lines", type=int, default=120, help="answer-key lines")
+    p.add_argument("--dataset-rows", type=int, default=40, help="dataset preview rows")
+    args = p.parse_args()
+
+    answer_key = "\n".join(
+        f"result_{i} = df['col_{i % 7}'].rolling(3).mean()  # problem {i}"
+        for i in range(1, args.key_lines + 1)
+    )
+    dataset = "\n".join(
+        ["date," + ",".join(f"col_{c}" for c in range(7))]
+        + [f"2024-01-{r % 28 + 1:02d}," + ",".join(str(r * c) for c in range(7))
+           for r in range(args.dataset_rows)]
+    )
+    prompts = [
+        build_chunk_grading_prompt(
+            ch,
+            task_description="Week 3 pandas problem set",
+            answer_key_text=answer_key,
+            dataset_context_text=dataset,
+        )
+        for ch in _chunks(args.chunks)
+    ]
+    layouts = {"legacy": [_legacy(t) for t in prompts], "current": prompts}
+
+    print(
+        f"{'layout':>8} {'avg chars':>10} {'prefix chars':>13} {'prefix %':>9} "
+        f"{'cacheable tok/req':>18}"
+    )
+    for name, users in layouts.items():
+        full = [SYSTEM_CHUNK_GRADER + "\n" + u for u in users]
+        avg = sum(len(t) for t in full) / len(full)
+        prefix = _common_prefix(full)
+        print(
+            f"{name:>8} {avg:>10.0f} {prefix:>13} {100 * prefix / avg:>8.1f}% "
+            f"{_cacheable_tokens(prefix):>18}"
+        )
+
+
+if __name__ == "__main__":
+    main()
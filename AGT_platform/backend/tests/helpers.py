@@ -0,0 +1,22 @@
+"""Shared fixtures for the grading tests."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from app.grading.multimodal.schemas import GradingChunk, Modality, TaskType
+
+
+def make_chunk(**overrides: Any) -> GradingChunk:
+    """A notebook :class:`GradingChunk` for student ``s1``; keyword arguments replace fields."""
+    fields: dict[str, Any] = dict(
+        chunk_id="c1",
+        assignment_id="a1",
+        student_id="s1",
+        question_id="q1",
+        modality=Modality.NOTEBOOK,
+        task_type=TaskType.UNKNOWN,
+        extracted_text="answer",
+    )
+    fields.update(overrides)
+    return GradingChunk(**fields)
@@ -0,0 +1,237 @@
+"""Token-budgeted per-chunk answer-key excerpts (``assemble_answer_key_context``)."""
+
+from __future__ import annotations
+
+import json
+import unittest
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from app.grading.embedding_vector import compact_embedding
+from app.grading.multimodal import (
+    MultimodalGradingConfig,
+    MultimodalGradingPipeline,
+    PipelineArtifactStore,
+    PreparedSubmission,
+    build_envelope_from_plaintext,
+)
+from app.grading.multimodal.answer_key_chunk_enrich import (
+    assemble_answer_key_context,
+    get_answer_key_section_index,
+    reset_answer_key_section_indexes,
+    split_answer_key_sections,
+)
+from app.grading.multimodal.schemas import (
+    GradingChunk,
+    Modality,
+    RubricType,
+    SampledChunkGrade,
+    TaskType,
+)
+from tests.helpers import make_chunk
+
+_TOPICS = ["apples", "pears", "rivers", "lakes", "engines"]
+_FILLER = " Details follow." * 20
+_KEY = "\n\n".join(
+    f"## Part {chr(65 + i)}\nAbout {topic}.{_FILLER}" for i, topic in enumerate(_TOPICS)
+)
+
+
+def _fake_embed(texts: list[str], _cfg: Any) -> list[tuple[list[float], str]]:
+    # apples~pears and rivers~lakes are close; engines is unrelated to both.
+    groups = [("apples", "pears"), ("rivers", "lakes"), ("engines",)]
+    out = []
+    for t in texts:
+        low = t.lower()
+        vec = [1.0 if any(w in low for w in g) else 0.0 for g in groups]
+        vec += [0.2 if "pears" in low or "lakes" in low else 0.0, 0.05]
+        out.append((vec, "mock_embed"))
+    return out
+
+
+def _chunk(heading: str, snippet: str) -> GradingChunk:
+    return make_chunk(
+        question_id="1",
+        modality=Modality.WRITTEN,
+        task_type=TaskType.FREE_RESPONSE_SHORT,
+        extracted_text="Apples are fruit.",
+        evidence={
+            "answer_key_unit": {
+                "snippet": snippet,
+                "parsed": {"matched_section_heading": heading},
+            }
+        },
+        rubric_type=RubricType.FREE_RESPONSE,
+        rubric_rows=[{"name": "Correctness", "max_points": 2}],
+    )
+
+
+class AssembleAnswerKeyContextTests(unittest.TestCase):
+    def setUp(self) -> None:
+        reset_answer_key_section_indexes()
+        patcher = patch(
+            "app.grading.multimodal.answer_key_chunk_enrich.compute_submission_embeddings",
+            side_effect=_fake_embed,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(reset_answer_key_section_indexes)
+
+    def test_matched_section_plus_most_similar_neighbour(self) -> None:
+        text, audit = assemble_answer_key_context(
+            _chunk("## Part A", "About apples."),
+            _KEY,
+            SimpleNamespace(),
+            token_budget=400,
+            neighbors=1,
+        )
+        self.assertIn("About apples", text)
+        self.assertIn("About pears", text)
+        self.assertNotIn("About engines", text)
+        self.assertEqual([s["index"] for s in audit["sections"]], [0, 1])
+        self.assertEqual(audit["selection"], "embedding_cosine")
+        self.assertGreater(audit["tokens_saved"], 0)
+        self.assertEqual(audit["tokens_full"] - audit["tokens_included"], audit["tokens_saved"])
+
+    def test_savings_are_measured_against_the_prompt_key(self) -> None:
+        _text, audit = assemble_answer_key_context(
+            _chunk("## Part A", "About apples."),
+            _KEY,
+            SimpleNamespace(),
+            token_budget=400,
+            neighbors=1,
+            prompt_text=_KEY[:200],
+        )
+        self.assertEqual(audit["tokens_untrimmed"], 50)
+        self.assertLess(audit["tokens_saved"], 0)
+
+    def test_budget_drops_neighbours_that_do_not_fit(self) -> None:
+        _text, audit = assemble_answer_key_context(
+            _chunk("## Part C", "About rivers."),
+            _KEY,
+            SimpleNamespace(),
+            token_budget=120,
+            neighbors=3,
+        )
+        self.assertEqual([s["index"] for s in audit["sections"]], [2])
+        self.assertLessEqual(audit["tokens_included"], 120)
+
+    def test_unknown_section_falls_back_to_chunk_answer_key_vector(self) -> None:
+        chunk = _chunk("", "Something about water.")
+        chunk.evidence["answer_key_unit"]["answer_key_rag"] = {
+            "embedding": compact_embedding([0.0, 1.0, 0.0, 0.0, 0.05]),
+        }
+        _text, audit = assemble_answer_key_context(
+            chunk, _KEY, SimpleNamespace(), token_budget=400, neighbors=1
+        )
+        self.assertEqual(audit["matched_section"], 2)
+        self.assertEqual([s["index"] for s in audit["sections"]], [2, 3])
+
+    def test_whole_key_kept_when_off_unmatched_or_within_budget(self) -> None:
+        cfg = SimpleNamespace()
+        matched = _chunk("## Part A", "About apples.")
+        self.assertIsNone(assemble_answer_key_context(matched, _KEY, cfg, token_budget=0))
+        self.assertIsNone(assemble_answer_key_context(matched, _KEY, cfg, token_budget=10_000))
+        unmatched = _chunk("", "")
+        self.assertIsNone(assemble_answer_key_context(unmatched, _KEY, cfg, token_budget=400))
+        # A segment found in every section does not pick one of them.
+        partial = _chunk("", "Details follow.")
+        self.assertIsNone(assemble_answer_key_context(partial, _KEY, cfg, token_budget=400))
+
+
+class SectionIndexCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        reset_answer_key_section_indexes()
+        self.addCleanup(reset_answer_key_section_indexes)
+
+    def test_index_with_fallback_backend_rows_is_not_cached(self) -> None:
+        cfg = SimpleNamespace(RAG_EMBEDDING_BACKEND="openai", OPENAI_TRIO_RAG_EMBEDDING_MODEL="te3")
+        sections = split_answer_key_sections(_KEY)
+        sources = iter(["sentence_transformers:m", "openai:te3", "openai:te3"])
+
+        def embed(texts: list[str], _cfg: Any) -> list[tuple[list[float], str]]:
+            src = next(sources)
+            return [(vec, src) for vec, _src in _fake_embed(texts, _cfg)]
+
+        with patch(
+            "app.grading.multimodal.answer_key_chunk_enrich.compute_submission_embeddings",
+            side_effect=embed,
+        ) as mock:
+            first = get_answer_key_section_index(_KEY, sections, cfg)
+            second = get_answer_key_section_index(_KEY, sections, cfg)
+            third = get_answer_key_section_index(_KEY, sections, cfg)
+        self.assertFalse(first.cacheable)
+        self.assertIsNot(second, first)
+        self.assertIs(third, second)
+        self.assertEqual(mock.call_count, 2)
+
+
+class PipelineAnswerKeyTrimTests(unittest.TestCase):
+    class _Runner:
+        def __init__(self) -> None:
+            self.prompts: list[str] = []
+
+        def run_chunk_samples(self, chunk, *, system_prompt: str, user_prompt: str):
+            self.prompts.append(user_prompt)
+            raw = '{"criterion_scores": [], "normalized_score": 1.0}'
+            return [SampledChunkGrade("openai:fake", 0, raw, None, False)]
+
+    def _grade(
+        self, chunk: GradingChunk, *, answer_key_for_prompt: str, answer_key_plain: str = ""
+    ) -> tuple[Any, _Runner]:
+        reset_answer_key_section_indexes()
+        self.addCleanup(reset_answer_key_section_indexes)
+        runner = self._Runner()
+        cfg = SimpleNamespace(
+            MULTIMODAL_ANSWER_KEY_TOKEN_BUDGET=400,
+            MULTIMODAL_ANSWER_KEY_NEIGHBOR_SECTIONS=1,
+            MULTIMODAL_RULE_GRADER=False,
+        )
+        pipeline = MultimodalGradingPipeline(MultimodalGradingConfig(), runner, app_cfg=cfg)
+        prepared = PreparedSubmission(
+            envelope=build_envelope_from_plaintext(
+                assignment_id="a1", student_id="s1", plaintext="x"
+            ),
+            chunks=[chunk],
+            answer_key_for_prompt=answer_key_for_prompt,
+            dataset_plain="",
+            artifacts=PipelineArtifactStore(),
+            workflow=[],
+            answer_key_plain=answer_key_plain,
+        )
+        with patch(
+            "app.grading.multimodal.answer_key_chunk_enrich.compute_submission_embeddings",
+            side_effect=_fake_embed,
+        ):
+            return pipeline.grade_prepared(prepared), runner
+
+    def test_prompt_uses_excerpt_and_records_savings(self) -> None:
+        result, runner = self._grade(
+            _chunk("## Part A", "About apples."), answer_key_for_prompt=_KEY
+        )
+        payload = json.loads(runner.prompts[0])
+        self.assertTrue(payload["reference_answer_key_excerpt"])
+        self.assertNotIn("engines", payload["reference_answer_key"])
+        ctx = result.chunk_results[0].stage_artifacts["answer_key_context"]
+        phase = [
+            w for w in result.stage_artifacts["agentic_workflow"]
+            if w["phase"] == "answer_key_context"
+        ]
+        self.assertEqual(phase[0]["tokens_saved"], ctx["tokens_saved"])
+
+    def test_sections_past_the_prompt_cap_can_be_selected(self) -> None:
+        capped = _KEY[: _KEY.index("## Part C")]
+        result, runner = self._grade(
+            _chunk("## Part E", "About engines."),
+            answer_key_for_prompt=capped,
+            answer_key_plain=_KEY,
+        )
+        payload = json.loads(runner.prompts[0])
+        self.assertIn("About engines", payload["reference_answer_key"])
+        ctx = result.chunk_results[0].stage_artifacts["answer_key_context"]
+        self.assertEqual(ctx["matched_section"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""Assignment-scoped context cache (:mod:`app.grading.multimodal.assignment_context`)."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from app.grading.cache_support import SqliteStore
+from app.grading.multimodal import assignment_context
+from app.grading.multimodal.assignment_context import (
+    AssignmentContextCache,
+    get_assignment_context_cache,
+    reset_assignment_context_caches,
+    resolve_answer_key_cached,
+    resolve_blank_template_cached,
+)
+
+
+def _cfg(**kw: Any) -> SimpleNamespace:
+    base = {"MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE": "memory", "REDIS_URL": ""}
+    base.update(kw)
+    return SimpleNamespace(**base)
+
+
+class AssignmentContextCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        reset_assignment_context_caches()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        reset_assignment_context_caches()
+        self._tmp.cleanup()
+
+    def test_answer_key_resolved_once_until_directory_changes(self) -> None:
+        cfg = _cfg()
+        (self.dir / "Week 1 PSet [Answer_Key].md").write_text("key v1", encoding="utf-8")
+        real = assignment_context.resolve_answer_key_plaintext
+        with patch.object(
+            assignment_context, "resolve_answer_key_plaintext", side_effect=real
+        ) as resolve:
+            first = resolve_answer_key_cached(cfg, "[Student 1] Week 1 PSet", self.dir)
+            second = resolve_answer_key_cached(cfg, "[Student 2] Week 1 PSet", self.dir)
+            again = resolve_answer_key_cached(cfg, "[Student 1] Week 1 PSet", self.dir)
+            self.assertEqual(first, ("key v1", "Week 1 PSet [Answer_Key].md"))
+            self.assertEqual(again, first)
+            self.assertEqual(second, first)
+            self.assertEqual(resolve.call_count, 2)
+
+            key_file = self.dir / "Week 1 PSet [Answer_Key].md"
+            key_file.write_text("key v2 (edited)", encoding="utf-8")
+            os.utime(key_file, ns=(1, 1))
+            edited = resolve_answer_key_cached(cfg, "[Student 1] Week 1 PSet", self.dir)
+        self.assertEqual(edited[0], "key v2 (edited)")
+        self.assertEqual(resolve.call_count, 3)
+
+    def test_off_mode_calls_through(self) -> None:
+        cfg = _cfg(MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE="off")
+        self.assertIsNone(get_assignment_context_cache(cfg))
+        self.assertEqual(resolve_answer_key_cached(cfg, "missing", self.dir), ("", ""))
+
+    def test_shared_store_serves_other_workers(self) -> None:
+        blank = self.dir / "blank"
+        blank.mkdir()
+        (blank / "HW2.ipynb").write_bytes(b'{"cells": []}\x00\xff')
+        store_path = self.dir / "ctx.sqlite3"
+        worker_a, worker_b = (
+            AssignmentContextCache(store=SqliteStore(store_path, table="responses", max_bytes=0))
+            for _ in range(2)
+        )
+        getter = "get_assignment_context_cache"
+        with patch.object(assignment_context, getter, return_value=worker_a):
+            got_a = resolve_blank_template_cached(_cfg(), "HW2", blank)
+        with (
+            patch.object(assignment_context, getter, return_value=worker_b),
+            patch.object(assignment_context, "resolve_blank_assignment_template") as resolve,
+        ):
+            got_b = resolve_blank_template_cached(_cfg(), "HW2", blank)
+        resolve.assert_not_called()
+        self.assertEqual(got_a, (b'{"cells": []}\x00\xff', "HW2.ipynb", ".ipynb"))
+        self.assertEqual(got_b, got_a)
+        self.assertEqual(worker_b.stats()["shared_hits"], 1)
+
+    def test_none_results_are_not_cached(self) -> None:
+        cache = AssignmentContextCache()
+        calls: list[int] = []
+
+        def build() -> None:
+            calls.append(1)
+            return None
+
+        cache.get_or_build("answer_key_audit", ("d",), build)
+        cache.get_or_build("answer_key_audit", ("d",), build)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(cache.stats()["memory_entries"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
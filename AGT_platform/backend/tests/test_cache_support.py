@@ -0,0 +1,105 @@
+"""SQLite back end shared by the grading caches (:mod:`app.grading.cache_support`)."""
+
+from __future__ import annotations
+
+import sqlite3
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+from app.grading import cache_support
+from app.grading.cache_support import (
+    CacheRegistry,
+    LruFront,
+    RunCacheStats,
+    SqliteStore,
+    in_run_context,
+)
+
+
+class SqliteStoreTests(unittest.TestCase):
+    def test_trims_to_max_bytes_least_recently_used_first(self) -> None:
+        with tempfile.TemporaryDirectory() as d:
+            store = SqliteStore(Path(d) / "c.sqlite3", table="responses", max_bytes=300)
+            for i in range(10):
+                store.put(f"k{i}", "x" * 100, ttl_sec=60)
+            self.assertIsNone(store.get("k0"))
+            self.assertEqual(store.get("k9"), "x" * 100)
+
+    def test_blob_values_and_no_ttl(self) -> None:
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "e.sqlite3"
+            SqliteStore(path, table="vectors", max_bytes=0, value_type="BLOB").put("k", b"\x00\x01")
+            fresh = SqliteStore(path, table="vectors", max_bytes=0, value_type="BLOB")
+            self.assertEqual(fresh.get("k"), b"\x00\x01")
+            with self.assertRaises(ValueError):
+                SqliteStore(path, table="bad name", max_bytes=0)
+
+    def test_table_size_read_only_when_budget_may_be_exceeded(self) -> None:
+        with tempfile.TemporaryDirectory() as d:
+            store = SqliteStore(Path(d) / "c.sqlite3", table="responses", max_bytes=10_000)
+            with patch.object(store, "_trim", wraps=store._trim) as trim:
+                for i in range(20):
+                    store.put(f"k{i}", "x" * 100)
+                self.assertEqual(trim.call_count, 1)
+                with patch.object(cache_support, "_SIZE_RESYNC_PUTS", 5):
+                    for i in range(5):
+                        store.put(f"r{i}", "x")
+                self.assertEqual(trim.call_count, 2)
+                for i in range(100):
+                    store.put(f"big{i}", "x" * 100)
+            with sqlite3.connect(str(Path(d) / "c.sqlite3")) as con:
+                total = con.execute("SELECT SUM(size) FROM responses").fetchone()[0]
+            self.assertLessEqual(total, 10_000)
+            self.assertIsNone(store.get("k0"))
+
+
+class _FailingStore:
+    def get(self, key: str) -> str:
+        raise OSError("down")
+
+    def put(self, key: str, value: str, *, ttl_sec: float | None = None) -> None:
+        raise OSError("down")
+
+
+class LruFrontAndRegistryTests(unittest.TestCase):
+    def test_store_errors_are_counted_misses(self) -> None:
+        front: LruFront[str] = LruFront(name="t", max_entries=1, store=_FailingStore())
+        with self.assertLogs(cache_support.__name__, level="WARNING"):
+            self.assertIsNone(front._store_get("k"))
+            front._store_put("k", "v")
+        front._remember("a", "1")
+        front._remember("b", "2")
+        self.assertIsNone(front._lookup("a"))
+        self.assertEqual(front._lookup("b"), "2")
+        self.assertEqual(
+            front.stats(), {"hits": 1, "misses": 0, "store_errors": 2, "memory_entries": 1}
+        )
+
+    def test_registry_builds_once_and_forgets_after_fork(self) -> None:
+        registry: CacheRegistry[object] = CacheRegistry()
+        first = registry.get(("memory", 1), object)
+        self.assertIs(registry.get(("memory", 1), object), first)
+        self.assertIsNot(registry.get(("memory", 2), object), first)
+        registry._reset_after_fork()
+        self.assertIsNot(registry.get(("memory", 1), object), first)
+
+    def test_run_stats_count_only_their_own_run(self) -> None:
+        front: LruFront[str] = LruFront(name="t", max_entries=4)
+        front._remember("k", "v")
+        first, second = RunCacheStats(), RunCacheStats()
+        with first.active():
+            front._lookup("k")
+            front._count("misses")
+        with second.active(), ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(in_run_context(front._lookup), ["k", "k", "k"]))
+        front._lookup("k")
+        self.assertEqual(first.counts("t", ("hits", "misses")), {"hits": 1, "misses": 1})
+        self.assertEqual(second.counts("t", ("hits", "misses")), {"hits": 3, "misses": 0})
+        self.assertEqual(front.stats()["hits"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""Binary memory-mapped chunk cache (:mod:`app.grading.multimodal.chunk_cache`)."""
+
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from app.grading.embedding_vector import EmbeddingVector, compact_embedding
+from app.grading.multimodal.chunk_cache import (
+    chunk_cache_has_unit_embeddings,
+    chunks_have_unit_embeddings,
+    load_grading_chunks_cache,
+    read_chunk_cache_header,
+    save_grading_chunks_cache,
+)
+from app.grading.multimodal.schemas import GradingChunk
+from tests.helpers import make_chunk
+
+
+def _chunks(n: int, *, dim: int = 16) -> list[GradingChunk]:
+    out: list[GradingChunk] = []
+    for i in range(n):
+        vec = compact_embedding(np.full(dim, i + 1.0))
+        out.append(
+            make_chunk(
+                chunk_id=f"c{i}",
+                question_id=f"q{i}",
+                extracted_text=f"answer {i} é",
+                evidence={
+                    "trio": {"question": f"Q{i}"},
+                    "trio_segment_rag": {
+                        "question": {"embedding": vec},
+                        "student_response": {"embedding": []},
+                    },
+                    "rag_embedding_bundle": {"embedding_dimension": dim, "embedding": vec},
+                },
+            )
+        )
+    return out
+
+
+class BinaryChunkCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_round_trip_with_memory_mapped_vectors(self) -> None:
+        chunks = _chunks(3)
+        path = self.dir / "units.agtc"
+        save_grading_chunks_cache(path, chunks)
+        loaded = load_grading_chunks_cache(path, verify_vectors=True)
+        assert loaded is not None
+        self.assertEqual([c.chunk_id for c in loaded], ["c0", "c1", "c2"])
+        self.assertEqual(loaded[2].extracted_text, "answer 2 é")
+        emb = loaded[2].evidence["rag_embedding_bundle"]["embedding"]
+        self.assertIsInstance(emb, EmbeddingVector)
+        self.assertIsInstance(emb.array.base, np.memmap)
+        self.assertEqual(emb, [3.0] * 16)
+        seg = loaded[0].evidence["trio_segment_rag"]
+        self.assertEqual(seg["student_response"]["embedding"], [])
+        self.assertTrue(chunks_have_unit_embeddings(loaded))
+
+    def test_header_answers_without_loading_records(self) -> None:
+        path = self.dir / "units.bin"
+        save_grading_chunks_cache(path, _chunks(2))
+        header = read_chunk_cache_header(path)
+        assert header is not None
+        self.assertEqual((header["n_chunks"], header["n_floats"]), (2, 64))
+        self.assertTrue(chunk_cache_has_unit_embeddings(path))
+
+        bare = _chunks(1)
+        bare[0].evidence = {}
+        save_grading_chunks_cache(path, bare)
+        self.assertFalse(chunk_cache_has_unit_embeddings(path))
+
+        json_path = self.dir / "units.json"
+        save_grading_chunks_cache(json_path, _chunks(1))
+        self.assertIsNone(chunk_cache_has_unit_embeddings(json_path))
+        self.assertIsNotNone(load_grading_chunks_cache(json_path))
+
+    def test_corruption_is_detected(self) -> None:
+        path = self.dir / "units.agtc"
+        save_grading_chunks_cache(path, _chunks(2))
+        raw = bytearray(path.read_bytes())
+
+        raw[-1] ^= 0xFF
+        path.write_bytes(bytes(raw))
+        self.assertIsNotNone(load_grading_chunks_cache(path))
+        with self.assertLogs("app.grading.multimodal.chunk_cache", level="WARNING"):
+            self.assertIsNone(load_grading_chunks_cache(path, verify_vectors=True))
+
+        records_at = raw.index(b'{"chunk_id"')
+        raw[records_at + 14] ^= 0x01
+        path.write_bytes(bytes(raw))
+        with self.assertLogs("app.grading.multimodal.chunk_cache", level="WARNING"):
+            self.assertIsNone(load_grading_chunks_cache(path))
+
+        save_grading_chunks_cache(path, _chunks(2))
+        path.write_bytes(path.read_bytes()[:-8])
+        with self.assertLogs("app.grading.multimodal.chunk_cache", level="WARNING"):
+            self.assertIsNone(load_grading_chunks_cache(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""Packed multi-chunk grading requests (:mod:`app.grading.multimodal.chunk_packing`)."""
+
+from __future__ import annotations
+
+import json
+import unittest
+from types import SimpleNamespace
+from typing import Any
+
+from app.grading.multimodal import (
+    MultimodalGradingConfig,
+    MultimodalGradingPipeline,
+    PipelineArtifactStore,
+    PreparedSubmission,
+    build_envelope_from_plaintext,
+)
+from app.grading.multimodal.chunk_packing import plan_chunk_batches, split_batch_samples
+from app.grading.multimodal.prompts_chunk import SYSTEM_BATCH_CHUNK_GRADER
+from app.grading.multimodal.schemas import GradingChunk, RubricType, SampledChunkGrade
+from tests.helpers import make_chunk
+
+_ROWS = [{"name": "Correctness", "max_points": 2}]
+_EDA_ROWS = [{"name": "Insight", "max_points": 3}]
+
+
+def _chunk(cid: str, text: str = "x = 1", *, eda: bool = False) -> GradingChunk:
+    return make_chunk(
+        chunk_id=cid,
+        question_id=cid,
+        extracted_text=text,
+        rubric_type=RubricType.EDA_VISUALIZATION if eda else RubricType.FREE_RESPONSE,
+        rubric_rows=list(_EDA_ROWS if eda else _ROWS),
+    )
+
+
+def _grade(score: float) -> dict[str, Any]:
+    return {
+        "criterion_scores": [{"name": "Correctness", "raw_score": score, "max_points": 2}],
+        "normalized_score": score / 2,
+    }
+
+
+class PlanAndSplitTests(unittest.TestCase):
+    def test_batches_share_rubric_respect_limits_and_drop_singletons(self) -> None:
+        chunks = [
+            _chunk("q1"),
+            _chunk("q2", eda=True),
+            _chunk("q3"),
+            _chunk("q4", "y" * 50),
+            _chunk("q5"),
+            _chunk("q6"),
+        ]
+        batches = plan_chunk_batches(chunks, max_chars=20, max_batch=2)
+        self.assertEqual([[c.chunk_id for c in b] for b in batches], [["q1", "q3"], ["q5", "q6"]])
+
+    def test_split_matches_chunk_ids_and_leaves_missing_empty(self) -> None:
+        raw = json.dumps({"results": [dict(_grade(2), chunk_id="q2"), {"chunk_id": "zz"}]})
+        split = split_batch_samples(
+            [_chunk("q1"), _chunk("q2")], [SampledChunkGrade("openai:m", 0, raw, None, False)]
+        )
+        self.assertEqual(split["q1"][0].raw_text, "")
+        self.assertEqual(json.loads(split["q2"][0].raw_text), _grade(2))
+
+
+class PackedPipelineTests(unittest.TestCase):
+    class _Runner:
+        """Batch requests answer every chunk except ``drop``; single requests give 1.0."""
+
+        def __init__(self, drop: str = "") -> None:
+            self.drop = drop
+            self.batch_calls = 0
+            self.single_calls: list[str] = []
+
+        def run_chunk_samples(self, chunk, *, system_prompt: str, user_prompt: str):
+            if system_prompt == SYSTEM_BATCH_CHUNK_GRADER:
+                self.batch_calls += 1
+                ids = [e["chunk_id"] for e in json.loads(user_prompt)["chunks"]]
+                raw = json.dumps(
+                    {"results": [dict(_grade(1), chunk_id=c) for c in ids if c != self.drop]}
+                )
+                usage = {"prompt_tokens": 100}
+            else:
+                self.single_calls.append(chunk.chunk_id)
+                raw, usage = json.dumps(_grade(2)), {"prompt_tokens": 10}
+            return [SampledChunkGrade("openai:m", i, raw, None, False, usage=usage) for i in (0, 1)]
+
+    def _run(self, runner: Any) -> Any:
+        cfg = SimpleNamespace(
+            MULTIMODAL_CHUNK_PACKING=True,
+            MULTIMODAL_CHUNK_PACKING_MAX_BATCH=3,
+            MULTIMODAL_RULE_GRADER=False,
+        )
+        pipeline = MultimodalGradingPipeline(MultimodalGradingConfig(), runner, app_cfg=cfg)
+        prepared = PreparedSubmission(
+            envelope=build_envelope_from_plaintext(
+                assignment_id="a1", student_id="s1", plaintext="x"
+            ),
+            chunks=[_chunk("q1"), _chunk("q2"), _chunk("q3"), _chunk("q4", "z" * 1000)],
+            answer_key_for_prompt="",
+            dataset_plain="",
+            artifacts=PipelineArtifactStore(),
+            workflow=[],
+        )
+        return pipeline.grade_prepared(prepared)
+
+    def test_small_chunks_graded_in_one_request(self) -> None:
+        runner = self._Runner()
+        result = self._run(runner)
+        self.assertEqual(runner.batch_calls, 1)
+        self.assertEqual(runner.single_calls, ["q4"])
+        q1, q2, q3, q4 = result.chunk_results
+        self.assertEqual(q2.normalized_score_estimate, 0.5)
+        self.assertEqual(q2.stage_artifacts["packing"]["chunk_ids"], ["q1", "q2", "q3"])
+        self.assertNotIn("packing", q4.stage_artifacts)
+        self.assertEqual(q1.stage_artifacts["token_usage"]["prompt_tokens"], 200)
+        self.assertEqual(q2.stage_artifacts["token_usage"]["prompt_tokens"], 0)
+        workflow = result.stage_artifacts["agentic_workflow"]
+        phase = [w for w in workflow if w["phase"] == "chunk_packing"]
+        self.assertEqual((phase[0]["packed"], phase[0]["fallback"]), (3, 0))
+
+    def test_unparsed_chunk_alone_falls_back(self) -> None:
+        runner = self._Runner(drop="q2")
+        result = self._run(runner)
+        self.assertEqual(runner.single_calls, ["q2", "q4"])
+        q1, q2, _q3, _q4 = result.chunk_results
+        self.assertTrue(q2.stage_artifacts["packing"]["fallback"])
+        self.assertEqual(q2.normalized_score_estimate, 1.0)
+        self.assertEqual(q1.normalized_score_estimate, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
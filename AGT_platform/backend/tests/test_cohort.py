@@ -0,0 +1,178 @@
+"""Cohort batch grading with near-duplicate clustering (:mod:`app.grading.multimodal.cohort`)."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import tempfile
+import unittest
+from typing import Any
+from unittest.mock import patch
+
+from app.config import Config
+from app.grading.multimodal import (
+    MultimodalGradingConfig,
+    MultimodalGradingPipeline,
+    build_envelope_from_plaintext,
+)
+from app.grading.multimodal.cohort import build_cohort_plan, grade_cohort
+from app.grading.multimodal.schemas import GradingChunk, SampledChunkGrade
+from tests.helpers import make_chunk
+
+
+def _chunk(student: str, text: str, vec: list[float]) -> GradingChunk:
+    return make_chunk(
+        chunk_id="q1",
+        student_id=student,
+        extracted_text=text,
+        evidence={"trio_segment_rag": {"student_response": {"embedding": vec}}},
+    )
+
+
+def _text_vector(text: str) -> list[float]:
+    return [b / 255.0 for b in hashlib.sha256(text.encode("utf-8")).digest()[:8]]
+
+
+class CohortPlanTests(unittest.TestCase):
+    def test_exact_and_near_duplicates_cluster_outliers_do_not(self) -> None:
+        plan = build_cohort_plan(
+            [
+                [_chunk("s1", "df.head()", [1.0, 0.0])],
+                [_chunk("s2", "df.head( )", [1.0, 0.0])],
+                [_chunk("s3", "df.head()", [1.0, 0.0])],
+                [_chunk("s4", "df.head(5)", [0.99, 0.05])],
+                [_chunk("s5", "print(len(df))", [0.0, 1.0])],
+                [_chunk("s6", "", [1.0, 0.0])],
+            ],
+            similarity=0.97,
+        )
+        roles = {sid: plan.roles.get((sid, "q1")) for sid in ("s1", "s2", "s3", "s4", "s5", "s6")}
+        self.assertEqual(roles["s1"].role, "representative")
+        for sid in ("s2", "s3", "s4"):
+            self.assertEqual(roles[sid].role, "member")
+            self.assertEqual(roles[sid].representative, ("s1", "q1"))
+        self.assertEqual(roles["s3"].similarity, 1.0)
+        self.assertLess(roles["s4"].similarity, 1.0)
+        self.assertEqual(roles["s1"].cluster_size, 4)
+        self.assertIsNone(roles["s5"])
+        self.assertIsNone(roles["s6"])
+
+
+class GradeCohortTests(unittest.TestCase):
+    """Three submissions, two identical: the copy is confirmed with one call per chunk."""
+
+    _SAME = "".join(f"Question {i}: What is {i}+{i}?\nAnswer: {2 * i}\n\n" for i in range(1, 4))
+    _OTHER = "".join(f"Question {i}: What is {i}+{i}?\nAnswer: {i * 7}0\n\n" for i in range(1, 4))
+
+    class _Runner:
+        def __init__(self, *, disagree: bool = False) -> None:
+            self.calls: list[bool] = []
+            self.disagree = disagree
+
+        def run_chunk_samples(self, chunk, *, system_prompt: str, user_prompt: str):
+            confirm = "reference_grade_for_similar_response" in user_prompt
+            self.calls.append(confirm)
+            score = 0.0 if (confirm and self.disagree) else 1.0
+            raw = json.dumps({"criterion_scores": [], "normalized_score": score})
+            usage = {"prompt_tokens": 7 if confirm else 10}
+            return [
+                SampledChunkGrade("openai:fake", i, raw, None, False, usage=dict(usage))
+                for i in range(3)
+            ]
+
+        def run_single_sample(self, chunk, *, system_prompt: str, user_prompt: str):
+            return self.run_chunk_samples(
+                chunk, system_prompt=system_prompt, user_prompt=user_prompt
+            )[:1]
+
+    def _grade(self, runner: Any) -> list[Any]:
+        cfg = Config()
+        cfg.OPENAI_API_KEY = ""
+        cfg.ANTHROPIC_API_KEY = ""
+        cfg.MULTIMODAL_COHORT_WORKERS = 2
+        with tempfile.TemporaryDirectory() as d:
+            hints = {
+                "answer_key_dir": d,
+                "blank_assignments_dir": d,
+                "skip_trio_chunks_json_export": True,
+                "skip_assignment_chunking_json_export": True,
+            }
+            items = [
+                (
+                    MultimodalGradingPipeline(MultimodalGradingConfig(), runner, app_cfg=cfg),
+                    build_envelope_from_plaintext(
+                        assignment_id="a1",
+                        student_id=sid,
+                        plaintext=text,
+                        modality_hints=dict(hints),
+                    ),
+                )
+                for sid, text in (("s1", self._SAME), ("s2", self._SAME), ("s3", self._OTHER))
+            ]
+            with patch(
+                "app.grading.multimodal.rag_embeddings.compute_submission_embeddings",
+                side_effect=lambda texts, _cfg: [(_text_vector(t), "mock_embed") for t in texts],
+            ):
+                return grade_cohort(items, app_cfg=cfg)
+
+    def test_members_confirmed_with_one_call(self) -> None:
+        runner = self._Runner()
+        s1, s2, s3 = self._grade(runner)
+        n = len(s1.chunk_results)
+        self.assertGreater(n, 0)
+        self.assertEqual(runner.calls.count(True), n)
+        self.assertEqual(runner.calls.count(False), 2 * n)
+        for outcome in s2.chunk_results:
+            cohort = outcome.stage_artifacts["cohort"]
+            self.assertEqual((cohort["role"], cohort["confirmed"]), ("member", True))
+            self.assertEqual(cohort["representative_student_id"], "s1")
+        self.assertEqual(s1.chunk_results[0].stage_artifacts["cohort"]["role"], "representative")
+        self.assertNotIn("cohort", s3.chunk_results[0].stage_artifacts)
+        self.assertEqual(s2.assignment_normalized_score, s1.assignment_normalized_score)
+        phase = [w for w in s2.stage_artifacts["agentic_workflow"] if w["phase"] == "cohort"]
+        self.assertEqual(phase[0]["confirmed"], n)
+
+    def test_disagreeing_member_is_graded_normally(self) -> None:
+        runner = self._Runner(disagree=True)
+        s1, s2, _s3 = self._grade(runner)
+        n = len(s1.chunk_results)
+        self.assertEqual(runner.calls.count(False), 3 * n)
+        cohort = s2.chunk_results[0].stage_artifacts["cohort"]
+        self.assertFalse(cohort["confirmed"])
+        self.assertGreater(s2.chunk_results[0].stage_artifacts["raw_sample_count"], 1)
+        self.assertEqual(
+            s2.chunk_results[0].stage_artifacts["token_usage"]["prompt_tokens"], 3 * 10 + 7
+        )
+
+
+class CohortRunnerTests(unittest.TestCase):
+    def test_unreadable_submission_fails_alone(self) -> None:
+        from app.grading.multimodal import course_multimodal_runner as runner_mod
+
+        def build(_cfg, _assignment, artifacts_bytes, **_kw):
+            if artifacts_bytes.get("ipynb") == b"not json":
+                raise ValueError("bad notebook")
+            return object(), object(), [], {}
+
+        subs = [
+            runner_mod.CohortSubmission(sid, sid, {"ipynb": data})
+            for sid, data in ((1, b"{}"), (2, b"not json"), (3, b"{}"))
+        ]
+        def grade(items, app_cfg):
+            return [RuntimeError("graded") for _ in items]
+
+        with (
+            patch.object(runner_mod, "_build_multimodal_run", side_effect=build),
+            patch.object(runner_mod, "grade_cohort", side_effect=grade) as graded,
+        ):
+            with self.assertLogs(runner_mod.__name__, level="WARNING"):
+                out = runner_mod.run_db_cohort_multimodal_pipeline(
+                    Config(), None, subs, assignment_id=1, rubric_text=None, answer_key_text=None
+                )
+        self.assertEqual(len(graded.call_args.args[0]), 2)
+        self.assertIsInstance(out[2], ValueError)
+        self.assertEqual(sorted(out), [1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+"""Embedding vector cache (:mod:`app.grading.embedding_cache`), no network."""
+
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from app.grading import rag_embeddings
+from app.grading.cache_support import SqliteStore
+from app.grading.embedding_cache import (
+    EmbeddingCache,
+    embedding_cache_key,
+    get_embedding_cache,
+    reset_embedding_caches,
+)
+from app.grading.rag_embeddings import (
+    compute_submission_embedding,
+    compute_submission_embeddings,
+)
+
+
+def _cfg(**kw: Any) -> SimpleNamespace:
+    base = {
+        "RAG_EMBEDDING_BACKEND": "sentence_transformers",
+        "SENTENCE_TRANSFORMERS_MODEL": "m",
+        "RAG_EMBED_MAX_CHARS": 24000,
+        "OPENAI_API_KEY": "",
+        "INTERNAL_OLLAMA_URL": "",
+        "OLLAMA_BASE_URL": "",
+        "RAG_EMBED_CACHE": "memory",
+    }
+    base.update(kw)
+    return SimpleNamespace(**base)
+
+
+class _CountingST:
+    def __init__(self) -> None:
+        self.encoded: list[str] = []
+
+    def __call__(self, texts: list[str], _cfg: Any) -> list[tuple[list[float], str] | None]:
+        self.encoded.extend(texts)
+        return [([float(len(t)), 0.5, 0.25] * 4, "sentence_transformers:m") for t in texts]
+
+
+def _store(path: Path) -> SqliteStore:
+    return SqliteStore(path, table="embedding_vectors", max_bytes=0, value_type="BLOB")
+
+
+class EmbeddingCacheKeyTests(unittest.TestCase):
+    def test_every_component_changes_key(self) -> None:
+        base = {"backend": "openai", "model": "m", "max_chars": 100, "text": "q"}
+        k0 = embedding_cache_key(**base)
+        for field, value in (
+            ("backend", "ollama"),
+            ("model", "m2"),
+            ("max_chars", 200),
+            ("text", "q2"),
+        ):
+            self.assertNotEqual(k0, embedding_cache_key(**{**base, field: value}))
+
+
+class EmbeddingCacheTests(unittest.TestCase):
+    def test_lru_evicts_and_counts_hit_rate(self) -> None:
+        cache = EmbeddingCache(max_entries=2)
+        cache.put("a", [1.0, 2.0], "s")
+        cache.put("b", [3.0], "s")
+        self.assertEqual(cache.get("a"), ([1.0, 2.0], "s"))
+        cache.put("c", [4.0], "s")
+        self.assertIsNone(cache.get("b"))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_disk_store_shared_between_caches(self) -> None:
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "e.sqlite3"
+            EmbeddingCache(store=_store(path)).put("k", [0.1, 0.2], "openai:m")
+            fresh = EmbeddingCache(store=_store(path))
+            self.assertEqual(fresh.get("k"), ([0.1, 0.2], "openai:m"))
+
+
+class CachedEmbeddingPathTests(unittest.TestCase):
+    def setUp(self) -> None:
+        reset_embedding_caches()
+
+    def tearDown(self) -> None:
+        reset_embedding_caches()
+
+    def test_batch_only_embeds_misses_and_single_path_hits(self) -> None:
+        cfg = _cfg()
+        st = _CountingST()
+        with patch.object(rag_embeddings, "sentence_transformers_embed_texts", side_effect=st):
+            first = compute_submission_embeddings(["question 1", "answer"], cfg)
+            second = compute_submission_embeddings(["question 1", "other"], cfg)
+        self.assertEqual(st.encoded, ["question 1", "answer", "other"])
+        self.assertEqual(first[0], second[0])
+        with patch.object(rag_embeddings, "sentence_transformers_embed_text") as single:
+            self.assertEqual(compute_submission_embedding("answer", cfg), first[1])
+        single.assert_not_called()
+        stats = get_embedding_cache(cfg).stats()  # type: ignore[union-attr]
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 3))
+
+    def test_hash_fallback_is_not_cached(self) -> None:
+        cfg = _cfg()
+        with patch.object(
+            rag_embeddings,
+            "sentence_transformers_embed_texts",
+            side_effect=lambda texts, _cfg: [None] * len(texts),
+        ):
+            with self.assertLogs("app.grading.rag_embeddings", level="WARNING"):
+                vec, src = compute_submission_embeddings(["x"], cfg)[0]
+        self.assertTrue(src.startswith("deterministic_hash:"))
+        self.assertEqual(get_embedding_cache(cfg).stats()["memory_entries"], 0)  # type: ignore[union-attr]
+
+    def test_fallback_backend_vector_not_cached_and_primary_recovers(self) -> None:
+        cfg = _cfg(RAG_EMBEDDING_BACKEND="openai", OPENAI_TRIO_RAG_EMBEDDING_MODEL="te3")
+        calls: list[int] = []
+
+        def openai(texts: list[str], _cfg: Any) -> list[tuple[list[float], str] | None]:
+            calls.append(len(texts))
+            if len(calls) == 1:
+                return [None] * len(texts)
+            return [([1.0] * 8, "openai:te3") for _ in texts]
+
+        st = _CountingST()
+        with patch.object(
+            rag_embeddings, "_openai_embed_snippets", side_effect=openai
+        ), patch.object(rag_embeddings, "sentence_transformers_embed_texts", side_effect=st):
+            with self.assertLogs("app.grading.rag_embeddings", level="WARNING"):
+                first = compute_submission_embeddings(["q"], cfg)[0]
+            second = compute_submission_embeddings(["q"], cfg)[0]
+            third = compute_submission_embeddings(["q"], cfg)[0]
+        self.assertEqual(first[1], "sentence_transformers:m")
+        self.assertEqual(second, ([1.0] * 8, "openai:te3"))
+        self.assertEqual(third, second)
+        self.assertEqual(calls, [1, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""Compact evidence vectors (:mod:`app.grading.embedding_vector`) and the chunk cache round trip."""
+
+from __future__ import annotations
+
+import json
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from app.grading.embedding_vector import (
+    JSON_TAG,
+    EmbeddingVector,
+    compact_embedding,
+    decode_vectors_from_json,
+    encode_vectors_for_json,
+)
+from app.grading.multimodal.chunk_cache import (
+    chunks_have_unit_embeddings,
+    grading_chunk_to_record,
+    load_grading_chunks_cache,
+    save_grading_chunks_cache,
+)
+from app.grading.multimodal.rag_embeddings import sanitize_evidence_for_grading_prompt
+from app.grading.multimodal.schemas import GradingChunk, Modality
+from tests.helpers import make_chunk
+
+
+def _chunk(evidence: dict) -> GradingChunk:
+    return make_chunk(modality=Modality.WRITTEN, evidence=evidence)
+
+
+class EmbeddingVectorTests(unittest.TestCase):
+    def test_sequence_interface_matches_list(self) -> None:
+        v = EmbeddingVector([0.5, -1.0, 2.0])
+        self.assertEqual(len(v), 3)
+        self.assertEqual(list(v), [0.5, -1.0, 2.0])
+        self.assertEqual(v[1], -1.0)
+        self.assertEqual(v[:2], [0.5, -1.0])
+        self.assertEqual(v, [0.5, -1.0, 2.0])
+        self.assertNotEqual(v, [0.5, -1.0])
+        self.assertEqual(np.asarray(v).dtype, np.float32)
+        with self.assertRaises(ValueError):
+            v.array[0] = 1.0
+
+    def test_bytes_json_and_pickle_round_trip(self) -> None:
+        v = EmbeddingVector(np.linspace(-1, 1, 16))
+        self.assertEqual(EmbeddingVector.from_bytes(v.to_bytes()), v)
+        self.assertEqual(pickle.loads(pickle.dumps(v)), v)
+        blob = json.dumps(encode_vectors_for_json({"x": [v, 1], "y": "z"}))
+        back = decode_vectors_from_json(json.loads(blob))
+        self.assertEqual(back["x"][0], v)
+        self.assertEqual(back["x"][1], 1)
+        self.assertEqual(back["y"], "z")
+
+    def test_compact_embedding_keeps_empty_as_list(self) -> None:
+        self.assertEqual(compact_embedding([]), [])
+        self.assertEqual(compact_embedding(None), [])
+        self.assertIsInstance(compact_embedding([1.0]), EmbeddingVector)
+
+
+class ChunkCacheVectorTests(unittest.TestCase):
+    def _evidence(self) -> dict:
+        vec = compact_embedding([float(i) / 7 for i in range(16)])
+        return {
+            "rag_embedding_bundle": {"embedding_dimension": 16, "embedding": vec},
+            "trio_segment_rag": {"question": {"embedding": vec}},
+            "answer_key_unit": {"snippet": "k", "answer_key_rag": {"embedding": vec}},
+        }
+
+    def test_binary_vectors_round_trip(self) -> None:
+        ch = _chunk(self._evidence())
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "chunks.json"
+            save_grading_chunks_cache(path, [ch])
+            self.assertIn(JSON_TAG, path.read_text(encoding="utf-8"))
+            loaded = load_grading_chunks_cache(path)
+        assert loaded is not None
+        ev = loaded[0].evidence
+        emb = ev["rag_embedding_bundle"]["embedding"]
+        self.assertIsInstance(emb, EmbeddingVector)
+        self.assertEqual(emb, ch.evidence["rag_embedding_bundle"]["embedding"])
+        self.assertTrue(chunks_have_unit_embeddings(loaded))
+
+    def test_legacy_float_lists_are_compacted_on_load(self) -> None:
+        ch = _chunk({})
+        record = grading_chunk_to_record(ch)
+        vec = [0.25] * 12
+        record["evidence"] = {
+            "rag_embedding_bundle": {"embedding": vec},
+            "trio_segment_rag": {
+                "question": {"embedding": vec},
+                "student_response": {"embedding": []},
+            },
+            "answer_key_unit": {"answer_key_rag": {"embedding": vec}},
+        }
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "legacy.json"
+            path.write_text(json.dumps([record], indent=2), encoding="utf-8")
+            loaded = load_grading_chunks_cache(path)
+        assert loaded is not None
+        ev = loaded[0].evidence
+        self.assertIsInstance(ev["rag_embedding_bundle"]["embedding"], EmbeddingVector)
+        self.assertIsInstance(ev["trio_segment_rag"]["question"]["embedding"], EmbeddingVector)
+        self.assertEqual(ev["trio_segment_rag"]["student_response"]["embedding"], [])
+        self.assertIsInstance(ev["answer_key_unit"]["answer_key_rag"]["embedding"], EmbeddingVector)
+        self.assertTrue(chunks_have_unit_embeddings(loaded))
+
+    def test_prompt_sanitizer_drops_vectors(self) -> None:
+        ev = self._evidence()
+        ev["stray"] = compact_embedding([1.0, 2.0])
+        out = sanitize_evidence_for_grading_prompt(ev)
+        json.dumps(out)
+        self.assertNotIn("embedding", out["rag_embedding_bundle"])
+        self.assertEqual(out["stray"]["embedding_dimension"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
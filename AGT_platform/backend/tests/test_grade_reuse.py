@@ -0,0 +1,199 @@
+"""Cross-student chunk grade reuse (:mod:`app.grading.multimodal.grade_reuse`)."""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from app.config import Config
+from app.grading.multimodal import MultimodalGradingConfig
+from app.grading.multimodal.assignment_context import reset_assignment_context_caches
+from app.grading.multimodal.grade_reuse import (
+    grade_reuse_enabled,
+    grade_reuse_key_parts,
+    normalize_response_text,
+    outcome_from_record,
+    outcome_to_record,
+)
+from app.grading.multimodal.schemas import (
+    ChunkGradeOutcome,
+    CriterionScore,
+    GradingChunk,
+    ParsedChunkGrade,
+    ReviewStatus,
+    RubricType,
+    SampledChunkGrade,
+)
+from tests.helpers import make_chunk
+
+
+def _chunk(text: str, *, student_id: str = "s1") -> GradingChunk:
+    return make_chunk(
+        chunk_id=f"{student_id}:q1",
+        student_id=student_id,
+        extracted_text=text,
+        rubric_type=RubricType.PROGRAMMING_SCAFFOLDED,
+        rubric_rows=[{"name": "Correctness", "max_points": 2}],
+    )
+
+
+class GradeReuseUnitTests(unittest.TestCase):
+    def test_normalization_ignores_spacing_but_not_indentation(self) -> None:
+        a = "def f(x):\r\n    return  x+1   \n\n"
+        b = "def f(x):\n    return x+1"
+        self.assertEqual(normalize_response_text(a), normalize_response_text(b))
+        self.assertNotEqual(
+            normalize_response_text("if x:\n  y()"), normalize_response_text("if x:\ny()")
+        )
+        self.assertEqual(
+            grade_reuse_key_parts(_chunk(a), grader_signature="g"),
+            grade_reuse_key_parts(_chunk(b, student_id="s2"), grader_signature="g"),
+        )
+        self.assertNotEqual(
+            grade_reuse_key_parts(_chunk(a), grader_signature="g"),
+            grade_reuse_key_parts(_chunk(a), grader_signature="h"),
+        )
+
+    def test_enable_and_opt_out(self) -> None:
+        on = SimpleNamespace(
+            MULTIMODAL_GRADE_REUSE=True,
+            MULTIMODAL_GRADE_REUSE_DISABLED_ASSIGNMENTS="hw9, hw10",
+            MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE="memory",
+        )
+        self.assertTrue(grade_reuse_enabled(on, {}, "hw1"))
+        self.assertFalse(grade_reuse_enabled(on, {}, "hw10"))
+        self.assertFalse(grade_reuse_enabled(on, {"grade_reuse": False}, "hw1"))
+        self.assertFalse(grade_reuse_enabled(SimpleNamespace(), {}, "hw1"))
+
+    def test_needs_assignment_context_cache(self) -> None:
+        from app.grading.multimodal import grade_reuse
+
+        cache_off = SimpleNamespace(
+            MULTIMODAL_GRADE_REUSE=True, MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE="off"
+        )
+        with patch.object(grade_reuse, "_warned_cache_off", False):
+            with self.assertLogs("app.grading.multimodal.grade_reuse", level="WARNING"):
+                self.assertFalse(grade_reuse_enabled(cache_off, {}, "hw1"))
+
+    def test_record_round_trip(self) -> None:
+        parsed = ParsedChunkGrade(
+            rubric_type=RubricType.PROGRAMMING_SCAFFOLDED,
+            criterion_scores=[CriterionScore(name="Correctness", score=2, max_points=2)],
+            criterion_justifications=["ok"],
+            total_score=2.0,
+            normalized_score=1.0,
+        )
+        outcome = ChunkGradeOutcome(
+            chunk_id="c1",
+            normalized_score_estimate=1.0,
+            semantic_entropy_nats=0.0,
+            ai_confidence=1.0,
+            entropy_max_reference_nats=1.0,
+            cluster_counts={"1.0": 1},
+            cluster_distribution={"1.0": 1.0},
+            samples=[SampledChunkGrade("openai:m", 0, "{}", parsed, True)],
+            criterion_consensus={"Correctness": 2.0},
+            review_status=ReviewStatus.CAUTION,
+            stage_artifacts={"model_ids": ["openai:m"]},
+        )
+        record = json.loads(json.dumps(outcome_to_record(outcome)))
+        self.assertEqual(outcome_from_record(record), outcome)
+
+
+class GradeReusePipelineTests(unittest.TestCase):
+    """Two students with the same submission: the second one draws no samples."""
+
+    _PLAIN = "".join(f"Question {i}: What is {i}+{i}?\nAnswer: {2 * i}\n\n" for i in range(1, 4))
+
+    class _CountingRunner:
+        def __init__(self) -> None:
+            self.calls = 0
+
+        def run_chunk_samples(self, chunk, *, system_prompt: str, user_prompt: str):
+            self.calls += 1
+            raw = json.dumps({"criterion_scores": [], "normalized_score": 1.0})
+            return [SampledChunkGrade("openai:fake", i, raw, None, False) for i in range(2)]
+
+    def setUp(self) -> None:
+        reset_assignment_context_caches()
+
+    def tearDown(self) -> None:
+        reset_assignment_context_caches()
+
+    def _run(self, runner: Any, student_id: str, **cfg_kw: Any) -> Any:
+        from app.grading.multimodal import MultimodalGradingPipeline, build_envelope_from_plaintext
+
+        cfg = Config()
+        cfg.OPENAI_API_KEY = ""
+        cfg.ANTHROPIC_API_KEY = ""
+        cfg.MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE = "memory"
+        cfg.MULTIMODAL_GRADE_REUSE = True
+        for k, v in cfg_kw.items():
+            setattr(cfg, k, v)
+        with tempfile.TemporaryDirectory() as d:
+            env = build_envelope_from_plaintext(
+                assignment_id="a1",
+                student_id=student_id,
+                plaintext=self._PLAIN,
+                modality_hints={
+                    "answer_key_dir": d,
+                    "blank_assignments_dir": d,
+                    "skip_trio_chunks_json_export": True,
+                    "skip_assignment_chunking_json_export": True,
+                },
+            )
+            with patch(
+                "app.grading.multimodal.rag_embeddings.compute_submission_embeddings",
+                side_effect=lambda texts, _cfg: [([0.1] * 8, "mock_embed") for _ in texts],
+            ):
+                return MultimodalGradingPipeline(
+                    MultimodalGradingConfig(), runner, app_cfg=cfg
+                ).run(env)
+
+    def test_identical_submission_reuses_grades(self) -> None:
+        runner = self._CountingRunner()
+        first = self._run(runner, "s1")
+        fresh_calls = runner.calls
+        self.assertGreater(fresh_calls, 0)
+        second = self._run(runner, "s2")
+        self.assertEqual(runner.calls, fresh_calls)
+        self.assertEqual(
+            [c.normalized_score_estimate for c in second.chunk_results],
+            [c.normalized_score_estimate for c in first.chunk_results],
+        )
+        reuse = second.chunk_results[0].stage_artifacts["grade_reuse"]
+        self.assertTrue(reuse["reused"])
+        self.assertEqual(reuse["source_student_id"], "s1")
+        self.assertEqual(second.chunk_results[0].stage_artifacts["raw_sample_count"], 0)
+        self.assertFalse(first.chunk_results[0].stage_artifacts["grade_reuse"]["reused"])
+
+    def test_chunks_without_question_id_are_not_reused(self) -> None:
+        from app.grading.multimodal import MultimodalGradingPipeline
+
+        cfg = Config()
+        cfg.MULTIMODAL_ASSIGNMENT_CONTEXT_CACHE = "memory"
+        cfg.MULTIMODAL_GRADE_REUSE = True
+        runner = self._CountingRunner()
+        pipeline = MultimodalGradingPipeline(MultimodalGradingConfig(), runner, app_cfg=cfg)
+        for student_id in ("s1", "s2"):
+            chunk = make_chunk(student_id=student_id, question_id="", extracted_text="42")
+            outcome, _row = pipeline._sample_or_reuse(
+                chunk, "prompt", answer_key_for_prompt="", dataset_plain=""
+            )
+            self.assertFalse(outcome.stage_artifacts["grade_reuse"]["reused"])
+        self.assertEqual(runner.calls, 2)
+
+    def test_disabled_assignment_grades_every_submission(self) -> None:
+        runner = self._CountingRunner()
+        self._run(runner, "s1", MULTIMODAL_GRADE_REUSE_DISABLED_ASSIGNMENTS="a1")
+        fresh_calls = runner.calls
+        self._run(runner, "s2", MULTIMODAL_GRADE_REUSE_DISABLED_ASSIGNMENTS="a1")
+        self.assertEqual(runner.calls, 2 * fresh_calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+"""Cheapest-model-first grading cascade (:mod:`app.grading.multimodal.cascade`)."""
+
+from __future__ import annotations
+
+import itertools
+import unittest
+from types import SimpleNamespace
+from typing import Any
+
+from app.grading.multimodal import (
+    MultimodalGradingConfig,
+    MultimodalGradingPipeline,
+    PipelineArtifactStore,
+    PreparedSubmission,
+    build_envelope_from_plaintext,
+)
+from app.grading.multimodal.cascade import cascade_tier_order, parse_model_prices
+from app.grading.multimodal.model_runner import MultiModelChunkRunner
+from app.grading.multimodal.schemas import GradingChunk, Modality, RubricType, TaskType
+from tests.helpers import make_chunk
+
+_ROWS = [{"name": "Correctness", "max_points": 2}]
+
+
+def _chunk() -> GradingChunk:
+    return make_chunk(
+        question_id="1",
+        modality=Modality.WRITTEN,
+        task_type=TaskType.FREE_RESPONSE_SHORT,
+        extracted_text="Water boils at 100 C.",
+        rubric_type=RubricType.FREE_RESPONSE,
+        rubric_rows=list(_ROWS),
+    )
+
+
+class _Client:
+    """Cycles through ``scores`` (``None`` = failed call) and counts calls."""
+
+    def __init__(self, scores: list[float | None]) -> None:
+        self._scores = itertools.cycle(scores)
+        self.calls = 0
+
+    def chat_json_with_usage(self, messages: list[dict], **_kw: Any):
+        self.calls += 1
+        score = next(self._scores)
+        if score is None:
+            raise ValueError("model returned invalid JSON")
+        obj = {
+            "criterion_scores": [{"name": "Correctness", "raw_score": score, "max_points": 2}],
+            "normalized_score": score / 2,
+        }
+        return obj, {"prompt_tokens": 1000, "completion_tokens": 100, "total_tokens": 1100}
+
+
+class PricesAndOrderTests(unittest.TestCase):
+    def test_prices_parse_and_cheapest_goes_first(self) -> None:
+        prices = parse_model_prices("openai:big=2.5/15, openai:nano=0.2/1.25,broken")
+        self.assertEqual(prices, {"openai:big": (2.5, 15.0), "openai:nano": (0.2, 1.25)})
+        labels = ["openai:big", "openai:other", "openai:nano"]
+        self.assertEqual(cascade_tier_order(labels, prices), [2, 0, 1])
+        self.assertEqual(cascade_tier_order(labels, {}), [0, 1, 2])
+
+
+class CascadePipelineTests(unittest.TestCase):
+    def _grade(self, cheap: _Client, strong: _Client, **cfg: Any) -> Any:
+        app_cfg = SimpleNamespace(
+            MULTIMODAL_SAMPLES_PER_MODEL=3,
+            MULTIMODAL_RULE_GRADER=False,
+            MULTIMODAL_GRADING_CASCADE=True,
+            MULTIMODAL_CASCADE_CONFIDENCE_MIN=0.85,
+            MULTIMODAL_CASCADE_MODEL_PRICES="openai:nano=0.2/1.25,openai:big=2.5/15",
+            **cfg,
+        )
+        runner = MultiModelChunkRunner(
+            app_cfg,  # type: ignore[arg-type]
+            build_clients=lambda _cfg: [(strong, "openai:big"), (cheap, "openai:nano")],
+        )
+        pipeline = MultimodalGradingPipeline(MultimodalGradingConfig(), runner, app_cfg=app_cfg)
+        prepared = PreparedSubmission(
+            envelope=build_envelope_from_plaintext(
+                assignment_id="a1", student_id="s1", plaintext="x"
+            ),
+            chunks=[_chunk()],
+            answer_key_for_prompt="",
+            dataset_plain="",
+            artifacts=PipelineArtifactStore(),
+            workflow=[],
+        )
+        return pipeline.grade_prepared(prepared)
+
+    def test_confident_cheap_tier_skips_strong_model(self) -> None:
+        cheap, strong = _Client([2]), _Client([0])
+        result = self._grade(cheap, strong)
+        self.assertEqual((cheap.calls, strong.calls), (3, 0))
+        outcome = result.chunk_results[0]
+        self.assertEqual(outcome.normalized_score_estimate, 1.0)
+        trace = outcome.stage_artifacts["cascade"]
+        self.assertEqual([t["model_id"] for t in trace["tiers"]], ["openai:nano"])
+        self.assertIsNone(trace["tiers"][0]["escalation_reason"])
+        self.assertAlmostEqual(trace["tiers"][0]["cost_usd"], (3000 * 0.2 + 300 * 1.25) / 1e6)
+
+    def test_low_confidence_or_parse_failures_escalate(self) -> None:
+        for scores, reason in (([2, 0, 1], "low_confidence"), ([None, None, 2], "parse_failures")):
+            with self.subTest(reason=reason):
+                cheap, strong = _Client(scores), _Client([2])
+                result = self._grade(cheap, strong)
+                self.assertEqual((cheap.calls, strong.calls), (3, 3))
+                tiers = result.chunk_results[0].stage_artifacts["cascade"]["tiers"]
+                self.assertEqual(tiers[0]["escalation_reason"], reason)
+                self.assertEqual(tiers[1]["model_id"], "openai:big")
+                self.assertEqual(result.chunk_results[0].stage_artifacts["raw_sample_count"], 6)
+                phase = [
+                    w for w in result.stage_artifacts["agentic_workflow"]
+                    if w["phase"] == "cascade"
+                ][0]
+                self.assertEqual(phase["escalated"], 1)
+                self.assertEqual(phase["tiers"]["openai:big"]["calls"], 3)
+                self.assertEqual(phase["tiers"]["openai:nano"]["tier"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+"""Content-addressed LLM response cache (:mod:`app.grading.llm_response_cache`), no network."""
+
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.grading.cache_support import SqliteStore
+from app.grading.llm_response_cache import (
+    LLMResponseCache,
+    get_llm_response_cache,
+    reset_llm_response_caches,
+    response_cache_key,
+)
+from app.grading.llm_router import CachedChatClient, maybe_cache_chat_client
+from app.grading.multimodal.model_runner import MultiModelChunkRunner
+from app.grading.multimodal.schemas import GradingChunk, Modality, TaskType
+
+_MSGS = [{"role": "system", "content": "s"}, {"role": "user", "content": "u"}]
+
+
+def _key(slot: int = 0, temperature: float | None = 0.3) -> str:
+    return response_cache_key(
+        model="openai:m",
+        messages=_MSGS,
+        temperature=temperature,
+        response_format=None,
+        sample_slot=slot,
+    )
+
+
+class _CountingClient:
+    model = "m"
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def chat_json(self, messages: list[dict], *, temperature: float | None = None) -> dict:
+        self.calls += 1
+        return {"n": self.calls}
+
+
+class ResponseCacheKeyTests(unittest.TestCase):
+    def test_slot_and_temperature_change_key(self) -> None:
+        self.assertEqual(_key(0), _key(0))
+        self.assertNotEqual(_key(0), _key(1))
+        self.assertNotEqual(_key(0, 0.3), _key(0, 0.0))
+
+
+class LLMResponseCacheTests(unittest.TestCase):
+    def test_memory_lru_evicts_oldest(self) -> None:
+        cache = LLMResponseCache(max_entries=2)
+        cache.put("a", {"v": 1})
+        cache.put("b", {"v": 2})
+        self.assertEqual(cache.get("a"), {"v": 1})
+        cache.put("c", {"v": 3})
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), {"v": 1})
+        self.assertEqual(cache.stats()["hits"], 2)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_ttl_expiry(self) -> None:
+        cache = LLMResponseCache(ttl_sec=60)
+        with patch("app.grading.cache_support.time.time", return_value=1000.0):
+            cache.put("a", {"v": 1})
+        with patch("app.grading.cache_support.time.time", return_value=1061.0):
+            self.assertIsNone(cache.get("a"))
+
+    def test_hits_return_independent_copies(self) -> None:
+        cache = LLMResponseCache()
+        cache.put("a", {"v": [1]})
+        cache.get("a")["v"].append(2)  # type: ignore[index]
+        self.assertEqual(cache.get("a"), {"v": [1]})
+
+    def test_disk_store_survives_new_process_cache(self) -> None:
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / "c.sqlite3"
+            LLMResponseCache(store=SqliteStore(path, table="responses", max_bytes=0)).put(
+                "a", {"v": 1}
+            )
+            fresh = LLMResponseCache(store=SqliteStore(path, table="responses", max_bytes=0))
+            self.assertEqual(fresh.get("a"), {"v": 1})
+
+
+class CachedChatClientTests(unittest.TestCase):
+    def setUp(self) -> None:
+        reset_llm_response_caches()
+
+    def tearDown(self) -> None:
+        reset_llm_response_caches()
+
+    def test_disabled_by_default(self) -> None:
+        inner = _CountingClient()
+        self.assertIs(maybe_cache_chat_client(inner, "openai:m", SimpleNamespace()), inner)
+
+    def test_rerun_replays_each_sample_slot(self) -> None:
+        cfg = SimpleNamespace(
+            LLM_RESPONSE_CACHE="memory",
+            MULTIMODAL_SAMPLES_PER_MODEL=3,
+            GRADING_SAMPLE_TEMPERATURE=0.3,
+        )
+        inner = _CountingClient()
+        client = maybe_cache_chat_client(inner, "openai:m", cfg)
+        self.assertIsInstance(client, CachedChatClient)
+        chunk = GradingChunk(
+            chunk_id="c1",
+            assignment_id="a1",
+            student_id="s1",
+            question_id="1",
+            modality=Modality.WRITTEN,
+            task_type=TaskType.FREE_RESPONSE_SHORT,
+            extracted_text="x",
+        )
+        runner = MultiModelChunkRunner(
+            cfg,  # type: ignore[arg-type]
+            build_clients=lambda _cfg: [(client, "openai:m")],
+        )
+        first = runner.run_chunk_samples(chunk, system_prompt="s", user_prompt="u")
+        second = runner.run_chunk_samples(chunk, system_prompt="s", user_prompt="u")
+        self.assertEqual(inner.calls, 3)
+        self.assertEqual([s.raw_text for s in first], [s.raw_text for s in second])
+        self.assertEqual(len({s.raw_text for s in first}), 3)
+        stats = get_llm_response_cache(cfg).stats()  # type: ignore[union-attr]
+        self.assertEqual((stats["hits"], stats["misses"]), (3, 3))
+
+    def test_multi_choice_requests_only_missing_slots(self) -> None:
+        class _Choices(_CountingClient):
+            supports_multi_choice = True
+
+            def __init__(self) -> None:
+                super().__init__()
+                self.requested: list[int] = []
+
+            def chat_json_choices(
+                self, messages: list[dict], *, n: int, temperature: float | None = None
+            ) -> list[dict]:
+                self.requested.append(n)
+                return [{"choice": i} for i in range(n)]
+
+        cache = LLMResponseCache()
+        cache.put(_key(slot=1), {"cached": 1})
+        inner = _Choices()
+        client = CachedChatClient(inner, cache, "openai:m")
+        out = client.chat_json_choices(_MSGS, n=3, temperature=0.3)
+        self.assertEqual(inner.requested, [2])
+        self.assertEqual(out, [{"choice": 0}, {"cached": 1}, {"choice": 1}])
+        self.assertEqual(client.chat_json(_MSGS, temperature=0.3, sample_slot=2), {"choice": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""Process-wide SDK client registry in :mod:`app.grading.llm_router` (no network)."""
+
+from __future__ import annotations
+
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from app.grading import llm_router
+from app.grading.llm_router import (
+    MultiChoiceUnsupportedError,
+    OpenAIJsonClient,
+    client_supports_multi_choice,
+    reset_shared_sdk_clients,
+    shared_anthropic_sdk_client,
+    shared_openai_sdk_client,
+)
+
+
+class SharedSdkClientTests(unittest.TestCase):
+    def setUp(self) -> None:
+        reset_shared_sdk_clients()
+
+    def tearDown(self) -> None:
+        reset_shared_sdk_clients()
+
+    def test_same_key_reuses_one_client_across_threads(self) -> None:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            clients = list(pool.map(lambda _i: shared_openai_sdk_client("sk-a"), range(16)))
+        self.assertEqual(len({id(c) for c in clients}), 1)
+
+    def test_distinct_keys_and_providers_get_distinct_clients(self) -> None:
+        a = shared_openai_sdk_client("sk-a")
+        b = shared_openai_sdk_client("sk-b")
+        c = shared_anthropic_sdk_client("sk-a")
+        self.assertIsNot(a, b)
+        self.assertIsNot(a, c)
+
+    def test_reset_drops_cached_clients(self) -> None:
+        a = shared_openai_sdk_client("sk-a")
+        reset_shared_sdk_clients()
+        self.assertIsNot(a, shared_openai_sdk_client("sk-a"))
+
+
+class _FakeCompletions:
+    def __init__(self, contents: list[str], error: Exception | None = None):
+        self.contents = contents
+        self.error = error
+        self.kwargs: list[dict[str, Any]] = []
+
+    def create(self, **kwargs: Any) -> Any:
+        self.kwargs.append(kwargs)
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(
+            choices=[
+                SimpleNamespace(message=SimpleNamespace(content=c)) for c in self.contents
+            ],
+            usage=SimpleNamespace(prompt_tokens=100, completion_tokens=30, total_tokens=130),
+        )
+
+
+class OpenAIMultiChoiceTests(unittest.TestCase):
+    def tearDown(self) -> None:
+        llm_router._multi_choice_unsupported_models.discard("gpt-test")
+
+    def _client(self, completions: _FakeCompletions) -> Any:
+        sdk = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        return patch.object(llm_router, "shared_openai_sdk_client", return_value=sdk)
+
+    def test_one_request_returns_parsed_choices_and_usage(self) -> None:
+        fake = _FakeCompletions(['{"a": 1}', "not json", '{"a": 3}'])
+        with self._client(fake):
+            choices, usage = OpenAIJsonClient("sk", "gpt-test").chat_json_choices_with_usage(
+                [{"role": "user", "content": "u"}], n=3, temperature=0.3
+            )
+        self.assertEqual(len(fake.kwargs), 1)
+        self.assertEqual(fake.kwargs[0]["n"], 3)
+        self.assertEqual(choices, [{"a": 1}, None, {"a": 3}])
+        self.assertEqual(usage["prompt_tokens"], 100)
+
+    def test_rejected_n_marks_model_unsupported(self) -> None:
+        import httpx
+        import openai
+
+        err = openai.BadRequestError(
+            "n is not supported",
+            response=httpx.Response(400, request=httpx.Request("POST", "https://x")),
+            body=None,
+        )
+        client = OpenAIJsonClient("sk", "gpt-test")
+        self.assertTrue(client_supports_multi_choice(client))
+        with self._client(_FakeCompletions([], error=err)):
+            with self.assertRaises(MultiChoiceUnsupportedError):
+                client.chat_json_choices([{"role": "user", "content": "u"}], n=2)
+        self.assertFalse(client_supports_multi_choice(client))
+
+    def test_other_bad_request_does_not_mark_model(self) -> None:
+        import httpx
+        import openai
+
+        err = openai.BadRequestError(
+            "This model's maximum context length is 128000 tokens.",
+            response=httpx.Response(400, request=httpx.Request("POST", "https://x")),
+            body={"code": "context_length_exceeded", "param": "messages", "type": "invalid"},
+        )
+        client = OpenAIJsonClient("sk", "gpt-test")
+        with self._client(_FakeCompletions([], error=err)):
+            with self.assertRaises(openai.BadRequestError) as ctx:
+                client.chat_json_choices([{"role": "user", "content": "u"}], n=2)
+        self.assertIs(ctx.exception, err)
+        self.assertTrue(client_supports_multi_choice(client))
+
+
+if __name__ == "__main__":
+    unittest.main()
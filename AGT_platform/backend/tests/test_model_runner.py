@@ -0,0 +1,236 @@
+"""Unit tests for :class:`app.grading.multimodal.model_runner.MultiModelChunkRunner` (no live LLM)."""
+
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from typing import Any
+
+from app.grading.multimodal.model_runner import MultiModelChunkRunner
+from app.grading.multimodal.schemas import GradingChunk, Modality, TaskType
+
+
+def _chunk() -> GradingChunk:
+    return GradingChunk(
+        chunk_id="s1:a1:1.1",
+        assignment_id="a1",
+        student_id="s1",
+        question_id="1.1",
+        modality=Modality.NOTEBOOK,
+        task_type=TaskType.SCAFFOLDED_CODING,
+        extracted_text="import csv",
+    )
+
+
+class _SlowClient:
+    """Records peak in-flight calls; returns the call ordinal so ordering is observable."""
+
+    def __init__(self, label: str, *, delay: float = 0.02, fail_on: set[int] | None = None):
+        self.label = label
+        self.delay = delay
+        self.fail_on = fail_on or set()
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    def chat_json(self, messages: list[dict], *, temperature: float | None = None) -> dict:
+        with self._lock:
+            n = self.calls
+            self.calls += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            if n in self.fail_on:
+                raise RuntimeError("boom")
+            return {"model": self.label, "temperature": temperature}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def _runner(clients: list[_SlowClient], **cfg: Any) -> MultiModelChunkRunner:
+    base = {"MULTIMODAL_SAMPLES_PER_MODEL": 4, "GRADING_SAMPLE_TEMPERATURE": 0.3}
+    base.update(cfg)
+    return MultiModelChunkRunner(
+        SimpleNamespace(**base),  # type: ignore[arg-type]
+        build_clients=lambda _cfg: [(c, c.label) for c in clients],
+    )
+
+
+class MultiModelChunkRunnerConcurrencyTests(unittest.TestCase):
+    def test_serial_default_runs_one_call_at_a_time(self) -> None:
+        a = _SlowClient("openai:a", delay=0.0)
+        out = _runner([a]).run_chunk_samples(_chunk(), system_prompt="s", user_prompt="u")
+        self.assertEqual(len(out), 4)
+        self.assertEqual(a.peak, 1)
+
+    def test_concurrent_mode_bounds_in_flight_per_model(self) -> None:
+        a = _SlowClient("openai:a")
+        b = _SlowClient("openai:b")
+        out = _runner([a, b], MULTIMODAL_SAMPLE_CONCURRENCY=2).run_chunk_samples(
+            _chunk(), system_prompt="s", user_prompt="u"
+        )
+        self.assertLessEqual(a.peak, 2)
+        self.assertLessEqual(b.peak, 2)
+        self.assertGreater(a.peak, 1)
+        self.assertEqual([s.sample_index for s in out], list(range(8)))
+        self.assertEqual(
+            [s.model_id for s in out], ["openai:a"] * 4 + ["openai:b"] * 4
+        )
+
+    def test_concurrent_failure_keeps_slot_and_logs(self) -> None:
+        a = _SlowClient("openai:a", fail_on={0})
+        with self.assertLogs("app.grading.multimodal.model_runner", level="WARNING") as logs:
+            out = _runner([a], MULTIMODAL_SAMPLE_CONCURRENCY=4).run_chunk_samples(
+                _chunk(), system_prompt="s", user_prompt="u"
+            )
+        self.assertEqual(len(out), 4)
+        self.assertEqual(sum(1 for s in out if s.raw_text == ""), 1)
+        self.assertTrue(any("grading_llm_sample_failed" in m for m in logs.output))
+
+    def test_in_flight_budget_caps_calls_across_threads(self) -> None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        a = _SlowClient("openai:a")
+        runner = _runner(
+            [a], MULTIMODAL_SAMPLE_CONCURRENCY=4, MULTIMODAL_LLM_MAX_IN_FLIGHT=2
+        )
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            results = list(
+                pool.map(
+                    lambda _i: runner.run_chunk_samples(
+                        _chunk(), system_prompt="s", user_prompt="u"
+                    ),
+                    range(3),
+                )
+            )
+        self.assertEqual([len(r) for r in results], [4, 4, 4])
+        self.assertEqual(a.calls, 12)
+        self.assertLessEqual(a.peak, 2)
+
+    def test_in_flight_budget_is_shared_by_runners_with_the_same_limit(self) -> None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        a = _SlowClient("openai:a")
+        runners = [
+            _runner([a], MULTIMODAL_SAMPLE_CONCURRENCY=4, MULTIMODAL_LLM_MAX_IN_FLIGHT=3)
+            for _ in range(3)
+        ]
+        self.assertIs(runners[0]._call_budget, runners[1]._call_budget)
+        self.assertIsNot(runners[0]._call_budget, _runner([a])._call_budget)
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            list(
+                pool.map(
+                    lambda r: r.run_chunk_samples(_chunk(), system_prompt="s", user_prompt="u"),
+                    runners,
+                )
+            )
+        self.assertEqual(a.calls, 12)
+        self.assertLessEqual(a.peak, 3)
+
+    def test_clients_are_built_once_per_runner(self) -> None:
+        a = _SlowClient("openai:a", delay=0.0)
+        builds: list[int] = []
+
+        def build(_cfg: Any) -> list[tuple[Any, str]]:
+            builds.append(1)
+            return [(a, a.label)]
+
+        runner = MultiModelChunkRunner(
+            SimpleNamespace(MULTIMODAL_SAMPLES_PER_MODEL=1),  # type: ignore[arg-type]
+            build_clients=build,
+        )
+        for _ in range(3):
+            runner.run_chunk_samples(_chunk(), system_prompt="s", user_prompt="u")
+        self.assertEqual(len(builds), 1)
+        self.assertEqual(a.calls, 3)
+
+
+class AdaptiveSamplingWaveTests(unittest.TestCase):
+    def test_should_stop_ends_chunk_after_first_wave(self) -> None:
+        a = _SlowClient("openai:a", delay=0.0)
+        seen: list[int] = []
+
+        def stop(samples: list[Any]) -> bool:
+            seen.append(len(samples))
+            return True
+
+        out = _runner(
+            [a], MULTIMODAL_SAMPLES_PER_MODEL=5, MULTIMODAL_ADAPTIVE_WAVE_SIZE=2
+        ).run_chunk_samples(_chunk(), system_prompt="s", user_prompt="u", should_stop=stop)
+        self.assertEqual(a.calls, 2)
+        self.assertEqual(seen, [2])
+        self.assertEqual([s.sample_index for s in out], [0, 1])
+
+    def test_waves_keep_slot_order_across_models(self) -> None:
+        a = _SlowClient("openai:a")
+        b = _SlowClient("openai:b")
+        out = _runner(
+            [a, b],
+            MULTIMODAL_SAMPLES_PER_MODEL=3,
+            MULTIMODAL_ADAPTIVE_WAVE_SIZE=2,
+            MULTIMODAL_SAMPLE_CONCURRENCY=2,
+        ).run_chunk_samples(
+            _chunk(), system_prompt="s", user_prompt="u", should_stop=lambda _s: False
+        )
+        self.assertEqual([s.sample_index for s in out], list(range(6)))
+        self.assertEqual([s.model_id for s in out], ["openai:a"] * 3 + ["openai:b"] * 3)
+
+
+class _MultiChoiceClient(_SlowClient):
+    """Returns ``n`` choices per request (optionally fewer, or rejects ``n``)."""
+
+    supports_multi_choice = True
+
+    def __init__(self, label: str, *, short_by: int = 0, reject: bool = False):
+        super().__init__(label, delay=0.0)
+        self.short_by = short_by
+        self.reject = reject
+        self.choice_requests: list[int] = []
+
+    def chat_json_choices(
+        self, messages: list[dict], *, n: int, temperature: float | None = None
+    ) -> list[dict | None]:
+        from app.grading.llm_router import MultiChoiceUnsupportedError
+
+        self.choice_requests.append(n)
+        if self.reject:
+            raise MultiChoiceUnsupportedError("n not supported")
+        return [{"model": self.label, "choice": i} for i in range(max(0, n - self.short_by))]
+
+
+class MultiChoiceSamplingTests(unittest.TestCase):
+    def test_one_request_per_model_when_supported(self) -> None:
+        a = _MultiChoiceClient("openai:a")
+        out = _runner([a]).run_chunk_samples(_chunk(), system_prompt="s", user_prompt="u")
+        self.assertEqual(a.choice_requests, [4])
+        self.assertEqual(a.calls, 0)
+        self.assertEqual([s.sample_index for s in out], [0, 1, 2, 3])
+        self.assertTrue(all(s.raw_text for s in out))
+
+    def test_short_response_is_topped_up_with_single_calls(self) -> None:
+        a = _MultiChoiceClient("openai:a", short_by=1)
+        out = _runner([a]).run_chunk_samples(_chunk(), system_prompt="s", user_prompt="u")
+        self.assertEqual(len(out), 4)
+        self.assertEqual(a.calls, 1)
+
+    def test_rejected_multi_choice_falls_back_to_single_calls(self) -> None:
+        a = _MultiChoiceClient("openai:a", reject=True)
+        out = _runner([a]).run_chunk_samples(_chunk(), system_prompt="s", user_prompt="u")
+        self.assertEqual(a.calls, 4)
+        self.assertEqual(len(out), 4)
+
+    def test_disabled_by_config(self) -> None:
+        a = _MultiChoiceClient("openai:a")
+        _runner([a], MULTIMODAL_OPENAI_MULTI_CHOICE=False).run_chunk_samples(
+            _chunk(), system_prompt="s", user_prompt="u"
+        )
+        self.assertEqual((a.choice_requests, a.calls), ([], 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -363,8 +363,9 @@ def _ollama_chat_smoke(cfg: Config) -> tuple[bool, str]:
 def _ollama_embedding_smoke(cfg: Config) -> tuple[bool, str]:
     """
     Fast Ollama check for multimodal integration on the RAG model (default
-    ``nomic-embed-text``). Matches :func:`app.grading.rag_embeddings._ollama_embed_snippet`:
-    try legacy ``POST /api/embeddings`` first, then ``POST /api/embed`` (current Ollama).
+    ``nomic-embed-text``). Probes the endpoints
+    :func:`app.grading.rag_embeddings._ollama_embed_snippet` uses: legacy
+    ``POST /api/embeddings``, then ``POST /api/embed`` (either one is enough).
     """
     base = (cfg.INTERNAL_OLLAMA_URL or cfg.OLLAMA_BASE_URL or "").strip().rstrip("/")
     embed_model = (getattr(cfg, "OLLAMA_EMBEDDINGS_MODEL", "") or "nomic-embed-text").strip()
@@ -757,11 +758,11 @@ class AnswerKeyCodeMatchTests(unittest.TestCase):
             )
         )
 
-    @patch("app.grading.multimodal.answer_key_chunk_enrich.compute_submission_embedding")
+    @patch("app.grading.multimodal.answer_key_chunk_enrich.compute_submission_embeddings")
     def test_enrich_prefers_trio_answer_key_when_it_matches_student(
         self, mock_emb: MagicMock,
     ) -> None:
-        mock_emb.return_value = ([0.1] * 16, "mock_embed")
+        mock_emb.side_effect = lambda texts, _cfg: [([0.1] * 16, "mock_embed") for _ in texts]
         cfg = SimpleNamespace()
         ch = GradingChunk(
             chunk_id="c1",
@@ -989,6 +990,136 @@ class ChunkGradingPromptJsonTests(unittest.TestCase):
         self.assertIn("Reference:", data["matched_answer_key_for_question"])
 
 
+class ParallelChunkGradingTests(unittest.TestCase):
+    """``MULTIMODAL_CHUNK_GRADING_WORKERS`` must not change results or audit order (no LLM)."""
+
+    _PLAIN = "".join(
+        f"Question {i}: What is {i}+{i}?\nAnswer: {2 * i}\n\n" for i in range(1, 7)
+    )
+
+    class _FakeRunner:
+        def run_chunk_samples(self, chunk, *, system_prompt: str, user_prompt: str):
+            import random
+            import time
+
+            from app.grading.multimodal.schemas import SampledChunkGrade
+
+            time.sleep(random.uniform(0.0, 0.01))
+            score = (len(chunk.chunk_id) % 4) / 4.0
+            raw = json.dumps({"criterion_scores": [], "normalized_score": score})
+            return [
+                SampledChunkGrade(
+                    model_id="openai:fake",
+                    sample_index=i,
+                    raw_text=raw,
+                    parsed=None,
+                    parse_ok=False,
+                )
+                for i in range(2)
+            ]
+
+    def _run(self, workers: int) -> tuple[Any, str]:
+        from app.grading.multimodal import MultimodalGradingPipeline, build_envelope_from_plaintext
+
+        cfg = Config()
+        cfg.OPENAI_API_KEY = ""
+        cfg.ANTHROPIC_API_KEY = ""
+        cfg.MULTIMODAL_CHUNK_GRADING_WORKERS = workers
+        with tempfile.TemporaryDirectory() as d:
+            env = build_envelope_from_plaintext(
+                assignment_id="a1",
+                student_id="s1",
+                plaintext=self._PLAIN,
+                modality_hints={
+                    "answer_key_dir": d,
+                    "blank_assignments_dir": d,
+                    "skip_trio_chunks_json_export": True,
+                    "skip_assignment_chunking_json_export": True,
+                },
+            )
+            with patch(
+                "app.grading.multimodal.rag_embeddings.compute_submission_embeddings",
+                side_effect=lambda texts, _cfg: [([0.1] * 8, "mock_embed") for _ in texts],
+            ):
+                res = MultimodalGradingPipeline(
+                    MultimodalGradingConfig(), self._FakeRunner(), app_cfg=cfg
+                ).run(env)
+        dumped = json.dumps(
+            {
+                "chunks": [
+                    (c.chunk_id, c.normalized_score_estimate, c.stage_artifacts)
+                    for c in res.chunk_results
+                ],
+                "audit": res.stage_artifacts["pipeline_audit"],
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return res, dumped
+
+    def test_parallel_matches_serial(self) -> None:
+        serial, serial_dump = self._run(1)
+        parallel, parallel_dump = self._run(4)
+        self.assertGreater(len(serial.chunk_results), 1)
+        self.assertEqual(serial_dump, parallel_dump)
+        self.assertEqual(
+            [r["chunk_id"] for r in parallel.stage_artifacts["pipeline_audit"]["grading"]],
+            [c.chunk_id for c in parallel.chunk_results],
+        )
+
+
+class AdaptiveSamplingPipelineTests(unittest.TestCase):
+    """``MULTIMODAL_ADAPTIVE_SAMPLING`` stops agreeing chunks after the first wave (no LLM)."""
+
+    class _AgreeingClient:
+        def __init__(self) -> None:
+            self.calls = 0
+
+        def chat_json(self, messages: list[dict], *, temperature: float | None = None) -> dict:
+            self.calls += 1
+            return {"criterion_scores": [], "normalized_score": 1.0}
+
+    def test_unanimous_chunks_stop_after_first_wave(self) -> None:
+        from app.grading.multimodal import MultimodalGradingPipeline, build_envelope_from_plaintext
+        from app.grading.multimodal.model_runner import MultiModelChunkRunner
+
+        cfg = Config()
+        cfg.OPENAI_API_KEY = ""
+        cfg.ANTHROPIC_API_KEY = ""
+        cfg.MULTIMODAL_SAMPLES_PER_MODEL = 5
+        cfg.MULTIMODAL_ADAPTIVE_SAMPLING = True
+        cfg.MULTIMODAL_ADAPTIVE_WAVE_SIZE = 2
+        cfg.MULTIMODAL_ADAPTIVE_STOP_RULE = "unanimous"
+        client = self._AgreeingClient()
+        runner = MultiModelChunkRunner(cfg, build_clients=lambda _c: [(client, "openai:fake")])
+        with tempfile.TemporaryDirectory() as d:
+            env = build_envelope_from_plaintext(
+                assignment_id="a1",
+                student_id="s1",
+                plaintext=ParallelChunkGradingTests._PLAIN,
+                modality_hints={
+                    "answer_key_dir": d,
+                    "blank_assignments_dir": d,
+                    "skip_trio_chunks_json_export": True,
+                    "skip_assignment_chunking_json_export": True,
+                },
+            )
+            with patch(
+                "app.grading.multimodal.rag_embeddings.compute_submission_embeddings",
+                side_effect=lambda texts, _cfg: [([0.1] * 8, "mock_embed") for _ in texts],
+            ):
+                res = MultimodalGradingPipeline(
+                    MultimodalGradingConfig(), runner, app_cfg=cfg
+                ).run(env)
+        self.assertGreater(len(res.chunk_results), 1)
+        for c in res.chunk_results:
+            trace = c.stage_artifacts["adaptive_sampling"]
+            self.assertEqual(trace["samples_drawn"], 2)
+            self.assertEqual(trace["budget"], 5)
+            self.assertTrue(trace["stopped_early"])
+        self.assertEqual(client.calls, 2 * len(res.chunk_results))
+
+
 # ---------------------------------------------------------------------------
 # Chunking accuracy tests (no LLM — verifies notebook cell-order chunker)
 # ---------------------------------------------------------------------------
@@ -1299,6 +1430,58 @@ class AnswerKeyChunkEnrichTests(unittest.TestCase):
         self.assertIsInstance(rag, dict)
         self.assertGreater(rag.get("embedding_dimension", 0), 0)
 
+    def test_section_index_embeds_sections_once_and_is_reused(self) -> None:
+        from app.grading.multimodal.answer_key_chunk_enrich import (
+            reset_answer_key_section_indexes,
+        )
+
+        topics = ["apples", "rivers", "engines"]
+
+        def fake_embed(texts: list[str], _cfg: Any) -> list[tuple[list[float], str]]:
+            calls.append(len(texts))
+            out = []
+            for t in texts:
+                vec = [1.0 if w in t.lower() else 0.0 for w in topics] + [0.1]
+                # Default backend's source: only primary-backend indexes are cached.
+                out.append((vec, "sentence_transformers:all-MiniLM-L6-v2"))
+            return out
+
+        def chunks() -> list[GradingChunk]:
+            return [
+                GradingChunk(
+                    chunk_id=f"s:a:{i}",
+                    assignment_id="a",
+                    student_id="s",
+                    question_id=f"q{i}",
+                    modality=Modality.WRITTEN,
+                    task_type=TaskType.FREE_RESPONSE_SHORT,
+                    extracted_text=f"Discuss {topic}.",
+                )
+                for i, topic in enumerate(["engines", "apples", "rivers", "engines"])
+            ]
+
+        ak = "## Part A\nAbout apples.\n\n## Part B\nAbout rivers.\n\n## Part C\nAbout engines."
+        calls: list[int] = []
+        reset_answer_key_section_indexes()
+        try:
+            with patch(
+                "app.grading.multimodal.answer_key_chunk_enrich.compute_submission_embeddings",
+                side_effect=fake_embed,
+            ):
+                first = chunks()
+                enrich_chunks_with_per_question_answer_key(first, ak, SimpleNamespace())
+                # sections, chunk queries, per-unit snippets
+                self.assertEqual(calls, [3, 4, 4])
+                enrich_chunks_with_per_question_answer_key(chunks(), ak, SimpleNamespace())
+                self.assertEqual(calls[3:], [4, 4])
+        finally:
+            reset_answer_key_section_indexes()
+        heads = [
+            (c.evidence or {})["answer_key_unit"]["parsed"]["matched_section_heading"]
+            for c in first
+        ]
+        self.assertEqual(heads, ["## Part C", "## Part A", "## Part B", "## Part C"])
+
 
 class NotebookChunkerInformalHeadingsTests(unittest.TestCase):
     """Labs without ``Question 1.1`` headings — ``## Step``, ``(N min)`` titles, prompt prose."""
@@ -0,0 +1,108 @@
+"""Parse-once submission views (:class:`ParsedArtifactBundle` on ``IngestionEnvelope.parsed``)."""
+
+from __future__ import annotations
+
+import json
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from app.grading.multimodal.claude_structured_assignment_chunker import (
+    _submission_payload_for_claude,
+)
+from app.grading.multimodal.ingestion import ingest_raw_submission
+from app.grading.multimodal.llm_triplet_three_source import _student_submission_plaintext
+from app.grading.multimodal.notebook_chunker import build_notebook_qa_chunks
+from app.grading.multimodal.parsed_artifacts import ParsedArtifactBundle
+from app.grading.multimodal.rag_embeddings import _qa_segment_plaintext
+
+_PAGES = ["1. What is 2 + 2?", "Answer: 4"]
+_NB = json.dumps(
+    {
+        "cells": [
+            {"cell_type": "markdown", "source": "## Question 1\nAdd the numbers."},
+            {"cell_type": "code", "source": "total = 2 + 2"},
+        ],
+        "metadata": {},
+        "nbformat": 4,
+        "nbformat_minor": 5,
+    }
+).encode()
+
+
+class ParsedArtifactBundleTests(unittest.TestCase):
+    def setUp(self) -> None:
+        patcher = patch(
+            "app.grading.multimodal.parsed_artifacts.extract_pdf_pages",
+            return_value=list(_PAGES),
+        )
+        self.extract = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_pdf_parsed_once_across_extractors(self) -> None:
+        artifacts = {"pdf": b"%PDF-1.4 fake"}
+        bundle = ParsedArtifactBundle(artifacts)
+        plain = bundle.concatenated_plaintext()
+        envelope = ingest_raw_submission(
+            assignment_id="a1",
+            student_id="s1",
+            artifacts=artifacts,
+            extracted_plaintext=plain,
+            parsed=bundle,
+        )
+        self.assertIn("=== PDF TEXT ===", plain)
+        self.assertEqual(_student_submission_plaintext(envelope), plain.strip())
+        self.assertIn("Answer: 4", _qa_segment_plaintext(envelope))
+        self.assertEqual(_submission_payload_for_claude(envelope, 10_000), (plain.strip(), False))
+        self.assertEqual(envelope.parsed.pdf_pages(), _PAGES)
+        self.assertEqual(self.extract.call_count, 1)
+
+    def test_same_bytes_object_shares_views_and_replacement_recomputes(self) -> None:
+        pdf = b"%PDF-1.4 fake"
+        envelope = ingest_raw_submission(
+            assignment_id="a1", student_id="s1", artifacts={"pdf": pdf}
+        )
+        envelope.parsed.concatenated_plaintext()
+        envelope.parsed.reflowed_plaintext()
+        envelope.parsed.pdf_text()
+        self.assertEqual(self.extract.call_count, 1)
+        envelope.artifacts["pdf"] = b"%PDF-1.4 other"
+        envelope.parsed.concatenated_plaintext()
+        self.assertEqual(self.extract.call_count, 2)
+
+    def test_notebook_json_reused_by_chunker(self) -> None:
+        envelope = ingest_raw_submission(
+            assignment_id="a1", student_id="s1", artifacts={"ipynb": _NB}
+        )
+        nb = envelope.parsed.notebook()
+        self.assertIs(envelope.parsed.notebook(), nb)
+        self.assertEqual(len(envelope.parsed.notebook_cells()), 2)
+        with patch("app.grading.multimodal.notebook_chunker.load_notebook_json") as load:
+            chunks = build_notebook_qa_chunks(
+                _NB, notebook=nb, assignment_id="a1", student_id="s1"
+            )
+        load.assert_not_called()
+        self.assertTrue(chunks)
+
+    def test_slow_view_does_not_block_other_views(self) -> None:
+        started, release = threading.Event(), threading.Event()
+
+        def slow_pages(_raw: bytes) -> list[str]:
+            started.set()
+            release.wait(5)
+            return list(_PAGES)
+
+        self.extract.side_effect = slow_pages
+        bundle = ParsedArtifactBundle({"pdf": b"%PDF-1.4 fake", "ipynb": _NB})
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            pages = [pool.submit(bundle.pdf_pages) for _ in range(2)]
+            self.assertTrue(started.wait(5))
+            self.assertEqual(len(bundle.notebook_cells()), 2)
+            release.set()
+            self.assertEqual([f.result() for f in pages], [_PAGES, _PAGES])
+        self.assertEqual(self.extract.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
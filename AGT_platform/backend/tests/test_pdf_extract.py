@@ -0,0 +1,118 @@
+"""Page-level PDF extraction: process-pool path, page offsets and the sha256 cache."""
+
+from __future__ import annotations
+
+import io
+import unittest
+from unittest.mock import Mock, patch
+
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from app.grading import tools
+from app.grading.tools import extract_pdf_document, reset_pdf_extraction_cache
+
+
+def _pdf(pages: list[list[str]]) -> bytes:
+    """Minimal Helvetica text PDF: one entry per page, one string per line."""
+    writer = PdfWriter()
+    font = writer._add_object(
+        DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/Subtype"): NameObject("/Type1"),
+                NameObject("/BaseFont"): NameObject("/Helvetica"),
+            }
+        )
+    )
+    for lines in pages:
+        page = writer.add_blank_page(612, 792)
+        stream = DecodedStreamObject()
+        stream.set_data(
+            "".join(
+                f"BT /F1 12 Tf 72 {720 - 16 * i} Td ({line}) Tj ET\n"
+                for i, line in enumerate(lines)
+            ).encode()
+        )
+        page[NameObject("/Contents")] = writer._add_object(stream)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})}
+        )
+    buf = io.BytesIO()
+    writer.write(buf)
+    return buf.getvalue()
+
+
+_PAGES = [
+    [f"Problem {i}: explain why the estimator is unbiased.", f"Answer {i}: expectation."]
+    for i in range(1, 6)
+] + [[]]
+
+
+class PdfExtractTests(unittest.TestCase):
+    def setUp(self) -> None:
+        reset_pdf_extraction_cache()
+        self.addCleanup(reset_pdf_extraction_cache)
+
+    def test_parallel_matches_serial_and_spans_cite_pages(self) -> None:
+        data = _pdf(_PAGES)
+        with patch.object(tools.Config, "PDF_EXTRACT_CACHE_MAX_ENTRIES", 0), patch.object(
+            tools.Config, "PDF_EXTRACT_MIN_PAGES", 2
+        ):
+            serial = extract_pdf_document(data, workers=1)
+            parallel = extract_pdf_document(data, workers=2)
+        self.assertEqual(parallel, serial)
+        self.assertEqual(len(serial.pages), 6)
+        self.assertEqual(serial.pages[5], "")
+        for number, (start, end) in enumerate(serial.page_spans[:5], start=1):
+            self.assertEqual(serial.joined[start:end], serial.pages[number - 1])
+            self.assertEqual(serial.page_for_offset(start), number)
+        self.assertEqual(serial.text, tools.pdf_pages_to_text(list(serial.pages)))
+
+    def test_cache_by_sha256_and_serial_fallback(self) -> None:
+        data = _pdf(_PAGES[:3])
+        with patch.object(tools.Config, "PDF_EXTRACT_MIN_PAGES", 1), patch.object(
+            tools, "_extract_pages_parallel", return_value=None
+        ) as parallel:
+            first = extract_pdf_document(data, workers=4)
+            again = extract_pdf_document(bytes(data), workers=4)
+        parallel.assert_called_once()
+        self.assertIs(again, first)
+        self.assertIn("Problem 3", first.text)
+
+
+class PdfProcessPoolTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tools._reset_pdf_pool_after_fork()
+        self.addCleanup(tools._reset_pdf_pool_after_fork)
+
+    def test_pool_rebuilt_when_workers_change_and_dropped_after_fork(self) -> None:
+        with patch.object(tools, "ProcessPoolExecutor", side_effect=[Mock(), Mock()]) as executor:
+            first = tools._pdf_process_pool(2)
+            self.assertIs(tools._pdf_process_pool(2), first)
+            second = tools._pdf_process_pool(3)
+        self.assertIsNot(second, first)
+        first.shutdown.assert_called_once_with(wait=False)
+        self.assertEqual([c.kwargs["max_workers"] for c in executor.call_args_list], [2, 3])
+        tools._reset_pdf_pool_after_fork()
+        self.assertIsNone(tools._pdf_pool)
+        self.assertEqual(tools._pdf_pool_workers, 0)
+
+    def test_worker_errors_keep_the_pool_and_broken_pools_disable_it(self) -> None:
+        failed, broken = Mock(), Mock()
+        failed.result.side_effect = ValueError("bad xref")
+        broken.result.side_effect = tools.BrokenProcessPool("worker died")
+        pool = Mock()
+        with patch.object(tools, "_pdf_pool_disabled", False), patch.object(
+            tools, "_pdf_process_pool", return_value=pool
+        ), self.assertLogs(tools.__name__, level="WARNING"):
+            pool.submit.return_value = failed
+            self.assertIsNone(tools._extract_pages_parallel(b"%PDF", 4, 2))
+            self.assertFalse(tools._pdf_pool_disabled)
+            pool.submit.return_value = broken
+            self.assertIsNone(tools._extract_pages_parallel(b"%PDF", 4, 2))
+            self.assertTrue(tools._pdf_pool_disabled)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+"""Batched embedding API in :mod:`app.grading.rag_embeddings` (no network, no model download)."""
+
+from __future__ import annotations
+
+import unittest
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+import numpy as np
+
+from app.grading import rag_embeddings
+from app.grading.rag_embeddings import (
+    compute_submission_embedding,
+    compute_submission_embeddings,
+)
+
+
+def _cfg(**kw: Any) -> SimpleNamespace:
+    base = {
+        "RAG_EMBEDDING_BACKEND": "ollama",
+        "RAG_EMBED_ORDER": "auto",
+        "RAG_EMBED_MAX_CHARS": 24000,
+        "OPENAI_API_KEY": "",
+        "INTERNAL_OLLAMA_URL": "",
+        "OLLAMA_BASE_URL": "",
+    }
+    base.update(kw)
+    return SimpleNamespace(**base)
+
+
+class _FakeEmbeddings:
+    def __init__(self, *, fail_batches: set[int] | None = None):
+        self.inputs: list[list[str]] = []
+        self.fail_batches = fail_batches or set()
+
+    def create(self, *, model: str, input: list[str]) -> Any:
+        n = len(self.inputs)
+        self.inputs.append(list(input))
+        if n in self.fail_batches:
+            raise RuntimeError("rate limited")
+        # Reverse order on the wire; ``index`` maps back to the input position.
+        data = [
+            SimpleNamespace(index=i, embedding=[float(len(t))] * 8)
+            for i, t in reversed(list(enumerate(input)))
+        ]
+        return SimpleNamespace(data=data)
+
+
+class ComputeSubmissionEmbeddingsTests(unittest.TestCase):
+    def test_matches_single_text_path(self) -> None:
+        cfg = _cfg()
+        texts = ["alpha", "", "beta" * 10]
+        self.assertEqual(
+            compute_submission_embeddings(texts, cfg),
+            [compute_submission_embedding(t, cfg) for t in texts],
+        )
+
+    def test_openai_batches_and_keeps_input_order(self) -> None:
+        fake = _FakeEmbeddings()
+        cfg = _cfg(RAG_EMBEDDING_BACKEND="openai", OPENAI_API_KEY="sk", RAG_EMBED_BATCH_SIZE=2)
+        with patch(
+            "app.grading.llm_router.shared_openai_sdk_client",
+            return_value=SimpleNamespace(embeddings=fake),
+        ):
+            out = compute_submission_embeddings(["a", "bb", "ccc", "dddd", "eeeee"], cfg)
+        self.assertEqual([len(b) for b in fake.inputs], [2, 2, 1])
+        self.assertEqual([v[0] for v, _src in out], [1.0, 2.0, 3.0, 4.0, 5.0])
+        self.assertTrue(all(src.startswith("openai:") for _v, src in out))
+
+    def test_failed_batch_falls_back_per_text(self) -> None:
+        fake = _FakeEmbeddings(fail_batches={1})
+        cfg = _cfg(RAG_EMBEDDING_BACKEND="openai", OPENAI_API_KEY="sk", RAG_EMBED_BATCH_SIZE=2)
+        with (
+            patch(
+                "app.grading.llm_router.shared_openai_sdk_client",
+                return_value=SimpleNamespace(embeddings=fake),
+            ),
+            patch.object(
+                rag_embeddings,
+                "sentence_transformers_embed_texts",
+                side_effect=lambda texts, _cfg: [None] * len(texts),
+            ),
+        ):
+            with self.assertLogs("app.grading.rag_embeddings", level="WARNING"):
+                out = compute_submission_embeddings(["a", "bb", "ccc", "dddd"], cfg)
+        sources = [src for _v, src in out]
+        self.assertEqual(sources[:2], ["openai:text-embedding-3-small"] * 2)
+        self.assertTrue(all(s.startswith("deterministic_hash:") for s in sources[2:]))
+
+    def test_ollama_single_and_batch_use_the_same_endpoint(self) -> None:
+        urls: list[str] = []
+
+        def _post(url: str, *, json: dict, timeout: int) -> Any:
+            urls.append(url.rsplit("/", 1)[-1])
+            n = len(json["input"]) if isinstance(json.get("input"), list) else 1
+            body = {"embeddings": [[0.5] * 8] * n, "embedding": [0.25] * 8}
+            return SimpleNamespace(raise_for_status=lambda: None, json=lambda: body)
+
+        cfg = _cfg(OLLAMA_BASE_URL="http://ollama:11434", OLLAMA_EMBEDDINGS_MODEL="nomic")
+        with patch.object(rag_embeddings.requests, "post", side_effect=_post):
+            single = rag_embeddings._ollama_embed_snippet("alpha", cfg)
+            batch = rag_embeddings._ollama_embed_snippets(["alpha"], cfg)
+        self.assertEqual(urls, ["embed", "embed"])
+        self.assertEqual(batch, [single])
+        self.assertEqual(single[1], "ollama_embed:nomic")
+
+    def test_sentence_transformers_encodes_once(self) -> None:
+        calls: list[list[str]] = []
+
+        class _Model:
+            def encode(self, texts: list[str], **_kw: Any) -> np.ndarray:
+                calls.append(list(texts))
+                return np.ones((len(texts), 16))
+
+        cfg = _cfg(RAG_EMBEDDING_BACKEND="sentence_transformers", SENTENCE_TRANSFORMERS_MODEL="m")
+        with patch.object(rag_embeddings, "_get_sentence_transformer", return_value=_Model()):
+            out = compute_submission_embeddings(["x", "  ", "y"], cfg)
+        self.assertEqual(calls, [["x", "y"]])
+        self.assertEqual(out[0][1], "sentence_transformers:m")
+        self.assertTrue(out[1][1].startswith("deterministic_hash:"))
+
+
+if __name__ == "__main__":
+    unittest.main()
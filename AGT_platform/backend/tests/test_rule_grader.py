@@ -0,0 +1,109 @@
+"""Rule-based fast path before LLM grading (:mod:`app.grading.multimodal.rule_grader`)."""
+
+from __future__ import annotations
+
+import unittest
+from types import SimpleNamespace
+from typing import Any
+
+from app.grading.multimodal import (
+    MultimodalGradingConfig,
+    MultimodalGradingPipeline,
+    PipelineArtifactStore,
+    PreparedSubmission,
+    build_envelope_from_plaintext,
+)
+from app.grading.multimodal.rule_grader import rule_grade_chunk
+from app.grading.multimodal.schemas import GradingChunk, ReviewStatus, RubricType, SampledChunkGrade
+from tests.helpers import make_chunk
+
+_ROWS = [
+    {"name": "Functional Correctness", "max_points": 4},
+    {"name": "Code Quality", "max_points": 2},
+]
+
+
+def _chunk(student: str, reference: str, *, cid: str = "c1") -> GradingChunk:
+    return make_chunk(
+        chunk_id=cid,
+        question_id=cid,
+        extracted_text=student,
+        evidence={"trio": {"student_response": student, "answer_key_segment": reference}},
+        rubric_type=RubricType.PROGRAMMING_SCAFFOLDED,
+        rubric_rows=list(_ROWS),
+        routing_reason="test",
+    )
+
+
+class RuleDecisionTests(unittest.TestCase):
+    def test_exact_and_normalized_reference_match(self) -> None:
+        ref = "import csv\nrows = list(csv.reader(f))"
+        self.assertEqual(rule_grade_chunk(_chunk(ref, ref)).rule, "exact_reference")
+        spaced = "# load\nimport csv\nrows  =  list(csv.reader(f))\n"
+        self.assertEqual(rule_grade_chunk(_chunk(spaced, ref)).rule, "exact_reference")
+
+    def test_partial_or_contained_match_goes_to_llm(self) -> None:
+        ref = "import csv\nrows = list(csv.reader(f))"
+        self.assertIsNone(rule_grade_chunk(_chunk("import csv", ref)))
+        self.assertIsNone(rule_grade_chunk(_chunk("rows = []", ref)))
+
+    def test_placeholder_only_response_is_empty(self) -> None:
+        decision = rule_grade_chunk(_chunk("# write code for problem 1.1 here\n", "x = 1"))
+        self.assertEqual(decision.rule, "empty_response")
+
+
+class RuleGradingPipelineTests(unittest.TestCase):
+    class _Runner:
+        def __init__(self) -> None:
+            self.calls = 0
+
+        def run_chunk_samples(self, chunk, *, system_prompt: str, user_prompt: str):
+            self.calls += 1
+            raw = '{"criterion_scores": [], "normalized_score": 0.5}'
+            return [SampledChunkGrade("openai:fake", i, raw, None, False) for i in range(2)]
+
+    def _grade(self, chunks: list[GradingChunk], **cfg: Any) -> tuple[Any, int]:
+        runner = self._Runner()
+        app_cfg = SimpleNamespace(**cfg)
+        pipeline = MultimodalGradingPipeline(MultimodalGradingConfig(), runner, app_cfg=app_cfg)
+        prepared = PreparedSubmission(
+            envelope=build_envelope_from_plaintext(
+                assignment_id="a1", student_id="s1", plaintext="x"
+            ),
+            chunks=chunks,
+            answer_key_for_prompt="",
+            dataset_plain="",
+            artifacts=PipelineArtifactStore(),
+            workflow=[],
+        )
+        return pipeline.grade_prepared(prepared), runner.calls
+
+    def test_short_circuits_skip_the_llm_and_are_traced(self) -> None:
+        ref = "df = pd.read_csv('a.csv')"
+        result, calls = self._grade(
+            [_chunk(ref, ref, cid="q1"), _chunk("", ref, cid="q2"), _chunk("x = 2", ref, cid="q3")]
+        )
+        self.assertEqual(calls, 1)
+        exact, empty, llm = result.chunk_results
+        self.assertEqual(exact.normalized_score_estimate, 1.0)
+        self.assertEqual(exact.review_status, ReviewStatus.AUTO_ACCEPTED)
+        self.assertGreaterEqual(exact.ai_confidence, 0.9)
+        self.assertEqual(exact.stage_artifacts["rule_grading"]["rule"], "exact_reference")
+        self.assertEqual(exact.stage_artifacts["model_ids"], ["rule:exact_reference"])
+        self.assertEqual(empty.normalized_score_estimate, 0.0)
+        self.assertNotIn("rule_grading", llm.stage_artifacts)
+        workflow = result.stage_artifacts["agentic_workflow"]
+        phase = [w for w in workflow if w["phase"] == "rule_grading"]
+        self.assertEqual(phase[0]["exact_reference"], 1)
+        self.assertEqual(phase[0]["empty_response"], 1)
+        self.assertEqual(phase[0]["chunk_ids"], ["q1", "q2"])
+
+    def test_switch_disables_fast_path(self) -> None:
+        ref = "df = pd.read_csv('a.csv')"
+        result, calls = self._grade([_chunk(ref, ref)], MULTIMODAL_RULE_GRADER=False)
+        self.assertEqual(calls, 1)
+        self.assertNotIn("rule_grading", result.chunk_results[0].stage_artifacts)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,7 +6,9 @@ import math
 import unittest
 
 from app.grading.multimodal.semantic_confidence import (
+    adaptive_sampling_can_stop,
     aggregate_assignment_confidence,
+    confidence_band,
     estimate_cluster_distribution,
     normalize_entropy_to_confidence,
     summarize_chunk_confidence_from_counts,
@@ -51,5 +53,36 @@ class AggregateAssignmentConfidenceTests(unittest.TestCase):
         self.assertEqual(len(trace["per_chunk"]), 2)
 
 
+class AdaptiveStopRuleTests(unittest.TestCase):
+    _cuts = {"auto_accept_min": 0.85, "caution_min": 0.50}
+
+    def test_band_uses_review_cut_points(self) -> None:
+        self.assertEqual(confidence_band(0.9, **self._cuts), "auto_accept")
+        self.assertEqual(confidence_band(0.6, **self._cuts), "caution")
+        self.assertEqual(confidence_band(0.1, **self._cuts), "flagged")
+
+    def test_unanimous_needs_min_valid_and_agreement(self) -> None:
+        self.assertFalse(adaptive_sampling_can_stop({"a": 1}, remaining=4, **self._cuts))
+        self.assertTrue(adaptive_sampling_can_stop({"a": 2}, remaining=3, **self._cuts))
+        self.assertFalse(adaptive_sampling_can_stop({"a": 2, "b": 1}, remaining=2, **self._cuts))
+
+    def test_exhausted_budget_always_stops(self) -> None:
+        self.assertTrue(adaptive_sampling_can_stop({"a": 2, "b": 1}, remaining=0, **self._cuts))
+
+    def test_band_stable_stops_only_when_remaining_cannot_flip_band(self) -> None:
+        # Two agreeing samples with three to go: a split could still drop out of auto-accept.
+        self.assertFalse(
+            adaptive_sampling_can_stop(
+                {"a": 2}, remaining=3, rule="band_stable", **self._cuts
+            )
+        )
+        # Evenly split and one sample left: flagged whatever the last sample says.
+        self.assertTrue(
+            adaptive_sampling_can_stop(
+                {"a": 2, "b": 2}, remaining=1, rule="band_stable", **self._cuts
+            )
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,56 @@
+"""Vectorized cosine kernel (:mod:`app.grading.similarity`)."""
+
+from __future__ import annotations
+
+import unittest
+
+import numpy as np
+
+from app.grading.similarity import best_match, cosine, cosine_matrix, top_k, unit_rows
+
+
+class CosineTests(unittest.TestCase):
+    def test_degenerate_inputs_score_zero(self) -> None:
+        self.assertEqual(cosine([], []), 0.0)
+        self.assertEqual(cosine([1.0, 2.0], [1.0, 2.0, 3.0]), 0.0)
+        self.assertEqual(cosine([0.0, 0.0], [1.0, 0.0]), 0.0)
+        self.assertAlmostEqual(cosine([1.0, 0.0], [2.0, 0.0]), 1.0, places=6)
+        self.assertAlmostEqual(cosine([1.0, 0.0], [-3.0, 0.0]), -1.0, places=6)
+
+    def test_unit_rows_zeroes_off_width_rows(self) -> None:
+        mat = unit_rows([[3.0, 4.0], [1.0, 2.0, 3.0], [0.0, 0.0], [0.0, 5.0]])
+        self.assertEqual(mat.shape, (4, 2))
+        self.assertEqual(mat.dtype, np.float32)
+        np.testing.assert_allclose(mat[0], [0.6, 0.8], rtol=1e-6)
+        self.assertFalse(mat[1].any())
+        self.assertFalse(mat[2].any())
+
+    def test_matrix_width_mismatch_is_zero(self) -> None:
+        scores = cosine_matrix(unit_rows([[1.0, 0.0]]), unit_rows([[1.0, 0.0, 0.0]]))
+        self.assertEqual(scores.shape, (1, 1))
+        self.assertEqual(float(scores[0, 0]), 0.0)
+
+
+class TopKTests(unittest.TestCase):
+    def test_orders_by_score_and_breaks_ties_by_index(self) -> None:
+        keys = unit_rows([[0.0, 1.0], [1.0, 0.0], [1.0, 0.0], [1.0, 1.0]])
+        idx, scores = top_k(unit_rows([[1.0, 0.0]]), keys, 3)
+        self.assertEqual(idx.tolist(), [[1, 2, 3]])
+        self.assertAlmostEqual(float(scores[0, 2]), 2**-0.5, places=6)
+
+    def test_k_is_clamped_to_key_count(self) -> None:
+        idx, scores = top_k(unit_rows([[1.0], [2.0]]), unit_rows([[1.0]]), 5)
+        self.assertEqual(idx.shape, (2, 1))
+        idx, scores = top_k(unit_rows([[1.0]]), unit_rows([[1.0]]), 0)
+        self.assertEqual(idx.shape, (1, 0))
+        self.assertEqual(scores.shape, (1, 0))
+
+    def test_best_match(self) -> None:
+        self.assertEqual(best_match([1.0, 0.0], []), (-1, -1.0))
+        i, sim = best_match([1.0, 0.0], [[1.0, 0.0, 0.0], [0.0, 1.0], [0.9, 0.1]])
+        self.assertEqual(i, 2)
+        self.assertGreater(sim, 0.99)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""Batched presign and concurrent HEAD checks used by the upload start/finalize endpoints."""
+
+from __future__ import annotations
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+from botocore.exceptions import ClientError
+
+from app.storage import (
+    head_objects,
+    missing_object_keys,
+    presigned_put_url,
+    presigned_put_urls,
+    reset_s3_clients,
+)
+
+_OBJECTS = {"u/1/a.pdf": 1234, "u/1/b.ipynb": 56}
+
+
+class _HeadClient:
+    def head_object(self, *, Bucket: str, Key: str) -> dict:
+        if Key == "u/1/denied":
+            raise ClientError({"Error": {"Code": "403"}}, "HeadObject")
+        if Key not in _OBJECTS:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        return {"ContentLength": _OBJECTS[Key], "ETag": f'"etag-{Key[-1]}"'}
+
+
+def _cfg(**kw) -> SimpleNamespace:
+    base = dict(
+        S3_ENDPOINT="http://minio:9000",
+        S3_PRESIGN_ENDPOINT="http://127.0.0.1:9000",
+        S3_ACCESS_KEY="minio",
+        S3_SECRET_KEY="minio-secret",
+        S3_REGION="us-east-1",
+        AWS_REGION="us-east-1",
+        S3_SECURE=False,
+        S3_ADDRESSING_STYLE="",
+        S3_BUCKET="uploads",
+        S3_PRESIGN_PUT_EXPIRES=900,
+        S3_HEAD_CONCURRENCY=4,
+    )
+    base.update(kw)
+    return SimpleNamespace(**base)
+
+
+class BatchStorageTests(unittest.TestCase):
+    def setUp(self) -> None:
+        reset_s3_clients()
+        self.addCleanup(reset_s3_clients)
+
+    def test_presign_batch_matches_single_presign(self) -> None:
+        cfg = _cfg()
+        urls = presigned_put_urls(cfg, [("u/1/a.pdf", "application/pdf"), ("u/1/b.ipynb", "")])
+        self.assertEqual(len(urls), 2)
+        first = urlparse(urls[0])
+        self.assertEqual((first.netloc, first.path), ("127.0.0.1:9000", "/uploads/u/1/a.pdf"))
+        self.assertEqual(parse_qs(first.query)["X-Amz-Expires"], ["900"])
+        single = urlparse(presigned_put_url(cfg, "u/1/a.pdf", "application/pdf"))
+        self.assertEqual(single.path, first.path)
+
+    def test_head_objects_keeps_order_and_reports_size_and_etag(self) -> None:
+        with patch("app.storage.s3_client", return_value=_HeadClient()):
+            stats = head_objects(_cfg(), ["u/1/b.ipynb", "u/1/gone.py", "u/1/a.pdf"])
+            missing = missing_object_keys(_cfg(), ["u/1/gone.py", "u/1/a.pdf", "u/1/x"])
+            with self.assertRaises(ClientError):
+                head_objects(_cfg(), ["u/1/a.pdf", "u/1/denied"])
+        self.assertEqual([s.key for s in stats], ["u/1/b.ipynb", "u/1/gone.py", "u/1/a.pdf"])
+        self.assertEqual([s.exists for s in stats], [True, False, True])
+        self.assertEqual((stats[2].size, stats[2].etag), (1234, "etag-f"))
+        self.assertIsNone(stats[1].size)
+        self.assertEqual(missing, ["u/1/gone.py", "u/1/x"])
+
+
+if __name__ == "__main__":
+    unittest.main()
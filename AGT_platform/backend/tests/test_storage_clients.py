@@ -0,0 +1,60 @@
+"""Process-wide boto3 client cache (:func:`app.storage.s3_client`)."""
+
+from __future__ import annotations
+
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from app.storage import reset_s3_clients, s3_client, s3_client_for_presign
+
+
+def _cfg(**kw) -> SimpleNamespace:
+    base = dict(
+        S3_ENDPOINT="http://minio:9000",
+        S3_PRESIGN_ENDPOINT="http://127.0.0.1:9000",
+        S3_ACCESS_KEY="minio",
+        S3_SECRET_KEY="minio-secret",
+        S3_REGION="us-east-1",
+        AWS_REGION="us-east-1",
+        S3_SECURE=False,
+        S3_ADDRESSING_STYLE="",
+        S3_MAX_POOL_CONNECTIONS=16,
+        S3_RETRY_MODE="adaptive",
+        S3_MAX_ATTEMPTS=5,
+        S3_CONNECT_TIMEOUT_SEC=2.0,
+        S3_READ_TIMEOUT_SEC=30.0,
+    )
+    base.update(kw)
+    return SimpleNamespace(**base)
+
+
+class SharedS3ClientTests(unittest.TestCase):
+    def setUp(self) -> None:
+        reset_s3_clients()
+        self.addCleanup(reset_s3_clients)
+
+    def test_one_client_per_endpoint_and_credentials(self) -> None:
+        cfg = _cfg()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            clients = list(pool.map(lambda _i: s3_client(cfg), range(8)))
+        self.assertTrue(all(c is clients[0] for c in clients))
+        self.assertIs(s3_client(_cfg()), clients[0])
+        self.assertIsNot(s3_client(_cfg(S3_SECRET_KEY="rotated")), clients[0])
+        presign = s3_client_for_presign(cfg)
+        self.assertIsNot(presign, clients[0])
+        self.assertEqual(presign.meta.endpoint_url, "http://127.0.0.1:9000")
+        reset_s3_clients()
+        self.assertIsNot(s3_client(cfg), clients[0])
+
+    def test_tuning_reaches_botocore_config(self) -> None:
+        conf = s3_client(_cfg()).meta.config
+        self.assertEqual(conf.max_pool_connections, 16)
+        self.assertEqual(conf.retries, {"mode": "adaptive", "total_max_attempts": 5})
+        self.assertEqual((conf.connect_timeout, conf.read_timeout), (2.0, 30.0))
+        conf = s3_client(_cfg(S3_RETRY_MODE="bogus")).meta.config
+        self.assertEqual(conf.retries["mode"], "standard")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Concurrent, sha256-checked artifact downloads (:func:`app.storage.fetch_objects`)."""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app import storage
+from app.storage import ObjectDigestMismatch, fetch_objects
+
+_BODIES = {
+    "subs/1/notes.txt": b"short answer",
+    "subs/1/report.pdf": b"%PDF-1.4 " + b"x" * 5000,
+    "subs/1/empty.py": b"",
+}
+
+
+class _Client:
+    def __init__(self) -> None:
+        self.keys: list[str] = []
+        self._lock = threading.Lock()
+
+    def get_object(self, *, Bucket: str, Key: str) -> dict:
+        with self._lock:
+            self.keys.append(Key)
+        return {"Body": io.BytesIO(_BODIES[Key]), "ContentLength": len(_BODIES[Key])}
+
+
+def _cfg(**kw) -> SimpleNamespace:
+    base = dict(
+        S3_BUCKET="grading",
+        S3_DOWNLOAD_CONCURRENCY=4,
+        S3_DOWNLOAD_VERIFY_SHA256=True,
+    )
+    base.update(kw)
+    return SimpleNamespace(**base)
+
+
+def _sha(key: str) -> str:
+    return hashlib.sha256(_BODIES[key]).hexdigest()
+
+
+class FetchObjectsTests(unittest.TestCase):
+    def test_one_client_input_order_and_digests(self) -> None:
+        client = _Client()
+        keys = list(_BODIES)
+        with patch.object(storage, "s3_client", return_value=client) as build:
+            fetched = fetch_objects(_cfg(), [(k, _sha(k).upper()) for k in keys])
+        build.assert_called_once()
+        self.assertEqual(sorted(client.keys), sorted(keys))
+        self.assertEqual([obj.key for obj in fetched], keys)
+        self.assertEqual([obj.data for obj in fetched], list(_BODIES.values()))
+        self.assertEqual(fetched[1].size, len(_BODIES["subs/1/report.pdf"]))
+        self.assertEqual(fetched[0].sha256, _sha("subs/1/notes.txt"))
+
+    def test_digest_mismatch_raises_unless_verification_off(self) -> None:
+        items = [("subs/1/notes.txt", None), ("subs/1/report.pdf", "0" * 64)]
+        with self.assertRaises(ObjectDigestMismatch):
+            fetch_objects(_cfg(), items, client=_Client())
+        fetched = fetch_objects(_cfg(S3_DOWNLOAD_VERIFY_SHA256=False), items, client=_Client())
+        self.assertEqual(len(fetched), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""Id-based cohort grading task (:func:`app.tasks.grade_submission_cohort`), DB and S3 mocked."""
+
+from __future__ import annotations
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app import tasks
+
+
+class GradeSubmissionCohortTests(unittest.TestCase):
+    def test_groups_by_assignment_and_marks_failures(self) -> None:
+        subs = {
+            1: SimpleNamespace(id=1, assignment_id=10, student_id=101),
+            2: SimpleNamespace(id=2, assignment_id=10, student_id=102),
+            3: SimpleNamespace(id=3, assignment_id=20, student_id=103),
+            4: SimpleNamespace(id=4, assignment_id=10, student_id=104),
+        }
+        db = MagicMock()
+        db.query.return_value.get.side_effect = lambda aid: SimpleNamespace(id=aid)
+
+        def inputs(_cfg, sub, assignment):
+            if sub.id == 4:
+                raise ValueError("download failed")
+            return assignment, {"txt": b"x"}, None, None
+
+        def cohort(_cfg, _assign, rows, *, assignment_id, rubric_text, answer_key_text):
+            return {
+                row.submission_id: RuntimeError("llm") if row.submission_id == 2 else {"ok": 1}
+                for row in rows
+            }
+
+        with (
+            patch.object(tasks, "_ensure_db"),
+            patch.object(tasks, "SessionLocal", return_value=db),
+            patch.object(tasks, "_claim_course_submission", side_effect=lambda _db, i: subs[i]),
+            patch.object(tasks, "_course_grading_inputs", side_effect=inputs),
+            patch.object(tasks, "run_db_cohort_multimodal_pipeline", side_effect=cohort) as run,
+            patch.object(tasks, "_store_course_result") as store,
+            patch.object(tasks, "_mark_course_error") as mark_error,
+            self.assertLogs(tasks.__name__, level="ERROR"),
+        ):
+            tasks.grade_submission_cohort.run([1, 2, 3, 4, 1])
+        batches = {
+            c.kwargs["assignment_id"]: [r.submission_id for r in c.args[2]]
+            for c in run.call_args_list
+        }
+        self.assertEqual(batches, {10: [1, 2], 20: [3]})
+        self.assertEqual(sorted(c.args[2] for c in store.call_args_list), [1, 3])
+        self.assertEqual(sorted(c.args[1] for c in mark_error.call_args_list), [2, 4])
+        db.close.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+"""Prompt-cache-friendly chunk prompt layout and per-submission token usage accounting."""
+
+from __future__ import annotations
+
+import json
+import os
+import unittest
+from types import SimpleNamespace
+from typing import Any
+
+from app.grading.llm_router import _openai_usage, sum_token_usage
+from app.grading.multimodal import (
+    MultimodalGradingConfig,
+    MultimodalGradingPipeline,
+    PipelineArtifactStore,
+    PreparedSubmission,
+    build_envelope_from_plaintext,
+)
+from app.grading.multimodal.model_runner import MultiModelChunkRunner
+from app.grading.multimodal.prompts_chunk import build_chunk_grading_prompt
+from app.grading.multimodal.schemas import GradingChunk, RubricType
+from tests.helpers import make_chunk
+
+_ROWS = [{"name": "Correctness", "max_points": 2}]
+
+
+def _chunk(i: int) -> GradingChunk:
+    return make_chunk(
+        chunk_id=f"c{i}",
+        question_id=str(i),
+        extracted_text=f"answer {i}",
+        evidence={"trio": {"student_response": f"x = {i}", "answer_key_segment": f"x = {i}0"}},
+        rubric_type=RubricType.FREE_RESPONSE,
+        rubric_rows=list(_ROWS),
+    )
+
+
+class PromptPrefixTests(unittest.TestCase):
+    def test_assignment_constant_fields_form_shared_prefix(self) -> None:
+        prompts = [
+            build_chunk_grading_prompt(
+                _chunk(i),
+                task_description="Week 1",
+                answer_key_text="x = 10\nx = 20",
+                dataset_context_text="a,b\n1,2",
+            )
+            for i in (1, 2)
+        ]
+        keys = list(json.loads(prompts[0]))
+        self.assertEqual(
+            keys[:5],
+            [
+                "instructions",
+                "output_schema_hint",
+                "task_description",
+                "reference_answer_key",
+                "matched_dataset_preview",
+            ],
+        )
+        self.assertIn("chunk_instructions", keys)
+        prefix = os.path.commonprefix(prompts)
+        self.assertIn('"matched_dataset_preview"', prefix)
+        self.assertNotIn('"extracted_text"', prefix)
+
+
+class UsageParsingTests(unittest.TestCase):
+    def test_cached_prompt_tokens_from_prompt_tokens_details(self) -> None:
+        resp = SimpleNamespace(
+            usage=SimpleNamespace(
+                prompt_tokens=2000,
+                completion_tokens=100,
+                total_tokens=2100,
+                prompt_tokens_details=SimpleNamespace(cached_tokens=1536),
+            )
+        )
+        self.assertEqual(_openai_usage(resp)["cached_prompt_tokens"], 1536)
+        self.assertEqual(_openai_usage(SimpleNamespace(usage=None))["cached_prompt_tokens"], 0)
+
+    def test_sum_token_usage_skips_missing(self) -> None:
+        total = sum_token_usage([{"prompt_tokens": 3, "cached_prompt_tokens": 1}, None, {}])
+        self.assertEqual((total["prompt_tokens"], total["cached_prompt_tokens"]), (3, 1))
+
+
+class SubmissionTokenUsageTests(unittest.TestCase):
+    class _Client:
+        supports_multi_choice = True
+
+        def chat_json_with_usage(self, messages: list[dict], **_kw: Any):
+            return {"criterion_scores": [], "normalized_score": 1.0}, {
+                "prompt_tokens": 1000,
+                "completion_tokens": 50,
+                "total_tokens": 1050,
+                "cached_prompt_tokens": 768,
+            }
+
+        def chat_json_choices_with_usage(self, messages: list[dict], *, n: int, **_kw: Any):
+            usage = {
+                "prompt_tokens": 1000,
+                "completion_tokens": 50 * n,
+                "total_tokens": 1000 + 50 * n,
+                "cached_prompt_tokens": 896,
+            }
+            return [{"criterion_scores": [], "normalized_score": 1.0}] * n, usage
+
+        def chat_json_choices(self, messages: list[dict], *, n: int, **kw: Any):
+            return self.chat_json_choices_with_usage(messages, n=n, **kw)[0]
+
+    def _grade(self, **cfg: Any) -> Any:
+        app_cfg = SimpleNamespace(
+            MULTIMODAL_SAMPLES_PER_MODEL=3, MULTIMODAL_RULE_GRADER=False, **cfg
+        )
+        client = self._Client()
+        runner = MultiModelChunkRunner(
+            app_cfg,  # type: ignore[arg-type]
+            build_clients=lambda _cfg: [(client, "openai:fake")],
+        )
+        pipeline = MultimodalGradingPipeline(MultimodalGradingConfig(), runner, app_cfg=app_cfg)
+        prepared = PreparedSubmission(
+            envelope=build_envelope_from_plaintext(
+                assignment_id="a1", student_id="s1", plaintext="x"
+            ),
+            chunks=[_chunk(1), _chunk(2)],
+            answer_key_for_prompt="",
+            dataset_plain="",
+            artifacts=PipelineArtifactStore(),
+            workflow=[],
+        )
+        return pipeline.grade_prepared(prepared)
+
+    def test_multi_choice_usage_counted_once_per_request(self) -> None:
+        result = self._grade()
+        chunk_usage = result.chunk_results[0].stage_artifacts["token_usage"]
+        self.assertEqual(chunk_usage["prompt_tokens"], 1000)
+        self.assertEqual(chunk_usage["cached_prompt_tokens"], 896)
+        total = result.stage_artifacts["token_usage"]
+        self.assertEqual(total["prompt_tokens"], 2000)
+        self.assertEqual(total["cached_prompt_tokens"], 1792)
+        phase = [
+            w for w in result.stage_artifacts["agentic_workflow"] if w["phase"] == "token_usage"
+        ]
+        self.assertEqual(phase[0]["cached_prompt_ratio"], 0.896)
+
+    def test_single_calls_sum_every_sample(self) -> None:
+        result = self._grade(MULTIMODAL_OPENAI_MULTI_CHOICE=False)
+        total = result.stage_artifacts["token_usage"]
+        self.assertEqual(total["prompt_tokens"], 6000)
+        self.assertEqual(total["cached_prompt_tokens"], 6 * 768)
+
+
+if __name__ == "__main__":
+    unittest.main()